@@ -10,31 +10,49 @@ Key Components:
 - SQLAlchemy database initialization
 - Flask-Login authentication setup
 - Blueprint registration for modular routing
+- Request and SQL instrumentation (opt-in /metrics endpoint)
 - Environment variable configuration
-- Database file management and creation
+- Database file management and schema version check
 
 The factory pattern allows for easy testing and multiple application instances
 with different configurations.
+
+Startup is kept cheap for preforked workers: the .env file is read inside the
+factory rather than at import, route modules are imported only when blueprints
+are registered, and tables are created only when the stored schema version is
+stale (see app/utils/schema.py). Run benchmarks/startup.py to measure it.
 """
 
 import os
 
-from flask import Flask
+from flask import Flask, request
 from flask_login import LoginManager
 from dotenv import load_dotenv
 
 from .models import db, User
-from .routes import register_blueprints
-
-# Load environment variables from .env file
-load_dotenv()
+from .utils.analytics import init_analytics
+from .utils.cache import init_cache
+from .utils.changes import install_change_listeners
+from .utils.goals import install_goals
+from .utils.hashing import init_password_hasher
+from .utils.jobs import init_jobs
+from .utils.leaderboard import init_leaderboard
+from .utils.log_search import install_log_search
+from .utils.log_sync import install_log_sync
+from .utils.metrics import init_metrics
+from .utils.piece_totals import init_piece_totals
+from .utils.rollups import init_rollups
+from .utils.schema import ensure_schema
+from .utils.streaks import install_streaks
+from .utils.suggest import install_piece_suggest
+from .utils.user_cache import READ_ONLY_METHODS, init_user_cache
 
 # Initialize Flask-Login for user session management
 login_manager = LoginManager()
 login_manager.login_view = "auth.login"    # Redirect unauthenticated users to login
 login_manager.login_message = None         # Disable default login required message
 
-def create_app():
+def create_app(config=None):
     """
     Create and configure the Flask application instance.
     
@@ -42,9 +60,17 @@ def create_app():
     tracker application including database configuration, authentication,
     routing, and static file handling.
     
+    Args:
+        config (dict): Optional configuration overrides, applied before any
+            extension is initialized (e.g. a test database URI)
+    
     Returns:
         Flask: Configured Flask application instance ready to run
     """
+    # Load environment variables from .env file
+    load_dotenv()
+
+
     # Create Flask application with custom static and template folders
     app = Flask(
         __name__,
@@ -64,10 +90,50 @@ def create_app():
     app.config["SQLALCHEMY_DATABASE_URI"] = db_uri
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False  # Disable event system for performance
     app.secret_key = os.getenv("SECRET_KEY")               # Secret key for sessions (from .env)
+    app.config["METRICS_ENABLED"] = os.getenv("METRICS_ENABLED") == "1"              # Expose /metrics
+    app.config["SERVER_TIMING_ENABLED"] = os.getenv("SERVER_TIMING_ENABLED") == "1"  # Add Server-Timing header
+    app.config["SLOW_QUERY_MS"] = float(os.getenv("SLOW_QUERY_MS", "100"))          # Slow-query log threshold
+    app.config["USER_CACHE_TTL"] = float(os.getenv("USER_CACHE_TTL", "60"))        # User snapshot lifetime (0 disables)
+    app.config["USER_CACHE_SIZE"] = int(os.getenv("USER_CACHE_SIZE", "1024"))      # Max cached users per worker
+    app.config["PASSWORD_HASH_METHOD"] = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")  # Hash method and cost
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # Hashing threads
+    app.config["PASSWORD_HASH_QUEUE"] = int(os.getenv("PASSWORD_HASH_QUEUE", "8"))      # Hashes allowed to wait
+    app.config["PASSWORD_HASH_WAIT"] = float(os.getenv("PASSWORD_HASH_WAIT", "0.5"))    # Seconds before 503
+    app.config["ANALYTICS_PROCESSES"] = int(os.getenv("ANALYTICS_PROCESSES", "2"))      # Report processes (0 = inline)
+    app.config["ANALYTICS_TIMEOUT"] = float(os.getenv("ANALYTICS_TIMEOUT", "10"))       # Seconds before 503
+    app.config["ANALYTICS_CACHE_TTL"] = float(os.getenv("ANALYTICS_CACHE_TTL", "3600"))  # Cached report lifetime
+    app.config["DASHBOARD_CACHE_TTL"] = float(os.getenv("DASHBOARD_CACHE_TTL", "300"))  # Section cache lifetime (0 disables)
+    app.config["CACHE_URL"] = os.getenv("CACHE_URL", "memory://")                   # Computed-stats cache backend
+    app.config["CACHE_SIZE"] = int(os.getenv("CACHE_SIZE", "4096"))                  # Max entries (memory/sqlite backends)
+    app.config["CACHE_PREFIX"] = os.getenv("CACHE_PREFIX", "subwoofer")              # Key prefix (one per database)
+    app.config["SINGLEFLIGHT_TIMEOUT"] = float(os.getenv("SINGLEFLIGHT_TIMEOUT", "10"))  # Seconds a duplicate request waits (0 disables)
+    app.config["JOB_WORKERS"] = int(os.getenv("JOB_WORKERS", "1"))                  # Background job threads
+    app.config["JOB_POLL_SECONDS"] = float(os.getenv("JOB_POLL_SECONDS", "1"))      # Idle worker poll interval
+    app.config["JOB_MAX_ATTEMPTS"] = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))        # Retries before "failed"
+    app.config["JOB_BACKOFF_SECONDS"] = float(os.getenv("JOB_BACKOFF_SECONDS", "2"))  # First retry delay
+    app.config["ADMIN_USERNAMES"] = os.getenv("ADMIN_USERNAMES", "")                # Comma-separated admins
+
+    # Apply caller overrides before extensions read the configuration
+    if config:
+        app.config.update(config)
 
     # Initialize extensions with the app
     db.init_app(app)           # SQLAlchemy database
     login_manager.init_app(app) # Flask-Login authentication
+    init_metrics(app)           # Request latency and SQL query instrumentation
+    init_user_cache(app)        # Cached user snapshots for read-only requests
+    init_password_hasher(app)   # Bounded password hashing pool
+    init_cache(app)             # Shared backend for computed stats (memory, SQLite file or Redis)
+    init_analytics(app)         # Process pool for long-range reports
+    install_change_listeners()  # Bump users' data_version on log/piece writes
+    init_rollups(app)           # Enqueue daily rollup jobs on log writes
+    install_streaks()           # Maintain practice streaks on log writes
+    install_goals()             # Maintain goal progress on log writes
+    init_leaderboard(app)       # Maintain leaderboard scores on log writes
+    init_piece_totals(app)      # Keep Piece.log_time in step with log edits/deletes
+    install_log_sync()          # Stamp change versions and tombstones for delta sync
+    install_piece_suggest()     # Index the words of new pieces for suggestions
+    install_log_search()        # Full-text search table over notes, created with the schema
 
     # Enable foreign key constraints for SQLite
     def enable_sqlite_foreign_keys():
@@ -91,15 +157,19 @@ def create_app():
         """
         Load user for Flask-Login sessions.
         
-        This callback function loads a user object from the database
-        given their user ID stored in the session.
+        Read-only requests get an immutable UserSnapshot from the per-worker
+        user cache, so they usually skip the user query; requests that may
+        write load the full User object from the database.
         
         Args:
             user_id (str): User ID from the session
             
         Returns:
-            User: User object or None if not found
+            User | UserSnapshot: User object or None if not found
         """
+        cache = app.extensions.get("user_cache")
+        if cache is not None and request.method in READ_ONLY_METHODS:
+            return cache.get(int(user_id))
         return db.session.get(User, int(user_id))
 
     @app.context_processor
@@ -116,12 +186,17 @@ def create_app():
         from flask_login import current_user
         return dict(user=current_user)
 
-    # Register all route blueprints for modular routing
+    # Register all route blueprints for modular routing (imported here so
+    # importing the package does not pull in every route module)
+    from .routes import register_blueprints
     register_blueprints(app)
     
-    # Ensure database folder exists and create tables
+    # Ensure database folder exists and create tables only if the stored
+    # schema version is out of date
     os.makedirs(db_folder, exist_ok=True)  # Create instance folder if needed
-    with app.app_context():
-        db.create_all()  # Create database tables if they don't exist
+    ensure_schema(app)
+
+    # Start background job workers once the job table is known to exist
+    init_jobs(app)
     
     return app
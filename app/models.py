@@ -9,6 +9,11 @@ Models:
 - User: User accounts with authentication and timezone preferences
 - PracticeLog: Individual practice sessions with detailed metadata
 - Piece: Musical pieces that users practice, linked to practice logs
+- DailyTotal: Per-user practice minutes rolled up by local date
+- Streak: Per-user practice streak state, maintained incrementally
+- Job: Durable background job queue entries
+- Goal: Practice-minute goals with incrementally maintained progress
+- LeaderboardScore: Per-window practice minutes of each user for leaderboards
 
 Key Features:
 - UTC timestamp storage with timezone conversion
@@ -19,6 +24,7 @@ Key Features:
 
 from datetime import datetime, timezone
 
+from flask import current_app, has_app_context
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import check_password_hash, generate_password_hash
@@ -38,6 +44,11 @@ def utc_now():
 # Initialize SQLAlchemy database instance
 db = SQLAlchemy()
 
+# Version of the schema described by these models. Bump this whenever a
+# table, column or index is added so existing databases are upgraded on the
+# next boot (see app/utils/schema.py).
+SCHEMA_VERSION = 12
+
 class User(UserMixin, db.Model):
     """
     User model for authentication and user management.
@@ -52,6 +63,8 @@ class User(UserMixin, db.Model):
         password_hash: Securely hashed password (never store plaintext)
         creation_date: UTC timestamp of account creation
         timezone: User's preferred timezone for display purposes
+        data_version: Counter bumped whenever the user's logs or pieces change
+            (see app/utils/changes.py); keys caches of derived statistics
         
     Relationships:
         logs: One-to-many relationship with PracticeLog (user.logs)
@@ -64,11 +77,12 @@ class User(UserMixin, db.Model):
 
     # Authentication fields
     username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)  # Never store plaintext passwords
+    password_hash = db.Column(db.String(256), nullable=False)  # Never store plaintext passwords
     
     # User metadata
-    creation_date = db.Column(db.DateTime, default=utc_now(), nullable=False)
+    creation_date = db.Column(db.DateTime, default=utc_now, nullable=False)
     timezone = db.Column(db.String(50), default="UTC", nullable=False)  # User's timezone preference
+    data_version = db.Column(db.Integer, default=0, server_default="0", nullable=False)  # Bumped on log/piece changes
 
     # Relationship definitions for easy access to related data
     logs = db.relationship("PracticeLog", backref="user", lazy=True)    # Access via user.logs
@@ -78,10 +92,14 @@ class User(UserMixin, db.Model):
         """
         Hash and store a user's password securely.
         
+        Uses the app's PASSWORD_HASH_METHOD. This runs on the calling thread;
+        request handlers hash through the bounded pool in app/utils/hashing.py.
+        
         Args:
             password (str): Plain text password to hash and store
         """
-        self.password_hash = generate_password_hash(password)
+        method = current_app.config.get("PASSWORD_HASH_METHOD", "scrypt") if has_app_context() else "scrypt"
+        self.password_hash = generate_password_hash(password, method)
 
     def check_password(self, password):
         """
@@ -110,6 +128,8 @@ class PracticeLog(db.Model):
         user_id: Foreign key linking to User table
         utc_timestamp: UTC timestamp of when practice occurred
         updated_at: UTC timestamp of last modification
+        change_version: The user's data_version when this log was last
+            written (see app/utils/log_sync.py); drives delta sync
         instrument: Name/type of instrument practiced
         duration: Practice time in minutes
         notes: Optional text notes about the practice session
@@ -120,6 +140,17 @@ class PracticeLog(db.Model):
         piece: Many-to-one relationship with Piece (log.piece)
     """
     __tablename__ = "practice_log"
+    __table_args__ = (
+        # Per-user time range scans (day lookups, recent logs, reports)
+        db.Index("ix_practice_log_user_time", "user_id", "utc_timestamp"),
+        # Per-piece aggregates of one user (piece statistics)
+        db.Index("ix_practice_log_user_piece", "user_id", "piece_id"),
+        # Log table sorts and filters (see app/utils/log_query.py)
+        db.Index("ix_practice_log_user_duration", "user_id", "duration", "utc_timestamp"),
+        db.Index("ix_practice_log_user_instrument", "user_id", "instrument", "utc_timestamp"),
+        # Rows written after a client's version (GET /api/logs/changes)
+        db.Index("ix_practice_log_user_change", "user_id", "change_version"),
+    )
     
     # Primary key and user sequence number
     id = db.Column(db.Integer, primary_key=True)
@@ -130,7 +161,9 @@ class PracticeLog(db.Model):
 
     # Timestamp fields (all stored in UTC)
     utc_timestamp = db.Column(db.DateTime(timezone=True), nullable=False)  # When practice occurred
-    updated_at = db.Column(db.DateTime, default=utc_now(), onupdate=utc_now())  # Last modification
+    # Pass the function, not utc_now(): a called default is evaluated once at import
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)  # Last modification
+    change_version = db.Column(db.Integer, default=0, server_default="0", nullable=False)  # Stamped after each write
 
     # Practice session details
     instrument = db.Column(db.String(50), nullable=False)  # Instrument name/type
@@ -156,16 +189,228 @@ class Piece(db.Model):
         title: Title of the musical piece
         composer: Optional composer name
         log_time: Total practice time spent on this piece (in minutes)
+        last_practiced: UTC timestamp of the latest log of this piece
         
     Relationships:
         user: Many-to-one relationship with User (piece.user)
         logs: One-to-many relationship with PracticeLog (piece.logs)
     """
+    __table_args__ = (
+        # Recently practiced pieces first (piece suggestions without a query)
+        db.Index("ix_piece_user_last_practiced", "user_id", "last_practiced"),
+    )
+
     # Primary key and user relationship
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
 
     # Piece metadata
     title = db.Column(db.String(100), nullable=False)    # Name of the piece
     composer = db.Column(db.String(100), nullable=True)  # Optional composer information
-    log_time = db.Column(db.Integer, nullable=False)     # Total practice time in minutes
\ No newline at end of file
+    log_time = db.Column(db.Integer, nullable=False)     # Total practice time in minutes
+    last_practiced = db.Column(db.DateTime, nullable=True)  # Latest log (app/utils/piece_totals.py)
+
+
+class PieceTerm(db.Model):
+    """
+    One normalized word of a piece's title or composer, so piece suggestions
+    (see app/utils/suggest.py) find word prefixes with an index range scan.
+
+    Attributes:
+        user_id: Owner of the piece (part of the primary key)
+        term: Lowercased, accent-free word (part of the primary key)
+        piece_id: Piece containing the word (part of the primary key)
+    """
+    __tablename__ = "piece_term"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    term = db.Column(db.String(100), primary_key=True)
+    piece_id = db.Column(db.Integer, db.ForeignKey("piece.id"), primary_key=True)
+
+
+class DailyTotal(db.Model):
+    """
+    Practice totals for one user on one local calendar day.
+
+    Rows are derived from PracticeLog and rebuilt from a given date onward by
+    the "rollup_daily_totals" background job (see app/utils/rollups.py), so
+    reports can read one row per day instead of every log. The cum_* columns
+    are prefix sums over the user's rows up to and including local_date, so
+    totals over any date range are two row lookups and a subtraction.
+
+    Attributes:
+        user_id: Owner of the logs (part of the primary key)
+        local_date: Date in the user's timezone (part of the primary key)
+        minutes: Total practice minutes that day
+        sessions: Number of practice logs that day
+        cum_minutes: Minutes from the user's first log through this day
+        cum_sessions: Logs from the user's first log through this day
+        cum_days: Days with practice from the first log through this day
+    """
+    __tablename__ = "daily_total"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    local_date = db.Column(db.Date, primary_key=True)
+    minutes = db.Column(db.Integer, nullable=False, default=0)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    cum_minutes = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    cum_sessions = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    cum_days = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+class Streak(db.Model):
+    """
+    Practice streak state of one user (see app/utils/streaks.py).
+
+    Only the latest run of consecutive practice days is stored, plus the
+    longest run before it, which is enough to update both streaks in O(1)
+    for almost every log change.
+
+    Attributes:
+        user_id: Owner (primary key)
+        run_start: First local date of the latest run (None if no logs)
+        run_end: Last local date of the latest run (None if no logs)
+        past_longest: Length in days of the longest run before the latest one
+    """
+    __tablename__ = "streak"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    run_start = db.Column(db.Date, nullable=True)
+    run_end = db.Column(db.Date, nullable=True)
+    past_longest = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Job(db.Model):
+    """
+    Durable background job (see app/utils/jobs.py).
+
+    At most one pending job exists per (kind, user_id): enqueueing a
+    duplicate merges its payload into the pending one. Finished jobs are
+    deleted; jobs that exhaust their retries stay with status "failed".
+
+    Attributes:
+        id: Primary key
+        kind: Registered job type name
+        user_id: User the job works on
+        payload: JSON-encoded job arguments
+        status: "pending", "running" or "failed"
+        attempts: Number of times the job has been started
+        run_at: Earliest UTC time the job may run (pushed back on retry)
+        created_at: UTC time the job was first enqueued
+        locked_at: UTC time a worker claimed the job
+        last_error: Error message of the last failed attempt
+    """
+    __tablename__ = "job"
+    __table_args__ = (
+        # Deduplication: one pending job per (kind, user)
+        db.Index(
+            "ux_job_pending_kind_user", "kind", "user_id", unique=True,
+            sqlite_where=db.text("status = 'pending'"),
+            postgresql_where=db.text("status = 'pending'"),
+        ),
+        # Claiming the next due job
+        db.Index("ix_job_status_run_at", "status", "run_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    payload = db.Column(db.Text, nullable=False, default="{}")
+    status = db.Column(db.String(10), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+
+class Goal(db.Model):
+    """
+    Practice-minute target over a daily, weekly or monthly window
+    (see app/utils/goals.py).
+
+    Progress for the current window is stored on the row and updated by
+    every log write that falls inside the window and matches the goal's
+    scope, so showing goals never re-aggregates logs.
+
+    Attributes:
+        id: Primary key
+        user_id: Owner of the goal
+        period: "daily", "weekly" (Monday-Sunday) or "monthly", in the
+            user's timezone
+        target_minutes: Minutes to practice per window
+        scope: "all", "instrument" or "piece"
+        scope_key: Instrument code or piece id for scoped goals, "" otherwise
+        active: False once the goal is deleted (kept for history)
+        created_at: UTC creation time
+        window_start: Local date the stored progress belongs to
+        progress_minutes: Matching minutes practiced in that window
+    """
+    __tablename__ = "goal"
+    __table_args__ = (
+        # Finding the active goals a log write touches
+        db.Index(
+            "ix_goal_active_user_scope", "user_id", "scope", "scope_key",
+            sqlite_where=db.text("active = 1"),
+            postgresql_where=db.text("active"),
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    period = db.Column(db.String(10), nullable=False)
+    target_minutes = db.Column(db.Integer, nullable=False)
+    scope = db.Column(db.String(10), nullable=False, default="all")
+    scope_key = db.Column(db.String(50), nullable=False, default="", server_default="")
+    active = db.Column(db.Boolean, nullable=False, default=True, server_default="1")
+    created_at = db.Column(db.DateTime, nullable=False, default=utc_now)
+    window_start = db.Column(db.Date, nullable=True)
+    progress_minutes = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+class LeaderboardScore(db.Model):
+    """
+    Practice minutes of one user on one leaderboard
+    (see app/utils/leaderboard.py).
+
+    A board is a window ("week:<monday>", "month:<yyyy-mm>" or "all", in
+    the user's local time) and an instrument ("" for all instruments).
+    Log writes add and subtract minutes, so leaderboards never scan logs.
+
+    Attributes:
+        board: Window key (part of the primary key)
+        instrument: Instrument code, "" for all instruments (part of the key)
+        user_id: Scored user (part of the primary key)
+        minutes: Practice minutes in the window
+    """
+    __tablename__ = "leaderboard_score"
+    __table_args__ = (
+        # Top-K and rank ("how many scores beat mine") lookups
+        db.Index("ix_leaderboard_board_minutes", "board", "instrument", "minutes"),
+    )
+
+    board = db.Column(db.String(20), primary_key=True)
+    instrument = db.Column(db.String(50), primary_key=True, default="")
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    minutes = db.Column(db.Integer, nullable=False, default=0)
+
+
+class LogTombstone(db.Model):
+    """
+    Marker left by a deleted practice log so clients syncing log deltas
+    (GET /api/logs/changes) learn about the delete.
+
+    Attributes:
+        user_id: Owner of the deleted log (part of the primary key)
+        user_log_number: Per-user number of the deleted log (part of the key)
+        change_version: The user's data_version after the delete
+    """
+    __tablename__ = "log_tombstone"
+    __table_args__ = (
+        # Deletes after a client's version
+        db.Index("ix_log_tombstone_user_change", "user_id", "change_version"),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    user_log_number = db.Column(db.Integer, primary_key=True)
+    change_version = db.Column(db.Integer, nullable=False)
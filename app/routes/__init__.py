@@ -11,6 +11,10 @@ Blueprints:
 - stats_bp: Statistics and data analysis routes  
 - main_bp: Core application routes (home page, etc.)
 - dash_bp: Dashboard and visualization routes
+- metrics_bp: Opt-in Prometheus metrics endpoint
+- admin_bp: Operational views for configured admins
+- goals_bp: Practice goal management routes
+- pieces_bp: Paginated per-piece statistics
 
 The register_blueprints function should be called during application
 factory setup to enable all routes.
@@ -22,6 +26,10 @@ from .logs import logs_bp
 from .stats.stats import stats_bp
 from .main import main_bp
 from .dash import dash_bp
+from .metrics import metrics_bp
+from .admin import admin_bp
+from .goals import goals_bp
+from .pieces import pieces_bp
 
 def register_blueprints(app):
     """
@@ -38,4 +46,8 @@ def register_blueprints(app):
     app.register_blueprint(logs_bp)   # Practice log routes
     app.register_blueprint(stats_bp)  # Statistics routes
     app.register_blueprint(main_bp)   # Main application routes
-    app.register_blueprint(dash_bp)   # Dashboard routes
\ No newline at end of file
+    app.register_blueprint(dash_bp)   # Dashboard routes
+    app.register_blueprint(metrics_bp)  # Metrics routes
+    app.register_blueprint(admin_bp)    # Admin routes
+    app.register_blueprint(goals_bp)    # Goal routes
+    app.register_blueprint(pieces_bp)   # Piece statistics routes
\ No newline at end of file
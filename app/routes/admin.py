@@ -0,0 +1,44 @@
+"""
+Admin Routes Blueprint for Practice Tracker Application
+
+This module exposes operational views for administrators. Access requires
+a logged-in user whose username is listed in the ADMIN_USERNAMES
+configuration value (comma-separated); everyone else gets 403.
+"""
+
+from flask import Blueprint, abort, current_app, jsonify
+from flask_login import current_user, login_required
+
+from app.utils.jobs import queue_stats
+from app.utils.metrics import query_budget
+
+# Create blueprint for admin routes
+admin_bp = Blueprint("admin", __name__)
+
+
+def require_admin():
+    """Abort with 403 unless the current user is a configured admin."""
+    admins = {
+        name.strip() for name in current_app.config.get("ADMIN_USERNAMES", "").split(",") if name.strip()
+    }
+    if current_user.username not in admins:
+        abort(403)
+
+
+@admin_bp.route("/admin/jobs")
+@query_budget(3)
+@login_required
+def job_queue():
+    """
+    Report background job queue depth and lag.
+
+    Returns:
+        JSON with pending/running/failed counts, lag_seconds (age of the
+        oldest due pending job), depth per job kind and recent failures
+
+    Status Codes:
+        200: Stats returned
+        403: Current user is not an admin
+    """
+    require_admin()
+    return jsonify(queue_stats()), 200
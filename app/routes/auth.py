@@ -6,23 +6,39 @@ login, and logout. All endpoints return JSON responses for AJAX integration
 with the frontend forms.
 
 Security Features:
-- Password hashing using secure methods
+- Password hashing on a bounded pool (503 + Retry-After when saturated)
+- Transparent rehash on login when hash parameters change
 - User verification and validation
 - Session management via Flask-Login
 - Timezone capture for user preferences
 """
 
-from flask import Blueprint, jsonify, redirect, request
+from flask import Blueprint, current_app, jsonify, redirect, request
 from flask_login import login_user, logout_user
 
-from app.models import User
+from app.models import User, db
 from app.utils import add_to_db, verify
+from app.utils.hashing import HasherBusy, get_password_hasher
+from app.utils.metrics import query_budget
 
 # Create blueprint for authentication routes
 auth_bp = Blueprint("auth", __name__)
 
 
+@auth_bp.errorhandler(HasherBusy)
+def hasher_busy(error):
+    """
+    Shed auth load when the password hashing pool is saturated.
+
+    Returns:
+        JSON error with a Retry-After header (503)
+    """
+    current_app.logger.warning("password hashing pool saturated on %s", request.path)
+    return jsonify({"message": "Server busy, please try again"}), 503, {"Retry-After": "1"}
+
+
 @auth_bp.route("/register", methods=["POST"])
+@query_budget(3)
 def register():
     """
     Handle user registration with username, password, and timezone.
@@ -43,6 +59,7 @@ def register():
         200: User created and logged in successfully
         400: Missing or invalid input data
         409: Username already exists
+        503: Password hashing pool saturated, retry later
     """
     # Extract registration data from JSON request
     register_data = request.get_json()
@@ -50,9 +67,9 @@ def register():
     password = register_data.get("password")
     timezone = register_data.get("timezone", "UTC")  # Default to UTC if not provided
     
-    # Debug log for timezone capture (could be removed in production)
+    # Debug log for timezone capture
     if timezone:
-        print("timezone captured successfully:", timezone)
+        current_app.logger.debug("timezone captured successfully: %s", timezone)
 
     # Validate required fields are present
     verify({"username": username, "password": password, "timezone": timezone}, 400)
@@ -63,8 +80,8 @@ def register():
 
     # Create new user with secure password hashing
     new_user = User(username=username, timezone=timezone)
-    print("new user created:", new_user)  # Debug log
-    new_user.set_password(password)  # Hash the password securely
+    current_app.logger.debug("new user created: %s", new_user)  # Debug log
+    new_user.password_hash = get_password_hasher().hash(password)  # Hash off the request thread
     add_to_db(new_user)  # Save to database
 
     # Automatically log in the new user
@@ -77,6 +94,7 @@ def register():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@query_budget(2)
 def login():
     """
     Handle user login with username and password authentication.
@@ -94,6 +112,7 @@ def login():
     Status Codes:
         200: Login successful, user session established
         401: Invalid username or password
+        503: Password hashing pool saturated, retry later
     """
     # Extract login credentials from JSON request
     data = request.get_json() or {}
@@ -109,14 +128,22 @@ def login():
         return check
 
     # Verify password is correct
-    if not user.check_password(password):
+    hasher = get_password_hasher()
+    if not hasher.verify(user.password_hash, password):
         return jsonify({"message": "Invalid credentials"}), 401
 
+    # Upgrade hashes made with old method/cost settings now that we know
+    # the plain text password
+    if hasher.needs_rehash(user.password_hash):
+        user.password_hash = hasher.hash(password)
+        db.session.commit()
+
     # Establish user session
     login_user(user)
     return jsonify({"message": "Login successful", "redirect": "/dashboard"}), 200
 
 @auth_bp.route("/logout")
+@query_budget(1)
 def logout():
     """
     Handle user logout by clearing the current session.
@@ -4,48 +4,55 @@ Dashboard Blueprint for Practice Tracker Application
 This module handles both the dashboard page rendering and the API endpoints
 that provide dashboard statistics and graph data for the frontend charts.
 All graph calculations are performed server-side for consistency and performance.
+
+The dashboard page inlines the same payload as /api/dashboard/stats (charts,
+statistics and the five most recent logs) as JSON, so the page renders
+without any further API round trip. The payload is made of independently
+computed and cached sections; API clients can ask for only some of them.
 """
 
-from flask import Blueprint, jsonify, render_template
+from datetime import datetime
+
+from flask import Blueprint, jsonify, render_template, request
 from flask_login import login_required, current_user
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
 
-# Import utility functions for data retrieval and calculations
-from app.utils import (
-    get_total_log_mins,    # Get total practice minutes for user
-    get_today_log_mins,    # Get today's practice minutes
-    get_avg_log_mins,      # Calculate average practice time
-    get_most_frequent,     # Find most frequent instrument/piece
-    get_logs_from,         # Get all logs for a user
-    get_this_week_logs     # Get current week's logs
-)
-from app.utils.formatting import get_instrument_name  # Format instrument names
-from app.utils.stats import calculate_cumulative_data, calculate_weekly_data  # Graph calculations
+# Sections of the dashboard payload (see app/utils/dashboard.py)
+from app.utils.dashboard import build_dashboard, parse_fields
+from app.utils.metrics import query_budget
+from app.utils.singleflight import coalesce_requests
+from app.utils.validation import validation_error
 
 # Create blueprint for dashboard routes
 dash_bp = Blueprint("dash", __name__)
 
 @dash_bp.route("/dashboard")
+@query_budget(11)
 @login_required
 def dashboard():
     """
     Render the main dashboard page.
     
     This route serves the dashboard HTML template with the current date
-    and user information. The actual chart data is loaded asynchronously
-    via the /api/dashboard/stats endpoint.
+    and user information. The chart, statistic and recent-log data are
+    inlined as JSON (the /api/dashboard/stats payload), saving the round
+    trips the page would otherwise make before it can draw anything.
     
     Returns:
-        Rendered dashboard.html template with user context and formatted date
+        Rendered dashboard.html template with user context, formatted date
+        and the initial dashboard data
     """
     # Format current date for display (e.g., "January 15, 2025")
     date = datetime.now().strftime("%B %d, %Y")
-    return render_template("dashboard.html", user=current_user, date=date)
+    return render_template(
+        "dashboard.html", user=current_user, date=date,
+        bootstrap=build_dashboard(current_user.id, current_user.timezone),
+    )
 
 
 @dash_bp.route("/api/dashboard/stats")
+@query_budget(11)
 @login_required
+@coalesce_requests
 def get_dashboard_stats():
     """
     API endpoint to retrieve all dashboard statistics and chart data.
@@ -56,43 +63,36 @@ def get_dashboard_stats():
     - Weekly practice chart (current week's daily totals)
     - Daily practice gauge (today's progress vs target)
     - Summary statistics (totals, averages, most frequent items)
+    - Current and longest practice streak (maintained incrementally)
+    - Active goals with their progress (maintained incrementally)
+    - The five most recent logs (the /api/recent-logs list)
     
     All calculations are performed server-side with proper timezone handling
-    to ensure consistency across different user timezones.
+    to ensure consistency across different user timezones. The all-time
+    cumulative series runs in the analytics process pool and is cached per
+    data version, as are the other sections derived only from logs.
+    
+    Query Parameters:
+        fields: Comma-separated sections to return (default: all), e.g.
+            fields=daily,weekly; only the named sections are computed
     
     Returns:
-        JSON response containing:
+        JSON response containing the requested sections:
         - cumulative: Data for the all-time cumulative chart
         - weekly: Data for the current week's daily practice chart  
-        - daily: Today's minutes and target for the gauge
+        - daily: Today's minutes and target for the gauge (the user's overall
+          daily goal, or 60 minutes without one)
         - Statistics: Total minutes, averages, most frequent instrument/piece
-    """
-    # Retrieve all user's practice logs for lifetime statistics
-    all_logs = get_logs_from(current_user)
+        - streak: {"current": days, "longest": days} in the user's timezone
+        - goals: Active goals (see app.utils.goals.serialize_goal)
+        - recent: The five most recent logs, newest first, with readable dates
     
-    # Get only this week's logs for weekly chart (more efficient than filtering all logs)
-    weekly_logs = get_this_week_logs()
-    
-    # Safely extract the most frequent piece title, handling None case
-    most_frequent_piece = get_most_frequent(all_logs, attr="piece")
-    piece_title = most_frequent_piece.title if most_frequent_piece else None
-    
-    # Return structured JSON data for frontend consumption
-    return jsonify({
-        # Chart data (calculated server-side for consistency)
-        "cumulative": calculate_cumulative_data(all_logs),  # All-time progress chart
-        "weekly": calculate_weekly_data(weekly_logs),        # Current week daily totals
-        
-        # Daily practice gauge data
-        "daily": {
-            "total_today": get_today_log_mins(all_logs) or 0,  # Today's practice time
-            "target": 60  # Daily target in minutes (could be user-configurable)
-        },
-        
-        # Summary statistics for dashboard metrics
-        "common_instrument": get_instrument_name(get_most_frequent(all_logs, attr="instrument")) or "None",
-        "total_minutes": get_total_log_mins(all_logs) or 0,      # Lifetime total
-        "average_minutes": get_avg_log_mins(all_logs) or 0,      # Average per session
-        "common_piece": piece_title  # Most frequently practiced piece
-    })
-
+    Status Codes:
+        200: Sections returned
+        400: Unknown section in fields
+    """
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as exc:
+        return validation_error(str(exc))
+    return jsonify(build_dashboard(current_user.id, current_user.timezone, fields))
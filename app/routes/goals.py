@@ -0,0 +1,119 @@
+"""
+Goals Routes Blueprint for Practice Tracker Application
+
+This module lets users set practice-minute goals over a daily, weekly or
+monthly window, overall or for one instrument or piece. Progress is kept
+up to date by log writes (see app/utils/goals.py), so listing goals never
+re-aggregates practice logs.
+
+Key Features:
+- Goal creation with validation
+- Goal listing with current window progress
+- Goal deletion (deactivation)
+"""
+
+from flask import Blueprint, jsonify, request
+from flask_login import current_user, login_required
+
+from app.models import Goal, Piece, db
+from app.utils.goals import PERIODS, SCOPES, create_goal, get_goals
+from app.utils.metrics import query_budget
+from app.utils.validation import validation_error
+
+# Create blueprint for goal routes
+goals_bp = Blueprint("goals", __name__)
+
+# Upper bound for a target: every minute of a 31-day month
+MAX_TARGET_MINUTES = 31 * 24 * 60
+
+
+@goals_bp.route("/api/goals", methods=["GET"])
+@query_budget(4)
+@login_required
+def list_goals():
+    """
+    API endpoint listing the current user's active goals.
+
+    Returns:
+        JSON array of goals with period, scope, target_minutes,
+        progress_minutes, the current window's dates and completion
+
+    Status Codes:
+        200: Goals retrieved successfully
+    """
+    return jsonify(get_goals(current_user.id, current_user.timezone)), 200
+
+
+@goals_bp.route("/api/goals", methods=["POST"])
+@query_budget(6)
+@login_required
+def add_goal():
+    """
+    API endpoint to create a goal.
+
+    Expected JSON payload:
+        - period: "daily", "weekly" or "monthly"
+        - target_minutes: Positive number of minutes per window
+        - scope: Optional "all" (default), "instrument" or "piece"
+        - scope_key: Instrument code or piece id (required for scoped goals)
+
+    Returns:
+        JSON goal including its progress in the current window
+
+    Status Codes:
+        201: Goal created
+        400: Invalid or missing data
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return validation_error("Request body must contain valid JSON")
+
+    period = data.get("period")
+    if period not in PERIODS:
+        return validation_error(f"period must be one of: {', '.join(PERIODS)}")
+
+    target = data.get("target_minutes")
+    if isinstance(target, bool) or not isinstance(target, int) or not 0 < target <= MAX_TARGET_MINUTES:
+        return validation_error(f"target_minutes must be an integer between 1 and {MAX_TARGET_MINUTES}")
+
+    scope = data.get("scope", "all")
+    if scope not in SCOPES:
+        return validation_error(f"scope must be one of: {', '.join(SCOPES)}")
+
+    scope_key = str(data.get("scope_key") or "").strip()
+    if scope == "all":
+        scope_key = ""
+    elif not scope_key:
+        return validation_error(f"scope_key is required for {scope} goals")
+    elif scope == "piece":
+        owned = scope_key.isdigit() and db.session.execute(
+            db.select(Piece.id).where(Piece.id == int(scope_key), Piece.user_id == current_user.id)
+        ).scalar() is not None
+        if not owned:
+            return validation_error("Piece not found")
+
+    goal = create_goal(current_user.id, current_user.timezone, period, target, scope, scope_key)
+    return jsonify(goal), 201
+
+
+@goals_bp.route("/api/goals/<int:goal_id>", methods=["DELETE"])
+@query_budget(3)
+@login_required
+def delete_goal(goal_id):
+    """
+    API endpoint to delete a goal. The row is deactivated, not removed.
+
+    Returns:
+        JSON confirmation message
+
+    Status Codes:
+        200: Goal deleted
+        404: Goal not found for the current user
+    """
+    goal = Goal.query.filter_by(id=goal_id, user_id=current_user.id, active=True).first()
+    if not goal:
+        return jsonify({"error": "Goal not found!"}), 404
+
+    goal.active = False
+    db.session.commit()
+    return jsonify({"message": "goal deleted!"}), 200
@@ -7,22 +7,67 @@ All log data is timezone-aware and properly formatted for display.
 
 Key Features:
 - Practice log creation with validation
-- Log retrieval with proper ordering
+- Log retrieval with SQL sorting, filtering and cursor pagination
 - Recent logs for dashboard display
+- Delta sync of the client's log copy (changes since a data version)
+- Full-text search over notes and piece titles, ranked with snippets
 - Timezone-aware timestamp handling
 """
 
+from datetime import date
+from math import ceil
+
 from flask import Blueprint, jsonify, request, render_template
 from flask_login import current_user, login_required
+from sqlalchemy.orm import joinedload
 
 from app.models import PracticeLog, db
-from app.utils import add_to_db, serialize_logs, prepare_log_data, get_or_create_piece
+from app.utils import serialize_logs, prepare_log_data, get_or_create_piece
+from app.utils.formatting import RECENT_DATE_FORMAT
+from app.utils.log_query import LOG_SORTS, query_logs
+from app.utils.log_search import search_logs
+from app.utils.log_sync import get_log_changes
+from app.utils.metrics import query_budget
+from app.utils.singleflight import coalesce_requests
+from app.utils.validation import validate_log_edit_data, validate_log_submission_data, validation_error
 
 # Create blueprint for practice log routes
 logs_bp = Blueprint("logs", __name__)
 
+# Largest page of GET /api/logs a client may request
+MAX_LOG_PAGE = 500
+
+# Largest page of search results a client may request
+MAX_SEARCH_PAGE = 100
+
+
+def _log_change_response(message, log):
+    """
+    Build the response of a log write: the written row (or a tombstone for
+    deletes) and the user's data version after the write.
+
+    Call it after the write is flushed and before it is committed: the
+    commit expires the user and the log, which would be reloaded otherwise.
+
+    Args:
+        message (str): Human-readable confirmation
+        log (dict): Serialized log, or {"id", "deleted": True}
+
+    Returns:
+        dict: {"message", "log", "data_version"}
+    """
+    # Set by the flush's version bump, so this is the version the write produced
+    return {"message": message, "log": log, "data_version": current_user.data_version}
+
+
+def _optional(args, name, parse):
+    """Parse an optional query parameter, None if absent or empty."""
+    value = args.get(name, "").strip()
+    return parse(value) if value else None
+
 
 @logs_bp.route("/log", methods=["POST", "GET"])
+@query_budget(2)
 @login_required
 def log_page():
     """
@@ -37,9 +82,23 @@ def log_page():
     Requires:
         User must be authenticated (login_required decorator)
     """
-    return render_template("log.html")
+    # Only check whether any log exists instead of loading user.logs
+    has_logs = (
+        db.session.query(PracticeLog.id)
+        .filter_by(user_id=current_user.id)
+        .first()
+    ) is not None
+    return render_template("log.html", has_logs=has_logs)
 
 @logs_bp.route("/api/logs", methods=["POST"])
+# Worst case, per statement: user, next log number, piece lookup; a new
+# piece's insert, its version bump and its search terms (an existing piece's
+# update rides on the log's flush); rollup job select + insert; the log
+# insert; streak state + days, then a state save or a recompute job
+# select + insert; goal select, then a progress update or, on a goal's first
+# write of a window, a rebuild read + update; leaderboard upsert; version
+# bump; change-version stamp. A same-day log with a known piece runs 14.
+@query_budget(19)
 @login_required
 def add_log():
     """
@@ -57,7 +116,8 @@ def add_log():
         - timestamp: Optional timestamp (defaults to now)
         
     Returns:
-        JSON response confirming log creation
+        JSON with the serialized new log and the user's new data version,
+        so the client can insert the row without refetching every log
         
     Status Codes:
         201: Log created successfully
@@ -66,75 +126,234 @@ def add_log():
     # Extract raw data from request
     raw_data = request.get_json()
     if raw_data is None:
-        return jsonify({"error": "validation_failed", "message": "Request body must contain valid JSON"}), 400
+        return validation_error("Request body must contain valid JSON")
     
     # Validate the incoming data
-    from app.utils.validation import validate_log_submission_data
     is_valid, validated_data, error_message = validate_log_submission_data(raw_data)
     
     if not is_valid:
-        return jsonify({"error": "validation_failed", "message": error_message}), 400
+        return validation_error(error_message)
     
     # Prepare validated data for database
     log_data = prepare_log_data(validated_data, current_user.id)
 
     # Create new practice log entry
     new_log = PracticeLog(**log_data)
-    add_to_db(new_log)  # Save to database
-    
-    return jsonify({"message": "log added!"}), 201
+    db.session.add(new_log)
+    db.session.flush()
+
+    response = _log_change_response("log added!", serialize_logs([new_log], timezone=current_user.timezone)[0])
+    db.session.commit()
+    return jsonify(response), 201
 
 
 @logs_bp.route("/api/logs", methods=["GET"])
+@query_budget(3)
 @login_required
+@coalesce_requests
 def get_logs():
     """
-    API endpoint to retrieve all practice logs for the current user.
-    
-    This endpoint returns all practice logs belonging to the authenticated user,
-    ordered by most recent first. The logs are serialized with proper timezone
-    conversion for frontend display.
-    
+    API endpoint to retrieve the current user's practice logs.
+
+    Without parameters every log is returned, most recent first. Sorting,
+    filtering and paging are done in SQL on indexed columns (see
+    app/utils/log_query.py); with a limit, the cursor of the next page is
+    returned in the X-Next-Cursor header.
+
+    Query Parameters:
+        sort: date (default), duration, instrument or piece
+        order: desc (default) or asc
+        instrument: Only logs of this instrument
+        piece_id: Only logs of this piece
+        start, end: Only logs on these local dates (YYYY-MM-DD, inclusive)
+        min_duration, max_duration: Only logs within these minutes
+        limit: Page size (1-500); without it every matching log is returned
+        cursor: X-Next-Cursor of the previous page
+
     Returns:
         JSON array of serialized practice logs with formatted timestamps
         
     Status Codes:
         200: Logs retrieved successfully
+        400: Invalid sort, filter or paging parameters
         
     Requires:
         User must be authenticated (login_required decorator)
     """
-    # Query user's logs ordered by most recent first
-    logs = (
-        PracticeLog.query.filter_by(user_id=current_user.id)
-        .order_by(PracticeLog.utc_timestamp.desc())
-        .all()
-    )
+    args = request.args
+    sort = args.get("sort", "date")
+    order = args.get("order", "desc")
+    if sort not in LOG_SORTS:
+        return validation_error(f"sort must be one of: {', '.join(LOG_SORTS)}")
+    if order not in ("asc", "desc"):
+        return validation_error("order must be asc or desc")
+
+    try:
+        filters = {
+            "instrument": args.get("instrument", "").strip(),
+            "piece_id": _optional(args, "piece_id", int),
+            "start": _optional(args, "start", date.fromisoformat),
+            "end": _optional(args, "end", date.fromisoformat),
+            "min_duration": _optional(args, "min_duration", int),
+            "max_duration": _optional(args, "max_duration", int),
+        }
+        limit = _optional(args, "limit", int)
+    except ValueError:
+        return validation_error("piece_id, durations and limit must be integers and start/end YYYY-MM-DD dates")
+    if limit is not None and not 1 <= limit <= MAX_LOG_PAGE:
+        return validation_error(f"limit must be between 1 and {MAX_LOG_PAGE}")
+
+    # Filtered, sorted (and paged) in SQL, with pieces loaded in the same
+    # query so serialization does not issue one query per piece
+    try:
+        logs, next_cursor = query_logs(
+            current_user.id, current_user.timezone, sort, order,
+            filters=filters, limit=limit, cursor=args.get("cursor"),
+        )
+    except ValueError as exc:
+        return validation_error(str(exc))
 
     # Serialize logs with timezone conversion for frontend
-    return jsonify(serialize_logs(logs)), 200
+    response = jsonify(serialize_logs(logs, timezone=current_user.timezone))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+
+@logs_bp.route("/api/logs/search", methods=["GET"])
+@query_budget(3)
+@login_required
+def search_logs_route():
+    """
+    API endpoint searching the current user's practice notes and piece titles.
+
+    Matching uses the full-text index (see app/utils/log_search.py): every
+    word must appear, ignoring case and accents, "quoted phrases" must appear
+    as written, and the last word also matches as a prefix. Results are
+    ranked by relevance, best first.
+
+    Query Parameters:
+        q: Search text
+        page: 1-based page number (default 1)
+        per_page: Results per page (1-100, default 20)
+
+    Returns:
+        JSON {items, page, per_page, total, pages}; each item is a serialized
+        log plus "snippet", the matching part of its notes as HTML with
+        matches in <mark> tags (escaped otherwise), or null
+
+    Status Codes:
+        200: Results returned
+        400: Missing query or invalid paging parameters
+        501: The database does not support full-text search
+    """
+    query = request.args.get("q", "").strip()
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 20, type=int)
+    if not query:
+        return validation_error("q is required")
+    if page < 1 or not 1 <= per_page <= MAX_SEARCH_PAGE:
+        return validation_error(f"page must be >= 1 and per_page between 1 and {MAX_SEARCH_PAGE}")
+    if db.engine.dialect.name != "sqlite":
+        return jsonify({"error": "not_supported", "message": "search requires SQLite"}), 501
+
+    results, total = search_logs(current_user.id, query[:200], page=page, per_page=per_page)
+    logs = serialize_logs([log for log, _ in results], timezone=current_user.timezone)
+    items = [dict(log, snippet=snippet) for log, (_, snippet) in zip(logs, results)]
+    return jsonify({
+        "items": items,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": ceil(total / per_page),
+    }), 200
+
+
+@logs_bp.route("/api/logs/changes", methods=["GET"])
+@query_budget(4)
+@login_required
+def get_log_changes_since():
+    """
+    API endpoint returning the logs written and deleted after a data version.
+
+    The log page keeps a copy of the user's logs and sends the version it
+    reflects; only rows inserted, updated or deleted since then are returned.
+
+    Query Parameters:
+        since: Data version of the client's copy (0 or missing for all logs)
+
+    Returns:
+        JSON {"user_id", "version", "full", "logs", "deleted"}; with full set
+        the client replaces its copy, otherwise it drops the deleted log
+        numbers and then upserts the logs
+
+    Status Codes:
+        200: Changes retrieved successfully
+        400: since is not a non-negative integer
+    """
+    since = request.args.get("since", 0, type=int)
+    if since < 0:
+        return validation_error("since must be a non-negative integer")
+
+    changes = get_log_changes(current_user.id, since, current_user.timezone)
+    return jsonify({"user_id": current_user.id, **changes}), 200
 
 @logs_bp.route("/api/edit-log/<int:user_log_number>", methods=["PATCH"])
+# Worst case, per statement: user, log with its piece; rollup job select +
+# insert; the log update; goal select, then a progress update or a window
+# rebuild read + update; leaderboard upsert; piece totals update; version
+# bump; change-version stamp. Edits never move a log's day, so streaks are
+# not touched.
+@query_budget(12)
 @login_required
 def edit_log(user_log_number):
-    data = request.get_json()
-    log = PracticeLog.query.filter_by(user_id=current_user.id, user_log_number=user_log_number).first()
+    """
+    API endpoint to edit the duration, instrument or notes of a practice log.
+
+    Args:
+        user_log_number (int): The user's number of the log to edit
+
+    Returns:
+        JSON with the serialized edited log and the user's new data version
+
+    Status Codes:
+        200: Log edited successfully
+        400: Missing body or invalid field values
+        404: Log not found
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        return validation_error("Request body must contain valid JSON")
+
+    is_valid, changes, error_message = validate_log_edit_data(data)
+    if not is_valid:
+        return validation_error(error_message)
+
+    # The piece is loaded with the log: the response serializes it
+    log = (
+        PracticeLog.query.options(joinedload(PracticeLog.piece))
+        .filter_by(user_id=current_user.id, user_log_number=user_log_number)
+        .first()
+    )
     
     if not log:
         return jsonify({"error": "Log not found!"}), 404
     
-    if "duration" in data:
-        log.duration = data["duration"]
-    if "instrument" in data:
-        log.instrument = data["instrument"]
-    if "notes" in data:
-        log.notes = data["notes"]
-    
+    for field, value in changes.items():
+        setattr(log, field, value)
+    db.session.flush()
+
+    response = _log_change_response("log edited!", serialize_logs([log], timezone=current_user.timezone)[0])
     db.session.commit()
-    
-    return jsonify({"message": "log edited!"}), 201
+    return jsonify(response), 200
 
 @logs_bp.route("/api/delete-log/<int:user_log_number>", methods=["DELETE"])
+# Worst case, per statement: user, log; rollup job select + insert; the
+# delete; streak state + days, then a state save or a recompute job
+# select + insert; goal select, then a progress update or a window rebuild
+# read + update; leaderboard upsert; piece totals update; version bump;
+# tombstone. Deleting a log from an earlier week runs 11.
+@query_budget(16)
 @login_required
 def delete_log(user_log_number):
     data = request.get_json()
@@ -148,12 +367,16 @@ def delete_log(user_log_number):
         return jsonify({"error": "Log not found!"}), 404
     
     db.session.delete(log)
+    db.session.flush()
+
+    # A tombstone tells the client which row to drop
+    response = _log_change_response("log deleted!", {"id": user_log_number, "deleted": True})
     db.session.commit()
-    
-    return jsonify({"message": "log deleted!"}), 200
+    return jsonify(response), 200
 
 
 @logs_bp.route("/api/recent-logs", methods=["GET"])
+@query_budget(2)
 @login_required
 def api_recent_logs():
     """
@@ -175,12 +398,13 @@ def api_recent_logs():
     # Query only the 5 most recent logs for performance
     logs = (
         PracticeLog.query.filter_by(user_id=current_user.id)
+        .options(joinedload(PracticeLog.piece))
         .order_by(PracticeLog.utc_timestamp.desc())
         .limit(5)  # Limit to 5 most recent for dashboard display
         .all()
     )
 
     # Serialize with human-readable date format for dashboard
-    serialized = serialize_logs(logs, local_format="%A, %b %d, %Y")
+    serialized = serialize_logs(logs, local_format=RECENT_DATE_FORMAT, timezone=current_user.timezone)
 
     return jsonify(serialized)
\ No newline at end of file
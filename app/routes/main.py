@@ -6,13 +6,15 @@ and user identification endpoints. These are the primary entry points
 for users accessing the application.
 """
 
-from flask import Blueprint, render_template
+from flask import Blueprint, current_app, render_template
 from flask_login import current_user, login_required
+from app.utils.metrics import query_budget
 
 # Create blueprint for main application routes
 main_bp = Blueprint("main", __name__)
 
 @main_bp.route("/")
+@query_budget(1)
 def home():
     """
     Render the home page of the application.
@@ -24,11 +26,12 @@ def home():
     Returns:
         Rendered index.html template with user authentication status
     """
-    # Debug log to track authentication status (could be removed in production)
-    print("Logged in?", current_user.is_authenticated)
+    # Debug log to track authentication status
+    current_app.logger.debug("Logged in? %s", current_user.is_authenticated)
     return render_template("index.html")
 
 @main_bp.route("/_whoami")
+@query_budget(1)
 @login_required
 def whoami():
     """
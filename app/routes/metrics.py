@@ -0,0 +1,65 @@
+"""
+Metrics Routes Blueprint for Practice Tracker Application
+
+This module exposes the in-process request and SQL metrics collected by
+app.utils.metrics, and the slow-query summary collected by
+app.utils.slow_queries. The endpoints are opt-in: they return 404 unless the
+METRICS_ENABLED configuration flag is set, so deployments that do not run a
+Prometheus scraper never publish internal timings.
+"""
+
+from flask import Blueprint, Response, abort, current_app, jsonify
+
+from app.utils.metrics import query_budget
+
+# Create blueprint for metrics routes
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics")
+@query_budget(0)
+def metrics():
+    """
+    Return all collected metrics in the Prometheus text format.
+
+    Returns:
+        text/plain response with latency histograms and SQL counters
+
+    Status Codes:
+        200: Metrics rendered successfully
+        404: Metrics endpoint is disabled
+    """
+    if not current_app.config.get("METRICS_ENABLED"):
+        abort(404)
+
+    registry = current_app.extensions["metrics"]
+    return Response(registry.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@metrics_bp.route("/metrics/slow-queries")
+@query_budget(0)
+def slow_queries():
+    """
+    Return a summary of statements that exceeded SLOW_QUERY_MS.
+
+    Each entry lists the statement, how often and how slowly it ran, the
+    application functions and routes that issued it, its EXPLAIN QUERY PLAN
+    output and whether that plan scans the whole practice_log table.
+
+    Returns:
+        JSON object with the active threshold and the slow statements
+
+    Status Codes:
+        200: Summary returned successfully
+        404: Metrics endpoints are disabled
+    """
+    if not current_app.config.get("METRICS_ENABLED"):
+        abort(404)
+
+    slow_log = current_app.extensions["slow_queries"]
+    statements = slow_log.summary()
+    return jsonify({
+        "threshold_ms": slow_log.threshold_ms,
+        "practice_log_scans": sum(1 for s in statements if s["scans_practice_log"]),
+        "statements": statements,
+    })
@@ -1,18 +1,181 @@
-from flask import Blueprint, jsonify
+"""
+Pieces Routes Blueprint for Practice Tracker Application
+
+This module serves per-piece practice statistics. Minutes are the piece's
+maintained total (Piece.log_time, see app/utils/piece_totals.py); the other
+statistics come from one grouped query over the user's practice logs (using
+the (user_id, piece_id) index), joined to their pieces, so a page costs the
+same number of queries however many pieces and logs the user has.
+
+Key Features:
+- Minutes, session count, last-practiced date and instruments per piece
+- Server-side sorting on any of those fields
+- Page-based pagination with totals
+- Piece suggestions for the log form (word-prefix matches, see app/utils/suggest.py)
+"""
+
+from math import ceil
+
+from flask import Blueprint, jsonify, request
 from flask_login import current_user, login_required
+from sqlalchemy import func, select
 
-from app.models import Piece
+from app.models import Piece, PracticeLog, db
+from app.utils.metrics import query_budget
+from app.utils.suggest import suggest_pieces
+from app.utils.time import set_as_local
+from app.utils.validation import validation_error
 
 pieces_bp = Blueprint("pieces", __name__)
 
+# Largest page a client may request
+MAX_PER_PAGE = 200
+
+# Most suggestions a client may request
+MAX_SUGGESTIONS = 50
+
+# Comma-separated distinct values per dialect (SQLite's DISTINCT aggregates
+# take one argument, so group_concat keeps its default separator)
+_DISTINCT_LISTS = {
+    "sqlite": lambda column: func.group_concat(column.distinct()),
+    "postgresql": lambda column: func.string_agg(column.distinct(), ","),
+}
+
+
+def _piece_stats_subquery(user_id):
+    """Per-piece aggregates of one user's logs (one row per practiced piece)."""
+    return (
+        select(
+            PracticeLog.piece_id.label("piece_id"),
+            func.count(PracticeLog.id).label("sessions"),
+            func.max(PracticeLog.utc_timestamp).label("last_practiced"),
+            func.count(PracticeLog.instrument.distinct()).label("instrument_count"),
+            _DISTINCT_LISTS[db.engine.dialect.name](PracticeLog.instrument).label("instruments"),
+        )
+        .where(PracticeLog.user_id == user_id, PracticeLog.piece_id.is_not(None))
+        .group_by(PracticeLog.piece_id)
+        .subquery()
+    )
+
+
 @pieces_bp.route("/api/pieces", methods=["GET"])
+@query_budget(3)
 @login_required
 def get_pieces():
-    pieces = (
-        Piece.query.filter_by(user_id=current_user.id).order_by(Piece.title.asc()).all()
-    )
-    result = [
-        {"id": p.id, "title": p.title, "composer": p.composer, "minutes": p.log_time}
-        for p in pieces
+    """
+    API endpoint returning one page of the current user's piece statistics.
+
+    Query Parameters:
+        sort: title (default), composer, minutes, sessions, last_practiced
+            or instruments (number of instruments used)
+        order: asc (default) or desc
+        page: 1-based page number (default 1)
+        per_page: Pieces per page (1-200, default 50)
+
+    Returns:
+        JSON {items, page, per_page, total, pages}; each item has id, title,
+        composer, minutes, sessions, last_practiced (local date or null) and
+        instruments (sorted list)
+
+    Status Codes:
+        200: Page returned
+        400: Invalid sort, order or paging parameters
+    """
+    stats = _piece_stats_subquery(current_user.id)
+    sort_columns = {
+        "title": Piece.title,
+        "composer": Piece.composer,
+        "minutes": Piece.log_time,
+        "sessions": func.coalesce(stats.c.sessions, 0),
+        "last_practiced": stats.c.last_practiced,
+        "instruments": func.coalesce(stats.c.instrument_count, 0),
+    }
+
+    sort = request.args.get("sort", "title")
+    order = request.args.get("order", "asc")
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 50, type=int)
+    if sort not in sort_columns:
+        return validation_error(f"sort must be one of: {', '.join(sort_columns)}")
+    if order not in ("asc", "desc"):
+        return validation_error("order must be asc or desc")
+    if page < 1 or not 1 <= per_page <= MAX_PER_PAGE:
+        return validation_error(f"page must be >= 1 and per_page between 1 and {MAX_PER_PAGE}")
+
+    total = db.session.execute(
+        select(func.count()).select_from(Piece).where(Piece.user_id == current_user.id)
+    ).scalar()
+
+    sort_column = sort_columns[sort]
+    direction = sort_column.desc() if order == "desc" else sort_column.asc()
+    tiebreak = Piece.id.desc() if order == "desc" else Piece.id.asc()
+    rows = db.session.execute(
+        select(Piece.id, Piece.title, Piece.composer, Piece.log_time, stats.c.sessions,
+               stats.c.last_practiced, stats.c.instruments)
+        .outerjoin(stats, stats.c.piece_id == Piece.id)
+        .where(Piece.user_id == current_user.id)
+        .order_by(direction, tiebreak)
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+    ).all()
+
+    timezone = current_user.timezone
+    items = [
+        {
+            "id": piece_id,
+            "title": title,
+            "composer": composer,
+            "minutes": minutes or 0,
+            "sessions": sessions or 0,
+            "last_practiced": set_as_local(last, timezone) if last else None,
+            "instruments": sorted(instruments.split(",")) if instruments else [],
+        }
+        for piece_id, title, composer, minutes, sessions, last, instruments in rows
     ]
-    return jsonify(result), 200
\ No newline at end of file
+    return jsonify({
+        "items": items,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": ceil(total / per_page),
+    }), 200
+
+
+@pieces_bp.route("/api/pieces/suggest", methods=["GET"])
+@query_budget(2)
+@login_required
+def suggest():
+    """
+    API endpoint returning the current user's pieces that best match what
+    was typed in the log form, so the form never downloads every piece.
+
+    Query Parameters:
+        q: Text typed so far; every word must start a word of the piece's
+            title or composer, ignoring case and accents (empty: the most
+            recently practiced pieces)
+        limit: Number of suggestions (1-50, default 10)
+
+    Returns:
+        JSON array, best match first; each item has id, title, composer,
+        minutes and last_practiced (local date or null)
+
+    Status Codes:
+        200: Suggestions returned
+        400: Invalid limit
+    """
+    query = request.args.get("q", "")
+    limit = request.args.get("limit", 10, type=int)
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        return validation_error(f"limit must be between 1 and {MAX_SUGGESTIONS}")
+
+    timezone = current_user.timezone
+    return jsonify([
+        {
+            "id": piece.id,
+            "title": piece.title,
+            "composer": piece.composer,
+            "minutes": piece.log_time,
+            "last_practiced": set_as_local(piece.last_practiced, timezone) if piece.last_practiced else None,
+        }
+        for piece in suggest_pieces(current_user.id, query[:200], limit=limit)
+    ]), 200
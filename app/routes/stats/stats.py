@@ -1,27 +1,223 @@
+import base64
+import hashlib
+import struct
 from zoneinfo import ZoneInfo
-from flask import Blueprint, jsonify, render_template
+from flask import Blueprint, jsonify, render_template, request
 from flask_login import current_user, login_required
-from datetime import datetime
+from datetime import date, datetime
 
-from app.models import Piece, PracticeLog
+from app.models import Piece, PracticeLog, db
 from app.utils import (get_avg_log_mins, get_most_frequent, get_this_week_logs, get_logs_from, get_today_log_mins,
                    get_total_log_mins, get_instrument_name,)
+from app.utils.analytics import get_analytics, instrument_breakdown, load_columns, year_in_review
+from app.utils.changes import get_data_version
+from app.utils.leaderboard import WINDOWS, get_leaderboard
+from app.utils.metrics import query_budget
+from app.utils.rollups import ensure_rollups_current, range_totals, year_minutes
+from app.utils.time import get_today_local
+from app.utils.validation import validation_error
 
 stats_bp = Blueprint("stats", __name__)
 
 @stats_bp.route("/api/stats")
+@query_budget(1)
 @login_required
 def stats():
     return render_template("stats.html")
 
-@stats_bp.route("/api/stats/pieces", methods=["GET"])
+@stats_bp.route("/api/stats/year-in-review", methods=["GET"])
+@query_budget(3)
 @login_required
-def get_pieces():
-    pieces = (
-        Piece.query.filter_by(user_id=current_user.id).order_by(Piece.title.asc()).all()
+def get_year_in_review():
+    """
+    Year-in-review report for the current user.
+
+    Query Parameters:
+        year: Calendar year in the user's timezone (defaults to this year)
+
+    Returns:
+        JSON report from app.utils.analytics.year_in_review plus top_piece
+        (title of the most practiced piece)
+
+    Status Codes:
+        200: Report computed (or served from cache)
+        400: Invalid year
+        503: Report still computing, retry later
+    """
+    timezone = current_user.timezone
+    year = request.args.get("year", type=int) or get_today_local(timezone).year
+    if not 1900 <= year <= 9999:
+        return validation_error("Invalid year")
+
+    user_id = current_user.id
+    report = get_analytics().run(
+        (user_id, get_data_version(user_id), "year_in_review", timezone, year),
+        year_in_review,
+        lambda: (load_columns(user_id), timezone, year),
+    )
+    top_piece = db.session.get(Piece, report["top_piece_id"]) if report["top_piece_id"] else None
+    return jsonify({**report, "top_piece": top_piece.title if top_piece else None}), 200
+
+
+@stats_bp.route("/api/stats/instruments", methods=["GET"])
+@query_budget(2)
+@login_required
+def get_instrument_breakdown():
+    """
+    All-time minutes, sessions and share of total time per instrument.
+
+    Returns:
+        JSON array of {instrument, name, minutes, sessions, share}, most
+        practiced first
+
+    Status Codes:
+        200: Breakdown computed (or served from cache)
+        503: Report still computing, retry later
+    """
+    user_id = current_user.id
+    breakdown = get_analytics().run(
+        (user_id, get_data_version(user_id), "instruments"),
+        instrument_breakdown,
+        lambda: (load_columns(user_id),),
+    )
+    return jsonify([
+        {**row, "name": get_instrument_name(row["instrument"])} for row in breakdown
+    ]), 200
+
+
+# Largest value a packed (uint16) heatmap cell can hold
+PACKED_MAX = 0xFFFF
+
+
+@stats_bp.route("/api/stats/heatmap", methods=["GET"])
+@query_budget(10)
+@login_required
+def get_heatmap():
+    """
+    Daily practice minutes for one local calendar year, for the heatmap.
+
+    Built from the DailyTotal rollups (one indexed range read) instead of
+    the raw logs. The response carries a content ETag: past years rarely
+    change, so revisits are answered with 304 Not Modified.
+
+    Query Parameters:
+        year: Calendar year in the user's timezone (defaults to this year)
+        format: "packed" to return minutes as base64 little-endian uint16
+            (values above 65535 are clamped) instead of a JSON array
+
+    Returns:
+        JSON {year, start, days, total, max, minutes} or, when packed,
+        {year, start, days, total, max, encoding, data}
+
+    Status Codes:
+        200: Heatmap returned
+        304: Unchanged since the If-None-Match ETag
+        400: Invalid year or format
+    """
+    timezone = current_user.timezone
+    year = request.args.get("year", type=int) or get_today_local(timezone).year
+    if not 1900 <= year <= 9999:
+        return validation_error("Invalid year")
+    fmt = request.args.get("format", "json")
+    if fmt not in ("json", "packed"):
+        return validation_error("Invalid format")
+
+    ensure_rollups_current(current_user.id)
+    minutes = year_minutes(current_user.id, year)
+
+    body = {
+        "year": year,
+        "start": f"{year:04d}-01-01",
+        "days": len(minutes),
+        "total": sum(minutes),
+        "max": max(minutes),
+    }
+    if fmt == "packed":
+        packed = struct.pack(f"<{len(minutes)}H", *(min(m, PACKED_MAX) for m in minutes))
+        body["encoding"] = "uint16le-base64"
+        body["data"] = base64.b64encode(packed).decode("ascii")
+    else:
+        body["minutes"] = minutes
+
+    response = jsonify(body)
+    # Private: per-user data; no-cache: always revalidate, which is cheap
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+    return response.make_conditional(request)
+
+
+@stats_bp.route("/api/stats/leaderboard", methods=["GET"])
+@query_budget(5)
+@login_required
+def leaderboard():
+    """
+    Leaderboard of practice minutes for the current week, month or all time.
+
+    Query Parameters:
+        window: "week" (default), "month" or "all"
+        instrument: Optional instrument code to rank only that instrument
+        limit: Number of top users (1-100, default 10)
+
+    Returns:
+        JSON {window, instrument, board, top: [{rank, username, minutes}],
+        me: {rank, minutes}}
+
+    Status Codes:
+        200: Leaderboard returned
+        400: Invalid window or limit
+    """
+    window = request.args.get("window", "week")
+    if window not in WINDOWS:
+        return validation_error(f"window must be one of: {', '.join(WINDOWS)}")
+    limit = request.args.get("limit", 10, type=int)
+    if not 1 <= limit <= 100:
+        return validation_error("limit must be between 1 and 100")
+    instrument = request.args.get("instrument", "").strip()
+
+    board = get_leaderboard(
+        window, get_today_local(current_user.timezone), current_user.id, instrument=instrument, limit=limit
     )
-    result = [
-        {"id": p.id, "title": p.title, "composer": p.composer, "minutes": p.log_time}
-        for p in pieces
-    ]
-    return jsonify(result), 200
\ No newline at end of file
+    return jsonify({"window": window, "instrument": instrument or None, **board}), 200
+
+
+@stats_bp.route("/api/stats/range", methods=["GET"])
+@query_budget(10)
+@login_required
+def get_range_totals():
+    """
+    Practice totals between two local dates, for custom report ranges.
+
+    Computed from the prefix sums on the daily rollups (two indexed row
+    lookups), so the cost does not depend on the range or history length.
+
+    Query Parameters:
+        start: First local date (YYYY-MM-DD)
+        end: Last local date (YYYY-MM-DD, inclusive, not before start)
+
+    Returns:
+        JSON {start, end, days, minutes, sessions, days_practiced,
+        daily_average (minutes per calendar day), session_average}
+
+    Status Codes:
+        200: Totals returned
+        400: Missing or invalid dates
+    """
+    try:
+        start = date.fromisoformat(request.args.get("start", ""))
+        end = date.fromisoformat(request.args.get("end", ""))
+    except ValueError:
+        return validation_error("start and end must be dates in YYYY-MM-DD format")
+    if end < start:
+        return validation_error("end must not be before start")
+
+    ensure_rollups_current(current_user.id)
+    totals = range_totals(current_user.id, start, end)
+    days = (end - start).days + 1
+    return jsonify({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": days,
+        **totals,
+        "daily_average": round(totals["minutes"] / days, 1),
+        "session_average": round(totals["minutes"] / totals["sessions"], 1) if totals["sessions"] else 0,
+    }), 200
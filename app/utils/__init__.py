@@ -15,22 +15,61 @@ Categories:
 
 Usage:
     from app.utils import function_name
+
+Submodules are imported lazily on first attribute access (PEP 562), so
+importing app.utils, or one small submodule such as app.utils.metrics, does
+not load the statistics and query helpers by itself. This keeps imports
+cheap for scripts and tests that do not build the app; create_app still
+loads them, since registering the blueprints imports every route module.
 """
 
-# Authentication utilities
-from .auth import verify
+from importlib import import_module
+
+
+# Map of public helper name -> submodule that defines it
+_EXPORTS = {
+    # Authentication utilities
+    "verify": "auth",
+
+    # Database operations
+    "add_to_db": "db",
+    "get_or_create_piece": "db",
+
+    # Data formatting and serialization
+    "prepare_log_data": "formatting",
+    "serialize_logs": "formatting",
+    "get_instrument_name": "formatting",
+
+    # Statistical calculations
+    "get_weekly_log_data": "stats",
+    "get_total_log_mins": "stats",
+    "get_today_log_mins": "stats",
+    "get_avg_log_mins": "stats",
+    "get_most_frequent": "stats",
 
-# Database operations
-from .db import add_to_db, get_or_create_piece
+    # Time and timezone utilities
+    "get_today_local": "time",
+    "utc_now": "time",
+    "set_as_local": "time",
 
-# Data formatting and serialization
-from .formatting import prepare_log_data, serialize_logs, get_instrument_name
+    # Database query helpers
+    "get_logs": "query",
+    "get_logs_from": "query",
+    "get_last_log": "query",
+    "get_last_log_from": "query",
+    "get_first_log": "query",
+    "get_today_logs": "query",
+    "get_this_week_logs": "query",
+}
 
-# Statistical calculations
-from .stats import get_weekly_log_data, get_total_log_mins, get_today_log_mins, get_avg_log_mins, get_most_frequent
+__all__ = list(_EXPORTS)
 
-# Time and timezone utilities
-from .time import get_today_local, utc_now, set_as_local
 
-# Database query helpers
-from .query import get_logs, get_logs_from, get_last_log, get_last_log_from, get_first_log, get_today_logs, get_this_week_logs
\ No newline at end of file
+def __getattr__(name):
+    """Import the submodule that defines `name` on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
@@ -0,0 +1,339 @@
+"""
+Process-Pool Analytics for Practice Tracker
+
+Long-range reports (the all-time cumulative series, year in review and the
+per-instrument breakdown) are pure-Python loops over every log a user has.
+Run on a request thread they hold the GIL for the whole computation and
+stall every other request in the worker. This module runs them in a
+ProcessPoolExecutor instead.
+
+Reports are computed by module-level kernel functions that take plain column
+arrays (UTC epoch seconds, durations, instruments, piece ids), never ORM
+objects, so their inputs pickle cheaply. Results are cached by
+(user, data_version, report, params) in the computed-stats cache
+(app/utils/cache.py), so every worker shares them: any write to the user's
+logs bumps the version (app/utils/changes.py), so cached reports never go
+stale.
+
+Configuration:
+- ANALYTICS_PROCESSES: Worker processes (0 runs every report inline)
+- ANALYTICS_TIMEOUT: Seconds a request waits for a report before 503
+- ANALYTICS_CACHE_TTL: Seconds a cached report is kept
+
+Key Components:
+- load_columns / columns_from_logs: extract column arrays for a user
+- cumulative_series, year_in_review, instrument_breakdown: report kernels
+- AnalyticsExecutor: pool with timeout, inline fallback and result cache
+- AnalyticsTimeout: raised when a report does not finish in time
+"""
+
+import multiprocessing
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from flask import current_app, jsonify
+from sqlalchemy import select
+
+from app.models import PracticeLog, db
+from app.utils.cache import MemoryBackend, SharedCache, shared_cache
+
+
+class AnalyticsTimeout(Exception):
+    """Raised when a report does not finish within ANALYTICS_TIMEOUT."""
+
+
+# ---------------------------------------------------------------------------
+# Column extraction (request thread)
+# ---------------------------------------------------------------------------
+
+def _epoch(dt):
+    # SQLite returns naive datetimes; they are stored as UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def load_columns(user_id):
+    """
+    Load a user's logs as plain column arrays in one query.
+
+    Args:
+        user_id (int): Owner of the logs
+
+    Returns:
+        dict: timestamps (UTC epoch seconds), durations, instruments and
+            piece_ids lists, ordered by timestamp
+    """
+    rows = db.session.execute(
+        select(
+            PracticeLog.utc_timestamp,
+            PracticeLog.duration,
+            PracticeLog.instrument,
+            PracticeLog.piece_id,
+        )
+        .where(PracticeLog.user_id == user_id)
+        .order_by(PracticeLog.utc_timestamp)
+    ).all()
+    return {
+        "timestamps": [_epoch(row[0]) for row in rows],
+        "durations": [row[1] for row in rows],
+        "instruments": [row[2] for row in rows],
+        "piece_ids": [row[3] for row in rows],
+    }
+
+
+def columns_from_logs(logs):
+    """Build the same column arrays from already loaded PracticeLog objects."""
+    return {
+        "timestamps": [_epoch(log.utc_timestamp) for log in logs],
+        "durations": [log.duration for log in logs],
+        "instruments": [log.instrument for log in logs],
+        "piece_ids": [log.piece_id for log in logs],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Report kernels (run in worker processes; plain data in, plain data out)
+# ---------------------------------------------------------------------------
+
+def _local_dates(timestamps, tz_name):
+    tz = ZoneInfo(tz_name)
+    return [datetime.fromtimestamp(ts, tz).date() for ts in timestamps]
+
+
+def cumulative_series(columns, tz_name, today_iso):
+    """
+    All-time cumulative minutes per local day, from the first log to today.
+
+    Args:
+        columns (dict): Column arrays from load_columns
+        tz_name (str): User timezone
+        today_iso (str): Today's local date (passed in so results are cacheable)
+
+    Returns:
+        dict: total_mins, y_vals, x_vals and x_range, as used by the
+            dashboard cumulative chart
+    """
+    if not columns["timestamps"]:
+        return {"total_mins": 0, "y_vals": [], "x_vals": [], "x_range": 0}
+
+    per_day = defaultdict(int)
+    for day, minutes in zip(_local_dates(columns["timestamps"], tz_name), columns["durations"]):
+        per_day[day] += minutes
+
+    current = min(per_day)
+    end = date.fromisoformat(today_iso)
+    total_mins = 0
+    x_vals, y_vals = [], []
+    while current <= end:
+        total_mins += per_day.get(current, 0)
+        x_vals.append(current.isoformat())
+        y_vals.append(total_mins)
+        current += timedelta(days=1)
+
+    return {"total_mins": total_mins, "y_vals": y_vals, "x_vals": x_vals, "x_range": len(x_vals)}
+
+
+def year_in_review(columns, tz_name, year):
+    """
+    Summary of one local calendar year.
+
+    Args:
+        columns (dict): Column arrays from load_columns
+        tz_name (str): User timezone
+        year (int): Calendar year in the user's timezone
+
+    Returns:
+        dict: totals, monthly minutes, busiest day, longest session,
+            instrument minutes and the most practiced piece id
+    """
+    monthly = [0] * 12
+    per_day = defaultdict(int)
+    instruments = Counter()
+    pieces = Counter()
+    sessions = 0
+    longest = 0
+
+    rows = zip(
+        _local_dates(columns["timestamps"], tz_name),
+        columns["durations"],
+        columns["instruments"],
+        columns["piece_ids"],
+    )
+    for day, minutes, instrument, piece_id in rows:
+        if day.year != year:
+            continue
+        sessions += 1
+        longest = max(longest, minutes)
+        monthly[day.month - 1] += minutes
+        per_day[day] += minutes
+        instruments[instrument] += minutes
+        if piece_id is not None:
+            pieces[piece_id] += minutes
+
+    busiest = max(per_day.items(), key=lambda item: (item[1], item[0]), default=None)
+    return {
+        "year": year,
+        "total_minutes": sum(monthly),
+        "sessions": sessions,
+        "days_practiced": len(per_day),
+        "longest_session": longest,
+        "monthly_minutes": monthly,
+        "busiest_day": {"date": busiest[0].isoformat(), "minutes": busiest[1]} if busiest else None,
+        "instrument_minutes": dict(instruments.most_common()),
+        "top_piece_id": pieces.most_common(1)[0][0] if pieces else None,
+    }
+
+
+def instrument_breakdown(columns):
+    """
+    Minutes and sessions per instrument across all logs.
+
+    Args:
+        columns (dict): Column arrays from load_columns
+
+    Returns:
+        list: {instrument, minutes, sessions, share} dicts, most minutes first
+    """
+    minutes = Counter()
+    sessions = Counter()
+    for instrument, duration in zip(columns["instruments"], columns["durations"]):
+        minutes[instrument] += duration
+        sessions[instrument] += 1
+
+    total = sum(minutes.values())
+    return [
+        {
+            "instrument": instrument,
+            "minutes": mins,
+            "sessions": sessions[instrument],
+            "share": round(mins / total, 4) if total else 0,
+        }
+        for instrument, mins in minutes.most_common()
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Executor
+# ---------------------------------------------------------------------------
+
+class AnalyticsExecutor:
+    """
+    Runs report kernels in worker processes with caching and fallback.
+
+    Args:
+        processes: Number of worker processes; 0 computes inline
+        timeout: Seconds to wait for a pooled report
+        cache: SharedCache for reports (default: a private in-memory one)
+        cache_ttl: Seconds a cached report is kept in the default cache
+            (versions make it exact; the TTL only bounds memory held by
+            idle users)
+    """
+
+    def __init__(self, processes=2, timeout=10.0, cache=None, cache_ttl=3600):
+        self.processes = processes
+        self.timeout = timeout
+        self.cache = cache or SharedCache(MemoryBackend(256), "analytics", cache_ttl)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a multi-threaded server process is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _discard_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, key, kernel, load_args):
+        """
+        Return a report, computing it in the pool on a cache miss.
+
+        Args:
+            key (tuple): Cache key; must include the user id and data version
+            kernel: Module-level report function
+            load_args: Callable returning the kernel's positional arguments;
+                only called on a cache miss
+
+        Returns:
+            The kernel's result
+
+        Raises:
+            AnalyticsTimeout: If the pooled report takes longer than timeout.
+                The report keeps computing and is cached when it finishes.
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        args = load_args()
+        if self.processes <= 0:
+            return self._store(key, kernel(*args))
+
+        try:
+            future = self._get_pool().submit(kernel, *args)
+        except (BrokenProcessPool, RuntimeError, OSError):
+            # Pool could not start or was shut down: compute here instead
+            current_app.logger.warning("analytics pool unavailable, running %s inline", kernel.__name__)
+            self._discard_pool()
+            return self._store(key, kernel(*args))
+
+        future.add_done_callback(
+            lambda done: done.exception() is None and self._store(key, done.result())
+        )
+        try:
+            return self._store(key, future.result(timeout=self.timeout))
+        except FutureTimeout:
+            raise AnalyticsTimeout(f"{kernel.__name__} exceeded {self.timeout}s") from None
+        except BrokenProcessPool:
+            current_app.logger.warning("analytics worker died, running %s inline", kernel.__name__)
+            self._discard_pool()
+            return self._store(key, kernel(*args))
+
+    def _store(self, key, result):
+        self.cache.set(key, result)
+        return result
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        self._discard_pool()
+
+
+def init_analytics(app):
+    """
+    Attach an AnalyticsExecutor built from the app config, caching reports
+    in the app's computed-stats backend (see init_cache), and serve
+    AnalyticsTimeout as 503 + Retry-After.
+
+    Args:
+        app (Flask): Application to configure
+    """
+    app.extensions["analytics"] = AnalyticsExecutor(
+        processes=int(app.config.get("ANALYTICS_PROCESSES", 2)),
+        timeout=float(app.config.get("ANALYTICS_TIMEOUT", 10)),
+        cache=shared_cache(app, "analytics", float(app.config.get("ANALYTICS_CACHE_TTL", 3600))),
+    )
+
+    @app.errorhandler(AnalyticsTimeout)
+    def analytics_timeout(error):
+        # The report is cached when it finishes, so a retry is usually instant
+        current_app.logger.warning("analytics timeout: %s", error)
+        return jsonify({"message": "Report is still being computed, please retry"}), 503, {"Retry-After": "2"}
+
+
+def get_analytics():
+    """Return the AnalyticsExecutor of the current app."""
+    return current_app.extensions["analytics"]
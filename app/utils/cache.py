@@ -0,0 +1,521 @@
+"""
+Caching Utilities for Practice Tracker
+
+This module provides a small thread-safe LRU cache with per-entry expiry,
+used for short-lived, per-worker caches such as the user snapshots read by
+Flask-Login on every request, and the cache of computed stats (dashboard
+sections and analytics reports).
+
+Computed stats are expensive and identical in every worker, so they go
+through a pluggable backend chosen by CACHE_URL:
+
+- memory:// (default): an LRU in this process, lost on restart
+- sqlite:///path/to/cache.db: a file shared by every worker on the host,
+  which survives restarts
+- redis://host:6379/0: any server speaking the Redis protocol (Redis,
+  Valkey, KeyDB, ...), shared by every host; spoken directly over a socket,
+  so no client library is needed
+
+Backends store bytes with a TTL. SharedCache puts a named namespace on a
+backend, serializes values (JSON, keeping dates and datetimes) and counts
+hits, misses and errors in subwoofer_cache_requests_total. Values must be
+JSON-shaped: None is cached like any other value, but tuples come back as
+lists and dict keys as strings, so cache what a view would jsonify. Keys start with
+the user id and data version (app/utils/changes.py): a write bumps the
+version, so stale entries are never read again and simply expire. A backend
+that fails (a locked file, an unreachable server) is treated as a miss.
+
+Versions restart when a database is recreated, so apps sharing a backend
+with different databases (or a database restored from a backup) need their
+own CACHE_PREFIX.
+
+Configuration:
+- CACHE_URL: Backend of the computed-stats cache
+- CACHE_SIZE: Maximum entries kept by the memory and SQLite backends
+- CACHE_PREFIX: Prefix of every key this app writes to the backend
+
+Key Components:
+- TTLCache: bounded LRU mapping whose entries expire after a TTL
+- MemoryBackend, SQLiteBackend, RedisBackend: interchangeable stores
+- make_backend: build the backend named by a cache URL
+- SharedCache: namespaced, serializing, instrumented view of a backend
+- init_cache: attach the configured backend to the app
+- shared_cache: a named SharedCache on the app's backend
+"""
+
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+# Sentinel distinguishing "not cached" from a cached None
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe least-recently-used cache with time-to-live expiry.
+
+    Entries expire ttl seconds after they were stored. When the cache holds
+    maxsize entries, storing a new key evicts the least recently used one.
+    All operations are O(1).
+
+    Attributes:
+        hits: Number of get() calls answered from the cache
+        misses: Number of get() calls that found nothing (or an expired entry)
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key, or default if missing or expired.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """
+        Store value under key, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl (float): Seconds this entry is kept (default: the cache's ttl)
+        """
+        with self._lock:
+            self._data[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Remove key from the cache and return its value (or default).
+
+        Args:
+            key: Cache key
+            default: Value returned if key is not cached
+        """
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+# ---------------------------------------------------------------------------
+# Computed-stats cache backends
+# ---------------------------------------------------------------------------
+
+class CacheError(Exception):
+    """Raised when a cache backend cannot be read or written."""
+
+
+# Failures treated as a cache miss instead of failing the request
+_BACKEND_ERRORS = (CacheError, OSError, sqlite3.Error)
+
+
+class MemoryBackend:
+    """
+    Per-process backend: a TTLCache of serialized values.
+
+    Args:
+        maxsize (int): Maximum number of entries
+    """
+
+    def __init__(self, maxsize=4096):
+        self._cache = TTLCache(maxsize=maxsize)
+
+    def get(self, key):
+        """Return the bytes stored under key, or None."""
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl):
+        """Store bytes under key for ttl seconds."""
+        self._cache.set(key, value, ttl=ttl)
+
+    def delete(self, key):
+        """Remove key if present."""
+        self._cache.pop(key)
+
+    def close(self):
+        """Nothing to release; entries live as long as the backend."""
+
+
+class SQLiteBackend:
+    """
+    Backend stored in an SQLite file, shared by every process on the host.
+
+    Each thread keeps its own connection; the file uses WAL so readers never
+    wait for a writer. Expired entries are deleted (and the table trimmed to
+    maxsize, soonest-expiring first) every PRUNE_EVERY writes.
+
+    Args:
+        path (str): Database file, created if missing
+        maxsize (int): Entries kept after pruning
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path, maxsize=4096):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        self._writes = 0
+        self._connection()  # fail at startup, not on the first request
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entry ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        """Return the bytes stored under key, or None."""
+        row = self._connection().execute(
+            "SELECT value FROM cache_entry WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        """Store bytes under key for ttl seconds."""
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entry (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def delete(self, key):
+        """Remove key if present."""
+        self._connection().execute("DELETE FROM cache_entry WHERE key = ?", (key,))
+
+    def close(self):
+        """Close this thread's connection, if it has one."""
+        connection, self._local.connection = getattr(self._local, "connection", None), None
+        if connection is not None:
+            connection.close()
+
+    def prune(self):
+        """Delete expired entries, then the soonest-expiring ones beyond maxsize."""
+        connection = self._connection()
+        connection.execute("DELETE FROM cache_entry WHERE expires_at <= ?", (time.time(),))
+        connection.execute(
+            "DELETE FROM cache_entry WHERE key IN ("
+            "SELECT key FROM cache_entry ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+
+
+class RedisBackend:
+    """
+    Backend on a server speaking the Redis protocol (RESP).
+
+    Only GET, SET ... PX and DEL are used, so Redis or any compatible
+    server (or a local stand-in implementing those commands) works. Each
+    thread keeps its own connection and reconnects after an error.
+
+    Args:
+        url (str): redis://[:password@]host[:port][/db]
+        timeout (float): Connect and read timeout in seconds
+    """
+
+    def __init__(self, url, timeout=0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._local.sock, self._local.reader = sock, sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", self.db)
+
+    def _send(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._local.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise CacheError("connection closed by the cache server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise CacheError(payload.decode(errors="replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return self._local.reader.read(length + 2)[:-2]
+        if kind == b"*":
+            return [self._read_reply() for _ in range(int(payload))]
+        raise CacheError(f"unexpected reply from the cache server: {line!r}")
+
+    def _command(self, *args):
+        try:
+            if getattr(self._local, "sock", None) is None:
+                self._connect()
+            return self._send(*args)
+        except (CacheError, OSError):
+            # Drop the connection so the next command starts clean
+            self.close()
+            raise
+
+    def close(self):
+        """Close this thread's connection, if it has one."""
+        reader, sock = getattr(self._local, "reader", None), getattr(self._local, "sock", None)
+        self._local.reader = self._local.sock = None
+        for resource in (reader, sock):
+            if resource is not None:
+                resource.close()
+
+    def get(self, key):
+        """Return the bytes stored under key, or None."""
+        return self._command("GET", key)
+
+    def set(self, key, value, ttl):
+        """Store bytes under key for ttl seconds."""
+        self._command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        """Remove key if present."""
+        self._command("DEL", key)
+
+
+def make_backend(url, maxsize=4096):
+    """
+    Build the backend named by a cache URL.
+
+    Args:
+        url (str): memory://, sqlite:///path or redis://host:port/db
+        maxsize (int): Entry limit of the memory and SQLite backends
+
+    Returns:
+        MemoryBackend | SQLiteBackend | RedisBackend
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    scheme = (url or "memory://").split("://", 1)[0]
+    if scheme == "memory":
+        return MemoryBackend(maxsize)
+    if scheme == "sqlite":
+        return SQLiteBackend(url.split("://", 1)[1][1:], maxsize)
+    if scheme in ("redis", "valkey"):
+        return RedisBackend(url)
+    raise ValueError(f"unsupported CACHE_URL scheme: {scheme}")
+
+
+# ---------------------------------------------------------------------------
+# Serialization and the namespaced cache
+# ---------------------------------------------------------------------------
+
+def _encode(value):
+    # datetime before date: a datetime is also a date
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not cacheable")
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def dump_value(value):
+    """
+    Serialize a cached value: JSON, with dates and datetimes kept.
+
+    Raises:
+        TypeError: If the value holds anything else JSON cannot represent
+    """
+    return json.dumps(value, default=_encode, separators=(",", ":")).encode()
+
+
+def load_value(raw):
+    """Deserialize a value written by dump_value."""
+    return json.loads(raw, object_hook=_decode)
+
+
+class SharedCache:
+    """
+    One named cache on a backend (e.g. "dashboard" sections or "analytics"
+    reports).
+
+    Keys are tuples starting with (user_id, data_version); they are joined
+    into one backend key under the cache's name. Values are stored wrapped
+    as {"v": value}, so a cached None is told apart from a miss, and come
+    back as fresh copies (JSON-shaped, see the module docstring), so callers
+    may modify them.
+
+    Args:
+        backend: MemoryBackend, SQLiteBackend or RedisBackend
+        name (str): Namespace, also the "cache" label of the metrics
+        ttl (float): Seconds an entry is kept
+        metrics: MetricsRegistry counting hits, misses and errors
+        prefix (str): Prefix of every backend key (see CACHE_PREFIX)
+
+    Attributes:
+        hits: Number of get() calls answered from the cache
+        misses: Number of get() calls that found nothing (or failed)
+    """
+
+    def __init__(self, backend, name, ttl, metrics=None, prefix="subwoofer"):
+        self.backend = backend
+        self.name = name
+        self.ttl = ttl
+        self.metrics = metrics
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        return ":".join([self.prefix, self.name, *map(str, key)])
+
+    def _observe(self, result):
+        if self.metrics is not None:
+            self.metrics.observe_cache(self.name, result)
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key, or default if missing or expired.
+
+        Args:
+            key (tuple): (user_id, data_version, ...)
+            default: Value returned on a miss
+        """
+        try:
+            raw = self.backend.get(self._key(key))
+        except _BACKEND_ERRORS as exc:
+            logger.warning("%s cache read failed: %s", self.name, exc)
+            self._observe("error")
+            self.misses += 1
+            return default
+        try:
+            value = load_value(raw)["v"] if raw is not None else _MISSING
+        except (ValueError, TypeError, KeyError):
+            value = _MISSING  # Written in another format: recompute and replace
+        if value is _MISSING:
+            self._observe("miss")
+            self.misses += 1
+            return default
+        self._observe("hit")
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store value under key (values that cannot be serialized are skipped).
+
+        Args:
+            key (tuple): (user_id, data_version, ...)
+            value: JSON-shaped value (dates, datetimes and None allowed)
+            ttl (float): Seconds the entry is kept (default: the cache's ttl)
+        """
+        try:
+            raw = dump_value({"v": value})
+        except TypeError as exc:
+            logger.warning("%s cache skipped %s: %s", self.name, self._key(key), exc)
+            return
+        try:
+            self.backend.set(self._key(key), raw, self.ttl if ttl is None else ttl)
+        except _BACKEND_ERRORS as exc:
+            logger.warning("%s cache write failed: %s", self.name, exc)
+            self._observe("error")
+
+
+def init_cache(app):
+    """
+    Attach the computed-stats backend named by CACHE_URL to
+    app.extensions["cache"].
+
+    Args:
+        app (Flask): Application to configure
+    """
+    app.extensions["cache"] = make_backend(
+        app.config.get("CACHE_URL", "memory://"), int(app.config.get("CACHE_SIZE", 4096))
+    )
+
+
+def shared_cache(app, name, ttl):
+    """
+    Build a SharedCache on the app's backend, counted in the app's metrics.
+
+    Args:
+        app (Flask): Application whose backend (see init_cache) is used
+        name (str): Cache name
+        ttl (float): Seconds an entry is kept
+
+    Returns:
+        SharedCache
+    """
+    return SharedCache(
+        app.extensions["cache"], name, ttl,
+        metrics=app.extensions.get("metrics"),
+        prefix=app.config.get("CACHE_PREFIX", "subwoofer"),
+    )
@@ -0,0 +1,257 @@
+"""
+Change Capture for Practice Tracker Data
+
+Every flush that inserts, updates or deletes a user's practice logs or
+pieces (or changes the user's timezone) bumps that user's data_version in
+the same transaction. Derived results such as analytics reports are cached
+by (user, data_version), so a write invalidates them without having to
+know which caches exist.
+
+Practice log writes are also reported to registered handlers as LogChange
+records (old and new values), before or after the flush, so derived data
+can be maintained in the same transaction as the write that caused it.
+Handlers registered with on_version_bump run right after the bump, when the
+new versions can be read on the flush's connection.
+
+Key Functions:
+- install_change_listeners: register the flush hooks once per process
+- on_log_change: register a handler for practice log changes
+- on_version_bump: register a handler for bumped data versions
+- get_data_version: read a user's current data version
+- bump_data_version: bump versions after bulk writes that bypass the ORM
+- user_timezone: a user's timezone from inside flush handlers
+"""
+
+from collections import namedtuple
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Piece, PracticeLog, User, db
+from app.utils.time import as_utc
+
+# Log fields derived data depends on (utc_timestamp is always aware UTC)
+LogValues = namedtuple("LogValues", "utc_timestamp duration instrument piece_id")
+
+# One inserted (old is None), updated, or deleted (new is None) practice log
+LogChange = namedtuple("LogChange", "user_id old new")
+
+# Handlers run before the flush (pre-write state) or after it (post-write state)
+_log_handlers = {"before": [], "after": []}
+
+# Handlers run after data versions were bumped, with the bumped user ids
+_version_handlers = []
+
+# Models whose rows belong to a user through user_id
+_USER_OWNED = (PracticeLog, Piece)
+
+
+def _touched_user_ids(session):
+    """Collect ids of users whose data is changed by the pending flush."""
+    ids = set()
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, _USER_OWNED) and obj.user_id is not None:
+            ids.add(obj.user_id)
+    for obj in session.dirty:
+        if isinstance(obj, _USER_OWNED) and session.is_modified(obj):
+            ids.add(obj.user_id)
+        elif isinstance(obj, User) and inspect(obj).attrs.timezone.history.has_changes():
+            # Timezone changes move logs between local days
+            ids.add(obj.id)
+    return ids
+
+
+def _after_flush(session, flush_context):
+    # new/dirty/deleted still describe the flushed objects at this point
+    changes = session.info.pop("log_changes", None)
+    if changes:
+        with session.no_autoflush:
+            for handler in _log_handlers["after"]:
+                handler(session, changes)
+        session.info.pop("flush_timezones", None)
+
+    ids = _touched_user_ids(session)
+    if ids:
+        versions = bump_data_version(ids, connection=session.connection())
+        for user_id in ids:
+            user = session.identity_map.get(session.identity_key(User, user_id))
+            if user is None:
+                continue
+            if user_id in versions:
+                # Loaded users see their new version without another SELECT
+                set_committed_value(user, "data_version", versions[user_id])
+            else:
+                session.expire(user, ["data_version"])
+        with session.no_autoflush:
+            for handler in _version_handlers:
+                handler(session, ids)
+
+
+def _values(log, history=False):
+    """LogValues of a log, as they were before this flush if history is set."""
+    state = inspect(log)
+    values = []
+    for name in LogValues._fields:
+        value = getattr(log, name)
+        if history:
+            hist = state.attrs[name].history
+            if hist.deleted:
+                value = hist.deleted[0]
+        values.append(value)
+    if values[0] is not None:
+        values[0] = as_utc(values[0])
+    return LogValues(*values)
+
+
+def collect_log_changes(session):
+    """
+    Describe the practice log writes in the pending flush.
+
+    Args:
+        session: Session about to flush
+
+    Returns:
+        list: LogChange records (updates only if a LogValues field changed)
+    """
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, PracticeLog):
+            changes.append(LogChange(obj.user_id, None, _values(obj)))
+    for obj in session.dirty:
+        if isinstance(obj, PracticeLog) and session.is_modified(obj):
+            old, new = _values(obj, history=True), _values(obj)
+            if old != new:
+                changes.append(LogChange(obj.user_id, old, new))
+    for obj in session.deleted:
+        if isinstance(obj, PracticeLog):
+            changes.append(LogChange(obj.user_id, _values(obj, history=True), None))
+    return changes
+
+
+def on_log_change(handler, after_flush=False):
+    """
+    Register handler(session, changes) for flushes that write logs.
+
+    Handlers run inside the flush's transaction and may add objects to the
+    session or execute statements; they must not commit. Before-flush
+    handlers see the database as it was; after-flush handlers see the
+    written rows. Registering the same handler twice has no effect.
+
+    Args:
+        handler: Callable taking the session and a list of LogChange
+        after_flush (bool): Run after the flush instead of before it
+    """
+    handlers = _log_handlers["after" if after_flush else "before"]
+    if handler not in handlers:
+        handlers.append(handler)
+    return handler
+
+
+def on_version_bump(handler):
+    """
+    Register handler(session, user_ids) to run after a flush bumped data versions.
+
+    The flushed objects are still in session.new/dirty/deleted with their
+    attribute history, and the bumped versions are visible on
+    session.connection(). Registering the same handler twice has no effect.
+
+    Args:
+        handler: Callable taking the session and a set of user ids
+    """
+    if handler not in _version_handlers:
+        _version_handlers.append(handler)
+    return handler
+
+
+def _dispatch_before_flush(session, flush_context, instances):
+    if not (_log_handlers["before"] or _log_handlers["after"]):
+        return
+    changes = collect_log_changes(session)
+    if changes:
+        if _log_handlers["after"]:
+            session.info.setdefault("log_changes", []).extend(changes)
+        with session.no_autoflush:
+            for handler in _log_handlers["before"]:
+                handler(session, changes)
+
+
+def user_timezone(session, user_id):
+    """
+    A user's timezone, safe to call from flush handlers.
+
+    Uses the loaded User if its timezone is in memory (no query), else
+    reads it on the session's connection once per flush, however many
+    handlers ask.
+
+    Args:
+        session: Session being flushed
+        user_id (int): User id
+
+    Returns:
+        str: Timezone name, or None if the user does not exist
+    """
+    user = session.identity_map.get(session.identity_key(User, user_id))
+    if user is not None and "timezone" in inspect(user).dict:
+        return user.timezone  # Loaded and not expired: no query
+    known = session.info.setdefault("flush_timezones", {})
+    if user_id not in known:
+        known[user_id] = session.connection().execute(
+            select(User.timezone).where(User.id == user_id)
+        ).scalar()
+    return known[user_id]
+
+
+def _discard_changes(session):
+    session.info.pop("log_changes", None)
+    session.info.pop("flush_timezones", None)
+
+
+def install_change_listeners():
+    """Register the data version and log change hooks on all sessions (idempotent)."""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+    if not event.contains(Session, "after_rollback", _discard_changes):
+        event.listen(Session, "after_rollback", _discard_changes)
+    if not event.contains(Session, "before_flush", _dispatch_before_flush):
+        event.listen(Session, "before_flush", _dispatch_before_flush)
+
+
+def bump_data_version(user_ids, connection=None):
+    """
+    Increment data_version for the given users.
+
+    Args:
+        user_ids: Iterable of user ids
+        connection: Connection to run the UPDATE on (defaults to db.session)
+
+    Returns:
+        dict: User id -> new version, read with UPDATE ... RETURNING where
+        the database supports it (empty otherwise)
+    """
+    table = User.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id.in_(list(user_ids)))
+        .values(data_version=table.c.data_version + 1)
+    )
+    connection = connection or db.session.connection()
+    if not connection.dialect.update_returning:
+        connection.execute(stmt)
+        return {}
+    return dict(connection.execute(stmt.returning(table.c.id, table.c.data_version)).all())
+
+
+def get_data_version(user_id) -> int:
+    """
+    Read a user's current data version (one indexed primary key lookup).
+
+    Args:
+        user_id (int): User id
+
+    Returns:
+        int: Current data version (0 if the user does not exist)
+    """
+    return db.session.execute(
+        select(User.data_version).where(User.id == user_id)
+    ).scalar() or 0
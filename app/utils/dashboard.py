@@ -0,0 +1,259 @@
+"""
+Dashboard Sections for Practice Tracker
+
+The dashboard payload (/api/dashboard/stats and the data inlined in the
+dashboard page) is made of named sections, each computed by its own
+provider function. A request names the sections it needs
+(?fields=weekly,daily) and only those providers run; the inputs they share
+(the user's logs, this week's logs, goals, ...) are loaded lazily, once per
+request, by DashboardContext. Adding a section therefore costs nothing for
+clients that do not ask for it.
+
+Sections that depend only on the user's logs and pieces are cached per
+(user, data_version, section, timezone, local date) in the computed-stats
+cache (app/utils/cache.py, shared by workers when CACHE_URL names a shared
+backend): every log or piece write bumps the data version
+(app/utils/changes.py), so a cached section is never stale. Sections that
+read other state (goals) are recomputed on every request.
+
+Configuration:
+- DASHBOARD_CACHE_TTL: Seconds a cached section is kept (0 disables caching)
+
+Key Functions:
+- dashboard_section: register a section provider
+- DashboardContext: lazily loaded inputs shared by the providers
+- parse_fields: validate a ?fields= parameter
+- build_dashboard: compute (or read from cache) the requested sections
+"""
+
+import heapq
+from functools import cached_property
+
+from flask import current_app, g
+
+from app.models import Piece, PracticeLog
+from app.utils.analytics import columns_from_logs, cumulative_series, get_analytics
+from app.utils.cache import shared_cache
+from app.utils.changes import get_data_version
+from app.utils.formatting import RECENT_DATE_FORMAT, get_instrument_name, serialize_logs
+from app.utils.goals import daily_target, get_goals
+from app.utils.query import get_this_week_logs
+from app.utils.stats import (
+    calculate_weekly_data,
+    get_avg_log_mins,
+    get_most_frequent,
+    get_today_log_mins,
+    get_total_log_mins,
+)
+from app.utils.streaks import get_streaks
+from app.utils.time import get_today_local
+
+# Logs shown in the dashboard's recent activity box
+RECENT_LOG_COUNT = 5
+
+# Section name -> (provider, cacheable), in evaluation order
+SECTIONS = {}
+
+# Sentinel distinguishing "not cached" from a cached None
+_MISSING = object()
+
+
+def dashboard_section(name, cache=True):
+    """
+    Register a function computing one dashboard section.
+
+    Providers take a DashboardContext and return a JSON-serializable value.
+    Sections are evaluated in registration order.
+
+    Args:
+        name (str): Key of the section in the payload
+        cache (bool): Whether the value depends only on the user's logs and
+            pieces (and the local date), so it can be cached per data version
+
+    Returns:
+        The decorator
+    """
+    def register(provider):
+        SECTIONS[name] = (provider, cache)
+        return provider
+    return register
+
+
+class DashboardContext:
+    """
+    Inputs shared by dashboard section providers, each loaded on first use.
+
+    Args:
+        user_id (int): User whose dashboard is computed
+        tz_name (str): User timezone (defines "today" and the current week)
+    """
+
+    def __init__(self, user_id, tz_name):
+        self.user_id = user_id
+        self.timezone = tz_name
+
+    @cached_property
+    def today(self):
+        return get_today_local(self.timezone)
+
+    @cached_property
+    def data_version(self):
+        # Already read by coalesce_requests on /api/dashboard/stats
+        version = g.get("data_version")
+        return version if version is not None else get_data_version(self.user_id)
+
+    @cached_property
+    def all_logs(self):
+        return PracticeLog.query.filter_by(user_id=self.user_id).order_by(PracticeLog.id).all()
+
+    @cached_property
+    def weekly_logs(self):
+        return get_this_week_logs(timezone=self.timezone, user_id=self.user_id)
+
+    @cached_property
+    def goals(self):
+        return get_goals(self.user_id, self.timezone)
+
+    @cached_property
+    def recent_logs(self):
+        return heapq.nlargest(RECENT_LOG_COUNT, self.all_logs, key=lambda log: (log.utc_timestamp, log.id))
+
+    @cached_property
+    def most_frequent_piece_id(self):
+        # Count by piece_id rather than the piece relationship so only the
+        # winning piece is loaded, not one per distinct piece
+        return get_most_frequent(self.all_logs, attr="piece_id")
+
+    @cached_property
+    def pieces(self):
+        """The pieces shown (most frequent and recent ones), in one query."""
+        ids = {log.piece_id for log in self.recent_logs} | {self.most_frequent_piece_id}
+        ids.discard(None)
+        if not ids:
+            return {}
+        # Loaded pieces also satisfy log.piece from the identity map
+        return {piece.id: piece for piece in Piece.query.filter(Piece.id.in_(ids))}
+
+
+@dashboard_section("cumulative", cache=False)  # cached by the analytics executor
+def _cumulative(ctx):
+    # Computed off-thread from column arrays
+    today = ctx.today.isoformat()
+    return get_analytics().run(
+        (ctx.user_id, ctx.data_version, "cumulative", ctx.timezone, today),
+        cumulative_series,
+        lambda: (columns_from_logs(ctx.all_logs), ctx.timezone, today),
+    )
+
+
+@dashboard_section("weekly")
+def _weekly(ctx):
+    return calculate_weekly_data(ctx.weekly_logs)
+
+
+@dashboard_section("daily", cache=False)  # the target comes from the goals
+def _daily(ctx):
+    # Today is part of this week: a bounded read, never the whole history
+    return {
+        "total_today": get_today_log_mins(ctx.weekly_logs, timezone=ctx.timezone) or 0,
+        "target": daily_target(ctx.goals),
+    }
+
+
+@dashboard_section("common_instrument")
+def _common_instrument(ctx):
+    return get_instrument_name(get_most_frequent(ctx.all_logs, attr="instrument")) or "None"
+
+
+@dashboard_section("total_minutes")
+def _total_minutes(ctx):
+    return get_total_log_mins(ctx.all_logs) or 0
+
+
+@dashboard_section("average_minutes")
+def _average_minutes(ctx):
+    return get_avg_log_mins(ctx.all_logs) or 0
+
+
+@dashboard_section("common_piece")
+def _common_piece(ctx):
+    piece = ctx.pieces.get(ctx.most_frequent_piece_id)
+    return piece.title if piece else None
+
+
+@dashboard_section("recent")
+def _recent(ctx):
+    ctx.pieces  # load the recent logs' pieces in one query
+    return serialize_logs(ctx.recent_logs, local_format=RECENT_DATE_FORMAT, timezone=ctx.timezone)
+
+
+# Streaks and goals come last: their first read for a user may commit,
+# which expires the logs loaded above
+@dashboard_section("streak")
+def _streak(ctx):
+    return get_streaks(ctx.user_id, ctx.timezone)
+
+
+@dashboard_section("goals", cache=False)  # goal edits do not bump the data version
+def _goals(ctx):
+    return ctx.goals
+
+
+def parse_fields(raw):
+    """
+    Validate a comma-separated ?fields= parameter.
+
+    Args:
+        raw (str): Parameter value, or None/empty for every section
+
+    Returns:
+        list: Section names, in evaluation order
+
+    Raises:
+        ValueError: If a name is not a registered section
+    """
+    if not raw:
+        return list(SECTIONS)
+    wanted = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = wanted - SECTIONS.keys()
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}; choose from: {', '.join(SECTIONS)}")
+    return [name for name in SECTIONS if name in wanted]
+
+
+def build_dashboard(user_id, tz_name, fields=None):
+    """
+    Compute the requested dashboard sections, reusing cached ones.
+
+    Args:
+        user_id (int): User whose dashboard is computed
+        tz_name (str): User timezone
+        fields (list): Section names (default: every section)
+
+    Returns:
+        dict: Section name -> value
+    """
+    ctx = DashboardContext(user_id, tz_name)
+    cache = _section_cache()
+    payload = {}
+    for name in fields if fields is not None else SECTIONS:
+        provider, cacheable = SECTIONS[name]
+        if cache is None or not cacheable:
+            payload[name] = provider(ctx)
+            continue
+        key = (user_id, ctx.data_version, name, tz_name, ctx.today)
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = provider(ctx)
+            cache.set(key, value)
+        payload[name] = value
+    return payload
+
+
+def _section_cache():
+    """The app's section cache, created on first use (None when disabled)."""
+    extensions = current_app.extensions
+    if "dashboard_cache" not in extensions:
+        ttl = float(current_app.config.get("DASHBOARD_CACHE_TTL", 300))
+        extensions["dashboard_cache"] = shared_cache(current_app, "dashboard", ttl) if ttl > 0 else None
+    return extensions["dashboard_cache"]
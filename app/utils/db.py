@@ -1,3 +1,5 @@
+from sqlalchemy import case
+
 from app.models import Piece, db
 
 def add_to_db(*items):
@@ -8,14 +10,25 @@ def add_to_db(*items):
         db.session.add(item)
     db.session.commit()
     
-def get_or_create_piece(title: str, composer: str, user_id: int, duration: int) -> Piece:
+def get_or_create_piece(title: str, composer: str, user_id: int, duration: int, practiced_at=None,
+                        flush: bool = True) -> Piece:
     """
-    Find or create a Piece record, update its log_time, and return it.
+    Find or create the user's Piece record, add duration to its log_time,
+    move its last_practiced forward to practiced_at (if later), and return it.
+
+    Nothing is committed: the piece total is written in the same transaction
+    as the log that caused it. Edits and deletes of logs adjust log_time
+    through app/utils/piece_totals.py.
+
+    With flush=False an existing piece's update is left pending, so it is
+    written by the same flush (and data version bump) as the new log. A new
+    piece is always flushed: the log needs its id.
     """
     title_clean = title.strip()
     composer_clean = composer.strip() if composer else "Unknown"
 
     piece = Piece.query.filter_by(
+        user_id=user_id,
         title=title_clean,
         composer=composer_clean
     ).first()
@@ -24,10 +37,19 @@ def get_or_create_piece(title: str, composer: str, user_id: int, duration: int)
             title=title_clean,
             composer=composer_clean,
             user_id=user_id,
-            log_time=0
+            log_time=int(duration),
+            last_practiced=practiced_at,
         )
-        add_to_db(piece)
+        db.session.add(piece)
+    else:
+        # Increment in SQL so concurrent logs for one piece cannot lose minutes
+        piece.log_time = Piece.log_time + int(duration)
+        if practiced_at is not None:
+            piece.last_practiced = case(
+                (Piece.last_practiced > practiced_at, Piece.last_practiced),
+                else_=practiced_at,
+            )
 
-    piece.log_time += int(duration)
-    db.session.commit()
-    return piece
\ No newline at end of file
+    if flush or piece.id is None:
+        db.session.flush()
+    return piece
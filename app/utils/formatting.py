@@ -6,6 +6,9 @@ from app.utils.time import set_as_local
 from app.utils.db import get_or_create_piece
 from ..instrument_map import instrument_labels as INSTRUMENTS
 
+# Readable local date of the dashboard's recent logs ("Monday, Jan 06, 2025")
+RECENT_DATE_FORMAT = "%A, %b %d, %Y"
+
 
 def prepare_log_data(raw: dict, user_id: int) -> dict:
     """
@@ -36,22 +39,26 @@ def prepare_log_data(raw: dict, user_id: int) -> dict:
 
     if piece_title:
         # Try to find by both title and composer
-        piece = get_or_create_piece(piece_title, composer_name, user_id, data["duration"])  
+        piece = get_or_create_piece(
+            piece_title, composer_name, user_id, data["duration"], practiced_at=data["utc_timestamp"], flush=False
+        )
         data["piece_id"] = piece.id
+        data["piece"] = piece  # Keeps the loaded piece on the log for its response
     else:
         data["piece_id"] = None
     return data
 
 
-def serialize_logs(logs: list, local_format: Optional[str] = None) -> list:
+def serialize_logs(logs: list, local_format: Optional[str] = None, timezone: Optional[str] = None) -> list:
     """
     Serialize a list of PracticeLog objects into dictionaries for JSON.
+    Pass the owner's timezone when known to avoid loading log.user.
     """
     output = []
     for log in logs:
         output.append({
             "id": log.user_log_number,
-            "local_date": set_as_local(log.utc_timestamp, log.user.timezone, local_format),
+            "local_date": set_as_local(log.utc_timestamp, timezone or log.user.timezone, local_format),
             "utc_date": log.utc_timestamp,
             "updated_at": log.updated_at,
             "instrument": log.instrument,
@@ -0,0 +1,302 @@
+"""
+Incremental Goal Progress for Practice Tracker
+
+A goal is a minute target over the user's current local day, week
+(Monday-Sunday) or month, optionally limited to one instrument or piece.
+Each Goal row stores the progress of the window it was last evaluated in,
+so showing goals never re-aggregates logs:
+
+- Log writes find only the active goals whose scope they match (through the
+  partial index on active goals by user and scope) and add or subtract the
+  changed minutes when the log falls in the goal's current window.
+- When a new window has started since a goal was last touched, its progress
+  is rebuilt from that window's logs. All stale goals of a user share one
+  indexed range read, so this costs one query per user per window change,
+  not one per goal.
+
+Key Functions:
+- install_goals: maintain goal progress after every flush that writes logs
+- window_bounds: local date range of a period containing a day
+- create_goal: add a goal with its current progress
+- get_goals: active goals with progress for the dashboard and API
+- daily_target: the dashboard gauge target taken from the user's goals
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, bindparam, or_, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Goal, PracticeLog, db
+from app.utils.changes import on_log_change, user_timezone
+from app.utils.time import as_utc, get_today_local
+
+PERIODS = ("daily", "weekly", "monthly")
+SCOPES = ("all", "instrument", "piece")
+
+# Gauge target for users without an overall daily goal
+DEFAULT_DAILY_TARGET = 60
+
+
+def window_bounds(period, day):
+    """
+    Local date range [start, end) of the period window containing day.
+
+    Args:
+        period (str): "daily", "weekly" or "monthly"
+        day (date): Local date inside the window
+
+    Returns:
+        tuple: (start, end) dates, end exclusive
+    """
+    if period == "daily":
+        return day, day + timedelta(days=1)
+    if period == "weekly":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    start = day.replace(day=1)
+    end = date(start.year + 1, 1, 1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def _matches(goal, instrument, piece_id):
+    """Whether a log with this instrument and piece counts toward goal."""
+    if goal.scope == "instrument":
+        return goal.scope_key == instrument
+    if goal.scope == "piece":
+        return piece_id is not None and goal.scope_key == str(piece_id)
+    return True
+
+
+def _utc_bounds(start, end, tz):
+    """Naive UTC range covering local dates [start, end)."""
+    return tuple(
+        datetime.combine(day, time.min, tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+        for day in (start, end)
+    )
+
+
+def _window_progress(connection, user_id, tz, stale):
+    """
+    Progress of each goal over its window, from one range read of logs.
+
+    Args:
+        connection: Connection or session to read on
+        user_id (int): Owner of the goals
+        tz (ZoneInfo): User timezone
+        stale: List of (goal, start, end) tuples
+
+    Returns:
+        dict: goal id -> minutes
+    """
+    lo, hi = _utc_bounds(min(s for _, s, _ in stale), max(e for _, _, e in stale), tz)
+    rows = connection.execute(
+        select(PracticeLog.utc_timestamp, PracticeLog.duration, PracticeLog.instrument, PracticeLog.piece_id)
+        .where(PracticeLog.user_id == user_id, PracticeLog.utc_timestamp >= lo, PracticeLog.utc_timestamp < hi)
+    ).all()
+
+    progress = {goal.id: 0 for goal, _, _ in stale}
+    for utc_timestamp, duration, instrument, piece_id in rows:
+        day = as_utc(utc_timestamp).astimezone(tz).date()
+        for goal, start, end in stale:
+            if start <= day < end and _matches(goal, instrument, piece_id):
+                progress[goal.id] += duration
+    return progress
+
+
+def _rebuild_windows(connection, user_id, tz, stale):
+    """Move stale goals to their current window; return goal id -> minutes."""
+    progress = _window_progress(connection, user_id, tz, stale)
+    table = Goal.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.id == bindparam("goal_id"))
+        .values(window_start=bindparam("start"), progress_minutes=bindparam("minutes")),
+        [{"goal_id": goal.id, "start": start, "minutes": progress[goal.id]} for goal, start, _ in stale],
+    )
+    return progress
+
+
+def _touched_goals(connection, user_id, changes):
+    """Active goals of a user whose scope matches any changed log."""
+    values = [v for change in changes for v in (change.old, change.new) if v is not None]
+    instruments = {v.instrument for v in values}
+    pieces = {str(v.piece_id) for v in values if v.piece_id is not None}
+    return connection.execute(
+        select(Goal.id, Goal.period, Goal.scope, Goal.scope_key, Goal.window_start)
+        .where(
+            Goal.user_id == user_id,
+            Goal.active,
+            or_(
+                Goal.scope == "all",
+                and_(Goal.scope == "instrument", Goal.scope_key.in_(instruments)),
+                and_(Goal.scope == "piece", Goal.scope_key.in_(pieces)),
+            ),
+        )
+    ).all()
+
+
+def _update_goals(session, changes):
+    """After-flush handler applying log changes to matching goals."""
+    by_user = {}
+    for change in changes:
+        by_user.setdefault(change.user_id, []).append(change)
+
+    connection = session.connection()
+    table = Goal.__table__
+    for user_id, user_changes in by_user.items():
+        goals = _touched_goals(connection, user_id, user_changes)
+        if not goals:
+            continue
+        tz_name = user_timezone(session, user_id)
+        if tz_name is None:
+            continue
+        tz = ZoneInfo(tz_name)
+        today = get_today_local(tz_name)
+
+        deltas, stale = [], []
+        for goal in goals:
+            start, end = window_bounds(goal.period, today)
+            if goal.window_start != start:
+                # New window since the goal was last touched; the rebuild
+                # reads the flushed rows, so this change is included
+                stale.append((goal, start, end))
+                continue
+            delta = 0
+            for change in user_changes:
+                for values, sign in ((change.old, -1), (change.new, 1)):
+                    if (values is not None
+                            and _matches(goal, values.instrument, values.piece_id)
+                            and start <= values.utc_timestamp.astimezone(tz).date() < end):
+                        delta += sign * values.duration
+            if delta:
+                deltas.append({"goal_id": goal.id, "delta": delta})
+
+        if deltas:
+            connection.execute(
+                update(table)
+                .where(table.c.id == bindparam("goal_id"))
+                .values(progress_minutes=table.c.progress_minutes + bindparam("delta")),
+                deltas,
+            )
+        if stale:
+            _rebuild_windows(connection, user_id, tz, stale)
+
+        # Loaded Goal objects must not keep the old progress
+        for goal in goals:
+            loaded = session.identity_map.get(session.identity_key(Goal, goal.id))
+            if loaded is not None:
+                session.expire(loaded, ["window_start", "progress_minutes"])
+
+
+def install_goals():
+    """Maintain goal progress after every flush that writes practice logs."""
+    on_log_change(_update_goals, after_flush=True)
+
+
+def serialize_goal(goal, today):
+    """
+    JSON-ready description of a goal and its progress.
+
+    Args:
+        goal (Goal): Goal whose window_start is current
+        today (date): Today's local date
+
+    Returns:
+        dict: Goal fields plus window dates, progress and completion
+    """
+    start, end = window_bounds(goal.period, today)
+    return {
+        "id": goal.id,
+        "period": goal.period,
+        "scope": goal.scope,
+        "scope_key": goal.scope_key or None,
+        "target_minutes": goal.target_minutes,
+        "progress_minutes": goal.progress_minutes,
+        "window_start": start.isoformat(),
+        "window_end": (end - timedelta(days=1)).isoformat(),
+        "complete": goal.progress_minutes >= goal.target_minutes,
+    }
+
+
+def get_goals(user_id, tz_name, today: date = None):
+    """
+    Active goals of a user with their current progress.
+
+    One indexed read of the goals; goals whose window has rolled over since
+    they were last touched are rebuilt together (one more read) and saved.
+
+    Args:
+        user_id (int): User id
+        tz_name (str): User timezone (defines the current windows)
+        today (date): Override today's local date (tests)
+
+    Returns:
+        list: serialize_goal dicts in creation order
+    """
+    today = today or get_today_local(tz_name)
+    goals = db.session.execute(
+        select(Goal).where(Goal.user_id == user_id, Goal.active).order_by(Goal.id)
+    ).scalars().all()
+
+    stale = []
+    for goal in goals:
+        start, end = window_bounds(goal.period, today)
+        if goal.window_start != start:
+            stale.append((goal, start, end))
+    if not stale:
+        return [serialize_goal(goal, today) for goal in goals]
+
+    progress = _rebuild_windows(db.session, user_id, ZoneInfo(tz_name), stale)
+    for goal, start, _ in stale:
+        # Already written by _rebuild_windows; record without dirtying
+        set_committed_value(goal, "window_start", start)
+        set_committed_value(goal, "progress_minutes", progress[goal.id])
+    # Serialize before committing, which would expire (and reload) every goal
+    result = [serialize_goal(goal, today) for goal in goals]
+    db.session.commit()
+    return result
+
+
+def create_goal(user_id, tz_name, period, target_minutes, scope="all", scope_key=""):
+    """
+    Add a goal with its progress for the current window already filled in.
+
+    Args:
+        user_id (int): Owner
+        tz_name (str): User timezone
+        period (str): One of PERIODS
+        target_minutes (int): Minutes per window
+        scope (str): One of SCOPES
+        scope_key (str): Instrument code or piece id for scoped goals
+
+    Returns:
+        dict: serialize_goal of the new goal
+    """
+    today = get_today_local(tz_name)
+    start, end = window_bounds(period, today)
+    goal = Goal(user_id=user_id, period=period, target_minutes=target_minutes,
+                scope=scope, scope_key=scope_key or "", window_start=start)
+    db.session.add(goal)
+    db.session.flush()
+    goal.progress_minutes = _window_progress(db.session, user_id, ZoneInfo(tz_name), [(goal, start, end)])[goal.id]
+    result = serialize_goal(goal, today)
+    db.session.commit()
+    return result
+
+
+def daily_target(goals):
+    """
+    Target for the dashboard's daily gauge.
+
+    Args:
+        goals (list): get_goals result
+
+    Returns:
+        int: Target of the first overall daily goal, or DEFAULT_DAILY_TARGET
+    """
+    for goal in goals:
+        if goal["period"] == "daily" and goal["scope"] == "all":
+            return goal["target_minutes"]
+    return DEFAULT_DAILY_TARGET
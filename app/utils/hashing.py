@@ -0,0 +1,154 @@
+"""
+Bounded Password Hashing for Practice Tracker
+
+Password hashing (scrypt by default) is deliberately CPU-expensive. Running
+it directly on request threads let a signup or login wave occupy every
+worker thread and starve all other endpoints. This module runs hashing on a
+small dedicated thread pool (hashlib releases the GIL while hashing) and
+bounds how many hashes may be queued. When the pool is saturated, auth
+requests fail fast with HasherBusy (served as 503 + Retry-After) instead of
+piling up behind it.
+
+The hashing method and cost come from the PASSWORD_HASH_METHOD setting, in
+Werkzeug's format (e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000").
+needs_rehash() reports hashes stored with different parameters so login can
+upgrade them transparently.
+
+Configuration:
+- PASSWORD_HASH_METHOD: Werkzeug hashing method and cost parameters
+- PASSWORD_HASH_WORKERS: Threads dedicated to hashing
+- PASSWORD_HASH_QUEUE: Extra hashes allowed to wait for a thread
+- PASSWORD_HASH_WAIT: Seconds a request waits for a queue slot before 503
+
+Key Components:
+- PasswordHasher: bounded pool with hash / verify / needs_rehash
+- HasherBusy: raised when the pool and its queue are full
+- init_password_hasher / get_password_hasher: per-app instance
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when no hashing slot frees up within the configured wait."""
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a bounded thread pool.
+
+    At most workers + queue_size hashes are in flight at once; callers
+    beyond that wait up to wait_timeout seconds for a slot and then get
+    HasherBusy.
+
+    Args:
+        method: Werkzeug hashing method string including cost parameters
+        workers: Number of hashing threads
+        queue_size: Number of hashes allowed to wait for a thread
+        wait_timeout: Seconds to wait for a free slot
+    """
+
+    def __init__(self, method="scrypt", workers=2, queue_size=8, wait_timeout=0.5):
+        self.method = method
+        self.workers = workers
+        self.wait_timeout = wait_timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._prefix = None
+
+    def _get_executor(self):
+        # Created on first use so workers that never authenticate don't
+        # start threads
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            raise HasherBusy("password hashing pool is saturated")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """
+        Hash a password with the configured method.
+
+        Args:
+            password (str): Plain text password
+
+        Returns:
+            str: Werkzeug password hash
+
+        Raises:
+            HasherBusy: If no hashing slot is available
+        """
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pw_hash, password):
+        """
+        Check a password against a stored hash (with that hash's parameters).
+
+        Args:
+            pw_hash (str): Stored Werkzeug password hash
+            password (str): Plain text password to check
+
+        Returns:
+            bool: True if the password matches
+
+        Raises:
+            HasherBusy: If no hashing slot is available
+        """
+        return self._run(check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """
+        Return True if pw_hash was made with different method or cost.
+
+        Args:
+            pw_hash (str): Stored Werkzeug password hash
+        """
+        if self._prefix is None:
+            # Let Werkzeug expand defaults (e.g. "scrypt" -> "scrypt:32768:8:1")
+            # using the cheapest possible input
+            self._prefix = self._run(generate_password_hash, "", self.method).split("$", 1)[0]
+        return pw_hash.split("$", 1)[0] != self._prefix
+
+    def shutdown(self):
+        """Stop the hashing threads (waits for in-flight hashes)."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+def init_password_hasher(app):
+    """
+    Attach a PasswordHasher built from the app config.
+
+    Args:
+        app (Flask): Application to configure
+    """
+    app.extensions["password_hasher"] = PasswordHasher(
+        method=app.config.get("PASSWORD_HASH_METHOD", "scrypt"),
+        workers=int(app.config.get("PASSWORD_HASH_WORKERS", 2)),
+        queue_size=int(app.config.get("PASSWORD_HASH_QUEUE", 8)),
+        wait_timeout=float(app.config.get("PASSWORD_HASH_WAIT", 0.5)),
+    )
+
+
+def get_password_hasher():
+    """Return the PasswordHasher of the current app."""
+    return current_app.extensions["password_hasher"]
@@ -0,0 +1,372 @@
+"""
+Durable Background Job Queue for Practice Tracker
+
+Derived data (daily rollups, and later streaks and other aggregates) is
+maintained by background jobs so log writes only record "what changed"
+instead of recomputing inline. Jobs live in the job table, are enqueued in
+the same transaction as the write that caused them, and are executed by
+worker threads started from create_app.
+
+- Deduplication: one pending job per (kind, user). Enqueueing a duplicate
+  merges payloads with the kind's merge function (e.g. keep the earliest
+  "since" date) instead of adding a row.
+- Retries: a failing job is retried with exponential backoff until
+  JOB_MAX_ATTEMPTS, then kept with status "failed" for inspection.
+- Recovery: jobs left "running" by a crashed worker are requeued when
+  workers start.
+
+Configuration:
+- JOB_WORKERS: Worker threads per process (0 = no threads; run drain())
+- JOB_POLL_SECONDS: Idle poll interval of worker threads
+- JOB_MAX_ATTEMPTS: Attempts before a job is marked failed
+- JOB_BACKOFF_SECONDS: First retry delay (doubles per attempt, max 5 min)
+
+Key Components:
+- register_job: decorator registering a handler (and merge) for a job kind
+- enqueue: add or merge a pending job in the caller's transaction
+- drain: run due jobs synchronously (tests, `flask jobs drain`)
+- run_pending_for_user: run one user's pending jobs now (read-your-writes)
+- queue_stats: depth and lag for the admin view
+- init_jobs: configure the app, register CLI commands, start workers
+"""
+
+import json
+import threading
+import traceback
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Job, db
+
+# kind -> (handler(user_id, payload), merge(old_payload, new_payload))
+_registry = {}
+
+# Stop retrying delays from growing without bound
+MAX_BACKOFF_SECONDS = 300
+
+
+def _now():
+    # Job times are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _replace(old, new):
+    return new
+
+
+def register_job(kind, merge=None):
+    """
+    Register the handler of a job kind.
+
+    The handler is called as handler(user_id, payload) inside an app context
+    and should only add/modify rows in db.session; the runner commits its
+    work together with the job's removal.
+
+    Args:
+        kind (str): Job type name stored in job.kind
+        merge: Optional merge(old_payload, new_payload) -> payload used when
+            a pending duplicate exists (default: keep the newer payload)
+    """
+    def decorator(handler):
+        _registry[kind] = (handler, merge or _replace)
+        return handler
+    return decorator
+
+
+def enqueue(kind, user_id, payload=None, session=None, delay=0):
+    """
+    Add a pending job, or merge into the pending job for (kind, user_id).
+
+    Runs in the caller's transaction (nothing is committed), so the job is
+    durable exactly when the write that caused it is.
+
+    Args:
+        kind (str): Registered job type
+        user_id (int): User the job works on
+        payload (dict): JSON-serializable arguments
+        session: Session to use (defaults to db.session)
+        delay (float): Seconds before the job may run
+
+    Returns:
+        Job: The new or merged pending job
+    """
+    session = session or db.session
+    payload = payload or {}
+    _, merge = _registry[kind]
+
+    with session.no_autoflush:
+        job = session.execute(
+            select(Job).where(Job.kind == kind, Job.user_id == user_id, Job.status == "pending")
+        ).scalar()
+    if job is not None:
+        merged = json.dumps(merge(json.loads(job.payload), payload))
+        if merged != job.payload:
+            # Core UPDATE so merging also works from inside flush handlers,
+            # where attribute changes on clean objects would be discarded
+            session.execute(update(Job).where(Job.id == job.id).values(payload=merged))
+            set_committed_value(job, "payload", merged)
+        return job
+
+    now = _now()
+    job = Job(kind=kind, user_id=user_id, payload=json.dumps(payload), status="pending",
+              attempts=0, run_at=now + timedelta(seconds=delay), created_at=now)
+    session.add(job)
+    _wake_workers()
+    return job
+
+
+def _claim(kinds=None, user_id=None, due_only=True):
+    """Atomically mark the next pending job as running; return its id or None."""
+    while True:
+        query = select(Job.id).where(Job.status == "pending")
+        if due_only:
+            query = query.where(Job.run_at <= _now())
+        if kinds is not None:
+            query = query.where(Job.kind.in_(kinds))
+        if user_id is not None:
+            query = query.where(Job.user_id == user_id)
+        job_id = db.session.execute(query.order_by(Job.run_at, Job.id).limit(1)).scalar()
+        if job_id is None:
+            return None
+
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "pending")
+            .values(status="running", locked_at=_now(), attempts=Job.attempts + 1)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+        # Another worker claimed it first; try the next one
+
+
+def _execute(job_id):
+    """Run a claimed job; delete it on success, schedule a retry on failure."""
+    job = db.session.get(Job, job_id)
+    kind = job.kind
+    handler, _ = _registry.get(kind, (None, None))
+    try:
+        if handler is None:
+            raise LookupError(f"no handler registered for job kind {kind!r}")
+        handler(job.user_id, json.loads(job.payload))
+        db.session.delete(job)
+        db.session.commit()
+        return True
+    except Exception:
+        db.session.rollback()
+        error = traceback.format_exc(limit=3)
+        current_app.logger.warning("job %s (%s) failed:\n%s", job_id, kind, error)
+        _reschedule(job_id, error)
+        return False
+
+
+def _reschedule(job_id, error):
+    """Put a failed job back in the queue with backoff, or mark it failed."""
+    job = db.session.get(Job, job_id)
+    max_attempts = current_app.config.get("JOB_MAX_ATTEMPTS", 5)
+    job.last_error = error
+    job.locked_at = None
+
+    if job.attempts >= max_attempts:
+        job.status = "failed"
+        db.session.commit()
+        return
+
+    # A newer job for the same (kind, user) may have been enqueued while this
+    # one ran; fold this job's work into it instead of violating dedupe
+    _, merge = _registry.get(job.kind, (None, _replace))
+    pending = db.session.execute(
+        select(Job).where(Job.kind == job.kind, Job.user_id == job.user_id, Job.status == "pending")
+    ).scalar()
+    if pending is not None:
+        pending.payload = json.dumps(merge(json.loads(job.payload), json.loads(pending.payload)))
+        db.session.delete(job)
+    else:
+        base = current_app.config.get("JOB_BACKOFF_SECONDS", 2)
+        delay = min(base * 2 ** (job.attempts - 1), MAX_BACKOFF_SECONDS)
+        job.status = "pending"
+        job.run_at = _now() + timedelta(seconds=delay)
+    db.session.commit()
+
+
+def drain(max_jobs=None, include_delayed=False):
+    """
+    Run pending jobs on the calling thread until the queue is empty.
+
+    Args:
+        max_jobs (int): Stop after this many jobs (default: no limit)
+        include_delayed (bool): Also run jobs waiting out a retry backoff
+
+    Returns:
+        int: Number of jobs run (successful or not)
+    """
+    ran = 0
+    while max_jobs is None or ran < max_jobs:
+        job_id = _claim(due_only=not include_delayed)
+        if job_id is None:
+            break
+        _execute(job_id)
+        ran += 1
+    return ran
+
+
+def run_pending_for_user(kind, user_id):
+    """
+    Run a user's pending job of one kind now, if there is one.
+
+    Read paths call this before reading derived data so a user always sees
+    their own latest writes, even if the workers are behind.
+
+    Args:
+        kind (str): Job type
+        user_id (int): User whose job should run
+
+    Returns:
+        bool: True if a job was run
+    """
+    job_id = _claim(kinds=[kind], user_id=user_id)
+    if job_id is None:
+        return False
+    _execute(job_id)
+    return True
+
+
+def recover_stale_jobs(older_than=300):
+    """
+    Requeue jobs left "running" by a worker that died mid-job.
+
+    Args:
+        older_than (float): Seconds since the job was claimed
+
+    Returns:
+        int: Number of jobs requeued
+    """
+    cutoff = _now() - timedelta(seconds=older_than)
+    stale = db.session.execute(
+        select(Job).where(Job.status == "running", Job.locked_at < cutoff)
+    ).scalars().all()
+    for job in stale:
+        job.locked_at = None
+        pending = db.session.execute(
+            select(Job.id).where(Job.kind == job.kind, Job.user_id == job.user_id, Job.status == "pending")
+        ).scalar()
+        if pending is not None:
+            db.session.delete(job)   # The newer pending job redoes its work
+        else:
+            job.status = "pending"
+    db.session.commit()
+    return len(stale)
+
+
+def queue_stats():
+    """
+    Summarize queue depth and lag for the admin view.
+
+    Returns:
+        dict: depth per kind and status, total pending, lag_seconds (age of
+            the oldest due pending job) and the most recent failures
+    """
+    now = _now()
+    rows = db.session.execute(
+        select(Job.kind, Job.status, func.count(), func.min(Job.run_at))
+        .group_by(Job.kind, Job.status)
+    ).all()
+
+    depth = {}
+    oldest_due = None
+    for kind, status, count, min_run_at in rows:
+        depth.setdefault(kind, {})[status] = count
+        if status == "pending" and min_run_at <= now:
+            oldest_due = min(oldest_due or min_run_at, min_run_at)
+
+    failures = db.session.execute(
+        select(Job).where(Job.status == "failed").order_by(Job.id.desc()).limit(10)
+    ).scalars().all()
+    return {
+        "pending": sum(kinds.get("pending", 0) for kinds in depth.values()),
+        "running": sum(kinds.get("running", 0) for kinds in depth.values()),
+        "failed": sum(kinds.get("failed", 0) for kinds in depth.values()),
+        "lag_seconds": round((now - oldest_due).total_seconds(), 3) if oldest_due else 0.0,
+        "depth": depth,
+        "recent_failures": [
+            {"id": job.id, "kind": job.kind, "user_id": job.user_id,
+             "attempts": job.attempts, "error": (job.last_error or "").strip().splitlines()[-1:]}
+            for job in failures
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Worker threads
+# ---------------------------------------------------------------------------
+
+_wakeup = threading.Event()
+
+
+def _wake_workers():
+    _wakeup.set()
+
+
+def _worker_loop(app, stop):
+    poll = app.config.get("JOB_POLL_SECONDS", 1.0)
+    while not stop.is_set():
+        with app.app_context():
+            try:
+                ran = drain(max_jobs=1)
+            except Exception:
+                app.logger.exception("job worker error")
+                ran = 0
+        if not ran:
+            _wakeup.wait(poll)
+            _wakeup.clear()
+
+
+def start_workers(app, count):
+    """
+    Start `count` daemon worker threads for app.
+
+    Returns:
+        threading.Event: Set it to stop the workers after their current job
+    """
+    stop = threading.Event()
+    with app.app_context():
+        recover_stale_jobs()
+    for n in range(count):
+        threading.Thread(
+            target=_worker_loop, args=(app, stop), name=f"job-worker-{n}", daemon=True
+        ).start()
+    return stop
+
+
+jobs_cli = AppGroup("jobs", help="Background job queue commands.")
+
+
+@jobs_cli.command("drain")
+@click.option("--include-delayed", is_flag=True, help="Also run jobs waiting on retry backoff.")
+def drain_command(include_delayed):
+    """Run all pending jobs now."""
+    click.echo(f"ran {drain(include_delayed=include_delayed)} job(s)")
+
+
+@jobs_cli.command("status")
+def status_command():
+    """Print queue depth and lag."""
+    click.echo(json.dumps(queue_stats(), indent=2, default=str))
+
+
+def init_jobs(app):
+    """
+    Register the jobs CLI and start JOB_WORKERS worker threads.
+
+    Args:
+        app (Flask): Application to configure
+    """
+    app.cli.add_command(jobs_cli)
+    workers = int(app.config.get("JOB_WORKERS", 1))
+    if workers > 0:
+        app.extensions["job_workers_stop"] = start_workers(app, workers)
@@ -0,0 +1,238 @@
+"""
+Incremental Leaderboards for Practice Tracker
+
+Weekly, monthly and all-time leaderboards of practice minutes, overall and
+per instrument. Ranking users by scanning everyone's PracticeLog rows does
+not scale, so each (board, instrument, user) has a LeaderboardScore row:
+
+- Every flush that writes logs adds or subtracts the changed minutes on the
+  week, month and all-time boards of the log's local date, overall and for
+  its instrument, in one upsert statement.
+- Top-K reads walk the (board, instrument, minutes) index from the top;
+  "my rank" counts the index entries above the user's score.
+
+Windows use each user's own local calendar, so a log counts toward the
+week in which the user practiced it. Timezone changes are not re-bucketed
+incrementally; `flask leaderboard rebuild` recomputes every score from the
+logs.
+
+Key Functions:
+- init_leaderboard: maintain scores on log writes, register the CLI
+- board_keys / current_board: window keys of a local date
+- get_leaderboard: top users and the requesting user's rank
+- rebuild_leaderboards: recompute every score from the logs
+- backfill_leaderboard_scores: score every existing log (schema upgrades)
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models import LeaderboardScore, PracticeLog, User, db
+from app.utils.changes import on_log_change, user_timezone
+from app.utils.time import as_utc
+
+WINDOWS = ("week", "month", "all")
+
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def board_keys(day):
+    """
+    Keys of the week, month and all-time boards a local date belongs to.
+
+    Args:
+        day (date): Local date of a log
+
+    Returns:
+        tuple: ("week:<monday iso>", "month:<yyyy-mm>", "all")
+    """
+    monday = day - timedelta(days=day.weekday())
+    return (f"week:{monday.isoformat()}", f"month:{day:%Y-%m}", "all")
+
+
+def current_board(window, today):
+    """Key of the board for `window` ("week", "month" or "all") containing today."""
+    return board_keys(today)[WINDOWS.index(window)]
+
+
+def _upsert_scores(connection, rows):
+    """Add each row's minutes to its score, creating missing rows."""
+    table = LeaderboardScore.__table__
+    stmt = _UPSERTS[connection.dialect.name](table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.board, table.c.instrument, table.c.user_id],
+        set_={"minutes": table.c.minutes + stmt.excluded.minutes},
+    )
+    connection.execute(stmt, rows)
+
+
+def _score_rows(totals):
+    return [
+        {"board": board, "instrument": instrument, "user_id": user_id, "minutes": minutes}
+        for (board, instrument, user_id), minutes in totals.items()
+        if minutes
+    ]
+
+
+def _add_log(totals, user_id, day, instrument, minutes):
+    """Accumulate one log's minutes on every board it counts toward."""
+    for board in board_keys(day):
+        totals[(board, "", user_id)] += minutes
+        totals[(board, instrument, user_id)] += minutes
+
+
+def _update_scores(session, changes):
+    """After-flush handler applying log changes to leaderboard scores."""
+    totals = defaultdict(int)
+    for change in changes:
+        tz_name = user_timezone(session, change.user_id)
+        if tz_name is None:
+            continue
+        tz = ZoneInfo(tz_name)
+        for values, sign in ((change.old, -1), (change.new, 1)):
+            if values is not None:
+                day = values.utc_timestamp.astimezone(tz).date()
+                _add_log(totals, change.user_id, day, values.instrument, sign * values.duration)
+
+    rows = _score_rows(totals)
+    if rows:
+        _upsert_scores(session.connection(), rows)
+
+
+def get_leaderboard(window, today, user_id, instrument="", limit=10):
+    """
+    Top users of the current board and the requesting user's standing.
+
+    Ties share a rank (1, 2, 2, 4). Costs two index reads plus a count of
+    the index entries above the user's score.
+
+    Args:
+        window (str): "week", "month" or "all"
+        today (date): Requesting user's local date (selects the board)
+        user_id (int): Requesting user
+        instrument (str): Instrument code, "" for all instruments
+        limit (int): Number of top users
+
+    Returns:
+        dict: board, top ([{rank, username, minutes}]) and me
+            ({rank, minutes}; rank is None without practice in the window)
+    """
+    board = current_board(window, today)
+    score = LeaderboardScore
+    rows = db.session.execute(
+        select(User.username, score.minutes)
+        .join(User, User.id == score.user_id)
+        .where(score.board == board, score.instrument == instrument, score.minutes > 0)
+        .order_by(score.minutes.desc(), score.user_id)
+        .limit(limit)
+    ).all()
+
+    top = []
+    for position, (username, minutes) in enumerate(rows, start=1):
+        rank = top[-1]["rank"] if top and top[-1]["minutes"] == minutes else position
+        top.append({"rank": rank, "username": username, "minutes": minutes})
+
+    mine = db.session.execute(
+        select(score.minutes).where(score.board == board, score.instrument == instrument, score.user_id == user_id)
+    ).scalar() or 0
+    rank = None
+    if mine > 0:
+        rank = 1 + db.session.execute(
+            select(func.count()).select_from(score)
+            .where(score.board == board, score.instrument == instrument, score.minutes > mine)
+        ).scalar()
+
+    return {"board": board, "top": top, "me": {"rank": rank, "minutes": mine}}
+
+
+def rebuild_leaderboards(batch_size=10_000):
+    """
+    Recompute every leaderboard score from the practice logs.
+
+    Streams logs ordered by user so memory holds one user's scores at a
+    time, and replaces all scores in a single transaction.
+
+    Args:
+        batch_size (int): Score rows per INSERT batch
+
+    Returns:
+        int: Number of score rows written
+    """
+    db.session.execute(delete(LeaderboardScore))
+    written = _write_scores(db.session.connection(), batch_size)
+    db.session.commit()
+    return written
+
+
+def backfill_leaderboard_scores(connection):
+    """
+    Score every existing log (databases whose logs predate the
+    leaderboard_score table).
+
+    Args:
+        connection: Connection to read logs and write scores on
+
+    Returns:
+        int: Number of score rows written
+    """
+    return _write_scores(connection)
+
+
+def _write_scores(connection, batch_size=10_000):
+    """Insert the scores of every log, one user's totals at a time."""
+    logs = connection.execute(
+        select(PracticeLog.user_id, User.timezone, PracticeLog.utc_timestamp,
+               PracticeLog.instrument, PracticeLog.duration)
+        .join(User, User.id == PracticeLog.user_id)
+        .order_by(PracticeLog.user_id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    written = 0
+    pending = []
+    totals = defaultdict(int)
+    current_user_id = None
+    for user_id, tz_name, utc_timestamp, instrument, duration in logs:
+        if user_id != current_user_id:
+            pending.extend(_score_rows(totals))
+            totals.clear()
+            current_user_id, tz = user_id, ZoneInfo(tz_name)
+        _add_log(totals, user_id, as_utc(utc_timestamp).astimezone(tz).date(), instrument, duration)
+        if len(pending) >= batch_size:
+            connection.execute(insert(LeaderboardScore), pending)
+            written += len(pending)
+            pending = []
+    pending.extend(_score_rows(totals))
+    if pending:
+        connection.execute(insert(LeaderboardScore), pending)
+        written += len(pending)
+    return written
+
+
+leaderboard_cli = AppGroup("leaderboard", help="Leaderboard maintenance commands.")
+
+
+@leaderboard_cli.command("rebuild")
+@click.option("--batch-size", default=10_000, show_default=True, help="Score rows per INSERT.")
+def rebuild_command(batch_size):
+    """Recompute all leaderboard scores from the practice logs."""
+    click.echo(f"wrote {rebuild_leaderboards(batch_size)} leaderboard score(s)")
+
+
+def init_leaderboard(app):
+    """
+    Maintain leaderboard scores on every log write.
+
+    Args:
+        app (Flask): Application to register the leaderboard CLI on
+    """
+    on_log_change(_update_scores, after_flush=True)
+    app.cli.add_command(leaderboard_cli)
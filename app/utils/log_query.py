@@ -0,0 +1,171 @@
+"""
+Log Table Queries for Practice Tracker
+
+Sorting, filtering and paging of a user's practice logs for the log table,
+done in SQL. Every sort orders by (sort key, utc_timestamp, id), so pages are
+stable and can be resumed from an opaque cursor (keyset pagination): a page
+is one index range read from the last row of the previous page, however deep
+into the history it is.
+
+Index usage (all per user):
+- date:       ix_practice_log_user_time (user_id, utc_timestamp)
+- duration:   ix_practice_log_user_duration (user_id, duration, utc_timestamp)
+- instrument: ix_practice_log_user_instrument (user_id, instrument, utc_timestamp),
+              which also serves an instrument filter with the date sort
+- piece:      joins piece titles; the user's logs are read through
+              ix_practice_log_user_piece and sorted
+
+Key Functions:
+- LOG_SORTS: supported sort names
+- query_logs: one page of filtered, sorted logs and the cursor of the next
+- encode_cursor / decode_cursor: opaque cursors bound to a sort and order
+"""
+
+import base64
+import json
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import contains_eager, joinedload
+
+from app.models import Piece, PracticeLog
+
+# Sort names and their leading key; ties are broken by time, then id
+LOG_SORTS = ("date", "duration", "instrument", "piece")
+
+
+def _sort_keys(sort):
+    """Columns a sort orders by, most significant first."""
+    leading = {
+        "date": (),
+        "duration": (PracticeLog.duration,),
+        "instrument": (PracticeLog.instrument,),
+        "piece": (func.coalesce(Piece.title, ""),),  # "Unlisted" logs sort first
+    }[sort]
+    return (*leading, PracticeLog.utc_timestamp, PracticeLog.id)
+
+
+def _key_values(log, sort):
+    """Values of a log's sort keys, matching _sort_keys."""
+    leading = {
+        "date": (),
+        "duration": (log.duration,),
+        "instrument": (log.instrument,),
+        "piece": (log.piece.title if log.piece else "",),
+    }[sort]
+    return (*leading, log.utc_timestamp, log.id)
+
+
+def encode_cursor(sort, order, values):
+    """
+    Encode the sort key values of a page's last row as an opaque cursor.
+
+    Args:
+        sort (str): Sort name
+        order (str): asc or desc
+        values (tuple): Values of the sort keys of the last row
+
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = [sort, order, *(v.isoformat() if isinstance(v, datetime) else v for v in values)]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort, order):
+    """
+    Decode a cursor made by encode_cursor for the same sort and order.
+
+    Args:
+        cursor (str): Cursor from a previous page
+        sort (str): Sort of the requested page
+        order (str): Order of the requested page
+
+    Returns:
+        list: Sort key values to continue after
+
+    Raises:
+        ValueError: If the cursor is malformed or was made for another sort/order
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor_sort, cursor_order, *values = payload
+    except (ValueError, TypeError) as exc:
+        raise ValueError("malformed cursor") from exc
+    if (cursor_sort, cursor_order) != (sort, order) or len(values) != len(_sort_keys(sort)):
+        raise ValueError("cursor does not match the requested sort")
+    try:
+        values[-2] = datetime.fromisoformat(values[-2])  # utc_timestamp
+    except (ValueError, TypeError) as exc:
+        raise ValueError("malformed cursor") from exc
+    return values
+
+
+def _utc_day_start(day, tz_name):
+    """UTC instant at which a local date starts."""
+    local = datetime.combine(day, time.min, tzinfo=ZoneInfo(tz_name))
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def query_logs(user_id, tz_name, sort="date", order="desc", filters=None, limit=None, cursor=None):
+    """
+    Read a user's logs filtered, sorted and paged in SQL.
+
+    Args:
+        user_id (int): Owner of the logs
+        tz_name (str): User timezone, for the local date range filters
+        sort (str): One of LOG_SORTS
+        order (str): asc or desc
+        filters (dict): Any of instrument, piece_id, start and end (local
+            dates, inclusive), min_duration and max_duration
+        limit (int): Page size, or None for every matching log
+        cursor (str): Cursor of the previous page (see encode_cursor)
+
+    Returns:
+        tuple: (list of PracticeLog with pieces loaded, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is invalid for this sort and order
+    """
+    filters = filters or {}
+    keys = _sort_keys(sort)
+
+    query = PracticeLog.query.filter(PracticeLog.user_id == user_id)
+    if sort == "piece":
+        query = query.outerjoin(Piece, PracticeLog.piece_id == Piece.id).options(
+            contains_eager(PracticeLog.piece)
+        )
+    else:
+        query = query.options(joinedload(PracticeLog.piece))
+
+    if filters.get("instrument"):
+        query = query.filter(PracticeLog.instrument == filters["instrument"])
+    if filters.get("piece_id") is not None:
+        query = query.filter(PracticeLog.piece_id == filters["piece_id"])
+    if filters.get("start") is not None:
+        query = query.filter(PracticeLog.utc_timestamp >= _utc_day_start(filters["start"], tz_name))
+    if filters.get("end") is not None:
+        end = _utc_day_start(filters["end"] + timedelta(days=1), tz_name)
+        query = query.filter(PracticeLog.utc_timestamp < end)
+    if filters.get("min_duration") is not None:
+        query = query.filter(PracticeLog.duration >= filters["min_duration"])
+    if filters.get("max_duration") is not None:
+        query = query.filter(PracticeLog.duration <= filters["max_duration"])
+
+    if cursor:
+        # Continue strictly after the previous page's last row
+        position = tuple_(*decode_cursor(cursor, sort, order))
+        query = query.filter(tuple_(*keys) < position if order == "desc" else tuple_(*keys) > position)
+
+    query = query.order_by(*(key.desc() if order == "desc" else key.asc() for key in keys))
+    if limit is None:
+        return query.all(), None
+
+    # One extra row tells whether another page follows
+    logs = query.limit(limit + 1).all()
+    if len(logs) <= limit:
+        return logs, None
+    logs = logs[:limit]
+    return logs, encode_cursor(sort, order, _key_values(logs[-1], sort))
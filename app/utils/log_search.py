@@ -0,0 +1,191 @@
+"""
+Practice Note Search for Practice Tracker
+
+Full-text search over practice notes and piece titles with an SQLite FTS5
+table (log_search) holding one row per log that has notes or a piece,
+keyed by the log's id. Triggers on practice_log and piece keep it in sync
+on every insert, edit and delete, including bulk writes that bypass the
+ORM. Each row also carries an "owner" token (u<user_id>), so a search is
+one FTS lookup restricted to the user instead of a LIKE scan over every
+log, and results are ranked with bm25.
+
+The table is created (and filled from the existing logs) whenever the
+schema is created or upgraded, see app/utils/schema.py. Search is only
+available on SQLite.
+
+Key Functions:
+- install_log_search: create the search table with the rest of the schema
+- build_match: turn typed text into a safe FTS5 query for one user
+- search_logs: one page of a user's logs matching a query, with snippets
+"""
+
+import html
+import re
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import joinedload
+
+from app.models import PracticeLog, db
+
+# Snippet highlight markers; replaced with <mark> after escaping the text
+_OPEN, _CLOSE = "\x02", "\x03"
+
+# Words around each match in a snippet
+SNIPPET_WORDS = 12
+
+# Relative weight of matches in notes and piece titles (bm25)
+NOTES_WEIGHT = 1.0
+TITLE_WEIGHT = 0.5
+
+_INDEXED_ROW = """
+    SELECT new.id, 'u' || new.user_id, new.notes,
+           (SELECT title FROM piece WHERE piece.id = new.piece_id)
+    WHERE new.notes IS NOT NULL OR new.piece_id IS NOT NULL
+"""
+
+_DDL = [
+    """
+    CREATE VIRTUAL TABLE log_search USING fts5(
+        owner, notes, title, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER log_search_insert AFTER INSERT ON practice_log BEGIN
+        INSERT INTO log_search (rowid, owner, notes, title) {_INDEXED_ROW};
+    END
+    """,
+    """
+    CREATE TRIGGER log_search_delete AFTER DELETE ON practice_log BEGIN
+        DELETE FROM log_search WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER log_search_update AFTER UPDATE OF user_id, notes, piece_id ON practice_log BEGIN
+        DELETE FROM log_search WHERE rowid = old.id;
+        INSERT INTO log_search (rowid, owner, notes, title) {_INDEXED_ROW};
+    END
+    """,
+    """
+    CREATE TRIGGER log_search_piece_title AFTER UPDATE OF title ON piece BEGIN
+        UPDATE log_search SET title = new.title
+        WHERE rowid IN (SELECT id FROM practice_log WHERE piece_id = new.id);
+    END
+    """,
+    # Index the logs written before the table existed
+    """
+    INSERT INTO log_search (rowid, owner, notes, title)
+    SELECT practice_log.id, 'u' || practice_log.user_id, practice_log.notes, piece.title
+    FROM practice_log LEFT JOIN piece ON piece.id = practice_log.piece_id
+    WHERE practice_log.notes IS NOT NULL OR practice_log.piece_id IS NOT NULL
+    """,
+]
+
+# Quoted phrases or single words of the typed text
+_TOKENS = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def _create_log_search(metadata, connection, **kw):
+    """After-create listener adding the search table and its triggers once."""
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'log_search'"
+    ).first()
+    if exists:
+        return
+    for statement in _DDL:
+        connection.exec_driver_sql(statement)
+
+
+def _drop_log_search(metadata, connection, **kw):
+    """Before-drop listener removing the search table (triggers go with their tables)."""
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS log_search")
+
+
+def build_match(user_id, query):
+    """
+    Turn typed text into an FTS5 query over one user's logs.
+
+    Every word or "quoted phrase" must appear (in any order); the last bare
+    word also matches as a prefix, so results follow the typing. FTS5
+    operators in the text are treated as plain words.
+
+    Args:
+        user_id (int): Owner of the logs
+        query (str): Text typed by the user
+
+    Returns:
+        str: FTS5 query, or None if the text has no searchable words
+    """
+    terms = []
+    for phrase, word in _TOKENS.findall(query or ""):
+        term = phrase or word
+        if re.search(r"\w", term):  # punctuation alone matches nothing
+            terms.append((term, bool(word)))
+    if not terms:
+        return None
+
+    quoted = ['"' + term.replace('"', '""') + '"' for term, _ in terms]
+    if terms[-1][1]:
+        quoted[-1] += "*"  # the word being typed matches as a prefix
+    return f"owner:u{int(user_id)} AND {{notes title}}: ({' AND '.join(quoted)})"
+
+
+def _snippet_html(snippet):
+    """Escape a snippet and turn its match markers into <mark> tags."""
+    if not snippet:
+        return None
+    return html.escape(snippet).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+def search_logs(user_id, query, page=1, per_page=20):
+    """
+    One page of a user's logs whose notes or piece title match a query.
+
+    Args:
+        user_id (int): Owner of the logs
+        query (str): Text typed by the user (see build_match)
+        page (int): 1-based page number
+        per_page (int): Results per page
+
+    Returns:
+        tuple: (list of (PracticeLog, snippet HTML or None) best match first,
+            total number of matches)
+    """
+    match = build_match(user_id, query)
+    if match is None:
+        return [], 0
+
+    total = db.session.execute(
+        text("SELECT count(*) FROM log_search WHERE log_search MATCH :match"), {"match": match}
+    ).scalar()
+    if not total:
+        return [], 0
+
+    hits = db.session.execute(
+        text(
+            "SELECT rowid, snippet(log_search, 1, :open, :close, '…', :words) "
+            "FROM log_search WHERE log_search MATCH :match "
+            "ORDER BY bm25(log_search, 0.0, :notes_weight, :title_weight), rowid DESC "
+            "LIMIT :limit OFFSET :offset"
+        ),
+        {
+            "match": match, "open": _OPEN, "close": _CLOSE, "words": SNIPPET_WORDS,
+            "notes_weight": NOTES_WEIGHT, "title_weight": TITLE_WEIGHT,
+            "limit": per_page, "offset": (page - 1) * per_page,
+        },
+    ).all()
+    logs = {
+        log.id: log
+        for log in PracticeLog.query.options(joinedload(PracticeLog.piece))
+        .filter(PracticeLog.id.in_([log_id for log_id, _ in hits]))
+    }
+    return [(logs[log_id], _snippet_html(snippet)) for log_id, snippet in hits if log_id in logs], total
+
+
+def install_log_search():
+    """Create the search table and its triggers with the schema (idempotent)."""
+    if not event.contains(db.metadata, "after_create", _create_log_search):
+        event.listen(db.metadata, "after_create", _create_log_search)
+        event.listen(db.metadata, "before_drop", _drop_log_search)
@@ -0,0 +1,128 @@
+"""
+Log Delta Sync for Practice Tracker
+
+The log page keeps a copy of the user's practice logs in the browser
+(static/js/state/logs.js) and asks GET /api/logs/changes?since=<version>
+for what changed after the data version its copy reflects. Every write
+bumps the user's data_version (app/utils/changes.py); this module stamps
+each written log with the new version and leaves a tombstone for each
+deleted log, so a delta is two indexed range reads however long the
+history is.
+
+Key Functions:
+- install_log_sync: stamp written logs and record deletes on every flush
+- get_log_changes: logs written and deleted after a version
+"""
+
+from sqlalchemy import bindparam, inspect, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import joinedload
+
+from app.models import LogTombstone, PracticeLog, User, db
+from app.utils.changes import get_data_version, on_version_bump
+from app.utils.formatting import serialize_logs
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def _user_version(user_id_column):
+    """Correlated subquery reading the (already bumped) version of a row's user."""
+    return select(User.data_version).where(User.id == user_id_column).scalar_subquery()
+
+
+def _stamp_changes(session, user_ids):
+    """Version-bump handler stamping written logs and tombstoning deleted ones."""
+    connection = session.connection()
+    table = PracticeLog.__table__
+
+    written = [
+        obj for obj in (*session.new, *session.dirty)
+        if isinstance(obj, PracticeLog) and (obj in session.new or session.is_modified(obj))
+    ]
+    # Local dates of every log move with the timezone, so all of them changed
+    retimed = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, User) and inspect(obj).attrs.timezone.history.has_changes()
+    ]
+    conditions = []
+    if written:
+        conditions.append(table.c.id.in_([obj.id for obj in written]))
+    if retimed:
+        conditions.append(table.c.user_id.in_(retimed))
+    if conditions:
+        connection.execute(
+            update(table)
+            .where(or_(*conditions))
+            # Keep updated_at: stamping is not a modification of the log
+            .values(change_version=_user_version(table.c.user_id), updated_at=table.c.updated_at)
+        )
+        for obj in written:
+            if obj not in session.new:  # Pending objects are not expirable yet
+                session.expire(obj, ["change_version"])
+
+    deleted = [
+        {"owner": obj.user_id, "number": obj.user_log_number}
+        for obj in session.deleted
+        if isinstance(obj, PracticeLog)
+    ]
+    if deleted:
+        tombstones = LogTombstone.__table__
+        stmt = _UPSERTS[connection.dialect.name](tombstones).values(
+            user_id=bindparam("owner"),
+            user_log_number=bindparam("number"),
+            change_version=_user_version(bindparam("owner")),
+        )
+        # A reused log number may be deleted again; keep the latest delete
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[tombstones.c.user_id, tombstones.c.user_log_number],
+            set_={"change_version": stmt.excluded.change_version},
+        )
+        connection.execute(stmt, deleted)
+
+
+def get_log_changes(user_id, since, tz_name):
+    """
+    Logs written and deleted after a data version.
+
+    A client without a copy (since 0) or with a version from the future
+    (e.g. after the database was restored) gets every log and must replace
+    its copy. Log numbers can be reused after a delete, so clients apply
+    the deletes before the logs.
+
+    Args:
+        user_id (int): User whose logs to read
+        since (int): Data version the client's copy reflects
+        tz_name (str): User timezone for serialization
+
+    Returns:
+        dict: {"version", "full", "logs", "deleted"} where logs are
+        serialized logs (newest first) and deleted are log numbers
+    """
+    version = get_data_version(user_id)
+    full = since <= 0 or since > version
+
+    query = (
+        PracticeLog.query.filter_by(user_id=user_id)
+        .options(joinedload(PracticeLog.piece))
+        .order_by(PracticeLog.utc_timestamp.desc())
+    )
+    deleted = []
+    if not full:
+        query = query.filter(PracticeLog.change_version > since)
+        deleted = db.session.execute(
+            select(LogTombstone.user_log_number)
+            .where(LogTombstone.user_id == user_id, LogTombstone.change_version > since)
+        ).scalars().all()
+
+    return {
+        "version": version,
+        "full": full,
+        "logs": serialize_logs(query.all(), timezone=tz_name),
+        "deleted": deleted,
+    }
+
+
+def install_log_sync():
+    """Stamp change versions and record tombstones on every write (idempotent)."""
+    on_version_bump(_stamp_changes)
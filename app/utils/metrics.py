@@ -0,0 +1,355 @@
+"""
+Request and SQL Instrumentation for Practice Tracker
+
+This module records per-endpoint request latency, SQL query counts and SQL
+time, and renders them in the Prometheus text exposition format. Request
+timing is collected through Flask request hooks, and SQL timing through
+SQLAlchemy cursor execution events, so no route needs to be changed to be
+measured.
+
+Key Components:
+- MetricsRegistry: thread-safe store of latency histograms and SQL counters
+- init_metrics: installs the request hooks and SQL listeners on an app
+- capture_queries: context manager that records every statement executed
+  on the current thread (used by tests and ad-hoc profiling)
+- query_budget: route decorator declaring the maximum SQL statements a
+  request may execute, independent of how much data the user has
+
+Configuration:
+- METRICS_ENABLED: expose the registry at /metrics (off by default)
+- SERVER_TIMING_ENABLED: add a Server-Timing header to every response
+- SLOW_QUERY_MS: threshold for the slow-query log (see slow_queries.py)
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.slow_queries import SlowQueryLog
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Per-thread list of active query collectors (see capture_queries)
+_local = threading.local()
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of per-endpoint request and SQL metrics.
+
+    Each (endpoint, method) pair gets a cumulative latency histogram plus
+    counters for SQL statements and SQL time. Response status codes are
+    counted separately so error rates can be derived per endpoint.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._latency = {}    # (endpoint, method) -> [bucket counts..., +Inf]
+        self._sums = {}       # (endpoint, method) -> total seconds
+        self._sql = {}        # endpoint -> [query count, sql seconds]
+        self._statuses = {}   # (endpoint, method, status) -> request count
+        self._over_budget = {}  # endpoint -> requests that exceeded their query budget
+        self._coalesced = {}  # (endpoint, outcome) -> coalesced requests (see singleflight.py)
+        self._cache = {}      # (cache, result) -> computed-stats cache lookups (see cache.py)
+
+    def observe_request(self, endpoint, method, status, duration, sql_count=0, sql_time=0.0):
+        """
+        Record one finished request.
+
+        Args:
+            endpoint: Flask endpoint name (e.g. "logs.get_logs")
+            method: HTTP method of the request
+            status: HTTP status code of the response
+            duration: Wall-clock request time in seconds
+            sql_count: Number of SQL statements executed during the request
+            sql_time: Total seconds spent executing those statements
+        """
+        key = (endpoint, method)
+        with self._lock:
+            counts = self._latency.setdefault(key, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    counts[i] += 1
+            counts[-1] += 1  # +Inf bucket doubles as the request count
+            self._sums[key] = self._sums.get(key, 0.0) + duration
+
+            sql = self._sql.setdefault(endpoint, [0, 0.0])
+            sql[0] += sql_count
+            sql[1] += sql_time
+
+            status_key = (endpoint, method, status)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def observe_budget_exceeded(self, endpoint):
+        """
+        Count a request that executed more SQL statements than its budget.
+
+        Args:
+            endpoint: Flask endpoint name of the offending request
+        """
+        with self._lock:
+            self._over_budget[endpoint] = self._over_budget.get(endpoint, 0) + 1
+
+    def observe_coalesced(self, endpoint, outcome):
+        """
+        Count a request served through request coalescing.
+
+        Args:
+            endpoint: Flask endpoint name of the request
+            outcome: "leader", "shared", "timeout" or "leader_failed"
+        """
+        key = (endpoint, outcome)
+        with self._lock:
+            self._coalesced[key] = self._coalesced.get(key, 0) + 1
+
+    def observe_cache(self, cache, result):
+        """
+        Count one lookup in a computed-stats cache.
+
+        Args:
+            cache: Cache name (e.g. "dashboard")
+            result: "hit", "miss" or "error"
+        """
+        key = (cache, result)
+        with self._lock:
+            self._cache[key] = self._cache.get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        """
+        Return a point-in-time copy of all recorded metrics.
+
+        Returns:
+            dict: latency histograms, latency sums, SQL counters, status counts,
+                over-budget and coalesced request counts, cache lookups
+        """
+        with self._lock:
+            return {
+                "latency": {k: list(v) for k, v in self._latency.items()},
+                "sums": dict(self._sums),
+                "sql": {k: list(v) for k, v in self._sql.items()},
+                "statuses": dict(self._statuses),
+                "over_budget": dict(self._over_budget),
+                "coalesced": dict(self._coalesced),
+                "cache": dict(self._cache),
+            }
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text suitable for a /metrics scrape
+        """
+        snap = self.snapshot()
+        lines = [
+            "# HELP subwoofer_request_duration_seconds Request latency by endpoint.",
+            "# TYPE subwoofer_request_duration_seconds histogram",
+        ]
+        for (endpoint, method), counts in sorted(snap["latency"].items()):
+            labels = f'endpoint="{endpoint}",method="{method}"'
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'subwoofer_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'subwoofer_request_duration_seconds_bucket{{{labels},le="+Inf"}} {counts[-1]}')
+            lines.append(f"subwoofer_request_duration_seconds_sum{{{labels}}} {snap['sums'][(endpoint, method)]:.6f}")
+            lines.append(f"subwoofer_request_duration_seconds_count{{{labels}}} {counts[-1]}")
+
+        lines += [
+            "# HELP subwoofer_requests_total Finished requests by endpoint and status.",
+            "# TYPE subwoofer_requests_total counter",
+        ]
+        for (endpoint, method, status), count in sorted(snap["statuses"].items()):
+            lines.append(
+                f'subwoofer_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}'
+            )
+
+        lines += [
+            "# HELP subwoofer_sql_queries_total SQL statements executed by endpoint.",
+            "# TYPE subwoofer_sql_queries_total counter",
+        ]
+        for endpoint, (count, _) in sorted(snap["sql"].items()):
+            lines.append(f'subwoofer_sql_queries_total{{endpoint="{endpoint}"}} {count}')
+
+        lines += [
+            "# HELP subwoofer_sql_seconds_total Time spent executing SQL by endpoint.",
+            "# TYPE subwoofer_sql_seconds_total counter",
+        ]
+        for endpoint, (_, seconds) in sorted(snap["sql"].items()):
+            lines.append(f'subwoofer_sql_seconds_total{{endpoint="{endpoint}"}} {seconds:.6f}')
+
+        lines += [
+            "# HELP subwoofer_query_budget_exceeded_total Requests over their declared query budget.",
+            "# TYPE subwoofer_query_budget_exceeded_total counter",
+        ]
+        for endpoint, count in sorted(snap["over_budget"].items()):
+            lines.append(f'subwoofer_query_budget_exceeded_total{{endpoint="{endpoint}"}} {count}')
+
+        lines += [
+            "# HELP subwoofer_coalesced_requests_total Coalesced requests by endpoint and outcome.",
+            "# TYPE subwoofer_coalesced_requests_total counter",
+        ]
+        for (endpoint, outcome), count in sorted(snap["coalesced"].items()):
+            lines.append(f'subwoofer_coalesced_requests_total{{endpoint="{endpoint}",outcome="{outcome}"}} {count}')
+
+        lines += [
+            "# HELP subwoofer_cache_requests_total Computed-stats cache lookups by cache and result.",
+            "# TYPE subwoofer_cache_requests_total counter",
+        ]
+        for (cache, result), count in sorted(snap["cache"].items()):
+            lines.append(f'subwoofer_cache_requests_total{{cache="{cache}",result="{result}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Remember when a statement started executing on this connection."""
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Attribute a finished statement to the current request and collectors."""
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    # Attribute to the current request (if any) for per-endpoint counters
+    endpoint = None
+    if has_request_context():
+        endpoint = request.endpoint
+        if "sql_count" in g:
+            g.sql_count += 1
+            g.sql_time += elapsed
+
+    # Hand slow statements to the application's slow-query log
+    if has_app_context():
+        slow_log = current_app.extensions.get("slow_queries")
+        if slow_log is not None:
+            slow_log.observe(conn, statement, parameters, elapsed, executemany, endpoint)
+
+    # Feed any active capture_queries() blocks on this thread
+    for collector in getattr(_local, "collectors", ()):
+        collector.append((statement, elapsed))
+
+
+def install_sql_listeners():
+    """
+    Attach the SQL timing listeners to every SQLAlchemy engine.
+
+    Listeners are registered on the Engine class once per process, so calling
+    this for every application instance does not double-count statements.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def capture_queries():
+    """
+    Record every SQL statement executed on the current thread.
+
+    Yields:
+        list: (statement, seconds) tuples, appended to as statements finish
+
+    Example:
+        with capture_queries() as queries:
+            client.get("/api/logs")
+        assert len(queries) <= 3
+    """
+    install_sql_listeners()
+    queries = []
+    collectors = getattr(_local, "collectors", None)
+    if collectors is None:
+        collectors = _local.collectors = []
+    collectors.append(queries)
+    try:
+        yield queries
+    finally:
+        collectors.remove(queries)
+
+
+def query_budget(max_queries: int):
+    """
+    Declare the maximum number of SQL statements a route may execute.
+
+    The budget must hold no matter how many logs or pieces the user has, so
+    any per-row query (an N+1 pattern) breaks it. Budgets are enforced by the
+    test suite (tests/test_query_budgets.py); at runtime a request over its
+    budget is logged and counted in subwoofer_query_budget_exceeded_total.
+
+    Place the decorator directly below the route decorator so the budget is
+    attached to the registered view function.
+
+    Args:
+        max_queries: Maximum statements per request, including the user lookup
+
+    Example:
+        @logs_bp.route("/api/logs", methods=["GET"])
+        @query_budget(2)
+        @login_required
+        def get_logs():
+            ...
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def init_metrics(app):
+    """
+    Install request timing hooks and SQL listeners on the application.
+
+    Args:
+        app (Flask): Application to instrument
+    """
+    registry = MetricsRegistry()
+    app.extensions["metrics"] = registry
+    app.extensions["slow_queries"] = SlowQueryLog(app.config.get("SLOW_QUERY_MS"))
+    install_sql_listeners()
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start_time = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.get("request_start_time")
+        if start is None:
+            return response
+        duration = time.perf_counter() - start
+
+        endpoint = request.endpoint or "unmatched"
+        registry.observe_request(
+            endpoint,
+            request.method,
+            response.status_code,
+            duration,
+            g.sql_count,
+            g.sql_time,
+        )
+
+        # Flag requests that broke their declared query budget
+        view = app.view_functions.get(request.endpoint)
+        budget = getattr(view, "query_budget", None)
+        if budget is not None and g.sql_count > budget:
+            registry.observe_budget_exceeded(endpoint)
+            logger.warning("%s ran %d queries (budget %d)", endpoint, g.sql_count, budget)
+
+        if app.config.get("SERVER_TIMING_ENABLED"):
+            response.headers["Server-Timing"] = (
+                f"app;dur={duration * 1000:.2f}, "
+                f'db;dur={g.sql_time * 1000:.2f};desc="{g.sql_count} queries"'
+            )
+        return response
@@ -0,0 +1,145 @@
+"""
+Piece Practice Totals for Practice Tracker
+
+Piece.log_time is a denormalized total of the minutes logged against a
+piece, so /api/pieces can read it without summing logs. New logs are
+counted when their piece is resolved (get_or_create_piece), which also moves
+Piece.last_practiced forward. This module keeps both correct when logs
+change afterwards:
+
+- Edits and deletes of practice logs apply the minute deltas to the old and
+  new piece in the same transaction.
+- The same pieces get last_practiced recomputed from their remaining logs
+  (served by the (user_id, piece_id) log index), in the same UPDATE as the
+  deltas: one statement per flush.
+- reconcile_piece_totals recomputes every total with one grouped query,
+  reports the pieces that drifted (e.g. after bulk imports that bypass the
+  ORM) and fixes them. It runs as `flask pieces reconcile`.
+
+Key Functions:
+- init_piece_totals: maintain totals and last_practiced on log edits/deletes, register the CLI
+- reconcile_piece_totals: find and repair drifted totals in one pass
+"""
+
+from collections import defaultdict
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import Boolean, bindparam, case, func, select, update
+
+from app.models import Piece, PracticeLog, db
+from app.utils.changes import on_log_change
+
+
+def _apply_piece_deltas(session, changes):
+    """After-flush handler moving minutes between pieces for edited/deleted logs."""
+    deltas = defaultdict(int)
+    moved = set()  # pieces whose latest log may have changed
+    for change in changes:
+        if change.old is None:
+            continue  # Inserts were counted by get_or_create_piece
+        if change.old.piece_id is not None:
+            deltas[change.old.piece_id] -= change.old.duration
+        if change.new is not None and change.new.piece_id is not None:
+            deltas[change.new.piece_id] += change.new.duration
+        if change.new is None or (change.new.piece_id, change.new.utc_timestamp) != (
+            change.old.piece_id, change.old.utc_timestamp
+        ):
+            moved.add(change.old.piece_id)
+            if change.new is not None:
+                moved.add(change.new.piece_id)
+    moved.discard(None)
+
+    touched = {piece_id for piece_id, delta in deltas.items() if delta} | moved
+    if not touched:
+        return
+
+    # One statement for both: deltas, and for moved pieces the latest
+    # remaining log (the deleted/moved log may have been the latest)
+    table, logs = Piece.__table__, PracticeLog.__table__
+    latest = (
+        select(func.max(logs.c.utc_timestamp))
+        .where(logs.c.user_id == table.c.user_id, logs.c.piece_id == table.c.id)
+        .scalar_subquery()
+    )
+    session.connection().execute(
+        update(table)
+        .where(table.c.id == bindparam("piece_id"))
+        .values(
+            log_time=table.c.log_time + bindparam("delta"),
+            last_practiced=case((bindparam("moved", type_=Boolean), latest), else_=table.c.last_practiced),
+        ),
+        [{"piece_id": piece_id, "delta": deltas[piece_id], "moved": piece_id in moved} for piece_id in touched],
+    )
+
+    # Loaded pieces must not keep the old values
+    for piece_id in touched:
+        piece = session.identity_map.get(session.identity_key(Piece, piece_id))
+        if piece is not None:
+            session.expire(piece, ["log_time", "last_practiced"])
+
+
+def reconcile_piece_totals(user_id=None, fix=True):
+    """
+    Compare every piece's log_time with the sum of its logs.
+
+    One grouped query over piece LEFT JOIN practice_log finds the drifted
+    pieces; with fix set they are corrected in one UPDATE and committed.
+
+    Args:
+        user_id (int): Only check this user's pieces (default: all users)
+        fix (bool): Write the recomputed totals
+
+    Returns:
+        list: {"piece_id", "user_id", "stored", "actual"} for each drifted piece
+    """
+    actual = func.coalesce(func.sum(PracticeLog.duration), 0)
+    query = (
+        select(Piece.id, Piece.user_id, Piece.log_time, actual)
+        .outerjoin(PracticeLog, PracticeLog.piece_id == Piece.id)
+        .group_by(Piece.id, Piece.user_id, Piece.log_time)
+        .having(Piece.log_time != actual)
+    )
+    if user_id is not None:
+        query = query.where(Piece.user_id == user_id)
+
+    drift = [
+        {"piece_id": piece_id, "user_id": owner, "stored": stored, "actual": total}
+        for piece_id, owner, stored, total in db.session.execute(query)
+    ]
+    if drift:
+        current_app.logger.warning("%d piece total(s) drifted from their logs", len(drift))
+        if fix:
+            table = Piece.__table__
+            db.session.execute(
+                update(table).where(table.c.id == bindparam("piece_id")).values(log_time=bindparam("actual")),
+                [{"piece_id": row["piece_id"], "actual": row["actual"]} for row in drift],
+            )
+            db.session.commit()
+    return drift
+
+
+pieces_cli = AppGroup("pieces", help="Piece maintenance commands.")
+
+
+@pieces_cli.command("reconcile")
+@click.option("--user-id", type=int, help="Only check this user's pieces.")
+@click.option("--dry-run", is_flag=True, help="Report drift without fixing it.")
+def reconcile_command(user_id, dry_run):
+    """Recompute piece totals from the logs and report drift."""
+    drift = reconcile_piece_totals(user_id=user_id, fix=not dry_run)
+    for row in drift:
+        click.echo(f"piece {row['piece_id']} (user {row['user_id']}): stored {row['stored']}, actual {row['actual']}")
+    click.echo(f"{len(drift)} drifted piece(s){'' if dry_run else ' fixed'}")
+
+
+def init_piece_totals(app):
+    """
+    Maintain piece totals on log edits and deletes.
+
+    Args:
+        app (Flask): Application to register the pieces CLI on
+    """
+    on_log_change(_apply_piece_deltas, after_flush=True)
+    app.cli.add_command(pieces_cli)
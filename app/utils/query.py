@@ -5,15 +5,15 @@ from app.utils.time import get_today_local
 from zoneinfo import ZoneInfo
 
 def get_logs() -> list:
-    """Get all PracticeLog entries for the current user."""
+    """Get all PracticeLog entries for the current user, in insertion order."""
     return PracticeLog.query.filter_by(
         user_id=current_user.id
-    ).all()
+    ).order_by(PracticeLog.id).all()
 
 
 def get_logs_from(user) -> list:
-    """Get all PracticeLog entries for a given user."""
-    return PracticeLog.query.filter_by(user_id=user.id).all()
+    """Get all PracticeLog entries for a given user, in insertion order."""
+    return PracticeLog.query.filter_by(user_id=user.id).order_by(PracticeLog.id).all()
 
 
 def get_last_log() -> PracticeLog | None:
@@ -0,0 +1,275 @@
+"""
+Daily Practice Rollups for Practice Tracker
+
+Maintains DailyTotal rows (minutes and sessions per user per local date) in
+the background. Every flush that writes practice logs enqueues a
+"rollup_daily_totals" job carrying the earliest affected UTC timestamp;
+the job rebuilds the user's rollups from that local date onward. Pending
+jobs for the same user are merged by keeping the earliest timestamp, so a
+burst of writes costs one rebuild.
+
+Each row also carries prefix sums (cumulative minutes, sessions and
+practiced days through its date). A rebuild continues them from the last
+row before the affected date, so rows before it are never touched, and any
+date-range total is the difference of two rows.
+
+Key Functions:
+- init_rollups: enqueue rollup jobs on log changes, register the CLI
+- rebuild_daily_totals: job handler rebuilding rollups from a date
+- enqueue_full_rebuild: rebuild a user's rollups from their first log
+- backfill_daily_totals: build every user's rollups (schema upgrades)
+- ensure_rollups_current: run the user's pending rollup job before a read
+- year_minutes: one local calendar year of daily minutes (heatmaps)
+- range_totals: minutes, sessions and practiced days between two dates
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from itertools import groupby
+from zoneinfo import ZoneInfo
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import delete, insert, select
+
+from app.models import DailyTotal, PracticeLog, User, db
+from app.utils.changes import on_log_change
+from app.utils.jobs import drain, enqueue, register_job, run_pending_for_user
+from app.utils.time import as_utc
+
+ROLLUP_JOB = "rollup_daily_totals"
+
+# "since" value that rebuilds a user's whole history
+BEGINNING = "1900-01-01T00:00:00+00:00"
+
+
+def _earliest_since(old, new):
+    """Merge two rollup payloads by keeping the earliest start."""
+    return {"since": min(old["since"], new["since"], key=datetime.fromisoformat)}
+
+
+def local_day_start_utc(local_date, tz_name):
+    """Naive UTC datetime of local midnight starting local_date."""
+    start = datetime.combine(local_date, time.min, tzinfo=ZoneInfo(tz_name))
+    return start.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@register_job(ROLLUP_JOB, merge=_earliest_since)
+def rebuild_daily_totals(user_id, payload):
+    """
+    Rebuild a user's DailyTotal rows from the local date of payload["since"].
+
+    Args:
+        user_id (int): User whose rollups are rebuilt
+        payload (dict): {"since": ISO UTC timestamp of the earliest change}
+    """
+    tz_name = db.session.execute(select(User.timezone).where(User.id == user_id)).scalar()
+    if tz_name is None:
+        return  # User was deleted
+    tz = ZoneInfo(tz_name)
+    from_date = as_utc(datetime.fromisoformat(payload["since"])).astimezone(tz).date()
+
+    rows = db.session.execute(
+        select(PracticeLog.utc_timestamp, PracticeLog.duration)
+        .where(
+            PracticeLog.user_id == user_id,
+            PracticeLog.utc_timestamp >= local_day_start_utc(from_date, tz_name),
+        )
+    ).all()
+
+    db.session.execute(
+        delete(DailyTotal).where(DailyTotal.user_id == user_id, DailyTotal.local_date >= from_date)
+    )
+    if rows:
+        # Continue the prefix sums from the last row before the rebuilt range
+        prefix = _prefix_before(user_id, from_date)
+        db.session.execute(insert(DailyTotal), _rollup_rows(user_id, tz, rows, prefix))
+
+
+def _rollup_rows(user_id, tz, logs, prefix=(0, 0, 0)):
+    """
+    DailyTotal rows of a user's logs, with prefix sums continued from prefix.
+
+    Args:
+        user_id (int): Owner of the logs
+        tz (ZoneInfo): User timezone (defines the local dates)
+        logs: (utc_timestamp, duration) pairs
+        prefix (tuple): (cum_minutes, cum_sessions, cum_days) before the first date
+
+    Returns:
+        list: Row dicts in date order
+    """
+    totals = defaultdict(lambda: [0, 0])
+    for utc_timestamp, duration in logs:
+        day = as_utc(utc_timestamp).astimezone(tz).date()
+        totals[day][0] += duration
+        totals[day][1] += 1
+
+    cum_minutes, cum_sessions, cum_days = prefix
+    rows = []
+    for day in sorted(totals):
+        minutes, sessions = totals[day]
+        cum_minutes += minutes
+        cum_sessions += sessions
+        cum_days += 1
+        rows.append({
+            "user_id": user_id, "local_date": day, "minutes": minutes, "sessions": sessions,
+            "cum_minutes": cum_minutes, "cum_sessions": cum_sessions, "cum_days": cum_days,
+        })
+    return rows
+
+
+def backfill_daily_totals(connection):
+    """
+    Build the rollups of every user from all their logs (databases whose
+    logs predate the daily_total table).
+
+    Args:
+        connection: Connection to read logs and write rollups on
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    logs = connection.execute(
+        select(PracticeLog.user_id, User.timezone, PracticeLog.utc_timestamp, PracticeLog.duration)
+        .join(User, User.id == PracticeLog.user_id)
+        .order_by(PracticeLog.user_id)
+    )
+    written = 0
+    for user_id, user_logs in groupby(logs, key=lambda row: row.user_id):
+        user_logs = list(user_logs)
+        rows = _rollup_rows(
+            user_id, ZoneInfo(user_logs[0].timezone),
+            [(log.utc_timestamp, log.duration) for log in user_logs],
+        )
+        connection.execute(insert(DailyTotal), rows)
+        written += len(rows)
+    return written
+
+
+def _prefix_before(user_id, day):
+    """(cum_minutes, cum_sessions, cum_days) of the last row before day."""
+    row = db.session.execute(
+        select(DailyTotal.cum_minutes, DailyTotal.cum_sessions, DailyTotal.cum_days)
+        .where(DailyTotal.user_id == user_id, DailyTotal.local_date < day)
+        .order_by(DailyTotal.local_date.desc())
+        .limit(1)
+    ).first()
+    return tuple(row) if row else (0, 0, 0)
+
+
+def _enqueue_rollups(session, changes):
+    """Enqueue one rollup job per user touched by the flush."""
+    earliest = {}
+    for change in changes:
+        for values in (change.old, change.new):
+            if values is not None and values.utc_timestamp is not None:
+                since = earliest.get(change.user_id)
+                earliest[change.user_id] = min(since, values.utc_timestamp) if since else values.utc_timestamp
+    for user_id, since in earliest.items():
+        enqueue(ROLLUP_JOB, user_id, {"since": since.isoformat()}, session=session)
+
+
+def enqueue_full_rebuild(user_id, session=None):
+    """
+    Enqueue a rebuild of all of a user's rollups (e.g. after bulk imports
+    that bypass the ORM, or for users whose logs predate rollups).
+
+    Args:
+        user_id (int): User whose rollups are rebuilt
+        session: Session to enqueue in (defaults to db.session)
+    """
+    enqueue(ROLLUP_JOB, user_id, {"since": BEGINNING}, session=session)
+
+
+rollups_cli = AppGroup("rollups", help="Daily rollup maintenance commands.")
+
+
+@rollups_cli.command("rebuild")
+@click.option("--user-id", type=int, help="Only rebuild this user.")
+@click.option("--now", is_flag=True, help="Run the jobs immediately instead of leaving them to workers.")
+def rebuild_command(user_id, now):
+    """Enqueue full rollup rebuilds for one or all users."""
+    user_ids = [user_id] if user_id else db.session.execute(select(User.id)).scalars().all()
+    for uid in user_ids:
+        enqueue_full_rebuild(uid)
+    db.session.commit()
+    click.echo(f"enqueued {len(user_ids)} rollup rebuild(s)")
+    if now:
+        click.echo(f"ran {drain()} job(s)")
+
+
+def init_rollups(app):
+    """
+    Maintain daily rollups in the background on every log write.
+
+    Args:
+        app (Flask): Application to register the rollups CLI on
+    """
+    on_log_change(_enqueue_rollups)
+    app.cli.add_command(rollups_cli)
+
+
+def ensure_rollups_current(user_id):
+    """
+    Run the user's pending rollup job, if any, so reads see their own writes.
+
+    Args:
+        user_id (int): User about to read rollups
+    """
+    run_pending_for_user(ROLLUP_JOB, user_id)
+
+
+def year_minutes(user_id, year):
+    """
+    Minutes practiced on every local day of a calendar year.
+
+    Reads one primary-key range of DailyTotal rows (at most 366), so the
+    cost does not depend on how many logs the user has.
+
+    Args:
+        user_id (int): User whose rollups are read
+        year (int): Calendar year in the user's timezone
+
+    Returns:
+        list: Minutes per day from Jan 1, 365 or 366 entries
+    """
+    first, last = date(year, 1, 1), date(year, 12, 31)
+    # Counted within the year so year 9999 never builds date(10000, ...)
+    minutes = [0] * ((last - first).days + 1)
+    rows = db.session.execute(
+        select(DailyTotal.local_date, DailyTotal.minutes).where(
+            DailyTotal.user_id == user_id,
+            DailyTotal.local_date >= first,
+            DailyTotal.local_date <= last,
+        )
+    ).all()
+    for local_date, mins in rows:
+        minutes[(local_date - first).days] = mins
+    return minutes
+
+
+def range_totals(user_id, start, end):
+    """
+    Practice totals over local dates start..end (inclusive).
+
+    Two primary-key lookups (the last rollup row on or before end, and the
+    last one before start) and a subtraction, whatever the range length.
+
+    Args:
+        user_id (int): User whose rollups are read
+        start (date): First local date
+        end (date): Last local date
+
+    Returns:
+        dict: minutes, sessions and days_practiced in the range
+    """
+    through_end = db.session.execute(
+        select(DailyTotal.cum_minutes, DailyTotal.cum_sessions, DailyTotal.cum_days)
+        .where(DailyTotal.user_id == user_id, DailyTotal.local_date <= end)
+        .order_by(DailyTotal.local_date.desc())
+        .limit(1)
+    ).first() or (0, 0, 0)
+    before_start = _prefix_before(user_id, start)
+    minutes, sessions, days = (a - b for a, b in zip(through_end, before_start))
+    return {"minutes": minutes, "sessions": sessions, "days_practiced": days}
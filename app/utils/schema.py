@@ -0,0 +1,205 @@
+"""
+Schema Version Management for Practice Tracker
+
+This module replaces the unconditional db.create_all() that used to run on
+every worker boot. The schema version of the models (SCHEMA_VERSION in
+app.models) is stored in the SQLite database header via PRAGMA user_version,
+so a warm boot costs a single PRAGMA read. Tables, indexes and columns
+added to existing tables are only created when the stored version differs
+from the models. New columns on existing tables must be nullable or have a
+server_default so SQLite can add them with ALTER TABLE. Columns whose
+values are derived from existing rows are filled in once, right after they
+are added (COLUMN_BACKFILLS), and so are derived tables created for existing
+data (TABLE_BACKFILLS). Tables the ORM does not model, such as the
+full-text search table, hook into create_all (see app/utils/log_search.py).
+
+Key Functions:
+- ensure_schema: create missing tables/columns/indexes when the stored version is stale,
+  in one locked transaction so concurrent workers upgrade once
+- add_missing_columns: ALTER TABLE ADD COLUMN for columns new to a table
+- COLUMN_BACKFILLS: one-time fills for derived columns added to old tables
+- TABLE_BACKFILLS: one-time fills for derived tables added to old databases
+- get_stored_version / set_stored_version: read and write PRAGMA user_version
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+
+from app.models import SCHEMA_VERSION, db
+from app.utils.leaderboard import backfill_leaderboard_scores
+from app.utils.rollups import backfill_daily_totals
+from app.utils.suggest import backfill_piece_terms
+
+# Milliseconds a booting worker waits for another worker's upgrade
+UPGRADE_LOCK_TIMEOUT_MS = 120_000
+
+# SQL run once when a derived column is added to an existing table
+COLUMN_BACKFILLS = {
+    # Prefix sums of the daily rollups, per user in date order
+    "daily_total.cum_minutes": """
+        UPDATE daily_total SET
+            cum_minutes = running.cum_minutes,
+            cum_sessions = running.cum_sessions,
+            cum_days = running.cum_days
+        FROM (
+            SELECT user_id, local_date,
+                   SUM(minutes) OVER w AS cum_minutes,
+                   SUM(sessions) OVER w AS cum_sessions,
+                   COUNT(*) OVER w AS cum_days
+            FROM daily_total
+            WINDOW w AS (PARTITION BY user_id ORDER BY local_date)
+        ) AS running
+        WHERE running.user_id = daily_total.user_id
+          AND running.local_date = daily_total.local_date
+    """,
+    # Existing logs count as written at their owner's current version
+    "practice_log.change_version": """
+        UPDATE practice_log SET change_version = (
+            SELECT data_version FROM user WHERE user.id = practice_log.user_id
+        )
+    """,
+    # Latest log of each piece
+    "piece.last_practiced": """
+        UPDATE piece SET last_practiced = (
+            SELECT MAX(utc_timestamp) FROM practice_log
+            WHERE practice_log.user_id = piece.user_id AND practice_log.piece_id = piece.id
+        )
+    """,
+}
+
+# Functions (called with a connection) run once when a derived table is
+# created in a database that already has other tables
+TABLE_BACKFILLS = {
+    # Search terms of the pieces created before piece suggestions
+    "piece_term": backfill_piece_terms,
+    # Daily rollups (and their prefix sums) of the logs written before rollups
+    "daily_total": backfill_daily_totals,
+    # Leaderboard scores of the logs written before leaderboards
+    "leaderboard_score": backfill_leaderboard_scores,
+}
+
+
+def _read_version(conn) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def get_stored_version(engine) -> int:
+    """
+    Read the schema version recorded in a SQLite database.
+
+    Args:
+        engine: SQLAlchemy engine bound to the database
+
+    Returns:
+        int: Stored version (0 for a new or pre-versioning database)
+    """
+    with engine.connect() as conn:
+        return _read_version(conn)
+
+
+def set_stored_version(engine, version: int):
+    """
+    Record a schema version in a SQLite database.
+
+    Args:
+        engine: SQLAlchemy engine bound to the database
+        version: Version number to store
+    """
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+def add_missing_columns(conn) -> list:
+    """
+    Add model columns that are missing from existing tables.
+
+    create_all only creates whole tables, so columns added to a model after
+    its table exists are added here with ALTER TABLE ADD COLUMN.
+
+    Args:
+        conn: Connection to the database, inside the upgrade's transaction
+
+    Returns:
+        list: "table.column" names that were added
+    """
+    added = []
+    inspector = inspect(conn)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN {ddl}')
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def _upgrade(conn) -> bool:
+    """Bring the schema up to date on a connection holding the write lock."""
+    # Another worker may have upgraded while this one waited for the lock
+    if _read_version(conn) == SCHEMA_VERSION:
+        return False
+
+    existing = set(inspect(conn).get_table_names())
+    for column in add_missing_columns(conn):
+        if column in COLUMN_BACKFILLS:
+            conn.exec_driver_sql(COLUMN_BACKFILLS[column])
+    db.metadata.create_all(bind=conn)
+    if existing:
+        for table, backfill in TABLE_BACKFILLS.items():
+            if table not in existing:
+                backfill(conn)
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    conn.exec_driver_sql(f"PRAGMA user_version = {int(SCHEMA_VERSION)}")
+    return True
+
+
+def ensure_schema(app) -> bool:
+    """
+    Bring the database schema up to SCHEMA_VERSION if it is out of date.
+
+    On SQLite the stored version is compared first, so up-to-date databases
+    skip table reflection entirely. A stale database is upgraded in one
+    BEGIN IMMEDIATE transaction, and the version is read again once the
+    write lock is held: when several workers boot against an old database,
+    the first upgrades it and the others wait, then find it current. Other
+    databases fall back to create_all. Indexes added to existing tables are
+    created as well, since create_all only creates indexes for tables it
+    creates.
+
+    Args:
+        app (Flask): Application whose database should be checked
+
+    Returns:
+        bool: True if the schema was (re)created, False if it was current
+    """
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != "sqlite":
+            db.create_all()
+            return True
+
+        if get_stored_version(engine) == SCHEMA_VERSION:
+            return False
+
+        with engine.connect() as conn:
+            # Transactions are issued explicitly so DDL and backfills share one
+            conn.execution_options(isolation_level="AUTOCOMMIT")
+            busy_timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            conn.exec_driver_sql(f"PRAGMA busy_timeout = {UPGRADE_LOCK_TIMEOUT_MS}")
+            try:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                try:
+                    upgraded = _upgrade(conn)
+                except BaseException:
+                    conn.exec_driver_sql("ROLLBACK")
+                    raise
+                conn.exec_driver_sql("COMMIT")
+            finally:
+                conn.exec_driver_sql(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+        return upgraded
@@ -0,0 +1,148 @@
+"""
+Request Coalescing (Single-Flight) for Practice Tracker
+
+Several tabs opening the dashboard, or a client retrying, can make one
+worker compute the same expensive response for the same user several
+times at once. Views decorated with coalesce_requests share one
+computation between identical concurrent requests: the first (the leader)
+runs the view, and duplicates arriving while it runs wait for its response
+instead of computing their own.
+
+Requests are identical when they have the same user, endpoint, arguments
+and data version (app/utils/changes.py), so a request made after a log or
+piece write never receives a response computed before it. Followers wait at most
+SINGLEFLIGHT_TIMEOUT seconds; if the leader is slower, or fails, they run
+the view themselves, so a stuck leader cannot wedge them.
+
+Configuration:
+- SINGLEFLIGHT_TIMEOUT: Seconds a duplicate waits for the leader (0 disables coalescing)
+
+Key Components:
+- SingleFlight: thread-safe group of in-flight computations by key
+- coalesce_requests: view decorator sharing responses of identical requests
+"""
+
+import threading
+from functools import wraps
+
+from flask import current_app, g, request
+from flask_login import current_user
+
+from app.utils.changes import get_data_version
+
+# Response headers rebuilt by the response class itself
+_SKIPPED_HEADERS = {"content-length"}
+
+
+class _Call:
+    """One in-flight computation and the outcome its followers wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class SingleFlight:
+    """
+    Runs a function at most once at a time per key; concurrent callers with
+    the same key share the running call's result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call
+
+    def do(self, key, fn, timeout):
+        """
+        Return fn(), computed once for all concurrent callers with this key.
+
+        Args:
+            key: Hashable identity of the computation
+            fn: Function computing the result
+            timeout (float): Seconds a follower waits for the leader before
+                computing the result itself
+
+        Returns:
+            tuple: (result, outcome) where outcome is "leader" (computed
+            here), "shared" (the leader's result), "timeout" or
+            "leader_failed" (computed here after waiting)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result, "leader"
+            except BaseException:
+                call.failed = True
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if not call.done.wait(timeout):
+            return fn(), "timeout"
+        if call.failed:
+            return fn(), "leader_failed"
+        return call.result, "shared"
+
+    def in_flight(self):
+        """Number of computations currently running."""
+        with self._lock:
+            return len(self._calls)
+
+
+def _group():
+    """The app's SingleFlight group, created on first use."""
+    return current_app.extensions.setdefault("singleflight", SingleFlight())
+
+
+def coalesce_requests(view):
+    """
+    Share the response of a read-only view between identical concurrent
+    requests of the same user.
+
+    Place it below login_required. Only the status, headers and body of the
+    leader's response are shared; each follower gets its own response object.
+
+    Example:
+        @dash_bp.route("/api/dashboard/stats")
+        @query_budget(11)
+        @login_required
+        @coalesce_requests
+        def get_dashboard_stats():
+            ...
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        timeout = float(current_app.config.get("SINGLEFLIGHT_TIMEOUT", 10))
+        if timeout <= 0:
+            return view(*args, **kwargs)
+
+        # Kept on g so the view can reuse it instead of reading it again
+        g.data_version = get_data_version(current_user.id)
+        key = (
+            current_user.id,
+            request.endpoint,
+            tuple(sorted(kwargs.items())),
+            tuple(sorted(request.args.items(multi=True))),
+            g.data_version,
+        )
+
+        def render():
+            response = current_app.make_response(view(*args, **kwargs))
+            headers = [(name, value) for name, value in response.headers.items()
+                       if name.lower() not in _SKIPPED_HEADERS]
+            return response.status_code, headers, response.get_data()
+
+        (status, headers, body), outcome = _group().do(key, render, timeout)
+        current_app.extensions["metrics"].observe_coalesced(request.endpoint, outcome)
+        return current_app.response_class(body, status=status, headers=headers)
+
+    return wrapper
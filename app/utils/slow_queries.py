@@ -0,0 +1,216 @@
+"""
+Slow Query Log for Practice Tracker
+
+This module records SQL statements that take longer than a configurable
+threshold. Each slow statement is logged with the shape of its parameters
+(types and lengths, never the values, which include password hashes and
+users' notes), the route that issued it and the application function it
+came from (for example app/utils/query.py:get_logs_from). The first time
+a distinct statement is seen slow, its SQLite EXPLAIN QUERY PLAN output is
+captured so that full scans of practice_log are visible without
+reproducing the request.
+
+Key Components:
+- SlowQueryLog: per-application store of slow statements and their plans
+- find_caller: locate the application frame that issued a statement
+- describe_parameters: redacted description of bound parameters
+
+Configuration:
+- SLOW_QUERY_MS: threshold in milliseconds (None disables the log)
+"""
+
+import logging
+import os
+import re
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Root of the application package, used to pick application frames
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Instrumentation modules that should never be reported as the caller
+_SKIP_FILES = {
+    os.path.join(APP_ROOT, "utils", "metrics.py"),
+    os.path.join(APP_ROOT, "utils", "slow_queries.py"),
+}
+
+# Query plan details that indicate a full table scan of practice_log
+_PRACTICE_LOG_SCAN = re.compile(r"^SCAN (TABLE )?practice_log\b")
+
+
+def find_caller() -> str:
+    """
+    Find the innermost application function on the current call stack.
+
+    Returns:
+        str: "app/<path>.py:<function>" or "unknown" if no app frame is found
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(APP_ROOT) and filename not in _SKIP_FILES:
+            relative = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+            return f"{relative.replace(os.sep, '/')}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _describe_value(value):
+    """Type of a parameter value, with its length for strings and bytes."""
+    if value is None:
+        return "None"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def describe_parameters(parameters, executemany=False) -> str:
+    """
+    Describe bound parameters without their values.
+
+    Args:
+        parameters: Positional tuple, mapping, or a list of them for executemany
+        executemany: True for executemany() batches
+
+    Returns:
+        str: e.g. "(int, str[102])", "{'id': int}" or "3 x (int, str[5])"
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        if not parameters:
+            return "0 x ()"
+        return f"{len(parameters)} x {describe_parameters(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key!r}: {_describe_value(value)}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_describe_value(value) for value in parameters) + ")"
+    return _describe_value(parameters)
+
+
+class SlowQueryLog:
+    """
+    Thread-safe record of statements slower than a threshold.
+
+    Statements are keyed by their SQL text (parameters are bound separately
+    by SQLAlchemy, so the number of distinct statements stays small). At most
+    max_statements distinct statements are tracked.
+    """
+
+    def __init__(self, threshold_ms, max_statements=500):
+        self.threshold_ms = threshold_ms
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._entries = {}  # statement -> entry dict
+
+    def observe(self, conn, statement, parameters, elapsed, executemany=False, endpoint=None):
+        """
+        Record a finished statement if it exceeded the threshold.
+
+        Args:
+            conn: SQLAlchemy Connection the statement ran on
+            statement: SQL text
+            parameters: Bound parameters
+            elapsed: Execution time in seconds
+            executemany: True for executemany() batches (no plan captured)
+            endpoint: Flask endpoint that issued the statement, if any
+        """
+        if self.threshold_ms is None:
+            return
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        caller = find_caller()
+        with self._lock:
+            entry = self._entries.get(statement)
+            if entry is None:
+                if len(self._entries) >= self.max_statements:
+                    return
+                entry = self._entries[statement] = {
+                    "statement": statement,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "callers": set(),
+                    "endpoints": set(),
+                    "last_parameters": None,
+                    "plan": None,
+                    "scans_practice_log": False,
+                }
+                capture_plan = not executemany
+            else:
+                capture_plan = False
+
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["callers"].add(caller)
+            if endpoint:
+                entry["endpoints"].add(endpoint)
+            # Values are redacted: slow writes to user would expose password hashes
+            entry["last_parameters"] = described = describe_parameters(parameters, executemany)
+
+        logger.warning(
+            "Slow query (%.1f ms) in %s via %s: %s params=%s",
+            elapsed_ms, endpoint or "-", caller, statement, described,
+        )
+
+        # Capture the plan outside the lock, once per distinct statement
+        if capture_plan:
+            plan = self._explain(conn, statement, parameters)
+            scans = any(_PRACTICE_LOG_SCAN.match(line) for line in plan)
+            with self._lock:
+                entry["plan"] = plan
+                entry["scans_practice_log"] = scans
+            if scans:
+                logger.warning("Query plan scans practice_log: %s | %s", statement, " / ".join(plan))
+
+    def _explain(self, conn, statement, parameters) -> list:
+        """
+        Run EXPLAIN QUERY PLAN for a statement on its own DBAPI connection.
+
+        The plan is executed directly on the driver connection so that it does
+        not re-enter the SQLAlchemy cursor events that called us.
+
+        Returns:
+            list: Plan detail strings (empty if the plan could not be captured)
+        """
+        if conn.dialect.name != "sqlite":
+            return []
+        try:
+            cursor = conn.connection.driver_connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+                return [row[-1] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as exc:  # a plan is diagnostic only, never fail the query
+            logger.debug("Could not capture query plan: %s", exc)
+            return []
+
+    def summary(self) -> list:
+        """
+        Summarize recorded slow statements, slowest in total first.
+
+        Returns:
+            list: JSON-serializable dicts with counts, timings, callers and plan
+        """
+        with self._lock:
+            entries = [
+                {
+                    **entry,
+                    "total_ms": round(entry["total_ms"], 3),
+                    "max_ms": round(entry["max_ms"], 3),
+                    "callers": sorted(entry["callers"]),
+                    "endpoints": sorted(entry["endpoints"]),
+                    "plan": list(entry["plan"] or []),
+                }
+                for entry in self._entries.values()
+            ]
+        return sorted(entries, key=lambda e: e["total_ms"], reverse=True)
+
+    def reset(self):
+        """Forget all recorded statements."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,270 @@
+"""
+Incremental Practice Streaks for Practice Tracker
+
+A streak is a run of consecutive local calendar days (in the user's
+timezone) with at least one practice log. Rescanning every log on each
+dashboard view is O(history), so each user's Streak row keeps only:
+
+- the latest run (run_start..run_end), and
+- past_longest, the longest run that ended before it.
+
+That is enough to apply almost any change to a single day's presence in
+O(1): extending or starting the latest run, trimming either end, or
+splitting it in the middle (the older half becomes a past run). Only
+changes that touch days before the latest run, or remove the whole latest
+run while older runs exist, need the full history; those enqueue a
+"recompute_streak" job (app/utils/jobs.py), which reads run before
+serving streaks so users always see their own writes.
+
+Key Functions:
+- install_streaks: maintain streaks after every flush that writes logs
+- get_streaks: current and longest streak for the dashboard
+- streak_state_from_days / apply_day_change: pure streak arithmetic
+- recompute_streak: job handler rebuilding a user's state from all logs
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+
+from app.models import PracticeLog, Streak, User, db
+from app.utils.changes import on_log_change, user_timezone
+from app.utils.jobs import enqueue, register_job, run_pending_for_user
+from app.utils.time import as_utc, get_today_local
+
+RECOMPUTE_JOB = "recompute_streak"
+
+ONE_DAY = timedelta(days=1)
+
+# (run_start, run_end, past_longest) for a user without logs
+EMPTY = (None, None, 0)
+
+
+def _run_length(start, end):
+    return (end - start).days + 1
+
+
+def streak_state_from_days(days):
+    """
+    Build streak state from every local date that has practice.
+
+    Args:
+        days: Iterable of datetime.date
+
+    Returns:
+        tuple: (run_start, run_end, past_longest)
+    """
+    start = end = None
+    past_longest = 0
+    for day in sorted(set(days)):
+        if end is not None and day == end + ONE_DAY:
+            end = day
+            continue
+        if end is not None:
+            past_longest = max(past_longest, _run_length(start, end))
+        start = end = day
+    return (start, end, past_longest)
+
+
+def apply_day_change(state, day, present, present_days):
+    """
+    Update streak state after one day's presence may have changed.
+
+    Args:
+        state (tuple): (run_start, run_end, past_longest) before the change
+        day (date): Local date whose logs changed
+        present (bool): Whether the day has logs after the change
+        present_days (set): Days near `day` that have logs after the change
+            (must include day - 1)
+
+    Returns:
+        tuple: New state, or None if the full history is needed
+    """
+    start, end, past = state
+    if start is None:
+        # No logs before: a present day is the only run
+        return (day, day, past) if present else state
+
+    if present:
+        if start <= day <= end:
+            return state
+        if day == end + ONE_DAY:
+            return (start, day, past)
+        if day > end + ONE_DAY:
+            return (day, day, max(past, _run_length(start, end)))
+        if day == start - ONE_DAY and (day - ONE_DAY) not in present_days:
+            return (day, end, past)
+        return None  # Joins or changes an older run
+
+    if day > end:
+        return state  # Days after the latest run never had logs
+    if day < start:
+        return None   # An older run lost a day
+    if start == end:
+        # The latest run disappears; the previous run is only known if
+        # there is none
+        return EMPTY if past == 0 else None
+    if day == end:
+        return (start, end - ONE_DAY, past)
+    if day == start:
+        return (start + ONE_DAY, end, past)
+    # Split: the part before `day` becomes a past run
+    return (day + ONE_DAY, end, max(past, _run_length(start, day - ONE_DAY)))
+
+
+def summarize(state, today):
+    """
+    Current and longest streak from a state.
+
+    The current streak stays alive through today if the user practiced
+    yesterday, so it does not reset before they have had a chance to log.
+
+    Args:
+        state (tuple): (run_start, run_end, past_longest)
+        today (date): Today's local date
+
+    Returns:
+        dict: {"current": days, "longest": days}
+    """
+    start, end, past = state
+    if start is None:
+        return {"current": 0, "longest": past}
+    run = _run_length(start, end)
+    return {"current": run if end >= today - ONE_DAY else 0, "longest": max(past, run)}
+
+
+def _day_bounds_utc(first_day, last_day, tz):
+    """Naive UTC range covering local days first_day..last_day."""
+    lo = datetime.combine(first_day, time.min, tzinfo=tz)
+    hi = datetime.combine(last_day + ONE_DAY, time.min, tzinfo=tz)
+    return (
+        lo.astimezone(timezone.utc).replace(tzinfo=None),
+        hi.astimezone(timezone.utc).replace(tzinfo=None),
+    )
+
+
+def _present_days(connection, user_id, tz, first_day, last_day):
+    """Local days in first_day..last_day that have at least one log."""
+    lo, hi = _day_bounds_utc(first_day, last_day, tz)
+    timestamps = connection.execute(
+        select(PracticeLog.utc_timestamp).where(
+            PracticeLog.user_id == user_id,
+            PracticeLog.utc_timestamp >= lo,
+            PracticeLog.utc_timestamp < hi,
+        )
+    ).scalars()
+    return {as_utc(ts).astimezone(tz).date() for ts in timestamps}
+
+
+def _load_state(user_id, connection=None):
+    row = (connection or db.session).execute(
+        select(Streak.run_start, Streak.run_end, Streak.past_longest).where(Streak.user_id == user_id)
+    ).first()
+    return tuple(row) if row else None
+
+
+def _save_state(connection, user_id, state, exists):
+    start, end, past = state
+    table = Streak.__table__
+    values = {"run_start": start, "run_end": end, "past_longest": past}
+    if exists:
+        connection.execute(table.update().where(table.c.user_id == user_id).values(**values))
+    else:
+        connection.execute(table.insert().values(user_id=user_id, **values))
+
+
+def _update_streaks(session, changes):
+    """After-flush handler applying log changes to each user's streak."""
+    by_user = {}
+    for change in changes:
+        old = change.old.utc_timestamp if change.old else None
+        new = change.new.utc_timestamp if change.new else None
+        if old != new:  # Duration/instrument edits do not move days
+            by_user.setdefault(change.user_id, []).append((old, new))
+
+    connection = session.connection()
+    for user_id, moves in by_user.items():
+        tz_name = user_timezone(session, user_id)
+        if tz_name is None:
+            continue
+        tz = ZoneInfo(tz_name)
+
+        days = set()
+        for old, new in moves:
+            old_day = old.astimezone(tz).date() if old else None
+            new_day = new.astimezone(tz).date() if new else None
+            if old_day != new_day:
+                days.update(day for day in (old_day, new_day) if day)
+        if not days:
+            continue
+        days = sorted(days)
+
+        state = _load_state(user_id, connection)
+        if state is None:
+            # First change since streaks were introduced: start from history
+            _save_state(connection, user_id, _state_from_history(connection, user_id, tz), exists=False)
+            continue
+
+        present_days = _present_days(connection, user_id, tz, days[0] - ONE_DAY, days[-1])
+        new_state = state
+        for day in days:
+            new_state = apply_day_change(new_state, day, day in present_days, present_days)
+            if new_state is None:
+                enqueue(RECOMPUTE_JOB, user_id, session=session)
+                break
+        else:
+            if new_state != state:
+                _save_state(connection, user_id, new_state, exists=True)
+
+
+def _state_from_history(connection, user_id, tz):
+    timestamps = connection.execute(
+        select(PracticeLog.utc_timestamp).where(PracticeLog.user_id == user_id)
+    ).scalars()
+    return streak_state_from_days(as_utc(ts).astimezone(tz).date() for ts in timestamps)
+
+
+@register_job(RECOMPUTE_JOB)
+def recompute_streak(user_id, payload):
+    """
+    Rebuild a user's streak state from all of their logs.
+
+    Args:
+        user_id (int): User whose streak is rebuilt
+        payload (dict): Unused
+    """
+    tz_name = db.session.execute(select(User.timezone).where(User.id == user_id)).scalar()
+    if tz_name is None:
+        return
+    connection = db.session.connection()
+    state = _state_from_history(connection, user_id, ZoneInfo(tz_name))
+    _save_state(connection, user_id, state, exists=_load_state(user_id) is not None)
+
+
+def install_streaks():
+    """Maintain streaks after every flush that writes practice logs."""
+    on_log_change(_update_streaks, after_flush=True)
+
+
+def get_streaks(user_id, tz_name, today: date = None):
+    """
+    Current and longest practice streak of a user.
+
+    Args:
+        user_id (int): User id
+        tz_name (str): User timezone (defines "today")
+        today (date): Override today's local date (tests)
+
+    Returns:
+        dict: {"current": days, "longest": days}
+    """
+    run_pending_for_user(RECOMPUTE_JOB, user_id)
+    state = _load_state(user_id)
+    if state is None:
+        # Users who have not written since streaks were introduced
+        connection = db.session.connection()
+        state = _state_from_history(connection, user_id, ZoneInfo(tz_name))
+        _save_state(connection, user_id, state, exists=False)
+        db.session.commit()
+    return summarize(state, today or get_today_local(tz_name))
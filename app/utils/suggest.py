@@ -0,0 +1,165 @@
+"""
+Piece Suggestions for Practice Tracker
+
+Autocomplete for the log form's piece field. Every word of a piece's title
+and composer is stored normalized (lowercase, accents and punctuation
+removed) in the piece_term table, keyed (user_id, term, piece_id), so the
+pieces matching a typed prefix are one index range scan however many
+pieces the user has. Matches are ranked by how much and how recently the
+piece was practiced (Piece.log_time and Piece.last_practiced).
+
+Key Functions:
+- normalize_terms: the searchable words of a text
+- suggest_pieces: top matching pieces for a query
+- install_piece_suggest: index the terms of new pieces on every flush
+- backfill_piece_terms: index every existing piece (schema upgrades)
+"""
+
+import heapq
+import re
+import unicodedata
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import Piece, PieceTerm, db
+from app.utils.time import as_utc, utc_now
+
+# Half-life of the recency weight, in days
+RECENCY_HALF_LIFE_DAYS = 30
+
+# Weight of a piece that was never practiced (roughly a decade ago)
+NEVER_PRACTICED_DAYS = 3650
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_terms(text):
+    """
+    Split text into searchable words: accents stripped, casefolded,
+    punctuation removed ("Für Elise, WoO 59" -> ["fur", "elise", "woo", "59"]).
+
+    Args:
+        text (str): Title, composer or query (None is treated as empty)
+
+    Returns:
+        list: Words in order of appearance
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return [word for word in _NON_WORD.sub(" ", stripped.casefold()).split() if word]
+
+
+def _term_rows(pieces):
+    rows = []
+    for piece_id, user_id, title, composer in pieces:
+        for term in set(normalize_terms(title) + normalize_terms(composer)):
+            rows.append({"user_id": user_id, "term": term[:100], "piece_id": piece_id})
+    return rows
+
+
+def _index_new_pieces(session, flush_context):
+    """After-flush listener storing the terms of newly inserted pieces."""
+    rows = _term_rows(
+        (obj.id, obj.user_id, obj.title, obj.composer)
+        for obj in session.new
+        if isinstance(obj, Piece)
+    )
+    if rows:
+        session.connection().execute(insert(PieceTerm), rows)
+
+
+def backfill_piece_terms(connection):
+    """
+    Index the terms of every piece that has none (pieces created before the
+    piece_term table existed, or inserted without the ORM).
+
+    Args:
+        connection: Connection to read pieces and write terms on
+
+    Returns:
+        int: Number of term rows written
+    """
+    indexed = select(PieceTerm.piece_id).distinct()
+    pieces = connection.execute(
+        select(Piece.id, Piece.user_id, Piece.title, Piece.composer).where(Piece.id.not_in(indexed))
+    ).all()
+    rows = _term_rows(pieces)
+    if rows:
+        connection.execute(insert(PieceTerm), rows)
+    return len(rows)
+
+
+def _successor(prefix):
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _score(piece, now):
+    """Frequency (minutes) weighted by recency (halving every RECENCY_HALF_LIFE_DAYS)."""
+    if piece.last_practiced is None:
+        days = NEVER_PRACTICED_DAYS
+    else:
+        days = max(0.0, (as_utc(now) - as_utc(piece.last_practiced)).total_seconds() / 86400)
+    return (1 + (piece.log_time or 0)) * 0.5 ** (days / RECENCY_HALF_LIFE_DAYS)
+
+
+def suggest_pieces(user_id, query, limit=10, now=None):
+    """
+    Top pieces of a user matching a query.
+
+    Every query word must be a prefix of some word of the piece's title or
+    composer ("moon son" matches "Moonlight Sonata"). The longest word is
+    looked up in the term index; the others are checked on the candidates.
+    Pieces whose title starts with the query rank first, then by score.
+    Without a query the most recently practiced pieces are returned.
+
+    Args:
+        user_id (int): Owner of the pieces
+        query (str): Text typed so far
+        limit (int): Maximum number of pieces
+        now (datetime): Reference time for recency (default: now)
+
+    Returns:
+        list: Piece objects, best match first
+    """
+    words = normalize_terms(query)
+    if not words:
+        return (
+            Piece.query.filter(Piece.user_id == user_id)
+            .order_by(Piece.last_practiced.desc().nulls_last(), Piece.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    lookup = max(words, key=len)
+    matching_ids = (
+        select(PieceTerm.piece_id)
+        .where(
+            PieceTerm.user_id == user_id,
+            PieceTerm.term >= lookup,
+            PieceTerm.term < _successor(lookup),
+        )
+        .distinct()
+    )
+    candidates = db.session.execute(select(Piece).where(Piece.id.in_(matching_ids))).scalars().all()
+
+    now = now or utc_now()
+    ranked = []
+    for piece in candidates:
+        title_terms = normalize_terms(piece.title)
+        terms = title_terms + normalize_terms(piece.composer)
+        if not all(any(term.startswith(word) for term in terms) for word in words):
+            continue
+        title_prefix = len(title_terms) >= len(words) and all(
+            term.startswith(word) for term, word in zip(title_terms, words)
+        )
+        ranked.append(((title_prefix, _score(piece, now)), piece))
+
+    return [piece for _, piece in heapq.nlargest(limit, ranked, key=lambda item: item[0])]
+
+
+def install_piece_suggest():
+    """Index the terms of new pieces on every flush (idempotent)."""
+    if not event.contains(Session, "after_flush", _index_new_pieces):
+        event.listen(Session, "after_flush", _index_new_pieces)
@@ -27,6 +27,14 @@ def set_as_local(
     local_dt = utc_dt.astimezone(ZoneInfo(tz_name))
     return local_dt.strftime(fmt)
 
+def as_utc(dt: datetime) -> datetime:
+    """
+    Return an aware UTC datetime (SQLite returns stored UTC values naive).
+    """
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
 def utc_now() -> datetime:
     """
     Get the current datetime in UTC.
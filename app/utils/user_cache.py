@@ -0,0 +1,157 @@
+"""
+User Snapshot Cache for Flask-Login
+
+Flask-Login calls the user_loader on every authenticated request, which used
+to cost one SELECT on the user table per request (three for a dashboard load:
+the page, /api/recent-logs and /api/dashboard/stats). Read-only requests only
+need the user's id, username and timezone, so this module caches immutable
+snapshots of those fields per worker.
+
+Snapshots are served for GET/HEAD/OPTIONS requests only; writes always load
+the ORM User. Any flushed change to a User (for example a timezone update)
+evicts its snapshot, both at flush and again at commit, so a concurrent
+request cannot re-cache the old row between the two.
+
+Key Components:
+- UserSnapshot: frozen, Flask-Login compatible view of a User
+- UserCache: per-app TTL/LRU cache of snapshots keyed by user id
+- init_user_cache: create the cache and register the invalidation listeners
+"""
+
+from dataclasses import dataclass
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import User, db
+from app.utils.cache import TTLCache
+
+# Requests that never modify the user and can be served from a snapshot
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass(frozen=True, eq=False)
+class UserSnapshot(UserMixin):
+    """
+    Immutable copy of the User fields read-only routes depend on.
+
+    Provides the Flask-Login interface (is_authenticated, get_id, ...) through
+    UserMixin, so it can stand in for current_user on read-only requests.
+    """
+    id: int
+    username: str
+    timezone: str
+
+    @classmethod
+    def from_user(cls, user):
+        """Build a snapshot from a User row."""
+        return cls(id=user.id, username=user.username, timezone=user.timezone)
+
+
+class UserCache:
+    """
+    Per-worker cache of UserSnapshot objects keyed by user id.
+
+    Args:
+        maxsize: Maximum number of cached users
+        ttl: Seconds a snapshot may be served before it is reloaded
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, user_id):
+        """
+        Return the snapshot for user_id, loading it on a miss.
+
+        Args:
+            user_id (int): Primary key of the user
+
+        Returns:
+            UserSnapshot: Cached snapshot, or None if the user does not exist
+        """
+        snapshot = self._cache.get(user_id)
+        if snapshot is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                return None
+            snapshot = UserSnapshot.from_user(user)
+            self._cache.set(user_id, snapshot)
+        return snapshot
+
+    def invalidate(self, user_id):
+        """Evict the snapshot of one user."""
+        self._cache.pop(user_id)
+
+    def clear(self):
+        """Evict every snapshot."""
+        self._cache.clear()
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+
+def _collect_user_ids(session, flush_context):
+    """Evict changed users at flush and remember them for after_commit."""
+    ids = {
+        obj.id for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if ids:
+        session.info.setdefault("changed_user_ids", set()).update(ids)
+        _evict(ids)
+
+
+def _evict_committed(session):
+    """Evict users changed in the transaction that just committed."""
+    _evict(session.info.pop("changed_user_ids", ()))
+
+
+def _discard_pending(session):
+    """Forget collected ids when the transaction rolls back."""
+    session.info.pop("changed_user_ids", None)
+
+
+def _evict(user_ids):
+    if not user_ids or not has_app_context():
+        return
+    cache = current_app.extensions.get("user_cache")
+    if cache is not None:
+        for user_id in user_ids:
+            cache.invalidate(user_id)
+
+
+def install_session_listeners():
+    """Register the User invalidation listeners once per process."""
+    for name, fn in (
+        ("after_flush", _collect_user_ids),
+        ("after_commit", _evict_committed),
+        ("after_rollback", _discard_pending),
+    ):
+        if not event.contains(Session, name, fn):
+            event.listen(Session, name, fn)
+
+
+def init_user_cache(app):
+    """
+    Attach a UserCache to app.extensions["user_cache"].
+
+    Reads USER_CACHE_SIZE and USER_CACHE_TTL from the app config; a TTL of 0
+    disables the cache (the user_loader then always queries the database).
+
+    Args:
+        app (Flask): Application to configure
+    """
+    ttl = float(app.config.get("USER_CACHE_TTL", 60))
+    if ttl > 0:
+        app.extensions["user_cache"] = UserCache(
+            maxsize=int(app.config.get("USER_CACHE_SIZE", 1024)), ttl=ttl
+        )
+        install_session_listeners()
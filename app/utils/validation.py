@@ -2,12 +2,28 @@
 Input validation utilities for practice tracking API.
 
 Provides validation functions for log submission data to prevent
-server crashes and return meaningful error responses.
+server crashes and return meaningful error responses, and the 400 response
+every API route uses for invalid input.
 """
 
 from datetime import datetime
 from typing import Dict, Any, List, Tuple, Optional
 
+from flask import jsonify
+
+
+def validation_error(message: str):
+    """
+    400 response for invalid request data or query parameters.
+    
+    Args:
+        message: Description of the problem, shown to the user
+        
+    Returns:
+        Tuple of (JSON {"error": "validation_failed", "message"}, 400)
+    """
+    return jsonify({"error": "validation_failed", "message": message}), 400
+
 
 def validate_required_fields(data: Dict[str, Any], required: List[str]) -> Optional[str]:
     """
@@ -158,3 +174,39 @@ def validate_log_submission_data(data: Dict[str, Any]) -> Tuple[bool, Dict[str,
         cleaned_data["notes"] = str(data["notes"]).strip() if data["notes"] else ""
     
     return True, cleaned_data, None
+
+
+def validate_log_edit_data(data: Dict[str, Any]) -> Tuple[bool, Dict[str, Any], Optional[str]]:
+    """
+    Validation for the fields of a log edit (every field is optional).
+    
+    Args:
+        data: Raw request data dictionary
+        
+    Returns:
+        Tuple of (is_valid, cleaned_data, error_message)
+        - is_valid: True if all validation passes
+        - cleaned_data: Dictionary with the validated/converted fields present
+        - error_message: Error description if validation fails
+    """
+    if not isinstance(data, dict):
+        return False, {}, "Request data must be a JSON object"
+    
+    cleaned_data = {}
+    
+    if "duration" in data:
+        duration_error = validate_duration(data["duration"])
+        if duration_error:
+            return False, {}, duration_error
+        cleaned_data["duration"] = int(data["duration"])
+    
+    if "instrument" in data:
+        instrument_error = validate_instrument(data["instrument"])
+        if instrument_error:
+            return False, {}, instrument_error
+        cleaned_data["instrument"] = data["instrument"].strip()
+    
+    if "notes" in data:
+        cleaned_data["notes"] = str(data["notes"]).strip() if data["notes"] else ""
+    
+    return True, cleaned_data, None
@@ -0,0 +1,115 @@
+"""
+Leaderboard Benchmark for Practice Tracker
+
+Measures leaderboard reads against 100,000 users with this week's scores in
+a SQLite file, comparing:
+
+- naive:       GROUP BY over every user's practice logs in the window, then
+               sort (what a leaderboard without score rows has to do)
+- top-k:       walk the (board, instrument, minutes) index from the top
+- my rank:     count index entries above a random user's score
+
+Usage:
+    python benchmarks/leaderboard.py
+    python benchmarks/leaderboard.py --users 200000 --logs-per-user 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import PracticeLog, User  # noqa: E402
+from app.utils.leaderboard import get_leaderboard, rebuild_leaderboards  # noqa: E402
+
+TZ = "UTC"
+
+
+def seed(users, logs_per_user, rng):
+    """Insert users with this week's logs; return the log count."""
+    db.session.execute(insert(User), [
+        {"id": n + 1, "username": f"user{n}", "password_hash": "x", "timezone": TZ}
+        for n in range(users)
+    ])
+    now = datetime.now(timezone.utc)
+    monday = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = [
+        {
+            "user_id": n + 1,
+            "user_log_number": k + 1,
+            "utc_timestamp": monday + timedelta(minutes=rng.randrange(max(1, int((now - monday).total_seconds() // 60)))),
+            "instrument": "piano",
+            "duration": rng.randint(5, 120),
+        }
+        for n in range(users)
+        for k in range(logs_per_user)
+    ]
+    db.session.execute(insert(PracticeLog), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def time_ms(fn, runs):
+    """Median and max wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100_000, help="number of users")
+    parser.add_argument("--logs-per-user", type=int, default=3, help="logs per user this week")
+    parser.add_argument("--runs", type=int, default=50, help="timed runs per measurement")
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "SECRET_KEY": "benchmark",
+            "JOB_WORKERS": 0,
+        })
+        with app.app_context():
+            count = seed(args.users, args.logs_per_user, rng)
+            start = time.perf_counter()
+            rows = rebuild_leaderboards()
+            rebuild_s = time.perf_counter() - start
+            today = datetime.now(timezone.utc).date()
+            monday = datetime.combine(today - timedelta(days=today.weekday()), datetime.min.time())
+
+            def naive():
+                db.session.execute(
+                    select(PracticeLog.user_id, func.sum(PracticeLog.duration).label("minutes"))
+                    .where(PracticeLog.utc_timestamp >= monday)
+                    .group_by(PracticeLog.user_id)
+                    .order_by(func.sum(PracticeLog.duration).desc())
+                    .limit(10)
+                ).all()
+
+            def board():
+                get_leaderboard("week", today, rng.randrange(1, args.users + 1))
+
+            naive_ms = time_ms(naive, max(3, args.runs // 10))
+            board_ms = time_ms(board, args.runs)
+
+    print(f"data:         {args.users} users, {count} logs this week")
+    print(f"rebuild:      {rows} score rows in {rebuild_s:.1f} s")
+    print(f"naive scan:   median {naive_ms[0]:8.2f} ms   max {naive_ms[1]:8.2f} ms")
+    print(f"top-10 + rank: median {board_ms[0]:7.2f} ms   max {board_ms[1]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Log Table Query Benchmark for Practice Tracker
+
+Times the first and a deep page of a filtered, sorted GET /api/logs for a
+user with 50,000 logs in a SQLite file, against the client-side alternative
+of downloading every log and filtering/sorting it:
+
+- full:     GET /api/logs (every log), then filter and sort in Python
+- filtered: GET /api/logs?instrument=violin&sort=duration&limit=50
+- deep:     the same page, resumed from a cursor 20 pages in
+
+Usage:
+    python benchmarks/log_query.py
+    python benchmarks/log_query.py --logs 200000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import PracticeLog, User  # noqa: E402
+
+PASSWORD = "benchmark-password"
+INSTRUMENTS = ["piano", "violin", "altoSax", "guitar"]
+PAGE = "/api/logs?instrument=violin&sort=duration&order=desc&limit=50"
+
+
+def seed(user_id, logs, rng):
+    """Insert logs for one user."""
+    start = datetime.now(timezone.utc) - timedelta(days=3650)
+    db.session.execute(insert(PracticeLog), [
+        {
+            "user_id": user_id,
+            "user_log_number": n + 1,
+            "utc_timestamp": start + timedelta(minutes=rng.randrange(3650 * 1440)),
+            "instrument": rng.choice(INSTRUMENTS),
+            "duration": rng.randint(5, 90),
+        }
+        for n in range(logs)
+    ])
+    db.session.commit()
+
+
+def time_ms(fn, runs):
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logs", type=int, default=50_000, help="logs of the user")
+    parser.add_argument("--runs", type=int, default=10, help="timed runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "SECRET_KEY": "benchmark",
+            "JOB_WORKERS": 0,
+            "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+        })
+        with app.app_context():
+            user = User(username="bench", timezone="America/New_York")
+            user.set_password(PASSWORD)
+            db.session.add(user)
+            db.session.commit()
+            seed(user.id, args.logs, random.Random(44))
+
+        client = app.test_client()
+        client.post("/login", json={"username": "bench", "password": PASSWORD})
+
+        def full():
+            logs = client.get("/api/logs").get_json()
+            violin = [log for log in logs if log["instrument"] == "violin"]
+            sorted(violin, key=lambda log: log["duration"], reverse=True)[:50]
+
+        def filtered():
+            assert client.get(PAGE).status_code == 200
+
+        cursor = None
+        for _ in range(20):
+            cursor = client.get(PAGE + (f"&cursor={cursor}" if cursor else "")).headers["X-Next-Cursor"]
+
+        def deep():
+            assert client.get(f"{PAGE}&cursor={cursor}").status_code == 200
+
+        full_ms = time_ms(full, max(3, args.runs // 3))
+        filtered_ms = time_ms(filtered, args.runs)
+        deep_ms = time_ms(deep, args.runs)
+
+    print(f"data:      {args.logs} logs")
+    print(f"full:      {full_ms:8.1f} ms (download everything, filter client-side)")
+    print(f"filtered:  {filtered_ms:8.1f} ms first page")
+    print(f"deep:      {deep_ms:8.1f} ms page 21 via cursor")
+
+
+if __name__ == "__main__":
+    main()
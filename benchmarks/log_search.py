@@ -0,0 +1,119 @@
+"""
+Practice Note Search Benchmark for Practice Tracker
+
+Times GET /api/logs/search for one user in a SQLite file holding logs with
+notes for several users, against the LIKE scan it replaces. About 1% of the
+notes mention "metronome 120":
+
+- like:   count and first page of WHERE user_id = ? AND notes LIKE '%metronome 120%'
+- search: GET /api/logs/search?q="metronome 120" (ranked, first page, total)
+- prefix: GET /api/logs/search?q=metronome 12 (last word as a prefix)
+
+Usage:
+    python benchmarks/log_search.py
+    python benchmarks/log_search.py --logs 1000000 --users 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from sqlalchemy import insert, text  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import PracticeLog, User  # noqa: E402
+
+PASSWORD = "benchmark-password"
+WORDS = (
+    "long tones scales arpeggios intonation shifting vibrato bowing "
+    "slow practice sight reading etude dynamics phrasing tempo rhythm tuning"
+).split()
+
+
+def seed(user_ids, logs, rng):
+    """Insert logs with generated notes, spread over the users."""
+    start = datetime.now(timezone.utc) - timedelta(days=3650)
+    batch = 50_000
+    for first in range(0, logs, batch):
+        db.session.execute(insert(PracticeLog), [
+            {
+                "user_id": user_ids[n % len(user_ids)],
+                "user_log_number": n // len(user_ids) + 1,
+                "utc_timestamp": start + timedelta(minutes=rng.randrange(3650 * 1440)),
+                "instrument": "violin",
+                "duration": rng.randint(5, 90),
+                "notes": " ".join(rng.choices(WORDS, k=8)) + (" metronome 120" if rng.random() < 0.01 else ""),
+            }
+            for n in range(first, min(first + batch, logs))
+        ])
+    db.session.commit()
+
+
+def time_ms(fn, runs):
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logs", type=int, default=200_000, help="logs across all users")
+    parser.add_argument("--users", type=int, default=100, help="users the logs are spread over")
+    parser.add_argument("--runs", type=int, default=10, help="timed runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "SECRET_KEY": "benchmark",
+            "JOB_WORKERS": 0,
+            "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+        })
+        with app.app_context():
+            users = [User(username=f"bench{n}", timezone="America/New_York") for n in range(args.users)]
+            for user in users:
+                user.set_password(PASSWORD)
+            db.session.add_all(users)
+            db.session.commit()
+            user_id = users[0].id
+            seed([user.id for user in users], args.logs, random.Random(46))
+
+        client = app.test_client()
+        client.post("/login", json={"username": "bench0", "password": PASSWORD})
+
+        def like():
+            with app.app_context():
+                where = "FROM practice_log WHERE user_id = :user AND notes LIKE :pattern"
+                params = {"user": user_id, "pattern": "%metronome 120%"}
+                db.session.execute(text(f"SELECT count(*) {where}"), params).scalar()
+                db.session.execute(text(f"SELECT id {where} ORDER BY utc_timestamp DESC LIMIT 20"), params).all()
+
+        def search():
+            assert client.get('/api/logs/search?q="metronome 120"').status_code == 200
+
+        def prefix():
+            assert client.get("/api/logs/search?q=metronome 12").status_code == 200
+
+        like_ms = time_ms(like, args.runs)
+        search_ms = time_ms(search, args.runs)
+        prefix_ms = time_ms(prefix, args.runs)
+
+    print(f"data:      {args.logs} logs, {args.users} users")
+    print(f"like:      {like_ms:8.1f} ms (LIKE scan of one user's notes)")
+    print(f"search:    {search_ms:8.1f} ms phrase query, ranked first page")
+    print(f"prefix:    {prefix_ms:8.1f} ms words + prefix query, ranked first page")
+
+
+if __name__ == "__main__":
+    main()
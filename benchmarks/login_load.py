@@ -0,0 +1,149 @@
+"""
+Mixed Login/Dashboard Load Benchmark for Practice Tracker
+
+Runs a burst of logins (each one a full scrypt verification) alongside
+logged-in users polling /api/dashboard/stats, and reports dashboard latency
+percentiles and login outcomes. Each scenario runs twice:
+
+- unbounded: one hashing thread per login thread and an unlimited queue,
+  which is how hashing behaved when it ran on the request threads
+- bounded:   the configured PASSWORD_HASH_WORKERS / PASSWORD_HASH_QUEUE,
+  where excess logins are shed with 503 + Retry-After
+
+Requests go through Flask test clients on real threads against a SQLite
+file, so the numbers include the app and database but not a WSGI server.
+
+Usage:
+    python benchmarks/login_load.py
+    python benchmarks/login_load.py --login-threads 16 --seconds 10
+    python benchmarks/login_load.py --hash-workers 1 --hash-queue 2
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from app import create_app, db  # noqa: E402
+from app.models import User  # noqa: E402
+
+PASSWORD = "benchmark-password"
+
+
+def build_app(db_uri, workers, queue_size):
+    """Create an app with the given hashing pool size."""
+    return create_app({
+        "SQLALCHEMY_DATABASE_URI": db_uri,
+        "SECRET_KEY": "benchmark",
+        "PASSWORD_HASH_WORKERS": workers,
+        "PASSWORD_HASH_QUEUE": queue_size,
+    })
+
+
+def seed_users(app, count):
+    """Create `count` users sharing one production-cost password hash."""
+    with app.app_context():
+        template = User(username="template")
+        template.set_password(PASSWORD)
+        db.session.add_all(
+            User(username=f"user{i}", password_hash=template.password_hash, timezone="UTC")
+            for i in range(count)
+        )
+        db.session.commit()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of floats."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_scenario(app, login_threads, dashboard_threads, seconds):
+    """Run the mixed workload; return (dashboard latencies, login status counts)."""
+    stop = threading.Event()
+    latencies = []
+    login_status = {}
+    lock = threading.Lock()
+
+    def login_loop(n):
+        client = app.test_client()
+        while not stop.is_set():
+            resp = client.post("/login", json={"username": f"user{n}", "password": PASSWORD})
+            with lock:
+                login_status[resp.status_code] = login_status.get(resp.status_code, 0) + 1
+            if resp.status_code == 503:
+                time.sleep(0.05)  # Well-behaved client backs off (shortened Retry-After)
+
+    def dashboard_loop(n):
+        client = app.test_client()
+        client.post("/login", json={"username": f"user{1000 + n}", "password": PASSWORD})
+        while not stop.is_set():
+            start = time.perf_counter()
+            resp = client.get("/api/dashboard/stats")
+            elapsed = time.perf_counter() - start
+            if resp.status_code == 200:
+                with lock:
+                    latencies.append(elapsed)
+            time.sleep(0.01)
+
+    # Dashboard users log in before the wave starts
+    dashboard = [threading.Thread(target=dashboard_loop, args=(n,)) for n in range(dashboard_threads)]
+    for thread in dashboard:
+        thread.start()
+    time.sleep(1)
+    with lock:
+        latencies.clear()
+
+    logins = [threading.Thread(target=login_loop, args=(n,)) for n in range(login_threads)]
+    for thread in logins:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in dashboard + logins:
+        thread.join()
+    return latencies, login_status
+
+
+def report(name, latencies, login_status, seconds):
+    """Print one scenario's results."""
+    ms = [x * 1000 for x in latencies]
+    ok = login_status.get(200, 0)
+    shed = login_status.get(503, 0)
+    print(f"{name:10} dashboard p50 {statistics.median(ms):7.1f} ms   p99 {percentile(ms, 99):7.1f} ms   "
+          f"({len(ms)} requests)   logins ok {ok / seconds:5.1f}/s   shed {shed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--login-threads", type=int, default=8, help="concurrent login clients")
+    parser.add_argument("--dashboard-threads", type=int, default=2, help="concurrent dashboard clients")
+    parser.add_argument("--seconds", type=float, default=5, help="duration of each scenario")
+    parser.add_argument("--hash-workers", type=int, default=1, help="bounded scenario hashing threads")
+    parser.add_argument("--hash-queue", type=int, default=1, help="bounded scenario queue size")
+    args = parser.parse_args()
+
+    scenarios = [
+        ("unbounded", args.login_threads, args.login_threads),
+        ("bounded", args.hash_workers, args.hash_queue),
+    ]
+    print(f"{args.login_threads} login clients, {args.dashboard_threads} dashboard clients, "
+          f"{args.seconds:g}s per scenario, {os.cpu_count()} CPUs")
+    for name, workers, queue_size in scenarios:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = build_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}", workers, queue_size)
+            seed_users(app, 1000 + args.dashboard_threads)
+            latencies, login_status = run_scenario(
+                app, args.login_threads, args.dashboard_threads, args.seconds
+            )
+            app.extensions["password_hasher"].shutdown()
+        report(name, latencies, login_status, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
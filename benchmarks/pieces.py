@@ -0,0 +1,120 @@
+"""
+Piece Statistics Benchmark for Practice Tracker
+
+Times one page of GET /api/pieces for a user with thousands of pieces in a
+SQLite file, against the naive alternative of loading every log and piece
+and aggregating in Python.
+
+- naive:   load all of the user's logs, group by piece in Python, sort, slice
+- grouped: the endpoint's single GROUP BY over (user_id, piece_id) plus a
+           page of pieces
+
+Usage:
+    python benchmarks/pieces.py
+    python benchmarks/pieces.py --pieces 10000 --logs 200000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import Piece, PracticeLog, User  # noqa: E402
+
+PASSWORD = "benchmark-password"
+INSTRUMENTS = ["piano", "violin", "altoSax", "guitar"]
+
+
+def seed(user_id, pieces, logs, rng):
+    """Insert pieces and logs for one user."""
+    db.session.execute(insert(Piece), [
+        {"id": n + 1, "user_id": user_id, "title": f"Piece {n}", "composer": "Bench", "log_time": 0}
+        for n in range(pieces)
+    ])
+    start = datetime.now(timezone.utc) - timedelta(days=3650)
+    db.session.execute(insert(PracticeLog), [
+        {
+            "user_id": user_id,
+            "user_log_number": n + 1,
+            "utc_timestamp": start + timedelta(minutes=rng.randrange(3650 * 1440)),
+            "instrument": rng.choice(INSTRUMENTS),
+            "duration": rng.randint(5, 90),
+            "piece_id": rng.randint(1, pieces),
+        }
+        for n in range(logs)
+    ])
+    db.session.commit()
+
+
+def time_ms(fn, runs):
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pieces", type=int, default=5000, help="pieces of the user")
+    parser.add_argument("--logs", type=int, default=100_000, help="logs of the user")
+    parser.add_argument("--runs", type=int, default=10, help="timed runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "SECRET_KEY": "benchmark",
+            "JOB_WORKERS": 0,
+            "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+        })
+        with app.app_context():
+            user = User(username="bench", timezone="America/New_York")
+            user.set_password(PASSWORD)
+            db.session.add(user)
+            db.session.commit()
+            seed(user.id, args.pieces, args.logs, random.Random(40))
+            user_id = user.id
+
+            def naive():
+                totals = defaultdict(lambda: [0, 0, None, set()])
+                for log in PracticeLog.query.filter_by(user_id=user_id).all():
+                    row = totals[log.piece_id]
+                    row[0] += log.duration
+                    row[1] += 1
+                    row[2] = max(row[2] or log.utc_timestamp, log.utc_timestamp)
+                    row[3].add(log.instrument)
+                pieces = Piece.query.filter_by(user_id=user_id).all()
+                sorted(pieces, key=lambda p: totals[p.id][0], reverse=True)[:50]
+                db.session.expunge_all()
+
+            naive_ms = time_ms(naive, args.runs)
+
+        client = app.test_client()
+        client.post("/login", json={"username": "bench", "password": PASSWORD})
+
+        def grouped():
+            assert client.get("/api/pieces?sort=minutes&order=desc&per_page=50").status_code == 200
+
+        grouped_ms = time_ms(grouped, args.runs)
+
+    print(f"data:     {args.pieces} pieces, {args.logs} logs")
+    print(f"naive:    {naive_ms:8.1f} ms per page")
+    print(f"grouped:  {grouped_ms:8.1f} ms per page (full request)")
+    print(f"speedup:  {naive_ms / grouped_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
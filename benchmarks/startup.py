@@ -0,0 +1,94 @@
+"""
+Startup Latency Benchmark for Practice Tracker
+
+Measures worker cold start: each run is a fresh Python process that imports
+the app package and calls create_app() against an existing database, like a
+preforked worker after a redeploy. For comparison, the same process then
+times the db.create_all() call that every boot used to run.
+
+Usage:
+    python benchmarks/startup.py               # 10 cold boots
+    python benchmarks/startup.py --runs 25
+    python benchmarks/startup.py --importtime  # -X importtime report
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+# Code run in each child process; prints one JSON line of timings
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+from app import create_app, db
+t1 = time.perf_counter()
+app = create_app({"SQLALCHEMY_DATABASE_URI": sys.argv[1]})
+t2 = time.perf_counter()
+with app.app_context():
+    db.create_all()
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "create_app": t2 - t1, "create_all": t3 - t2}))
+"""
+
+
+def run_child(db_uri, *python_flags):
+    """Run one cold boot and return (timings dict, stderr)."""
+    proc = subprocess.run(
+        [sys.executable, *python_flags, "-c", CHILD, db_uri],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def importtime_report(stderr, top=20):
+    """Print the slowest imports (cumulative) from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+
+    app_rows = [r for r in rows if r[2] == "app" or r[2].startswith("app.")]
+    app_self = sum(r[1] for r in app_rows) / 1000
+    print(f"\napp.* modules: {len(app_rows)} imported, {app_self:.1f} ms self time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="number of cold boots")
+    parser.add_argument("--importtime", action="store_true", help="print an -X importtime report")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        run_child(db_uri)  # first boot creates the schema; the rest are warm
+
+        if args.importtime:
+            _, stderr = run_child(db_uri, "-X", "importtime")
+            importtime_report(stderr)
+            return
+
+        results = [run_child(db_uri)[0] for _ in range(args.runs)]
+
+    def median_ms(key):
+        return statistics.median(r[key] for r in results) * 1000
+
+    print(f"cold boots:                {args.runs}")
+    print(f"import app (median):       {median_ms('import'):8.1f} ms")
+    print(f"create_app (median):       {median_ms('create_app'):8.1f} ms")
+    print(f"create_all it skips:       {median_ms('create_all'):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
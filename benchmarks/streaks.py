@@ -0,0 +1,112 @@
+"""
+Streak Maintenance Benchmark for Practice Tracker
+
+Compares the incremental streak update run on every log write with a full
+recomputation from the user's history, for a 10-year history (about 3,300
+practice days with occasional gaps, 1-3 logs per day) in a SQLite file.
+
+- recompute:   load every log timestamp, convert to local dates, rebuild
+- incremental: read the stored state, check the days around the change,
+               apply it and save (what _update_streaks does per write)
+
+Usage:
+    python benchmarks/streaks.py
+    python benchmarks/streaks.py --years 20 --runs 50
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import PracticeLog, User  # noqa: E402
+from app.utils.changes import LogChange, LogValues  # noqa: E402
+from app.utils.streaks import _state_from_history, _update_streaks, recompute_streak  # noqa: E402
+
+TZ = "America/New_York"
+
+
+def seed_history(user_id, years, rng):
+    """Insert `years` of daily practice with random gaps; return log count."""
+    start = datetime.now(timezone.utc) - timedelta(days=365 * years)
+    rows = []
+    for offset in range(365 * years):
+        if rng.random() < 0.1:
+            continue  # Missed day
+        for _ in range(rng.randint(1, 3)):
+            rows.append({
+                "user_id": user_id,
+                "user_log_number": len(rows) + 1,
+                "utc_timestamp": start + timedelta(days=offset, minutes=rng.randrange(1440)),
+                "instrument": "piano",
+                "duration": rng.randint(10, 90),
+            })
+    db.session.execute(insert(PracticeLog), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def time_ms(fn, runs):
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, default=10, help="length of the history")
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "SECRET_KEY": "benchmark",
+            "JOB_WORKERS": 0,
+        })
+        with app.app_context():
+            user = User(username="bench", password_hash="x", timezone=TZ)
+            db.session.add(user)
+            db.session.commit()
+            count = seed_history(user.id, args.years, random.Random(42))
+            recompute_streak(user.id, {})
+            db.session.commit()
+
+            tz = ZoneInfo(TZ)
+
+            def recompute():
+                _state_from_history(db.session.connection(), user.id, tz)
+
+            # A new log today: the common case on every write
+            now = datetime.now(timezone.utc)
+            change = [LogChange(user.id, None, LogValues(now, 30, "piano", None))]
+
+            def incremental():
+                _update_streaks(db.session, change)
+                db.session.rollback()
+
+            recompute_ms = time_ms(recompute, args.runs)
+            incremental_ms = time_ms(incremental, args.runs)
+
+    print(f"history:      {args.years} years, {count} logs")
+    print(f"recompute:    {recompute_ms:8.2f} ms per write")
+    print(f"incremental:  {incremental_ms:8.2f} ms per write")
+    print(f"speedup:      {recompute_ms / incremental_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
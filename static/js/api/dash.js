@@ -29,6 +29,9 @@ import { fetchJson } from "./api-helper.js";
  *   - total_minutes: Lifetime total practice minutes
  *   - average_minutes: Average minutes per practice session
  *   - common_piece: Most frequently practiced piece
+ *   - streak: { current, longest } practice streaks in days
+ *   - goals: Active goals with target_minutes and progress_minutes
+ *   - recent: The five most recent logs, newest first
  *
  * @example
  * const result = await getDashboardStats();
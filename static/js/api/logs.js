@@ -23,5 +23,18 @@ export const deleteLog = (logNumber) =>
 
 // gets the current user's logs
 export const fetchLogs = () => fetchJson("/api/logs");
+// gets the logs written or deleted after a data version (0 for all logs)
+export const fetchLogChanges = (since) =>
+	fetchJson(`/api/logs/changes?since=${encodeURIComponent(since || 0)}`);
 export const recentLogs = () => fetchJson("/api/recent-logs");
-export const fetchPieces = () => fetchJson("/api/stats/pieces");
+// gets one page of the current user's piece statistics
+export const fetchPieces = ({ sort = "title", order = "asc", page = 1, perPage = 50 } = {}) =>
+	fetchJson(
+		`/api/pieces?sort=${encodeURIComponent(sort)}&order=${encodeURIComponent(order)}` +
+			`&page=${encodeURIComponent(page)}&per_page=${encodeURIComponent(perPage)}`
+	);
+// gets the pieces best matching typed text (most recent pieces for "")
+export const suggestPieces = (query = "", limit = 10) =>
+	fetchJson(
+		`/api/pieces/suggest?q=${encodeURIComponent(query)}&limit=${encodeURIComponent(limit)}`
+	);
@@ -26,7 +26,7 @@ import { renderAsTxt } from "./time-format.js";
  *
  * @param {Object} data - Daily practice data from API
  * @param {number} data.total_today - Minutes practiced today
- * @param {number} data.target - Daily target in minutes (usually 60)
+ * @param {number} data.target - Daily target in minutes (the overall daily goal, or 60)
  */
 function renderDailyMinutes(data) {
 	if (!data) {
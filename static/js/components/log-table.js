@@ -5,26 +5,140 @@ import { instrumentHTML } from "./instrument-dropdown.js";
 import { handleLogDeletion, handleLogEdit } from "../forms/index.js";
 import { renderTxtShort } from "./time-format.js";
 
+// Rows are windowed: only the rows in view plus OVERSCAN rows on each side
+// are in the DOM, and their <tr> elements are reused as the table scrolls,
+// so rendering and re-sorting cost the same for 10 logs or 10,000.
+const DEFAULT_ROW_HEIGHT = 41; // px, one line of text in a Bootstrap table row
+const OVERSCAN = 10; // rows rendered above and below the visible ones
+
+const view = {
+	body: null, // bound <tbody>
+	scroller: null, // scrolling ancestor (.log-table-scroll), or null for the window
+	logs: [], // rows to show, in display order
+	pool: [], // reusable <tr> elements
+	topSpacer: null,
+	bottomSpacer: null,
+	rowHeight: 0, // measured once rows are laid out
+	start: -1, // first rendered index
+	end: -1, // one past the last rendered index
+	editing: false, // a row is being edited: keep the rendered rows as they are
+	frame: 0, // pending animation frame for scroll updates
+};
+
 export function renderLogs(logs) {
 	const tableBody = document.getElementById("log-table-body");
 	if (!tableBody) return;
 
-	tableBody.innerHTML = ""; // Clear current rows
+	bindTable(tableBody);
+	view.logs = logs || [];
+	view.start = view.end = -1; // force a refill, the rows may have changed
+	renderWindow();
+}
+
+function bindTable(tableBody) {
+	if (view.body === tableBody) return;
+
+	view.body = tableBody;
+	view.scroller = tableBody.closest(".log-table-scroll");
+	view.pool = [];
+	view.rowHeight = 0;
+	view.editing = false;
+	view.topSpacer = createSpacer();
+	view.bottomSpacer = createSpacer();
+
+	// One delegated handler for every edit button, current and recycled
+	tableBody.addEventListener("click", (e) => {
+		const btn = e.target.closest(".floating-edit-btn");
+		if (!btn || view.editing) return;
+		e.stopPropagation();
+		setupEditLogRow(btn.closest("tr").dataset.logId);
+	});
 
-	logs.forEach((log) => {
-		const row = document.createElement("tr"); // current row to render
+	const onScroll = () => {
+		if (view.frame) return;
+		view.frame = requestAnimationFrame(() => {
+			view.frame = 0;
+			if (!view.editing) renderWindow();
+		});
+	};
+	(view.scroller || window).addEventListener("scroll", onScroll, { passive: true });
+	window.addEventListener("resize", onScroll);
+}
 
-		row.dataset.logId = log.id; // store log id for editing
-		row.dataset.rawDuration = log.duration; // store the raw duration for editing
+function createSpacer() {
+	const spacer = document.createElement("tr");
+	spacer.className = "virtual-spacer";
+	spacer.setAttribute("aria-hidden", "true");
+	return spacer;
+}
 
+function visibleRange(rowHeight) {
+	let offset, height;
+	if (view.scroller) {
+		offset = view.scroller.scrollTop;
+		height = view.scroller.clientHeight;
+	} else {
+		offset = Math.max(0, -view.body.getBoundingClientRect().top);
+		height = window.innerHeight;
+	}
+	height = height || window.innerHeight || 800; // not laid out yet
+
+	const first = Math.floor(offset / rowHeight);
+	const start = Math.max(0, Math.min(first, view.logs.length) - OVERSCAN);
+	const end = Math.min(view.logs.length, first + Math.ceil(height / rowHeight) + OVERSCAN);
+	return [start, Math.max(start, end)];
+}
+
+function renderWindow() {
+	const rowHeight = view.rowHeight || DEFAULT_ROW_HEIGHT;
+	const [start, end] = visibleRange(rowHeight);
+	if (start === view.start && end === view.end) return;
+	view.start = start;
+	view.end = end;
+
+	// Grow the pool to the window size; rows beyond it are detached, not destroyed
+	while (view.pool.length < end - start) {
+		const row = document.createElement("tr");
 		row.style.position = "relative"; // enable positioning for floating button
+		view.pool.push(row);
+	}
+	const rows = view.pool.slice(0, end - start);
+	rows.forEach((row, i) => fillRow(row, view.logs[start + i]));
+
+	// Spacers stand in for the rows above and below the window
+	const children = [];
+	const above = start * rowHeight;
+	const below = (view.logs.length - end) * rowHeight;
+	if (above > 0) {
+		view.topSpacer.style.height = `${above}px`;
+		children.push(view.topSpacer);
+	}
+	children.push(...rows);
+	if (below > 0) {
+		view.bottomSpacer.style.height = `${below}px`;
+		children.push(view.bottomSpacer);
+	}
+	view.body.replaceChildren(...children);
 
-		if (log.piece !== "Unlisted") {
-			// if piece is not "Unlisted", italicize it
-			log.piece = `<span style="font-style: italic;">${log.piece}</span>`;
-		}
+	if (!view.rowHeight && rows.length && rows[0].offsetHeight) {
+		view.rowHeight = rows[0].offsetHeight; // measure once, then size the window by it
+		view.start = view.end = -1;
+		renderWindow();
+	}
+}
+
+function fillRow(row, log) {
+	row.dataset.logId = log.id; // store log id for editing
+	row.dataset.rawDuration = log.duration; // store the raw duration for editing
 
-		row.innerHTML = `
+	// if piece is not "Unlisted", italicize it; the log itself stays
+	// untouched since it is patched in place and re-rendered
+	const piece =
+		log.piece !== "Unlisted"
+			? `<span style="font-style: italic;">${log.piece}</span>`
+			: log.piece;
+
+	row.innerHTML = `
             <td data-label="id">${log.id}</td>
             <td data-label="date">${log.local_date}</td>
             <td data-label="duration">${renderTxtShort(
@@ -35,7 +149,7 @@ export function renderLogs(logs) {
             <td data-label="instrument">${
 							instrumentMap[log.instrument] || log.instrument
 						}</td>
-            <td data-label="piece">${log.piece}</td>
+            <td data-label="piece">${piece}</td>
             <td data-label="composer">${
 							log.composer && log.composer.trim() !== "" ? log.composer : "N/A"
 						}</td>
@@ -44,17 +158,6 @@ export function renderLogs(logs) {
 				log.id
 			}" title="Edit this log">✏️</button>
         `;
-
-		tableBody.appendChild(row);
-	});
-
-	document.querySelectorAll(".floating-edit-btn").forEach((btn) => {
-		btn.addEventListener("click", (e) => {
-			e.stopPropagation();
-			const logId = btn.closest("tr").dataset.logId; // store log id from the button
-			setupEditLogRow(logId);
-		});
-	});
 }
 
 function getCellData(row) {
@@ -76,14 +179,6 @@ function getRawDurationFromRow(row) {
 	return parseInt(row.dataset.rawDuration) || 0;
 }
 
-function rebindEditBtn(row, logId) {
-	// rebind the edit button to the row after revealing (from hidden state)
-	row.querySelector(".floating-edit-btn")?.addEventListener("click", (e) => {
-		e.stopPropagation();
-		setupEditLogRow(logId);
-	});
-}
-
 function hideAllEditButtons() {
 	document.querySelectorAll(".floating-edit-btn").forEach((btn) => {
 		btn.style.display = "none";
@@ -149,13 +244,15 @@ function buildEditedData(row, logId, values, rawDuration) {
 }
 
 export function setupEditLogRow(row_id) {
-	hideAllEditButtons(); // hide all edit buttons to prevent multiple edits at once
 	const row = document.querySelector(`tr[data-log-id="${row_id}"]`); // find the row with the given ID
 	if (!row) return console.error(`Row with ID ${row_id} not found`);
 
 	const logId = row.dataset.logId;
 	if (!logId) return console.error(`Log ID not found for row ${row_id}`);
 
+	hideAllEditButtons(); // hide all edit buttons to prevent multiple edits at once
+	view.editing = true; // don't recycle the row while it is being edited
+
 	const originalHTML = row.innerHTML; // store the original HTML to reset later
 
 	const { values, cellElements } = getCellData(row);
@@ -180,7 +277,6 @@ export function setupEditLogRow(row_id) {
 			e.stopPropagation();
 			// reset the row to its original state
 			row.innerHTML = originalHTML;
-			rebindEditBtn(row, logId);
 			cleanup();
 		}
 
@@ -195,7 +291,6 @@ export function setupEditLogRow(row_id) {
 				await handleLogDeletion(logId);
 			} else {
 				row.innerHTML = originalHTML;
-				rebindEditBtn(row, logId);
 			}
 			cleanup();
 		}
@@ -213,7 +308,6 @@ export function setupEditLogRow(row_id) {
 			e.stopPropagation();
 			// reset the row to its original state
 			row.innerHTML = originalHTML;
-			rebindEditBtn(row, logId);
 			cleanup();
 		}
 
@@ -237,7 +331,6 @@ export function setupEditLogRow(row_id) {
 				await handleLogDeletion(logId);
 			} else {
 				row.innerHTML = originalHTML;
-				rebindEditBtn(row, logId);
 			}
 			cleanup();
 		}
@@ -245,6 +338,9 @@ export function setupEditLogRow(row_id) {
 
 	const cleanup = () => {
 		showAllEditButtons(); // show all edit buttons again
+		view.editing = false;
+		view.start = view.end = -1;
+		renderWindow(); // catch up with scrolling done while editing
 		const logTable = document.getElementById("log-table-body");
 		logTable.removeEventListener("click", handleTableClick); // remove the click event listener
 		document.removeEventListener("keydown", handleKeyDown); // remove the keydown event listener
@@ -9,15 +9,15 @@
  * - Extract piece and composer information from form inputs
  * - Handle both dropdown selections and manual entry
  * - Form validation and error handling
- * - State management for logs after submission
+ * - In-place state updates from the row each write returns
  * - Modal integration for form display
  */
 
-import { submitLog, fetchLogs } from "../api/index.js";
+import { submitLog } from "../api/index.js";
 import { deleteLog } from "../api/index.js";
 import { editLog } from "../api/index.js";
 import { closeLogModal } from "../modals/index.js";
-import { setLogs } from "../state/logs.js";
+import { applyLogChange, getLogs } from "../state/logs.js";
 import { renderLogs } from "../components/index.js";
 import { getLogData } from "../logic/index.js";
 
@@ -123,12 +123,8 @@ export async function handleLogSubmission() {
 
 		closeLogModal();
 
-		const { ok: updateOk, data: logs } = await fetchLogs();
-		console.log("Updated logs after submission:", logs);
-		if (updateOk) {
-			setLogs(logs);
-			renderLogs(logs);
-		}
+		// The response carries the new row; no need to refetch every log
+		if (applyLogChange(data)) renderLogs(getLogs());
 	} catch (error) {
 		console.error("Error submitting log:", error);
 		alert("An error occurred while submitting the log. Please try again.");
@@ -144,12 +140,7 @@ export async function handleLogEdit(editData, logNumber) {
 			return;
 		}
 
-		const { ok: updateOk, data: logs } = await fetchLogs();
-		console.log("Updated logs after submission:", logs);
-		if (updateOk) {
-			setLogs(logs);
-			renderLogs(logs);
-		}
+		if (applyLogChange(data)) renderLogs(getLogs());
 	} catch (error) {
 		console.error("Error editing log:", error);
 		alert("An error occurred while editing the log. Please try again.");
@@ -166,12 +157,8 @@ export async function handleLogDeletion(logNumber) {
 			return;
 		}
 
-		const { ok: updateOk, data: logs } = await fetchLogs();
-		console.log("Updated logs after deletion:", logs);
-		if (updateOk) {
-			setLogs(logs);
-			renderLogs(logs);
-		}
+		// Deletes return a tombstone ({ id, deleted: true })
+		if (applyLogChange(data)) renderLogs(getLogs());
 	} catch (error) {
 		console.error("Error deleting log:", error);
 		alert("An error occurred while deleting the log. Please try again.");
@@ -22,15 +22,15 @@ export function getLogData() {
 }
 
 export function sortLogs(logs, field, ascending = true) {
-	return [...logs].sort((a, b) => {
-		let valA = a[field],
-			valB = b[field];
-		if (field === "date") {
-			valA = new Date(valA);
-			valB = new Date(valB);
-		}
-		if (valA < valB) return ascending ? -1 : 1;
-		if (valA > valB) return ascending ? 1 : -1;
+	// Compute each key once (one Date per log) instead of per comparison
+	const keyed = logs.map((log) => ({
+		log,
+		key: field === "date" ? new Date(log[field]).getTime() : log[field],
+	}));
+	keyed.sort((a, b) => {
+		if (a.key < b.key) return ascending ? -1 : 1;
+		if (a.key > b.key) return ascending ? 1 : -1;
 		return 0;
 	});
+	return keyed.map(({ log }) => log);
 }
@@ -1,5 +1,10 @@
 import { resetPieceComposerFields } from "../forms/index.js";
-import { fetchPieces } from "../api/index.js";
+import { suggestPieces } from "../api/index.js";
+
+// Wait this long after the last keystroke before asking for suggestions
+const SUGGEST_DELAY_MS = 150;
+
+let suggestRequest = 0; // id of the latest suggestion request
 
 export function openModal(modalElement) {
 	// adds the .active class, which makes the modal visible
@@ -102,12 +107,22 @@ export function hiddenInputSetup(hiddenFields) {
 	});
 }
 
-export async function populatePieceDropdown() {
+/**
+ * Fill the piece dropdown with the user's pieces best matching a query.
+ *
+ * Only the top matches are fetched (the most recently practiced pieces for
+ * an empty query), so opening the log modal costs the same however many
+ * pieces the user has. Responses to superseded queries are ignored.
+ *
+ * @param {string} query - Text typed in the piece field
+ */
+export async function populatePieceDropdown(query = "") {
 	const dropdown = document.getElementById("pieceDropdown");
 	if (!dropdown) return;
 
-	// TODO: adjust backend logic for fetching specific log attributes
-	const { ok, data } = await fetchPieces();
+	const request = ++suggestRequest;
+	const { ok, data } = await suggestPieces(query.trim());
+	if (request !== suggestRequest) return; // a newer query is on its way
 	if (!ok) {
 		console.warn("Could not load pieces.");
 		return;
@@ -122,3 +137,18 @@ export async function populatePieceDropdown() {
 		dropdown.appendChild(option);
 	});
 }
+
+/**
+ * Refill the piece dropdown with matches while a title is typed, so an
+ * existing piece can be picked instead of creating a near-duplicate.
+ */
+export function setupPieceSuggestions() {
+	const pieceInput = document.getElementById("piece");
+	if (!pieceInput) return;
+
+	let timer = null;
+	pieceInput.addEventListener("input", () => {
+		clearTimeout(timer);
+		timer = setTimeout(() => populatePieceDropdown(pieceInput.value), SUGGEST_DELAY_MS);
+	});
+}
@@ -9,6 +9,7 @@ import {
 	setUpExitButton,
 	setUpOpenButton,
 	modalOverlayExit,
+	setupPieceSuggestions,
 } from "./modal-helper.js";
 import {
 	signupAnimateModalIn,
@@ -44,6 +45,7 @@ export function setupLogForm() {
 	if (!logForm) return;
 
 	setupPieceInputToggle();
+	setupPieceSuggestions();
 
 	logForm.addEventListener("submit", async (e) => {
 		e.preventDefault();
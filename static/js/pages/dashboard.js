@@ -6,7 +6,7 @@
  * and the various UI components to create a comprehensive dashboard experience.
  *
  * Key Responsibilities:
- * - Fetch dashboard statistics and recent logs from API
+ * - Read the dashboard data inlined in the page (or fetch it in one request)
  * - Render all charts using backend-calculated data
  * - Display practice metrics and summary statistics
  * - Set up modal interactions for user actions
@@ -19,7 +19,7 @@
  * - Metric display components for statistics
  */
 
-import { recentLogs, getDashboardStats } from "../api/index.js";
+import { getDashboardStats } from "../api/index.js";
 import { setupModalListeners } from "../modals/index.js";
 import {
 	renderRecentLogs, // Displays recent practice sessions
@@ -27,48 +27,71 @@ import {
 	setMetricText, // Updates metric display elements
 } from "../components/index.js";
 
+/**
+ * Read the dashboard data inlined in the page by the server.
+ *
+ * The page embeds the /api/dashboard/stats payload (including the recent
+ * logs) as JSON, so the dashboard can render without waiting for a request.
+ *
+ * @returns {Object|null} Dashboard data, or null if absent or unreadable
+ */
+export function readBootstrapData() {
+	const element = document.getElementById("dashboard-data");
+	if (!element) return null;
+	try {
+		return JSON.parse(element.textContent);
+	} catch {
+		return null;
+	}
+}
+
+/**
+ * Render charts, metrics and recent logs from one dashboard payload.
+ *
+ * @param {Object} data - /api/dashboard/stats payload
+ */
+function renderDashboard(data) {
+	// Render all charts using backend-calculated data
+	renderGraphs(data);
+
+	// Update dashboard metrics with practice statistics
+	setMetricText({
+		"top-instrument": data.common_instrument, // Most frequent instrument
+		"total-mins": data.total_minutes, // Lifetime total minutes
+		"total-mins-header": data.total_minutes, // Header display
+		"avg-mins": data.average_minutes, // Average per session
+		"avg-mins-header": data.average_minutes, // Header display
+		"common-piece": data.common_piece, // Most frequent piece
+	});
+
+	// Recent practice logs come with the same payload
+	renderRecentLogs(data.recent || []);
+}
+
 /**
  * Initialize dashboard when DOM is ready.
  *
- * This function runs when the page loads and coordinates all dashboard
- * initialization including API calls, chart rendering, and UI setup.
- * It uses the unified dashboard API endpoint for efficiency.
+ * The data inlined in the page is used directly; only if it is missing
+ * does the page fall back to one request to the unified dashboard endpoint.
  */
 document.addEventListener("DOMContentLoaded", async () => {
 	// Set up modal event listeners for user interactions
 	setupModalListeners();
 
 	try {
-		// Fetch data from API endpoints concurrently for better performance
-		const recentResult = await recentLogs(); // Get recent practice sessions
-		const dashboardResult = await getDashboardStats(); // Get charts + statistics
+		const inlined = readBootstrapData();
+		if (inlined) {
+			renderDashboard(inlined);
+			return;
+		}
 
-		// Handle dashboard statistics and charts
+		// No inlined data: one request returns charts, statistics and recent logs
+		const dashboardResult = await getDashboardStats();
 		if (dashboardResult.ok && dashboardResult.data) {
-			const data = dashboardResult.data;
-
-			// Render all charts using backend-calculated data
-			renderGraphs(data);
-
-			// Update dashboard metrics with practice statistics
-			setMetricText({
-				"top-instrument": data.common_instrument, // Most frequent instrument
-				"total-mins": data.total_minutes, // Lifetime total minutes
-				"total-mins-header": data.total_minutes, // Header display
-				"avg-mins": data.average_minutes, // Average per session
-				"avg-mins-header": data.average_minutes, // Header display
-				"common-piece": data.common_piece, // Most frequent piece
-			});
+			renderDashboard(dashboardResult.data);
 		} else {
 			console.error("Failed to fetch dashboard data:", dashboardResult);
 		}
-
-		// Handle recent practice logs display
-		if (recentResult.ok) {
-			renderRecentLogs(recentResult.data);
-		} else {
-			console.error("Failed to fetch recent logs:", recentResult);
-		}
 	} catch (err) {
 		// Log any unexpected errors during dashboard initialization
 		console.error("Error initializing dashboard:", err);
@@ -1,24 +1,43 @@
 // static/js/log-core/log.js
 import { setupModalListeners, setupLogForm } from "../modals/index.js";
-import { fetchLogs } from "../api/index.js";
-import { setLogs, getLogs } from "../state/logs.js";
+import { fetchLogChanges } from "../api/index.js";
+import {
+	applyLogDelta,
+	getDataVersion,
+	getLogs,
+	loadStoredLogs,
+} from "../state/logs.js";
 import { sortLogs } from "../logic/index.js";
 import { renderLogs } from "../components/index.js";
 
-document.addEventListener("DOMContentLoaded", async () => {
-	setupModalListeners();
-	setupLogForm();
-
-	// Fetch and display logs on page load
+// Bring the stored log copy up to date, transferring only what changed
+async function syncLogs() {
 	try {
-		const { ok, data } = await fetchLogs();
-		if (ok) {
-			setLogs(data);
-			renderLogs(data);
-		} else console.error("Failed to load logs.");
+		let { ok, data } = await fetchLogChanges(getDataVersion());
+		if (ok && !applyLogDelta(data)) {
+			// The stored copy belongs to another account: start over
+			({ ok, data } = await fetchLogChanges(0));
+			if (ok) applyLogDelta(data);
+		}
+		if (ok) renderLogs(getLogs());
+		else console.error("Failed to load logs.");
 	} catch (err) {
 		console.error("Error fetching logs:", err);
 	}
+}
+
+document.addEventListener("DOMContentLoaded", async () => {
+	setupModalListeners();
+	setupLogForm();
+
+	// Show the copy from the last visit right away, then fetch the delta
+	if (loadStoredLogs()) renderLogs(getLogs());
+	await syncLogs();
+
+	// Catch up on changes from other tabs/devices when the page is shown again
+	document.addEventListener("visibilitychange", () => {
+		if (document.visibilityState === "visible") syncLogs();
+	});
 
 	document.querySelectorAll("[data-sort]").forEach((header) => {
 		header.addEventListener("click", () => {
@@ -1,4 +1,26 @@
+/**
+ * Practice Log State for Practice Tracker
+ *
+ * Holds the logs shown on the log page and the user's data version they
+ * reflect, and persists both in localStorage. A page load shows the stored
+ * copy and asks /api/logs/changes only for what changed since its version
+ * (applyLogDelta). Log writes return the written row (or a tombstone for
+ * deletes) with the new data version, which applyLogChange patches in place.
+ *
+ * Key Functions:
+ * - getLogs / setLogs: read or replace the whole list
+ * - upsertLog / removeLog: patch one log, keyed by its per-user number (id)
+ * - applyLogChange: apply a write response ({ log, data_version })
+ * - applyLogDelta: apply a /api/logs/changes response
+ * - loadStoredLogs: restore the copy saved by a previous visit
+ * - getDataVersion / setDataVersion: the data version the state reflects
+ */
+
+const STORAGE_KEY = "subwoofer:logs";
+
 let logsData = [];
+let dataVersion = 0;
+let ownerId = null; // user the copy belongs to, from the last delta
 
 export function getLogs() {
     return logsData;
@@ -6,4 +28,118 @@ export function getLogs() {
 
 export function setLogs(data) {
     logsData = data;
-}
\ No newline at end of file
+}
+
+export function getDataVersion() {
+    return dataVersion;
+}
+
+export function setDataVersion(version) {
+    dataVersion = version || 0;
+}
+
+/**
+ * Replace the log with the same id, or insert it keeping newest-first order.
+ *
+ * @param {Object} log - Serialized log as returned by the API
+ */
+export function upsertLog(log) {
+    if (!Array.isArray(logsData)) logsData = [];
+
+    const index = logsData.findIndex((existing) => existing.id === log.id);
+    if (index !== -1) {
+        logsData[index] = log;
+        return;
+    }
+
+    // Logs are listed most recent first; insert before the first older one
+    const time = Date.parse(log.utc_date);
+    const position = logsData.findIndex((existing) => Date.parse(existing.utc_date) < time);
+    if (position === -1) logsData.push(log);
+    else logsData.splice(position, 0, log);
+}
+
+/**
+ * Drop the log with the given id, if present.
+ *
+ * @param {number} logNumber - Per-user log number (the serialized id)
+ */
+export function removeLog(logNumber) {
+    if (!Array.isArray(logsData)) return;
+    const index = logsData.findIndex((existing) => existing.id === logNumber);
+    if (index !== -1) logsData.splice(index, 1);
+}
+
+/**
+ * Apply the response of a log write to the state.
+ *
+ * The stored version only advances when the write directly follows it;
+ * after a gap (another tab wrote in between) it stays put, so the next
+ * delta sync still fetches the missed changes.
+ *
+ * @param {Object} change - { log, data_version } where log is a serialized
+ *   row or a { id, deleted: true } tombstone
+ * @returns {boolean} False if the state already reflects the write
+ */
+export function applyLogChange({ log, data_version: version }) {
+    if (!log) return false;
+    if (version !== undefined && version <= dataVersion) return false; // already synced
+
+    if (log.deleted) removeLog(log.id);
+    else upsertLog(log);
+
+    if (version === dataVersion + 1) dataVersion = version;
+    saveLogs();
+    return true;
+}
+
+/**
+ * Apply a /api/logs/changes response to the state.
+ *
+ * @param {Object} delta - { user_id, version, full, logs, deleted }
+ * @returns {boolean} False if the delta was computed for another user's
+ *   copy; the caller should then request a full sync (since=0)
+ */
+export function applyLogDelta({ user_id: userId, version, full, logs, deleted }) {
+    if (full) {
+        logsData = logs; // already newest first
+    } else {
+        if (userId !== ownerId) return false;
+        deleted.forEach((logNumber) => removeLog(logNumber)); // numbers can be reused
+        logs.forEach((log) => upsertLog(log));
+    }
+
+    ownerId = userId;
+    dataVersion = version;
+    saveLogs();
+    return true;
+}
+
+/**
+ * Restore the copy saved by a previous visit, if any.
+ *
+ * @returns {boolean} True if a stored copy was loaded
+ */
+export function loadStoredLogs() {
+    try {
+        const stored = JSON.parse(localStorage.getItem(STORAGE_KEY));
+        if (!stored || !Array.isArray(stored.logs)) return false;
+        logsData = stored.logs;
+        dataVersion = stored.version || 0;
+        ownerId = stored.userId ?? null;
+        return true;
+    } catch {
+        return false; // unavailable storage or a corrupt entry: start empty
+    }
+}
+
+function saveLogs() {
+    try {
+        localStorage.setItem(
+            STORAGE_KEY,
+            JSON.stringify({ userId: ownerId, version: dataVersion, logs: logsData })
+        );
+    } catch {
+        // Storage full or disabled; the copy is only an optimization
+    }
+}
@@ -1,17 +1,30 @@
 import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
 from app import create_app, db
-from app.models import User
+from app.models import Piece, PracticeLog, User
+from app.utils.changes import bump_data_version
+from app.utils.jobs import drain, enqueue
+from app.utils.leaderboard import rebuild_leaderboards
+from app.utils.metrics import capture_queries
+from app.utils.rollups import enqueue_full_rebuild
+from app.utils.streaks import RECOMPUTE_JOB
 
 @pytest.fixture
 def app():
-    app = create_app()
-    app.config.update({
+    app = create_app({
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
         "SQLALCHEMY_TRACK_MODIFICATIONS": False,
         "WTF_CSRF_ENABLED": False,
         "LOGIN_DISABLED": False,
         "SECRET_KEY": "testsecret",
+        "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",  # Cheap hashing keeps the suite fast
+        "ANALYTICS_PROCESSES": 0,                      # Compute reports inline
+        "JOB_WORKERS": 0,                              # Run jobs explicitly with drain()
     })
     with app.app_context():
         db.create_all()
@@ -46,3 +59,66 @@ def create_test_user(username="testuser", password="testpass"):
 
 def login_test_user(client, username="testuser", password="testpass"):
     client.post("/login", json={"username": username, "password": password})
+
+def seed_logs(user, count, pieces=25, start=None, derived=True):
+    """
+    Bulk-insert `count` hourly logs for `user`, spread across `pieces` pieces.
+
+    The insert bypasses the ORM flush listeners, so with `derived` set the
+    state they maintain is brought in line afterwards: piece totals, data
+    and change versions, rollups, streak and leaderboard scores all agree
+    with the seeded logs. Without it the logs look like a raw bulk import.
+    """
+    start = start or datetime.now(timezone.utc) - timedelta(hours=count)
+    instruments = ["piano", "altoSax", "violin", "guitar"]
+    logs = [
+        {
+            "user_id": user.id,
+            "user_log_number": i + 1,
+            "utc_timestamp": start + timedelta(hours=i),
+            "instrument": instruments[i % len(instruments)],
+            "duration": 15 + i % 45,
+            "notes": f"seeded log {i}",
+        }
+        for i in range(count)
+    ]
+
+    piece_rows = [
+        Piece(title=f"Seed Piece {i}", composer="Seeder", user_id=user.id, log_time=0)
+        for i in range(pieces)
+    ]
+    if derived:
+        for i, log in enumerate(logs):
+            piece = piece_rows[i % pieces]
+            piece.log_time += log["duration"]
+            piece.last_practiced = log["utc_timestamp"].replace(tzinfo=None)
+    db.session.add_all(piece_rows)
+    db.session.flush()
+
+    # One version bump for the whole batch, as a single flush would do
+    version = user.data_version + 1
+    for i, log in enumerate(logs):
+        log["piece_id"] = piece_rows[i % pieces].id
+        if derived:
+            log["change_version"] = version
+    db.session.execute(insert(PracticeLog), logs)
+    if not derived:
+        db.session.commit()
+        return
+
+    bump_data_version([user.id])
+    db.session.expire(user, ["data_version"])
+
+    enqueue_full_rebuild(user.id)
+    enqueue(RECOMPUTE_JOB, user.id)
+    db.session.commit()
+    drain()
+    rebuild_leaderboards()
+
+@contextmanager
+def assert_max_queries(limit):
+    """Fail if the wrapped block executes more than `limit` SQL statements."""
+    with capture_queries() as queries:
+        yield queries
+    statements = "\n".join(statement for statement, _ in queries)
+    assert len(queries) <= limit, f"{len(queries)} queries (budget {limit}):\n{statements}"
@@ -10,6 +10,7 @@ import {
 	fetchLogs,
 	recentLogs,
 	fetchPieces,
+	suggestPieces,
 } from "../../static/js/api/logs.js";
 import * as apiHelper from "../../static/js/api/api-helper.js";
 
@@ -233,32 +234,40 @@ describe("Logs API", () => {
 
 	describe("fetchPieces", () => {
 		test("calls fetchJson with correct endpoint for pieces stats", async () => {
-			const mockPieces = [
-				{
-					title: "Moonlight Sonata",
-					composer: "Beethoven",
-					total_time: 180,
-					log_count: 4,
-				},
-				{
-					title: "Classical Gas",
-					composer: "Williams",
-					total_time: 90,
-					log_count: 2,
-				},
-			];
+			const mockPieces = {
+				items: [
+					{ title: "Classical Gas", composer: "Williams", minutes: 90, sessions: 2 },
+					{ title: "Moonlight Sonata", composer: "Beethoven", minutes: 180, sessions: 4 },
+				],
+				page: 1,
+				per_page: 50,
+				total: 2,
+				pages: 1,
+			};
 
 			const mockResponse = { ok: true, status: 200, data: mockPieces };
 			apiHelper.fetchJson.mockResolvedValue(mockResponse);
 
 			const result = await fetchPieces();
 
-			expect(apiHelper.fetchJson).toHaveBeenCalledWith("/api/stats/pieces");
+			expect(apiHelper.fetchJson).toHaveBeenCalledWith(
+				"/api/pieces?sort=title&order=asc&page=1&per_page=50"
+			);
 			expect(result).toEqual(mockResponse);
 		});
 
+		test("passes sorting and paging options", async () => {
+			apiHelper.fetchJson.mockResolvedValue({ ok: true, data: { items: [] } });
+
+			await fetchPieces({ sort: "minutes", order: "desc", page: 3, perPage: 20 });
+
+			expect(apiHelper.fetchJson).toHaveBeenCalledWith(
+				"/api/pieces?sort=minutes&order=desc&page=3&per_page=20"
+			);
+		});
+
 		test("handles empty pieces response", async () => {
-			const mockResponse = { ok: true, status: 200, data: [] };
+			const mockResponse = { ok: true, status: 200, data: { items: [], total: 0 } };
 			apiHelper.fetchJson.mockResolvedValue(mockResponse);
 
 			const result = await fetchPieces();
@@ -280,6 +289,28 @@ describe("Logs API", () => {
 		});
 	});
 
+	describe("suggestPieces", () => {
+		test("calls fetchJson with the encoded query and limit", async () => {
+			const mockResponse = { ok: true, status: 200, data: [] };
+			apiHelper.fetchJson.mockResolvedValue(mockResponse);
+
+			const result = await suggestPieces("für el", 5);
+
+			expect(apiHelper.fetchJson).toHaveBeenCalledWith(
+				"/api/pieces/suggest?q=f%C3%BCr%20el&limit=5"
+			);
+			expect(result).toEqual(mockResponse);
+		});
+
+		test("defaults to the ten most recent pieces", async () => {
+			apiHelper.fetchJson.mockResolvedValue({ ok: true, data: [] });
+
+			await suggestPieces();
+
+			expect(apiHelper.fetchJson).toHaveBeenCalledWith("/api/pieces/suggest?q=&limit=10");
+		});
+	});
+
 	describe("Integration Tests", () => {
 		test("all functions return promises", () => {
 			const logData = { instrument: "piano", duration: 30 };
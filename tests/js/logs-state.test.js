@@ -5,7 +5,15 @@
  * the current logs array in the application.
  */
 
-import { getLogs, setLogs } from "../../static/js/state/logs.js";
+import {
+	applyLogChange,
+	applyLogDelta,
+	getDataVersion,
+	getLogs,
+	loadStoredLogs,
+	setDataVersion,
+	setLogs,
+} from "../../static/js/state/logs.js";
 
 describe("Logs State Management", () => {
 	describe("getLogs and setLogs", () => {
@@ -126,4 +134,68 @@ describe("Logs State Management", () => {
 			expect(third).toEqual(testLogs);
 		});
 	});
+
+	describe("applyLogChange", () => {
+		const older = { id: 1, utc_date: "Wed, 01 Jan 2025 10:00:00 GMT", duration: 30 };
+		const newer = { id: 2, utc_date: "Fri, 03 Jan 2025 10:00:00 GMT", duration: 20 };
+
+		beforeEach(() => {
+			setLogs([newer, older]);
+			setDataVersion(5);
+		});
+
+		test("inserts a new log in newest-first order", () => {
+			const middle = { id: 3, utc_date: "Thu, 02 Jan 2025 10:00:00 GMT", duration: 10 };
+			expect(applyLogChange({ log: middle, data_version: 6 })).toBe(true);
+			expect(getLogs().map((log) => log.id)).toEqual([2, 3, 1]);
+			expect(getDataVersion()).toBe(6);
+		});
+
+		test("replaces an edited log in place", () => {
+			applyLogChange({ log: { ...older, duration: 45 }, data_version: 6 });
+			expect(getLogs()).toHaveLength(2);
+			expect(getLogs()[1].duration).toBe(45);
+		});
+
+		test("removes a log for a tombstone", () => {
+			applyLogChange({ log: { id: 2, deleted: true }, data_version: 6 });
+			expect(getLogs().map((log) => log.id)).toEqual([1]);
+		});
+
+		test("ignores responses older than the state", () => {
+			expect(applyLogChange({ log: { id: 2, deleted: true }, data_version: 4 })).toBe(false);
+			expect(getLogs()).toHaveLength(2);
+			expect(getDataVersion()).toBe(5);
+		});
+	});
+
+	describe("applyLogDelta", () => {
+		const log = (id, day) => ({ id, utc_date: `Wed, ${day} Jan 2025 10:00:00 GMT` });
+
+		beforeEach(() => localStorage.clear());
+
+		test("replaces the copy on a full sync and persists it", () => {
+			applyLogDelta({ user_id: 7, version: 3, full: true, logs: [log(2, "02"), log(1, "01")], deleted: [] });
+			expect(getLogs().map((entry) => entry.id)).toEqual([2, 1]);
+
+			setLogs([]);
+			setDataVersion(0);
+			expect(loadStoredLogs()).toBe(true);
+			expect(getLogs().map((entry) => entry.id)).toEqual([2, 1]);
+			expect(getDataVersion()).toBe(3);
+		});
+
+		test("applies deletes before upserts so reused numbers survive", () => {
+			applyLogDelta({ user_id: 7, version: 3, full: true, logs: [log(2, "02"), log(1, "01")], deleted: [] });
+			applyLogDelta({ user_id: 7, version: 6, full: false, logs: [log(2, "05")], deleted: [2] });
+			expect(getLogs().map((entry) => entry.utc_date)).toEqual([log(2, "05").utc_date, log(1, "01").utc_date]);
+			expect(getDataVersion()).toBe(6);
+		});
+
+		test("rejects a delta computed for another user's copy", () => {
+			applyLogDelta({ user_id: 7, version: 3, full: true, logs: [], deleted: [] });
+			expect(applyLogDelta({ user_id: 8, version: 9, full: false, logs: [], deleted: [] })).toBe(false);
+			expect(getDataVersion()).toBe(3);
+		});
+	});
 });
@@ -349,8 +349,8 @@ describe("renderLogs", () => {
 	});
 
 	describe("Large Data Sets", () => {
-		test("handles large number of logs efficiently", () => {
-			const logs = Array.from({ length: 1000 }, (_, i) => ({
+		const manyLogs = (count) =>
+			Array.from({ length: count }, (_, i) => ({
 				id: i + 1,
 				local_date: `2025-01-${((i % 28) + 1).toString().padStart(2, "0")}`,
 				duration: (i % 120) + 1,
@@ -360,15 +360,33 @@ describe("renderLogs", () => {
 				notes: `Practice notes for log ${i + 1}`,
 			}));
 
+		test("renders only a window of rows for long histories", () => {
+			const logs = manyLogs(10000);
+
 			const startTime = performance.now();
 			renderLogs(logs);
 			const endTime = performance.now();
 
-			// Should handle 1000 logs reasonably (under 1000ms is acceptable for DOM operations)
-			expect(endTime - startTime).toBeLessThan(1000);
+			// Only the visible rows plus overscan are in the DOM
+			const rows = tableBody.querySelectorAll("tr:not(.virtual-spacer)");
+			expect(rows.length).toBeGreaterThan(0);
+			expect(rows.length).toBeLessThan(100);
+			expect(rows[0].querySelectorAll("td")[0].textContent).toBe("1");
+			expect(endTime - startTime).toBeLessThan(100);
 
-			const rows = tableBody.querySelectorAll("tr");
-			expect(rows).toHaveLength(1000);
+			// A spacer stands in for the rows below the window
+			expect(tableBody.querySelector(".virtual-spacer")).not.toBeNull();
+		});
+
+		test("reuses row elements across renders", () => {
+			renderLogs(manyLogs(5000));
+			const firstRow = tableBody.querySelector("tr:not(.virtual-spacer)");
+
+			renderLogs([...manyLogs(5000)].reverse()); // e.g. after a sort click
+			const rerendered = tableBody.querySelector("tr:not(.virtual-spacer)");
+
+			expect(rerendered).toBe(firstRow);
+			expect(rerendered.querySelectorAll("td")[0].textContent).toBe("5000");
 		});
 	});
 
@@ -0,0 +1,175 @@
+"""
+Analytics Tests for Practice Tracker Application
+
+This module tests the report kernels, the per-user data version that keys
+their cache, the process-pool executor and the report endpoints.
+"""
+
+from datetime import datetime, timezone
+
+from .conftest import create_test_user, login_test_user, seed_logs
+from app import db
+from app.models import Piece, PracticeLog
+from app.utils.analytics import (
+    AnalyticsExecutor,
+    AnalyticsTimeout,
+    cumulative_series,
+    instrument_breakdown,
+    year_in_review,
+)
+from app.utils.changes import get_data_version
+
+
+def ts(*args):
+    """UTC epoch seconds for a datetime."""
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+COLUMNS = {
+    # 2024-12-31 23:30 UTC is still Dec 31 in New York; 2025-01-01 04:30 UTC is
+    # Dec 31 23:30 in New York
+    "timestamps": [ts(2024, 12, 31, 23, 30), ts(2025, 1, 1, 4, 30), ts(2025, 1, 3, 18, 0)],
+    "durations": [30, 20, 45],
+    "instruments": ["piano", "violin", "piano"],
+    "piece_ids": [1, None, 2],
+}
+
+
+def test_cumulative_series_groups_by_local_day():
+    """Test that the series runs from the first local day to today."""
+    result = cumulative_series(COLUMNS, "America/New_York", "2025-01-04")
+
+    assert result["x_vals"] == ["2024-12-31", "2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"]
+    assert result["y_vals"] == [50, 50, 50, 95, 95]
+    assert result["total_mins"] == 95
+
+
+def test_year_in_review_uses_local_year():
+    """Test that logs are attributed to the year in the user's timezone."""
+    review = year_in_review(COLUMNS, "America/New_York", 2025)
+
+    assert review["sessions"] == 1
+    assert review["total_minutes"] == 45
+    assert review["busiest_day"] == {"date": "2025-01-03", "minutes": 45}
+    assert review["monthly_minutes"][0] == 45
+    assert review["top_piece_id"] == 2
+
+    assert year_in_review(COLUMNS, "America/New_York", 2024)["total_minutes"] == 50
+
+
+def test_instrument_breakdown_orders_by_minutes():
+    """Test minutes, sessions and share per instrument."""
+    assert instrument_breakdown(COLUMNS) == [
+        {"instrument": "piano", "minutes": 75, "sessions": 2, "share": 0.7895},
+        {"instrument": "violin", "minutes": 20, "sessions": 1, "share": 0.2105},
+    ]
+
+
+def test_log_writes_bump_data_version(app):
+    """Test that inserting, editing and deleting logs bumps data_version."""
+    user = create_test_user()
+    version = get_data_version(user.id)
+
+    log = PracticeLog(user_id=user.id, user_log_number=1, instrument="piano", duration=10,
+                      utc_timestamp=datetime.now(timezone.utc))
+    db.session.add(log)
+    db.session.commit()
+    assert get_data_version(user.id) == version + 1
+
+    log.duration = 15
+    db.session.commit()
+    assert get_data_version(user.id) == version + 2
+
+    db.session.delete(log)
+    db.session.commit()
+    assert get_data_version(user.id) == version + 3
+
+    # Unmodified objects do not count as changes
+    db.session.add(Piece(user_id=user.id, title="Etude", log_time=0))
+    db.session.commit()
+    assert get_data_version(user.id) == version + 4
+    assert user.data_version == version + 4
+
+
+def test_executor_caches_by_key():
+    """Test that a cached report is returned without reloading columns."""
+    executor = AnalyticsExecutor(processes=0)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return (COLUMNS,)
+
+    first = executor.run((1, 0, "instruments"), instrument_breakdown, load)
+    second = executor.run((1, 0, "instruments"), instrument_breakdown, load)
+    assert first == second
+    assert loads == [1]
+
+    executor.run((1, 1, "instruments"), instrument_breakdown, load)
+    assert loads == [1, 1]
+
+
+def test_executor_runs_in_worker_process(app):
+    """Test that reports computed in the process pool match inline results."""
+    executor = AnalyticsExecutor(processes=1, timeout=60)
+    try:
+        result = executor.run((1, 0, "instruments"), instrument_breakdown, lambda: (COLUMNS,))
+    finally:
+        executor.shutdown()
+    assert result == instrument_breakdown(COLUMNS)
+
+
+def test_executor_falls_back_inline_when_pool_unavailable(app, monkeypatch):
+    """Test that a pool that cannot start does not fail the request."""
+    executor = AnalyticsExecutor(processes=1)
+
+    def broken():
+        raise OSError("cannot start worker processes")
+
+    monkeypatch.setattr(executor, "_get_pool", broken)
+    result = executor.run((1, 0, "instruments"), instrument_breakdown, lambda: (COLUMNS,))
+    assert result == instrument_breakdown(COLUMNS)
+
+
+def test_report_timeout_returns_503(app, client, monkeypatch):
+    """Test that a report over ANALYTICS_TIMEOUT is served as a retryable 503."""
+    create_test_user()
+    login_test_user(client)
+
+    def too_slow(*args):
+        raise AnalyticsTimeout("instrument_breakdown exceeded 10s")
+
+    monkeypatch.setattr(app.extensions["analytics"], "run", too_slow)
+    resp = client.get("/api/stats/instruments")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "2"
+
+
+def test_year_in_review_endpoint(app, client):
+    """Test the year-in-review report and its year validation."""
+    user = create_test_user()
+    seed_logs(user, 48, pieces=2, start=datetime(2024, 6, 1, 12, tzinfo=timezone.utc))
+    login_test_user(client)
+
+    resp = client.get("/api/stats/year-in-review?year=2024")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["year"] == 2024
+    assert data["sessions"] == 48
+    assert data["top_piece"] in {"Seed Piece 0", "Seed Piece 1"}
+
+    assert client.get("/api/stats/year-in-review?year=2023").get_json()["sessions"] == 0
+    assert client.get("/api/stats/year-in-review?year=20000").status_code == 400
+
+
+def test_instrument_endpoint_reflects_new_logs(app, client):
+    """Test that a new log invalidates the cached breakdown."""
+    create_test_user()
+    login_test_user(client)
+    client.post("/api/logs", json={"utc_timestamp": "2025-01-01T10:00:00", "instrument": "piano", "duration": 30})
+    assert client.get("/api/stats/instruments").get_json()[0]["minutes"] == 30
+
+    client.post("/api/logs", json={"utc_timestamp": "2025-01-02T10:00:00", "instrument": "piano", "duration": 15})
+    data = client.get("/api/stats/instruments").get_json()
+    assert data[0]["minutes"] == 45
+    assert data[0]["sessions"] == 2
@@ -5,10 +5,15 @@ This module tests the dashboard functionality including the main dashboard page,
 dashboard statistics API endpoint, and data calculations performed server-side.
 """
 
+import json
+import re
 from datetime import datetime, timezone, timedelta
-from .conftest import create_test_user, login_test_user
+
+from .conftest import assert_max_queries, create_test_user, login_test_user
 from app.models import PracticeLog, Piece
 from app.utils import add_to_db
+from app.utils.dashboard import SECTIONS, dashboard_section
+from app.utils.metrics import capture_queries
 
 
 def test_dashboard_page_renders(client):
@@ -228,3 +233,120 @@ def test_dashboard_api_response_structure(client):
     assert isinstance(data["daily"]["target"], int)
     assert isinstance(data["common_instrument"], (str, type(None)))
     assert isinstance(data["common_piece"], (str, type(None)))
+
+
+def test_dashboard_stats_include_recent_logs(client):
+    """Test that the stats payload carries the same recent logs as /api/recent-logs."""
+    create_test_user()
+    login_test_user(client)
+    start = datetime(2025, 1, 1, 12)
+    for n in range(8):
+        client.post("/api/logs", json={
+            "utc_timestamp": (start + timedelta(days=(n * 5) % 8)).isoformat(),  # out of order
+            "instrument": "piano",
+            "duration": 10 + n,
+            "piece": f"Piece {n % 3}",
+            "composer": "Someone",
+        })
+
+    data = client.get("/api/dashboard/stats").get_json()
+    assert data["recent"] == client.get("/api/recent-logs").get_json()
+    assert len(data["recent"]) == 5
+
+
+def test_dashboard_page_inlines_stats(client):
+    """Test that the dashboard page embeds the stats payload as JSON."""
+    create_test_user()
+    login_test_user(client)
+    client.post("/api/logs", json={
+        "utc_timestamp": "2025-01-01T12:00:00",
+        "instrument": "piano",
+        "duration": 25,
+        "notes": "</script><script>alert(1)</script>",
+    })
+
+    html = client.get("/dashboard").get_data(as_text=True)
+    match = re.search(r'<script type="application/json" id="dashboard-data">(.*?)</script>', html, re.S)
+    assert match, "dashboard data not inlined"
+    inlined = json.loads(match.group(1))
+    assert inlined == client.get("/api/dashboard/stats").get_json()
+    assert inlined["recent"][0]["notes"] == "</script><script>alert(1)</script>"
+
+
+def post_log(client, minutes, when=None):
+    client.post("/api/logs", json={
+        "utc_timestamp": (when or datetime.now(timezone.utc).replace(tzinfo=None)).isoformat(),
+        "instrument": "piano",
+        "duration": minutes,
+    })
+
+
+def test_dashboard_stats_fields_select_sections(client):
+    """Test that fields= returns only the named sections."""
+    create_test_user()
+    login_test_user(client)
+    post_log(client, 30)
+
+    data = client.get("/api/dashboard/stats?fields=total_minutes,daily").get_json()
+    assert set(data) == {"total_minutes", "daily"}
+    assert data["total_minutes"] == 30
+    assert set(client.get("/api/dashboard/stats").get_json()) == set(SECTIONS)
+
+
+def test_dashboard_stats_rejects_unknown_fields(client):
+    """Test 400 for a section that does not exist."""
+    create_test_user()
+    login_test_user(client)
+    resp = client.get("/api/dashboard/stats?fields=weekly,nope")
+    assert resp.status_code == 400
+    assert "nope" in resp.get_json()["message"]
+
+
+def test_dashboard_sections_are_cached_per_data_version(client):
+    """Test that log-derived sections come from the cache until the next write."""
+    create_test_user()
+    login_test_user(client)
+    post_log(client, 30)
+
+    url = "/api/dashboard/stats?fields=total_minutes,average_minutes,weekly,recent"
+    first = client.get(url).get_json()
+    with assert_max_queries(1):  # the data version only
+        assert client.get(url).get_json() == first
+
+    post_log(client, 20)
+    assert client.get(url).get_json()["total_minutes"] == 50
+
+
+def test_warm_dashboard_does_not_load_the_whole_history(client):
+    """Test that once sections are cached, daily totals come from a bounded read."""
+    create_test_user()
+    login_test_user(client)
+    post_log(client, 30)
+    post_log(client, 20, when=datetime(2020, 1, 1, 12))
+
+    assert client.get("/api/dashboard/stats").get_json()["daily"]["total_today"] == 30
+    with capture_queries() as queries:
+        assert client.get("/api/dashboard/stats").get_json()["daily"]["total_today"] == 30
+
+    log_reads = [statement for statement, _ in queries if "FROM practice_log" in statement]
+    assert log_reads and all("utc_timestamp >=" in statement for statement in log_reads)
+
+
+def test_dashboard_sections_run_only_when_requested(client):
+    """Test that a registered section costs nothing for clients that do not ask for it."""
+    create_test_user()
+    login_test_user(client)
+    calls = []
+
+    @dashboard_section("probe", cache=False)
+    def probe(ctx):
+        calls.append(ctx.user_id)
+        return len(ctx.all_logs)
+
+    try:
+        client.get("/api/dashboard/stats?fields=total_minutes")
+        assert calls == []
+        assert client.get("/api/dashboard/stats?fields=probe").get_json() == {"probe": 0}
+        assert len(calls) == 1
+    finally:
+        SECTIONS.pop("probe")
@@ -342,9 +342,9 @@ def test_empty_database_queries(client):
     assert resp1.status_code == 200
     assert resp1.get_json() == []
     
-    resp2 = client.get("/api/stats/pieces")
+    resp2 = client.get("/api/pieces")
     assert resp2.status_code == 200
-    assert resp2.get_json() == []
+    assert resp2.get_json()["items"] == []
     
     resp3 = client.get("/api/dashboard/stats")
     assert resp3.status_code == 200
@@ -0,0 +1,161 @@
+"""
+Goal Tests for Practice Tracker Application
+
+This module tests goal windows, the goal API, progress maintained by log
+writes (checked against recomputation), window rollover and the dashboard
+gauge target.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from .conftest import assert_max_queries, create_test_user, login_test_user
+from app import db
+from app.models import Goal, Piece, PracticeLog
+from app.utils.goals import DEFAULT_DAILY_TARGET, get_goals, window_bounds
+
+
+def test_window_bounds():
+    """Test daily, Monday-based weekly and calendar monthly windows."""
+    wednesday = date(2025, 12, 17)
+    assert window_bounds("daily", wednesday) == (wednesday, date(2025, 12, 18))
+    assert window_bounds("weekly", wednesday) == (date(2025, 12, 15), date(2025, 12, 22))
+    assert window_bounds("monthly", wednesday) == (date(2025, 12, 1), date(2026, 1, 1))
+
+
+def log_now(client, duration, instrument="piano", piece=None, days_ago=0):
+    """Post a log at local noon `days_ago` days before today."""
+    tz = ZoneInfo("America/New_York")
+    local = datetime.combine(datetime.now(tz).date() - timedelta(days=days_ago), time(12, 0), tzinfo=tz)
+    payload = {
+        "utc_timestamp": local.astimezone(timezone.utc).replace(tzinfo=None).isoformat(),
+        "instrument": instrument,
+        "duration": duration,
+    }
+    if piece:
+        payload.update(piece=piece, composer="Composer")
+    client.post("/api/logs", json=payload)
+
+
+def recomputed(user, goal_id):
+    """Progress of a goal recomputed from scratch."""
+    goal = db.session.get(Goal, goal_id)
+    goal.window_start = None
+    db.session.commit()
+    return next(g for g in get_goals(user.id, user.timezone) if g["id"] == goal_id)["progress_minutes"]
+
+
+def test_create_goal_counts_existing_logs(app, client):
+    """Test that a new goal starts with the window's matching minutes."""
+    create_test_user()
+    login_test_user(client)
+    log_now(client, 30)
+    log_now(client, 15, instrument="violin")
+
+    resp = client.post("/api/goals", json={"period": "daily", "target_minutes": 40})
+    assert resp.status_code == 201
+    goal = resp.get_json()
+    assert goal["progress_minutes"] == 45
+    assert goal["complete"] is True
+
+    scoped = client.post("/api/goals", json={
+        "period": "monthly", "target_minutes": 600, "scope": "instrument", "scope_key": "violin",
+    }).get_json()
+    assert scoped["progress_minutes"] == 15
+    assert scoped["complete"] is False
+
+
+def test_log_writes_update_only_matching_goals(app, client):
+    """Test add, edit and delete against recomputed progress."""
+    user = create_test_user()
+    login_test_user(client)
+    log_now(client, 10, piece="Etude")
+    piece_id = Piece.query.filter_by(title="Etude").one().id
+
+    overall = client.post("/api/goals", json={"period": "weekly", "target_minutes": 300}).get_json()["id"]
+    violin = client.post("/api/goals", json={
+        "period": "weekly", "target_minutes": 100, "scope": "instrument", "scope_key": "violin",
+    }).get_json()["id"]
+    etude = client.post("/api/goals", json={
+        "period": "daily", "target_minutes": 20, "scope": "piece", "scope_key": piece_id,
+    }).get_json()["id"]
+
+    log_now(client, 25, instrument="violin")
+    log_now(client, 5, piece="Etude")
+    log_now(client, 40, days_ago=40)  # Outside every window
+
+    progress = {g["id"]: g["progress_minutes"] for g in get_goals(user.id, user.timezone)}
+    assert progress == {overall: 40, violin: 25, etude: 15}
+
+    # Edit the violin log's duration, then delete the first Etude log
+    client.patch("/api/edit-log/2", json={"duration": 35})
+    client.delete("/api/delete-log/1", json={"logNumber": 1})
+
+    progress = {g["id"]: g["progress_minutes"] for g in get_goals(user.id, user.timezone)}
+    assert progress == {overall: 40, violin: 35, etude: 5}
+    for goal_id, minutes in progress.items():
+        assert recomputed(user, goal_id) == minutes
+
+
+def test_stale_window_is_rebuilt_on_read(app, client):
+    """Test that a goal last touched in an earlier window starts over."""
+    user = create_test_user()
+    login_test_user(client)
+    log_now(client, 30, days_ago=1)
+    goal_id = client.post("/api/goals", json={"period": "daily", "target_minutes": 20}).get_json()["id"]
+
+    # Pretend the goal was last evaluated yesterday
+    goal = db.session.get(Goal, goal_id)
+    goal.window_start = goal.window_start - timedelta(days=1)
+    goal.progress_minutes = 30
+    db.session.commit()
+
+    [result] = get_goals(user.id, user.timezone)
+    assert result["progress_minutes"] == 0
+    assert db.session.get(Goal, goal_id).window_start.isoformat() == result["window_start"]
+
+
+def test_goal_validation_and_delete(app, client):
+    """Test 400s for bad goals and that deleted goals disappear."""
+    create_test_user()
+    login_test_user(client)
+
+    assert client.post("/api/goals", json={"period": "yearly", "target_minutes": 10}).status_code == 400
+    assert client.post("/api/goals", json={"period": "daily", "target_minutes": 0}).status_code == 400
+    assert client.post("/api/goals", json={"period": "daily", "target_minutes": 10, "scope": "piece"}).status_code == 400
+    assert client.post("/api/goals", json={
+        "period": "daily", "target_minutes": 10, "scope": "piece", "scope_key": 999,
+    }).status_code == 400
+
+    goal_id = client.post("/api/goals", json={"period": "daily", "target_minutes": 10}).get_json()["id"]
+    assert client.delete(f"/api/goals/{goal_id}").status_code == 200
+    assert client.get("/api/goals").get_json() == []
+    assert client.delete(f"/api/goals/{goal_id}").status_code == 404
+
+
+def test_dashboard_target_comes_from_daily_goal(app, client):
+    """Test the gauge target with and without an overall daily goal."""
+    create_test_user()
+    login_test_user(client)
+
+    assert client.get("/api/dashboard/stats").get_json()["daily"]["target"] == DEFAULT_DAILY_TARGET
+
+    client.post("/api/goals", json={"period": "daily", "target_minutes": 45})
+    stats = client.get("/api/dashboard/stats").get_json()
+    assert stats["daily"]["target"] == 45
+    assert len(stats["goals"]) == 1
+
+
+def test_many_goals_cost_constant_queries(app, client):
+    """Test that dozens of goals add no per-goal queries to writes or reads."""
+    user = create_test_user()
+    login_test_user(client)
+    for n in range(40):
+        client.post("/api/goals", json={"period": ("daily", "weekly", "monthly")[n % 3], "target_minutes": 10 + n})
+
+    with app.app_context(), assert_max_queries(16):
+        log_now(client, 20)
+    with app.app_context(), assert_max_queries(4):
+        goals = client.get("/api/goals").get_json()
+    assert all(goal["progress_minutes"] == 20 for goal in goals)
+    assert PracticeLog.query.filter_by(user_id=user.id).count() == 1
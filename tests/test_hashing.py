@@ -0,0 +1,107 @@
+"""
+Password Hashing Tests for Practice Tracker Application
+
+This module tests the bounded password hashing pool, its backpressure
+behaviour on the auth routes, and transparent rehashing on login.
+"""
+
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from .conftest import create_test_user
+from app import db
+from app.models import User
+from app.utils.hashing import HasherBusy, PasswordHasher
+
+
+def test_hash_and_verify_use_configured_method():
+    """Test that hashes carry the configured method and verify correctly."""
+    hasher = PasswordHasher(method="pbkdf2:sha256:1000", workers=1, queue_size=0)
+    pw_hash = hasher.hash("secret")
+
+    assert pw_hash.startswith("pbkdf2:sha256:1000$")
+    assert hasher.verify(pw_hash, "secret")
+    assert not hasher.verify(pw_hash, "wrong")
+    hasher.shutdown()
+
+
+def test_needs_rehash_detects_changed_parameters():
+    """Test that hashes made with other cost parameters are flagged."""
+    hasher = PasswordHasher(method="pbkdf2:sha256:1000", workers=1, queue_size=0)
+
+    assert not hasher.needs_rehash(generate_password_hash("pw", "pbkdf2:sha256:1000"))
+    assert hasher.needs_rehash(generate_password_hash("pw", "pbkdf2:sha256:2000"))
+    assert hasher.needs_rehash(generate_password_hash("pw", "scrypt:16384:8:1"))
+    hasher.shutdown()
+
+
+def test_saturated_pool_raises_busy():
+    """Test that callers beyond workers + queue get HasherBusy."""
+    hasher = PasswordHasher(method="pbkdf2:sha256:1000", workers=1, queue_size=0, wait_timeout=0.05)
+    release = threading.Event()
+    blocker = threading.Thread(target=hasher._run, args=(release.wait,))
+    blocker.start()
+    try:
+        with pytest.raises(HasherBusy):
+            hasher.hash("secret")
+    finally:
+        release.set()
+        blocker.join()
+
+    # The slot is released once the blocking job finishes
+    assert hasher.verify(hasher.hash("secret"), "secret")
+    hasher.shutdown()
+
+
+def test_login_returns_503_when_pool_is_busy(app, client, monkeypatch):
+    """Test that auth requests are shed with Retry-After instead of queuing."""
+    create_test_user()
+
+    def busy(*args):
+        raise HasherBusy()
+
+    monkeypatch.setattr(app.extensions["password_hasher"], "_run", busy)
+    resp = client.post("/login", json={"username": "testuser", "password": "testpass"})
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_outdated_hash(app, client):
+    """Test that a login upgrades a hash made with old parameters."""
+    user = create_test_user()
+    user.password_hash = generate_password_hash("testpass", "pbkdf2:sha256:500")
+    db.session.commit()
+
+    resp = client.post("/login", json={"username": "testuser", "password": "testpass"})
+    assert resp.status_code == 200
+
+    db.session.expire_all()
+    stored = db.session.get(User, user.id).password_hash
+    assert stored.startswith(app.config["PASSWORD_HASH_METHOD"] + "$")
+
+
+def test_failed_login_does_not_rehash(app, client):
+    """Test that a wrong password leaves the stored hash untouched."""
+    user = create_test_user()
+    old_hash = generate_password_hash("testpass", "pbkdf2:sha256:500")
+    user.password_hash = old_hash
+    db.session.commit()
+
+    resp = client.post("/login", json={"username": "testuser", "password": "nope"})
+    assert resp.status_code == 401
+
+    db.session.expire_all()
+    assert db.session.get(User, user.id).password_hash == old_hash
+
+
+def test_register_hashes_with_configured_method(app, client):
+    """Test that new accounts are hashed through the pool."""
+    resp = client.post("/register", json={"username": "newbie", "password": "pw123"})
+    assert resp.status_code == 200
+
+    user = User.query.filter_by(username="newbie").first()
+    assert user.password_hash.startswith(app.config["PASSWORD_HASH_METHOD"] + "$")
+    assert user.check_password("pw123")
@@ -0,0 +1,130 @@
+"""
+Heatmap Tests for Practice Tracker Application
+
+This module tests /api/stats/heatmap: daily minutes built from the
+DailyTotal rollups on local dates, the packed encoding, ETag revalidation
+and the rollup rebuild command.
+"""
+
+import base64
+import struct
+
+from .conftest import assert_max_queries, create_test_user, login_test_user, seed_logs
+from app import db
+from app.models import DailyTotal, PracticeLog
+from app.utils.rollups import rollups_cli
+
+
+def add_log(client, utc_timestamp, duration):
+    client.post("/api/logs", json={
+        "utc_timestamp": utc_timestamp,
+        "instrument": "piano",
+        "duration": duration,
+    })
+
+
+def test_heatmap_uses_local_dates(app, client):
+    """Test that minutes land on the user's local day."""
+    create_test_user()
+    login_test_user(client)
+    # 2024-01-01 03:00 UTC is still Dec 31 2023 in New York
+    add_log(client, "2024-01-01T03:00:00", 30)
+    add_log(client, "2024-01-02T18:00:00", 20)
+    add_log(client, "2024-01-02T19:00:00", 25)
+
+    body = client.get("/api/stats/heatmap?year=2024").get_json()
+    assert body["year"] == 2024
+    assert body["start"] == "2024-01-01"
+    assert body["days"] == 366  # Leap year
+    assert body["minutes"][:3] == [0, 45, 0]
+    assert body["total"] == 45
+    assert body["max"] == 45
+
+    previous = client.get("/api/stats/heatmap?year=2023").get_json()
+    assert previous["days"] == 365
+    assert previous["minutes"][-1] == 30
+
+
+def test_packed_heatmap_matches_json(app, client):
+    """Test that the packed encoding decodes to the same minutes."""
+    create_test_user()
+    login_test_user(client)
+    add_log(client, "2025-03-10T15:00:00", 70)
+
+    plain = client.get("/api/stats/heatmap?year=2025").get_json()
+    packed = client.get("/api/stats/heatmap?year=2025&format=packed").get_json()
+    assert packed["encoding"] == "uint16le-base64"
+    data = base64.b64decode(packed["data"])
+    assert list(struct.unpack(f"<{packed['days']}H", data)) == plain["minutes"]
+
+
+def test_heatmap_rejects_bad_parameters(app, client):
+    """Test 400 for out-of-range years and unknown formats."""
+    create_test_user()
+    login_test_user(client)
+
+    assert client.get("/api/stats/heatmap?year=123").status_code == 400
+    assert client.get("/api/stats/heatmap?year=10000").status_code == 400
+    assert client.get("/api/stats/heatmap?year=2024&format=png").status_code == 400
+
+
+def test_heatmap_accepts_the_last_allowed_year(app, client):
+    """Test that year 9999, the upper bound, is a full empty year rather than a 500."""
+    create_test_user()
+    login_test_user(client)
+
+    resp = client.get("/api/stats/heatmap?year=9999")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert (body["start"], body["days"], body["total"]) == ("9999-01-01", 365, 0)
+
+
+def test_etag_revalidation(app, client):
+    """Test 304 for unchanged years and a new ETag after an edit."""
+    create_test_user()
+    login_test_user(client)
+    add_log(client, "2023-06-01T16:00:00", 40)
+
+    first = client.get("/api/stats/heatmap?year=2023")
+    etag = first.headers["ETag"]
+    assert "private" in first.headers["Cache-Control"]
+
+    again = client.get("/api/stats/heatmap?year=2023", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    # Writes to another year leave this year's ETag valid
+    add_log(client, "2025-06-01T16:00:00", 10)
+    again = client.get("/api/stats/heatmap?year=2023", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    client.patch("/api/edit-log/1", json={"duration": 55})
+    changed = client.get("/api/stats/heatmap?year=2023", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert max(changed.get_json()["minutes"]) == 55
+
+
+def test_multi_year_heatmap_is_a_handful_of_reads(app, client):
+    """Test that five years cost a fixed number of queries each."""
+    user = create_test_user()
+    seed_logs(user, 5000)
+    db.session.commit()
+    login_test_user(client)
+
+    for year in range(2021, 2026):
+        with app.app_context(), assert_max_queries(3):
+            assert client.get(f"/api/stats/heatmap?year={year}").status_code == 200
+
+
+def test_rebuild_command_backfills_rollups(app):
+    """Test that `flask rollups rebuild --now` builds rollups for bulk-loaded logs."""
+    user = create_test_user()
+    seed_logs(user, 48, derived=False)
+    db.session.commit()
+    assert DailyTotal.query.count() == 0
+
+    result = app.test_cli_runner().invoke(rollups_cli, ["rebuild", "--now"])
+    assert "enqueued 1" in result.output
+
+    total_minutes = db.session.query(db.func.sum(PracticeLog.duration)).scalar()
+    assert db.session.query(db.func.sum(DailyTotal.minutes)).scalar() == total_minutes
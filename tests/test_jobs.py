@@ -0,0 +1,182 @@
+"""
+Background Job Queue Tests for Practice Tracker Application
+
+This module tests the durable job queue (enqueue, deduplication, retries
+with backoff, recovery, worker threads, the drain command and the admin
+view) and the daily rollup job enqueued by log writes.
+"""
+
+import json
+import time
+from datetime import date, datetime, timedelta
+
+from .conftest import create_test_user, login_test_user
+from app import create_app, db
+from app.models import DailyTotal, Job, PracticeLog
+from app.utils import jobs
+from app.utils.jobs import drain, enqueue, queue_stats, recover_stale_jobs, register_job
+from app.utils.rollups import ROLLUP_JOB
+
+FLAKY_CALLS = []
+
+
+@register_job("test_flaky")
+def flaky_job(user_id, payload):
+    FLAKY_CALLS.append(payload)
+    raise RuntimeError("boom")
+
+
+@register_job("test_noop")
+def noop_job(user_id, payload):
+    pass
+
+
+def post_log(client, timestamp, duration=30):
+    return client.post("/api/logs", json={"utc_timestamp": timestamp, "instrument": "piano", "duration": duration})
+
+
+def daily_totals(user_id):
+    rows = DailyTotal.query.filter_by(user_id=user_id).order_by(DailyTotal.local_date).all()
+    return {row.local_date: (row.minutes, row.sessions) for row in rows}
+
+
+def test_log_writes_enqueue_one_deduplicated_job(app, client):
+    """Test that several writes leave one pending job with the earliest date."""
+    user = create_test_user()
+    login_test_user(client)
+    post_log(client, "2025-03-10T15:00:00")
+    post_log(client, "2025-03-05T15:00:00")
+    post_log(client, "2025-03-12T15:00:00")
+
+    pending = Job.query.filter_by(kind=ROLLUP_JOB, user_id=user.id).all()
+    assert len(pending) == 1
+    assert json.loads(pending[0].payload)["since"].startswith("2025-03-05T15:00:00")
+
+
+def test_rollup_job_builds_local_daily_totals(app, client):
+    """Test that draining the queue builds per-local-day totals."""
+    user = create_test_user()
+    login_test_user(client)
+    post_log(client, "2025-03-10T15:00:00", 30)
+    post_log(client, "2025-03-10T20:00:00", 15)
+    post_log(client, "2025-03-11T02:00:00", 10)  # Still Mar 10 in New York
+
+    assert drain() == 1
+    assert daily_totals(user.id) == {date(2025, 3, 10): (55, 3)}
+    assert Job.query.count() == 0
+
+
+def test_edit_and_delete_rebuild_from_affected_date(app, client):
+    """Test that edits and deletes rebuild rollups from the earliest change."""
+    user = create_test_user()
+    login_test_user(client)
+    post_log(client, "2025-03-10T15:00:00", 30)
+    post_log(client, "2025-03-12T15:00:00", 20)
+    drain()
+
+    log = PracticeLog.query.filter_by(user_id=user.id, user_log_number=2).first()
+    log.utc_timestamp = datetime(2025, 3, 11, 15)
+    db.session.commit()
+    drain()
+    assert daily_totals(user.id) == {date(2025, 3, 10): (30, 1), date(2025, 3, 11): (20, 1)}
+
+    client.delete("/api/delete-log/1", json={"logNumber": 1})
+    drain()
+    assert daily_totals(user.id) == {date(2025, 3, 11): (20, 1)}
+
+
+def test_failed_job_retries_with_backoff_then_fails(app):
+    """Test exponential backoff and the terminal failed state."""
+    app.config["JOB_MAX_ATTEMPTS"] = 3
+    FLAKY_CALLS.clear()
+    enqueue("test_flaky", 1, {"n": 1})
+    db.session.commit()
+
+    assert drain() == 1
+    job = Job.query.one()
+    assert (job.status, job.attempts) == ("pending", 1)
+    assert job.run_at > jobs._now() + timedelta(seconds=1)
+    assert "boom" in job.last_error
+
+    assert drain() == 0  # Still backing off
+    assert drain(include_delayed=True) == 2
+    db.session.expire_all()
+    job = Job.query.one()
+    assert (job.status, job.attempts) == ("failed", 3)
+    assert len(FLAKY_CALLS) == 3
+    assert queue_stats()["failed"] == 1
+
+
+def test_retry_merges_into_newer_pending_job(app):
+    """Test that a failing job folds into a duplicate enqueued meanwhile."""
+    enqueue("test_noop", 7, {"v": 1})
+    db.session.commit()
+    job_id = jobs._claim()
+
+    enqueue("test_noop", 7, {"v": 2})   # Arrives while the first one runs
+    db.session.commit()
+    jobs._reschedule(job_id, "error")
+
+    remaining = Job.query.all()
+    assert len(remaining) == 1
+    assert remaining[0].status == "pending"
+
+
+def test_stale_running_jobs_are_recovered(app):
+    """Test that jobs abandoned by a dead worker are requeued."""
+    enqueue("test_noop", 1)
+    db.session.commit()
+    jobs._claim()
+    Job.query.update({"locked_at": jobs._now() - timedelta(hours=1)})
+    db.session.commit()
+
+    assert recover_stale_jobs() == 1
+    assert Job.query.one().status == "pending"
+    assert drain() == 1
+
+
+def test_drain_cli_command(app):
+    """Test the `flask jobs drain` command."""
+    enqueue("test_noop", 1)
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["jobs", "drain"])
+    assert "ran 1 job(s)" in result.output
+    assert Job.query.count() == 0
+
+
+def test_worker_threads_process_jobs(tmp_path):
+    """Test that workers started by create_app drain the queue."""
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'jobs.db'}",
+        "SECRET_KEY": "testsecret",
+        "JOB_WORKERS": 2,
+        "JOB_POLL_SECONDS": 0.05,
+    })
+    try:
+        with app.app_context():
+            for user_id in range(5):
+                enqueue("test_noop", user_id)
+            db.session.commit()
+
+            deadline = time.monotonic() + 5
+            while Job.query.count() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert Job.query.count() == 0
+    finally:
+        app.extensions["job_workers_stop"].set()
+
+
+def test_admin_view_requires_admin(app, client):
+    """Test that only configured admins see the queue stats."""
+    create_test_user()
+    login_test_user(client)
+    assert client.get("/admin/jobs").status_code == 403
+
+    app.config["ADMIN_USERNAMES"] = "someone, testuser"
+    post_log(client, "2025-03-10T15:00:00")
+    data = client.get("/admin/jobs").get_json()
+    assert data["pending"] == 1
+    assert data["depth"] == {ROLLUP_JOB: {"pending": 1}}
+    assert data["lag_seconds"] >= 0
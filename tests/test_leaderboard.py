@@ -0,0 +1,115 @@
+"""
+Leaderboard Tests for Practice Tracker Application
+
+This module tests the board keys, scores maintained by log writes (checked
+against a full rebuild), ranking with ties and /api/stats/leaderboard.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from .conftest import create_test_user, login_test_user, seed_logs
+from app import db
+from app.models import LeaderboardScore, PracticeLog
+from app.utils.leaderboard import board_keys, leaderboard_cli, rebuild_leaderboards
+
+
+def test_board_keys():
+    """Test week (Monday), month and all-time keys of a local date."""
+    assert board_keys(date(2025, 3, 2)) == ("week:2025-02-24", "month:2025-03", "all")
+
+
+def log_today(client, duration, instrument="piano", days_ago=0):
+    tz = ZoneInfo("America/New_York")
+    local = datetime.combine(datetime.now(tz).date() - timedelta(days=days_ago), time(12, 0), tzinfo=tz)
+    client.post("/api/logs", json={
+        "utc_timestamp": local.astimezone(timezone.utc).replace(tzinfo=None).isoformat(),
+        "instrument": instrument,
+        "duration": duration,
+    })
+
+
+def scores():
+    return {
+        (row.board, row.instrument, row.user_id): row.minutes
+        for row in LeaderboardScore.query.all()
+        if row.minutes
+    }
+
+
+def test_scores_follow_writes_and_match_rebuild(app, client):
+    """Test add, edit and delete against recomputing every score."""
+    create_test_user()
+    login_test_user(client)
+    log_today(client, 30)
+    log_today(client, 20, instrument="violin")
+    log_today(client, 45, days_ago=60)
+    client.patch("/api/edit-log/1", json={"duration": 35})
+    client.delete("/api/delete-log/2", json={"logNumber": 2})
+
+    incremental = scores()
+    assert incremental[("all", "", 1)] == 80
+    assert incremental[("all", "piano", 1)] == 80
+    assert ("all", "violin", 1) not in incremental
+
+    rebuild_leaderboards()
+    assert scores() == incremental
+
+
+def test_invalid_edit_leaves_scores_untouched(app, client):
+    """Test that a non-numeric duration is rejected before the score listeners run."""
+    create_test_user()
+    login_test_user(client)
+    log_today(client, 30)
+
+    assert client.patch("/api/edit-log/1", json={"duration": "abc"}).status_code == 400
+    assert scores()[("all", "", 1)] == 30
+
+    # Numeric strings are stored as integers, so the listeners add numbers
+    assert client.patch("/api/edit-log/1", json={"duration": "35"}).status_code == 200
+    assert scores()[("all", "", 1)] == 35
+
+
+def test_leaderboard_ranks_with_ties(app, client):
+    """Test top users, shared ranks and the requesting user's rank."""
+    for name, minutes in (("alice", 50), ("bob", 90), ("carol", 50), ("testuser", 20)):
+        create_test_user(username=name)
+        login_test_user(client, username=name)
+        log_today(client, minutes)
+        client.get("/logout")
+    login_test_user(client)
+
+    board = client.get("/api/stats/leaderboard?window=week&limit=3").get_json()
+    assert [(r["rank"], r["username"], r["minutes"]) for r in board["top"]] == [
+        (1, "bob", 90), (2, "alice", 50), (2, "carol", 50),
+    ]
+    assert board["me"] == {"rank": 4, "minutes": 20}
+
+    violin = client.get("/api/stats/leaderboard?window=all&instrument=violin").get_json()
+    assert violin["top"] == []
+    assert violin["me"] == {"rank": None, "minutes": 0}
+
+
+def test_leaderboard_rejects_bad_parameters(app, client):
+    """Test 400 for unknown windows and out-of-range limits."""
+    create_test_user()
+    login_test_user(client)
+
+    assert client.get("/api/stats/leaderboard?window=year").status_code == 400
+    resp = client.get("/api/stats/leaderboard?limit=0")
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "validation_failed"
+
+
+def test_rebuild_command_scores_bulk_loaded_logs(app):
+    """Test that `flask leaderboard rebuild` covers logs inserted without the ORM."""
+    user = create_test_user()
+    seed_logs(user, 100, derived=False)
+    db.session.commit()
+    assert LeaderboardScore.query.count() == 0
+
+    result = app.test_cli_runner().invoke(leaderboard_cli, ["rebuild", "--batch-size", "7"])
+    assert "leaderboard score(s)" in result.output
+
+    total = db.session.query(db.func.sum(PracticeLog.duration)).scalar()
+    assert scores()[("all", "", user.id)] == total
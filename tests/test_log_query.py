@@ -0,0 +1,156 @@
+"""
+Log Table Query Tests for Practice Tracker Application
+
+This module tests sorting, filtering and cursor pagination of GET /api/logs,
+checking every page walk against sorting and filtering the logs in Python,
+and that the filtered sorts are served from indexes.
+"""
+
+import base64
+import json
+import random
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from .conftest import create_test_user, login_test_user
+from app import db
+from app.models import PracticeLog
+from app.utils.log_query import LOG_SORTS, _sort_keys
+
+PIECES = [("Etude", "Chopin"), ("Arabesque", "Debussy"), ("Zadok", "Handel")]
+
+
+@pytest.fixture
+def logged_history(client):
+    """Fifty logs with varied instruments, pieces, durations and dates."""
+    rng = random.Random(44)
+    create_test_user()
+    login_test_user(client)
+    first = datetime(2025, 1, 1, 8, 0)
+    for n in range(50):
+        payload = {
+            "utc_timestamp": (first + timedelta(hours=rng.randrange(24 * 60))).isoformat(),
+            "instrument": rng.choice(["piano", "violin", "cello"]),
+            "duration": rng.choice([15, 30, 45, 60]),  # many ties
+        }
+        if n % 4:
+            payload["piece"], payload["composer"] = rng.choice(PIECES)
+        client.post("/api/logs", json=payload)
+    return client.get("/api/logs").get_json()
+
+
+def python_key(sort):
+    def key(log):
+        moment = datetime.strptime(log["utc_date"], "%a, %d %b %Y %H:%M:%S %Z")
+        leading = {
+            "date": (),
+            "duration": (log["duration"],),
+            "instrument": (log["instrument"],),
+            "piece": ("" if log["piece"] == "Unlisted" else log["piece"],),
+        }[sort]
+        return (*leading, moment, log["id"])
+    return key
+
+
+def walk(client, **params):
+    """Follow X-Next-Cursor through every page."""
+    logs, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        resp = client.get("/api/logs", query_string=query)
+        assert resp.status_code == 200
+        logs.extend(resp.get_json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return logs
+
+
+@pytest.mark.parametrize("sort", LOG_SORTS)
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pages_match_python_sort(client, logged_history, sort, order):
+    """Test that paging through any sort returns every log once, in order."""
+    expected = sorted(logged_history, key=python_key(sort), reverse=order == "desc")
+    pages = walk(client, sort=sort, order=order, limit=7)
+    assert [log["id"] for log in pages] == [log["id"] for log in expected]
+
+
+def test_filters_compose_with_sort_and_paging(client, logged_history):
+    """Test instrument, date range and duration filters against filtering in Python."""
+    def wanted(log):
+        moment = datetime.strptime(log["utc_date"], "%a, %d %b %Y %H:%M:%S %Z")
+        day = moment.replace(tzinfo=timezone.utc).astimezone(ZoneInfo("America/New_York")).date()
+        return (
+            log["instrument"] == "violin"
+            and date(2025, 1, 10) <= day <= date(2025, 2, 10)
+            and 30 <= log["duration"] <= 45
+        )
+
+    expected = sorted(filter(wanted, logged_history), key=python_key("duration"))
+    pages = walk(
+        client, sort="duration", order="asc", limit=3, instrument="violin",
+        start="2025-01-10", end="2025-02-10", min_duration=30, max_duration=45,
+    )
+    assert [log["id"] for log in pages] == [log["id"] for log in expected]
+
+
+def test_piece_filter(client, logged_history):
+    """Test filtering by piece id."""
+    piece_id = client.get("/api/pieces?sort=title").get_json()["items"][0]["id"]  # Arabesque
+    logs = client.get("/api/logs", query_string={"piece_id": piece_id}).get_json()
+    assert logs and {log["piece"] for log in logs} == {"Arabesque"}
+
+
+def test_rejects_bad_parameters(client, logged_history):
+    """Test 400 for unknown sorts, bad filters and foreign cursors."""
+    assert client.get("/api/logs?sort=notes").status_code == 400
+    assert client.get("/api/logs?order=up").status_code == 400
+    assert client.get("/api/logs?start=2025-13-01").status_code == 400
+    assert client.get("/api/logs?limit=0").status_code == 400
+    assert client.get("/api/logs?cursor=not-a-cursor").status_code == 400
+
+    cursor = client.get("/api/logs?sort=duration&limit=5").headers["X-Next-Cursor"]
+    assert client.get(f"/api/logs?sort=date&limit=5&cursor={cursor}").status_code == 400
+
+    # Well-formed cursors whose timestamp is not an ISO string
+    for payload in (["date", "desc", 123, 1], ["date", "desc", "yesterday", 1]):
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+        resp = client.get(f"/api/logs?limit=5&cursor={cursor}")
+        assert resp.status_code == 400
+        assert resp.get_json()["message"] == "malformed cursor"
+
+
+@pytest.mark.parametrize("sort,index", [
+    ("date", "ix_practice_log_user_time"),
+    ("duration", "ix_practice_log_user_duration"),
+    ("instrument", "ix_practice_log_user_instrument"),
+])
+def test_sorts_are_index_backed(app, sort, index):
+    """Test that sorted pages read an index in order instead of sorting."""
+    keys = _sort_keys(sort)
+    query = (
+        db.select(PracticeLog.id)
+        .where(PracticeLog.user_id == 1)
+        .order_by(*(key.desc() for key in keys))
+        .limit(50)
+    )
+    plan = " ".join(
+        row[-1] for row in db.session.execute(
+            db.text("EXPLAIN QUERY PLAN " + str(query.compile(compile_kwargs={"literal_binds": True})))
+        )
+    )
+    assert index in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_instrument_filter_with_date_sort_is_index_backed(app):
+    """Test that the instrument filter plus the default sort needs no sort step."""
+    plan = " ".join(
+        row[-1] for row in db.session.execute(db.text(
+            "EXPLAIN QUERY PLAN SELECT id FROM practice_log WHERE user_id = 1 AND instrument = 'piano' "
+            "ORDER BY utc_timestamp DESC, id DESC LIMIT 50"
+        ))
+    )
+    assert "ix_practice_log_user_instrument" in plan
+    assert "TEMP B-TREE" not in plan
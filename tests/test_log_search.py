@@ -0,0 +1,158 @@
+"""
+Practice Note Search Tests for Practice Tracker Application
+
+This module tests GET /api/logs/search: the full-text index following log
+inserts, edits and deletes, query parsing (phrases, prefixes, accents and
+FTS5 syntax in user input), ranking, per-user isolation, snippets and
+pagination.
+"""
+
+from datetime import datetime, timedelta
+
+from .conftest import create_test_user, login_test_user
+from app import db
+from app.models import Piece
+from app.utils.log_search import build_match
+
+
+def add_log(client, notes=None, piece=None, when=None, **extra):
+    payload = {
+        "utc_timestamp": (when or datetime(2025, 1, 1, 12)).isoformat(),
+        "instrument": "violin",
+        "duration": 30,
+        **extra,
+    }
+    if notes is not None:
+        payload["notes"] = notes
+    if piece is not None:
+        payload["piece"], payload["composer"] = piece, "Someone"
+    resp = client.post("/api/logs", json=payload)
+    assert resp.status_code == 201
+    return resp.get_json()["log"]["id"]
+
+
+def search(client, q, **params):
+    resp = client.get("/api/logs/search", query_string={"q": q, **params})
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def ids(client, q, **params):
+    return [item["id"] for item in search(client, q, **params)["items"]]
+
+
+def test_build_match_quotes_user_input():
+    """Test that words are quoted, phrases kept and only the last word is a prefix."""
+    assert build_match(3, 'long "metronome 120" ton') == (
+        'owner:u3 AND {notes title}: ("long" AND "metronome 120" AND "ton"*)'
+    )
+    assert build_match(3, 'say "hi"') == 'owner:u3 AND {notes title}: ("say" AND "hi")'
+    assert build_match(3, "  ?! ") is None
+
+
+def test_finds_notes_and_piece_titles(client):
+    """Test matching words in any order, phrases, prefixes and accents."""
+    create_test_user()
+    login_test_user(client)
+    tones = add_log(client, notes="Long tones, then scales at metronome 120")
+    etude = add_log(client, notes="Worked on shifting", piece="Étude in A")
+    slow = add_log(client, notes="Metronome at 90, slow tones")
+
+    assert ids(client, "tones long") == [tones]
+    assert ids(client, '"metronome 120"') == [tones]
+    assert set(ids(client, "metro")) == {tones, slow}
+    assert ids(client, "etude") == [etude]  # piece title, accent-free
+    assert ids(client, "shift") == [etude]
+    assert ids(client, "vibrato") == []
+
+
+def test_operators_in_input_are_plain_words(client):
+    """Test that FTS5 syntax typed by the user cannot break the query."""
+    create_test_user()
+    login_test_user(client)
+    log = add_log(client, notes="scales OR arpeggios (NEAR the end)")
+
+    for q in ["OR", "NEAR(", 'scales" OR "', "arpeggios*", "owner:u1", "-scales", "^scales"]:
+        resp = client.get("/api/logs/search", query_string={"q": q})
+        assert resp.status_code == 200, q
+    assert ids(client, "scales OR") == [log]
+
+
+def test_index_follows_edits_and_deletes(client):
+    """Test that edited notes are searchable at once and deleted logs disappear."""
+    user = create_test_user()
+    login_test_user(client)
+    log = add_log(client, notes="bowing drills", piece="Meditation")
+
+    client.patch(f"/api/edit-log/{log}", json={"notes": "vibrato drills"})
+    assert ids(client, "bowing") == []
+    assert ids(client, "vibrato") == [log]
+
+    piece = Piece.query.filter_by(user_id=user.id).one()
+    piece.title = "Thais Meditation"
+    db.session.commit()
+    assert ids(client, "thais") == [log]
+
+    client.delete(f"/api/delete-log/{log}", json={"logNumber": log})
+    assert ids(client, "vibrato") == []
+    assert ids(client, "thais") == []
+
+
+def test_results_are_private(client):
+    """Test that a user never finds another user's logs."""
+    create_test_user()
+    create_test_user(username="other")
+    login_test_user(client, username="other")
+    add_log(client, notes="secret fingering")
+    client.get("/logout")
+    login_test_user(client)
+
+    assert ids(client, "secret") == []
+    assert ids(client, "u2") == []
+
+
+def test_ranking_prefers_better_matches(client):
+    """Test that logs matching more often rank first."""
+    create_test_user()
+    login_test_user(client)
+    once = add_log(client, notes="scales then a long piece run through with many other words")
+    twice = add_log(client, notes="scales, scales")
+
+    assert ids(client, "scales") == [twice, once]
+
+
+def test_snippets_are_escaped_html(client):
+    """Test that snippets mark matches and escape the rest of the notes."""
+    create_test_user()
+    login_test_user(client)
+    add_log(client, notes="<b>intonation</b> & tuning")
+    add_log(client, piece="Intonation Study")  # no notes
+
+    items = search(client, "intonation")["items"]
+    snippets = {item["piece"]: item["snippet"] for item in items}
+    assert snippets["Unlisted"] == "&lt;b&gt;<mark>intonation</mark>&lt;/b&gt; &amp; tuning"
+    assert snippets["Intonation Study"] is None
+
+
+def test_pagination(client):
+    """Test that pages cover every match once, with totals."""
+    create_test_user()
+    login_test_user(client)
+    first = datetime(2025, 1, 1, 12)
+    logged = {add_log(client, notes="etude practice", when=first + timedelta(days=n)) for n in range(7)}
+
+    pages = [search(client, "etude", page=page, per_page=3) for page in (1, 2, 3)]
+    assert [page["total"] for page in pages] == [7, 7, 7]
+    assert pages[0]["pages"] == 3
+    seen = [item["id"] for page in pages for item in page["items"]]
+    assert sorted(seen) == sorted(logged)
+    assert search(client, "etude", page=4, per_page=3)["items"] == []
+
+
+def test_rejects_bad_parameters(client):
+    """Test 400 for a missing query and invalid paging."""
+    create_test_user()
+    login_test_user(client)
+    assert client.get("/api/logs/search").status_code == 400
+    assert client.get("/api/logs/search?q=a&per_page=101").status_code == 400
+    assert client.get("/api/logs/search?q=a&page=0").status_code == 400
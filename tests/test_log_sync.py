@@ -0,0 +1,118 @@
+"""
+Log Delta Sync Tests for Practice Tracker Application
+
+This module tests the change versions stamped on log writes, tombstones for
+deletes and /api/logs/changes, checking that a client copy patched with
+deltas matches a full fetch.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from .conftest import assert_max_queries, create_test_user, login_test_user
+from app import db
+from app.models import PracticeLog, User
+
+
+def add_log(client, day, duration=30):
+    return client.post("/api/logs", json={
+        "utc_timestamp": f"2025-03-{day:02d}T12:00:00",
+        "instrument": "piano",
+        "duration": duration,
+    }).get_json()
+
+
+def apply_delta(copy, delta):
+    """Patch a client copy ({log number: log}) the way state/logs.js does."""
+    if delta["full"]:
+        copy = {}
+    for number in delta["deleted"]:
+        copy.pop(number, None)
+    for log in delta["logs"]:
+        copy[log["id"]] = log
+    return copy
+
+
+def test_changes_since_version_patch_copy_to_full_state(client):
+    """Test that inserts, edits, deletes and reused log numbers sync as deltas."""
+    create_test_user()
+    login_test_user(client)
+    for day in (1, 2, 3):
+        add_log(client, day)
+
+    first = client.get("/api/logs/changes").get_json()
+    assert first["full"] is True
+    assert [log["id"] for log in first["logs"]] == [3, 2, 1]
+    copy = apply_delta({}, first)
+
+    client.patch("/api/edit-log/1", json={"notes": "scales"})
+    client.delete("/api/delete-log/2", json={"logNumber": 2})
+    client.delete("/api/delete-log/3", json={"logNumber": 3})
+    add_log(client, 4)  # Reuses log number 2
+
+    delta = client.get(f"/api/logs/changes?since={first['version']}").get_json()
+    assert delta["full"] is False
+    assert sorted(log["id"] for log in delta["logs"]) == [1, 2]
+    assert sorted(delta["deleted"]) == [2, 3]
+    assert delta["version"] > first["version"]
+
+    copy = apply_delta(copy, delta)
+    full = client.get("/api/logs").get_json()
+    assert copy == {log["id"]: log for log in full}
+
+    # Nothing changed since the latest version
+    empty = client.get(f"/api/logs/changes?since={delta['version']}").get_json()
+    assert empty["logs"] == [] and empty["deleted"] == []
+
+
+def test_changes_endpoint_falls_back_to_full_sync(client):
+    """Test full responses for unknown future versions and 400 for negative ones."""
+    create_test_user()
+    login_test_user(client)
+    add_log(client, 1)
+
+    future = client.get("/api/logs/changes?since=1000").get_json()
+    assert future["full"] is True
+    assert len(future["logs"]) == 1
+    assert client.get("/api/logs/changes?since=-1").status_code == 400
+
+
+def test_timezone_change_restamps_logs(app, client):
+    """Test that a timezone change resends every log, whose local dates moved."""
+    user = create_test_user()
+    login_test_user(client)
+    add_log(client, 1)
+    add_log(client, 2)
+    version = client.get("/api/logs/changes").get_json()["version"]
+
+    user = db.session.get(User, user.id)
+    user.timezone = "Asia/Tokyo"
+    db.session.commit()
+
+    delta = client.get(f"/api/logs/changes?since={version}").get_json()
+    assert sorted(log["id"] for log in delta["logs"]) == [1, 2]
+
+
+def test_updated_at_is_set_per_write(client):
+    """Test that updated_at is the write time, not the time the models were imported."""
+    user = create_test_user()
+    login_test_user(client)
+    before = datetime.now(timezone.utc).replace(tzinfo=None)
+    add_log(client, 1)
+    created = PracticeLog.query.filter_by(user_id=user.id).one().updated_at
+    assert created >= before - timedelta(seconds=1)
+
+    client.patch("/api/edit-log/1", json={"duration": 45})
+    db.session.expire_all()
+    assert PracticeLog.query.filter_by(user_id=user.id).one().updated_at >= created
+
+
+def test_changes_query_count_is_constant(app, client):
+    """Test that a delta costs the same queries however many logs changed."""
+    create_test_user()
+    login_test_user(client)
+    for day in range(1, 21):
+        add_log(client, day)
+
+    # User, version, changed logs (with pieces) and tombstones
+    with app.app_context(), assert_max_queries(4):
+        client.get("/api/logs/changes?since=1")
@@ -390,3 +390,61 @@ def test_submit_log_updates_existing_piece_time(client):
     # Verify piece time was updated (30 + 45 = 75)
     piece = Piece.query.filter_by(user_id=user.id, title="Existing Piece").first()
     assert piece.log_time == 75
+
+
+def test_log_writes_return_row_and_data_version(client):
+    """Test that add, edit and delete return the row (or tombstone) and a rising data version."""
+    create_test_user()
+    login_test_user(client)
+
+    added = client.post("/api/logs", json={
+        "utc_timestamp": "2025-01-01T10:00:00",
+        "instrument": "piano",
+        "duration": 30,
+        "piece": "Clair de Lune",
+        "composer": "Debussy",
+    }).get_json()
+    assert added["log"]["id"] == 1
+    assert added["log"]["duration"] == 30
+    assert added["log"]["piece"] == "Clair de Lune"
+    assert added["data_version"] > 0
+
+    edited = client.patch("/api/edit-log/1", json={"duration": 50, "notes": "slower"}).get_json()
+    assert edited["log"]["duration"] == 50
+    assert edited["log"]["notes"] == "slower"
+    assert edited["log"]["composer"] == "Debussy"
+    assert edited["data_version"] > added["data_version"]
+
+    deleted = client.delete("/api/delete-log/1", json={"logNumber": 1}).get_json()
+    assert deleted["log"] == {"id": 1, "deleted": True}
+    assert deleted["data_version"] > edited["data_version"]
+
+    # The single-row responses agree with a full refetch
+    assert client.get("/api/logs").get_json() == []
+
+
+def test_edit_log_validates_fields(client):
+    """Test that invalid edits are rejected with 400 before anything is written."""
+    user = create_test_user()
+    login_test_user(client)
+    client.post("/api/logs", json={
+        "utc_timestamp": "2025-01-01T10:00:00",
+        "instrument": "piano",
+        "duration": 30,
+    })
+
+    for body in ({"duration": "abc"}, {"duration": 0}, {"instrument": ""}, {"instrument": 5}, [1]):
+        resp = client.patch("/api/edit-log/1", json=body)
+        assert resp.status_code == 400, body
+        assert resp.get_json()["error"] == "validation_failed"
+
+    resp = client.patch("/api/edit-log/1", data="null", content_type="application/json")
+    assert resp.status_code == 400
+
+    log = PracticeLog.query.filter_by(user_id=user.id).one()
+    assert (log.duration, log.instrument) == (30, "piano")
+
+    resp = client.patch("/api/edit-log/1", json={"duration": "45", "instrument": " violin "})
+    assert resp.status_code == 200
+    assert resp.get_json()["log"]["duration"] == 45
+    assert PracticeLog.query.filter_by(user_id=user.id).one().instrument == "violin"
@@ -0,0 +1,141 @@
+"""
+Metrics Tests for Practice Tracker Application
+
+This module tests the request/SQL instrumentation, the opt-in /metrics
+endpoint and the optional Server-Timing response header.
+"""
+
+from .conftest import create_test_user, login_test_user
+from app.utils.metrics import MetricsRegistry, capture_queries
+
+
+def test_metrics_endpoint_disabled_by_default(client):
+    """Test that /metrics is hidden unless explicitly enabled."""
+    resp = client.get("/metrics")
+    assert resp.status_code == 404
+
+
+def test_metrics_endpoint_reports_latency_and_sql(app, client):
+    """Test that per-endpoint latency and SQL counters are exported."""
+    app.config["METRICS_ENABLED"] = True
+    create_test_user()
+    login_test_user(client)
+
+    client.get("/api/logs")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+
+    text = resp.get_data(as_text=True)
+    assert 'subwoofer_request_duration_seconds_count{endpoint="logs.get_logs",method="GET"} 1' in text
+    assert 'subwoofer_requests_total{endpoint="logs.get_logs",method="GET",status="200"} 1' in text
+
+    sql_line = next(line for line in text.splitlines()
+                    if line.startswith('subwoofer_sql_queries_total{endpoint="logs.get_logs"}'))
+    assert int(sql_line.split()[-1]) >= 1
+
+
+def test_server_timing_header_optional(app, client):
+    """Test that the Server-Timing header is only added when enabled."""
+    resp = client.get("/")
+    assert "Server-Timing" not in resp.headers
+
+    app.config["SERVER_TIMING_ENABLED"] = True
+    create_test_user()
+    login_test_user(client)
+
+    resp = client.get("/api/logs")
+    timing = resp.headers["Server-Timing"]
+    assert timing.startswith("app;dur=")
+    assert "db;dur=" in timing
+    assert "queries" in timing
+
+
+def test_capture_queries_records_statements(client):
+    """Test that capture_queries sees statements issued during a request."""
+    create_test_user()
+    login_test_user(client)
+
+    with capture_queries() as queries:
+        client.get("/api/recent-logs")
+
+    assert len(queries) >= 1
+    assert any("practice_log" in statement for statement, _ in queries)
+
+
+def test_registry_histogram_buckets():
+    """Test that latency observations land in every bucket at or above them."""
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe_request("main.home", "GET", 200, 0.05, sql_count=2, sql_time=0.01)
+    registry.observe_request("main.home", "GET", 200, 0.5)
+
+    text = registry.render_prometheus()
+    assert 'subwoofer_request_duration_seconds_bucket{endpoint="main.home",method="GET",le="0.1"} 1' in text
+    assert 'subwoofer_request_duration_seconds_bucket{endpoint="main.home",method="GET",le="1.0"} 2' in text
+    assert 'subwoofer_request_duration_seconds_bucket{endpoint="main.home",method="GET",le="+Inf"} 2' in text
+    assert 'subwoofer_sql_queries_total{endpoint="main.home"} 2' in text
+
+
+def test_slow_query_log_captures_plan_and_caller(app, client):
+    """Test that slow statements are summarized with caller and query plan."""
+    app.config["METRICS_ENABLED"] = True
+    app.extensions["slow_queries"].threshold_ms = 0  # treat every statement as slow
+    create_test_user()
+    login_test_user(client)
+
+    client.get("/api/dashboard/stats")
+
+    resp = client.get("/metrics/slow-queries")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["threshold_ms"] == 0
+
+    log_queries = [s for s in data["statements"]
+                   if "FROM practice_log" in s["statement"] and s["statement"].startswith("SELECT")]
+    assert log_queries
+    entry = log_queries[0]
+    assert "dash.get_dashboard_stats" in entry["endpoints"]
+    assert any(caller.startswith("app/") for caller in entry["callers"])
+    assert entry["plan"]
+    assert isinstance(entry["scans_practice_log"], bool)
+
+
+def test_slow_query_log_flags_practice_log_scans(app, client):
+    """Test that a full scan of practice_log is flagged in the summary."""
+    from app.models import db
+    from sqlalchemy import text
+
+    app.extensions["slow_queries"].threshold_ms = 0
+    db.session.execute(text("SELECT SUM(duration) FROM practice_log WHERE notes = 'x'"))
+
+    entry = next(s for s in app.extensions["slow_queries"].summary()
+                 if "SUM(duration)" in s["statement"])
+    assert entry["scans_practice_log"] is True
+    assert entry["count"] == 1
+
+
+def test_slow_query_log_ignores_fast_statements(app, client):
+    """Test that statements under the threshold are not recorded."""
+    app.extensions["slow_queries"].threshold_ms = 10_000
+    create_test_user()
+    login_test_user(client)
+    client.get("/api/logs")
+
+    assert app.extensions["slow_queries"].summary() == []
+
+
+def test_slow_query_log_redacts_parameters(app, client, caplog):
+    """Test that a slow write to the user table exposes neither the hash nor other values."""
+    app.config["METRICS_ENABLED"] = True
+    app.extensions["slow_queries"].threshold_ms = 0
+    with caplog.at_level("WARNING", logger="app.utils.slow_queries"):
+        user = create_test_user(password="hunter2-secret")
+
+    summary = client.get("/metrics/slow-queries").get_data(as_text=True)
+    for text in (summary, caplog.text):
+        assert user.password_hash not in text
+        assert "testuser" not in text
+    insert = next(s for s in app.extensions["slow_queries"].summary()
+                  if s["statement"].startswith("INSERT INTO user"))
+    assert f"str[{len(user.password_hash)}]" in insert["last_parameters"]
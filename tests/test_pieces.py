@@ -5,9 +5,11 @@ This module tests the pieces functionality including piece creation,
 retrieval, time tracking, and API endpoints for piece management.
 """
 
-from .conftest import create_test_user, login_test_user
+from .conftest import create_test_user, login_test_user, seed_logs
+from app import db
 from app.utils import get_or_create_piece, add_to_db
-from app.models import Piece
+from app.models import Piece, PracticeLog
+from app.utils.piece_totals import pieces_cli, reconcile_piece_totals
 
 
 def test_get_pieces_empty_user(client):
@@ -15,10 +17,10 @@ def test_get_pieces_empty_user(client):
     user = create_test_user()
     login_test_user(client)
 
-    resp = client.get("/api/stats/pieces")
+    resp = client.get("/api/pieces")
     assert resp.status_code == 200
     
-    data = resp.get_json()
+    data = resp.get_json()["items"]
     assert data == []
 
 
@@ -36,10 +38,10 @@ def test_get_pieces_with_data(client):
     add_to_db(piece2)
     add_to_db(piece3)
 
-    resp = client.get("/api/stats/pieces")
+    resp = client.get("/api/pieces")
     assert resp.status_code == 200
     
-    data = resp.get_json()
+    data = resp.get_json()["items"]
     assert len(data) == 3
     
     # Check that pieces are sorted by title (ascending)
@@ -60,10 +62,17 @@ def test_get_pieces_with_data(client):
 
 def test_get_pieces_requires_authentication(client):
     """Test that pieces endpoint requires authentication."""
-    resp = client.get("/api/stats/pieces")
+    resp = client.get("/api/pieces")
     assert resp.status_code in [302, 401]
 
 
+def test_old_piece_stats_route_is_gone(client):
+    """Test that /api/pieces is the only pieces listing."""
+    create_test_user()
+    login_test_user(client)
+    assert client.get("/api/stats/pieces").status_code == 404
+
+
 def test_get_pieces_user_isolation(client):
     """Test that users only see their own pieces."""
     user1 = create_test_user(username="user1", password="pass1")
@@ -79,10 +88,10 @@ def test_get_pieces_user_isolation(client):
     
     # Login as user1 and check pieces
     login_test_user(client, username="user1", password="pass1")
-    resp = client.get("/api/stats/pieces")
+    resp = client.get("/api/pieces")
     assert resp.status_code == 200
     
-    data = resp.get_json()
+    data = resp.get_json()["items"]
     assert len(data) == 1
     assert data[0]["title"] == "User1 Piece"
     
@@ -90,10 +99,10 @@ def test_get_pieces_user_isolation(client):
     client.get("/logout")
     login_test_user(client, username="user2", password="pass2")
     
-    resp = client.get("/api/stats/pieces")
+    resp = client.get("/api/pieces")
     assert resp.status_code == 200
     
-    data = resp.get_json()
+    data = resp.get_json()["items"]
     assert len(data) == 1
     assert data[0]["title"] == "User2 Piece"
 
@@ -249,10 +258,10 @@ def test_pieces_sorting_alphabetical(client):
         piece = Piece(title=title, composer=composer, user_id=user.id, log_time=30)
         add_to_db(piece)
 
-    resp = client.get("/api/stats/pieces")
+    resp = client.get("/api/pieces")
     assert resp.status_code == 200
     
-    data = resp.get_json()
+    data = resp.get_json()["items"]
     titles = [p["title"] for p in data]
     
     # Should be alphabetically sorted
@@ -269,10 +278,10 @@ def test_piece_zero_time_handling(client):
     piece = Piece(title="No Practice Yet", composer="Composer", user_id=user.id, log_time=0)
     add_to_db(piece)
 
-    resp = client.get("/api/stats/pieces")
+    resp = client.get("/api/pieces")
     assert resp.status_code == 200
     
-    data = resp.get_json()
+    data = resp.get_json()["items"]
     assert len(data) == 1
     assert data[0]["minutes"] == 0
     assert data[0]["title"] == "No Practice Yet"
@@ -288,11 +297,106 @@ def test_piece_large_time_values(client):
     piece = Piece(title="Marathon Practice", composer="Dedicated", user_id=user.id, log_time=large_time)
     add_to_db(piece)
 
-    resp = client.get("/api/stats/pieces")
+    resp = client.get("/api/pieces")
     assert resp.status_code == 200
     
-    data = resp.get_json()
+    data = resp.get_json()["items"]
     assert len(data) == 1
     assert data[0]["minutes"] == large_time
     
     
+
+
+def post_piece_log(client, duration, piece="Sonata"):
+    client.post("/api/logs", json={
+        "utc_timestamp": "2025-01-01T00:00:00",
+        "instrument": "piano",
+        "duration": duration,
+        "piece": piece,
+        "composer": "Composer",
+    })
+
+
+def test_edit_and_delete_adjust_piece_time(client):
+    """Test that log edits and deletes keep the piece total in step."""
+    user = create_test_user()
+    login_test_user(client)
+    post_piece_log(client, 30)
+    post_piece_log(client, 20)
+
+    client.patch("/api/edit-log/1", json={"duration": 45})
+    assert Piece.query.filter_by(user_id=user.id).one().log_time == 65
+
+    client.delete("/api/delete-log/2", json={"logNumber": 2})
+    assert Piece.query.filter_by(user_id=user.id).one().log_time == 45
+    assert client.get("/api/pieces").get_json()["items"][0]["minutes"] == 45
+    assert reconcile_piece_totals() == []
+
+
+def test_pieces_are_not_shared_between_users(client):
+    """Test that a piece with the same title is created per user."""
+    user1 = create_test_user(username="user1")
+    user2 = create_test_user(username="user2")
+
+    piece1 = get_or_create_piece("Shared Title", "Composer", user1.id, 30)
+    piece2 = get_or_create_piece("Shared Title", "Composer", user2.id, 15)
+
+    assert piece1.id != piece2.id
+    assert (piece1.log_time, piece2.log_time) == (30, 15)
+
+
+def test_reconcile_reports_and_fixes_drift(app):
+    """Test one-pass reconciliation of totals written without the ORM."""
+    user = create_test_user()
+    seed_logs(user, 50, pieces=5, derived=False)
+    db.session.commit()
+
+    drift = reconcile_piece_totals(fix=False)
+    assert len(drift) == 5
+    assert all(row["stored"] == 0 for row in drift)
+
+    result = app.test_cli_runner().invoke(pieces_cli, ["reconcile"])
+    assert "5 drifted piece(s) fixed" in result.output
+    assert reconcile_piece_totals() == []
+
+    total = db.session.query(db.func.sum(PracticeLog.duration)).scalar()
+    assert db.session.query(db.func.sum(Piece.log_time)).scalar() == total
+
+
+def test_paginated_piece_stats(client):
+    """Test per-piece aggregates, sorting and paging of /api/pieces."""
+    user = create_test_user()
+    login_test_user(client)
+    for piece, duration, instrument in (
+        ("Sonata", 30, "piano"), ("Sonata", 20, "violin"), ("Etude", 90, "piano"), ("Waltz", 10, "piano"),
+    ):
+        client.post("/api/logs", json={
+            "utc_timestamp": "2025-01-02T15:00:00", "instrument": instrument,
+            "duration": duration, "piece": piece, "composer": "Composer",
+        })
+    add_to_db(Piece(title="Untouched", composer="Composer", user_id=user.id, log_time=0))
+
+    body = client.get("/api/pieces?sort=minutes&order=desc&per_page=2").get_json()
+    assert (body["total"], body["pages"], body["page"]) == (4, 2, 1)
+    assert [item["title"] for item in body["items"]] == ["Etude", "Sonata"]
+    sonata = body["items"][1]
+    assert sonata["minutes"] == 50
+    assert sonata["sessions"] == 2
+    assert sonata["instruments"] == ["piano", "violin"]
+    assert sonata["last_practiced"] == "2025-01-02"
+
+    page2 = client.get("/api/pieces?sort=minutes&order=desc&per_page=2&page=2").get_json()
+    assert [item["title"] for item in page2["items"]] == ["Waltz", "Untouched"]
+    assert page2["items"][1] == {
+        "id": page2["items"][1]["id"], "title": "Untouched", "composer": "Composer",
+        "minutes": 0, "sessions": 0, "last_practiced": None, "instruments": [],
+    }
+
+    by_instruments = client.get("/api/pieces?sort=instruments&order=desc").get_json()
+    assert by_instruments["items"][0]["title"] == "Sonata"
+
+    for query in ("sort=color", "order=up", "per_page=500"):
+        resp = client.get(f"/api/pieces?{query}")
+        assert resp.status_code == 400
+        assert resp.get_json()["error"] == "validation_failed"
+        assert resp.get_json()["message"]
@@ -0,0 +1,127 @@
+"""
+Query Budget Tests for Practice Tracker Application
+
+This module enforces the @query_budget declared on every route: the number
+of SQL statements a request executes must not grow with the size of the
+user's history. Each route is exercised for a user with 10 logs and a user
+with 10,000 logs, so any per-row (N+1) query fails the build.
+"""
+
+import pytest
+
+from .conftest import assert_max_queries, create_test_user, login_test_user, seed_logs
+from app import db
+from app.models import DailyTotal, LeaderboardScore, PracticeLog, Streak
+from app.utils.piece_totals import reconcile_piece_totals
+
+# Requests covering every route in app/routes/*.py (method, url, kwargs)
+ROUTE_REQUESTS = [
+    ("get", "/", {}),
+    ("get", "/_whoami", {}),
+    ("get", "/dashboard", {}),
+    # Created first so the dashboard and log writes below maintain a goal
+    ("post", "/api/goals", {"json": {"period": "weekly", "target_minutes": 120}}),
+    ("get", "/api/goals", {}),
+    ("get", "/api/dashboard/stats", {}),
+    ("get", "/log", {}),
+    ("get", "/api/logs", {}),
+    ("get", "/api/logs", {"query_string": {"sort": "duration", "instrument": "piano", "limit": 20}}),
+    ("get", "/api/logs/changes", {"query_string": {"since": 1}}),
+    ("get", "/api/logs/search", {"query_string": {"q": "seeded"}}),
+    ("get", "/api/recent-logs", {}),
+    ("get", "/api/stats", {}),
+    ("get", "/api/pieces", {"query_string": {"sort": "minutes", "order": "desc"}}),
+    ("get", "/api/pieces/suggest", {"query_string": {"q": "seed"}}),
+    ("get", "/api/stats/year-in-review", {}),
+    ("get", "/api/stats/instruments", {}),
+    ("get", "/api/stats/heatmap", {}),
+    ("get", "/api/stats/leaderboard", {}),
+    ("get", "/api/stats/range", {"query_string": {"start": "2024-01-01", "end": "2025-12-31"}}),
+    ("post", "/api/logs", {"json": {
+        "utc_timestamp": "2025-01-01T00:00:00",
+        "instrument": "piano",
+        "duration": 20,
+        "piece": "Seed Piece 3",
+        "composer": "Seeder",
+    }}),
+    ("patch", "/api/edit-log/1", {"json": {"duration": 25, "notes": "edited"}}),
+    ("delete", "/api/delete-log/2", {"json": {"logNumber": 2}}),
+    ("delete", "/api/goals/1", {}),
+    ("get", "/metrics", {}),
+    ("get", "/metrics/slow-queries", {}),
+    ("get", "/admin/jobs", {}),
+    ("post", "/login", {"json": {"username": "testuser", "password": "testpass"}}),
+    ("get", "/logout", {}),
+    ("post", "/register", {"json": {"username": "budget_user", "password": "pw"}}),
+]
+
+
+def budget_for(app, url, method):
+    """Look up the declared query budget of the view that serves a URL."""
+    adapter = app.url_map.bind("localhost")
+    endpoint, _ = adapter.match(url, method=method.upper())
+    return getattr(app.view_functions[endpoint], "query_budget")
+
+
+def test_every_route_declares_a_budget(app):
+    """Test that no route is registered without a query budget."""
+    missing = [
+        rule.endpoint for rule in app.url_map.iter_rules()
+        if rule.endpoint != "static"
+        and getattr(app.view_functions[rule.endpoint], "query_budget", None) is None
+    ]
+    assert missing == []
+
+
+def test_budget_requests_cover_every_route(app):
+    """Test that ROUTE_REQUESTS exercises every registered endpoint."""
+    adapter = app.url_map.bind("localhost")
+    covered = {adapter.match(url, method=method.upper())[0] for method, url, _ in ROUTE_REQUESTS}
+    registered = {rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint != "static"}
+    assert registered <= covered
+
+
+def test_seeded_history_has_consistent_derived_state(app):
+    """Test that seeded users start from the state the write listeners keep."""
+    user = create_test_user()
+    seed_logs(user, 500)
+
+    total = db.session.query(db.func.sum(PracticeLog.duration)).scalar()
+    assert reconcile_piece_totals(fix=False) == []
+    assert db.session.query(db.func.sum(DailyTotal.minutes)).scalar() == total
+    assert db.session.get(LeaderboardScore, ("all", "", user.id)).minutes == total
+    assert db.session.get(Streak, user.id).run_end is not None
+
+    versions = db.session.query(db.func.min(PracticeLog.change_version), db.func.max(PracticeLog.change_version))
+    assert versions.one() == (user.data_version, user.data_version)
+
+
+@pytest.mark.parametrize("log_count", [10, 10_000])
+def test_routes_stay_within_query_budget(app, client, log_count):
+    """Test that every route stays within budget regardless of history size."""
+    user = create_test_user()
+    seed_logs(user, log_count)
+    login_test_user(client)
+
+    for method, url, kwargs in ROUTE_REQUESTS:
+        budget = budget_for(app, url, method)
+        # A fresh app context gives each request its own session and user
+        # lookup, as in production, instead of the test's shared identity map
+        with app.app_context(), assert_max_queries(budget):
+            resp = getattr(client, method)(url, **kwargs)
+        assert resp.status_code < 500, f"{method.upper()} {url} -> {resp.status_code}"
+        db.session.expire_all()
+
+
+def test_budget_overrun_is_counted(app, client, monkeypatch):
+    """Test that a request over its budget is reported in /metrics."""
+    app.config["METRICS_ENABLED"] = True
+    monkeypatch.setattr(app.view_functions["logs.get_logs"], "query_budget", 0)
+    create_test_user()
+    login_test_user(client)
+
+    with app.app_context():
+        client.get("/api/logs")
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'subwoofer_query_budget_exceeded_total{endpoint="logs.get_logs"} 1' in text
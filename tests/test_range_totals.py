@@ -0,0 +1,102 @@
+"""
+Date-Range Total Tests for Practice Tracker Application
+
+This module tests the prefix sums kept on the daily rollups and
+/api/stats/range, checking range totals against summing the logs directly.
+"""
+
+import random
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from .conftest import assert_max_queries, create_test_user, login_test_user
+from app.models import DailyTotal, PracticeLog
+from app.utils.jobs import drain
+from app.utils.rollups import range_totals
+
+TZ = ZoneInfo("America/New_York")
+
+
+def brute_force(user_id, start, end):
+    minutes = sessions = 0
+    days = set()
+    for log in PracticeLog.query.filter_by(user_id=user_id):
+        day = log.utc_timestamp.replace(tzinfo=timezone.utc).astimezone(TZ).date()
+        if start <= day <= end:
+            minutes += log.duration
+            sessions += 1
+            days.add(day)
+    return {"minutes": minutes, "sessions": sessions, "days_practiced": len(days)}
+
+
+def test_range_totals_match_logs_after_edits(app, client):
+    """Test random ranges against summing logs, after inserts and edits."""
+    rng = random.Random(38)
+    user = create_test_user()
+    login_test_user(client)
+    first = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for _ in range(60):
+        moment = first + timedelta(hours=rng.randrange(24 * 90))
+        client.post("/api/logs", json={
+            "utc_timestamp": moment.replace(tzinfo=None).isoformat(),
+            "instrument": "piano",
+            "duration": rng.randint(5, 90),
+        })
+    drain()
+
+    # Edit a log in the middle; only rows from its date onward are rebuilt
+    log = PracticeLog.query.filter_by(user_id=user.id, user_log_number=30).one()
+    changed_day = log.utc_timestamp.replace(tzinfo=timezone.utc).astimezone(TZ).date()
+    before = {
+        row.local_date: row.cum_minutes
+        for row in DailyTotal.query.filter(DailyTotal.local_date < changed_day)
+    }
+    client.patch("/api/edit-log/30", json={"duration": 200})
+    drain()
+    after = {
+        row.local_date: row.cum_minutes
+        for row in DailyTotal.query.filter(DailyTotal.local_date < changed_day)
+    }
+    assert after == before
+
+    for _ in range(50):
+        start = date(2024, 12, 25) + timedelta(days=rng.randrange(100))
+        end = start + timedelta(days=rng.randrange(40))
+        assert range_totals(user.id, start, end) == brute_force(user.id, start, end)
+
+
+def test_range_endpoint(app, client):
+    """Test totals, averages and read-your-writes through the API."""
+    create_test_user()
+    login_test_user(client)
+    client.post("/api/logs", json={"utc_timestamp": "2025-02-03T15:00:00", "instrument": "piano", "duration": 30})
+    client.post("/api/logs", json={"utc_timestamp": "2025-02-05T15:00:00", "instrument": "piano", "duration": 50})
+
+    # The pending rollup job runs before the read
+    body = client.get("/api/stats/range?start=2025-02-01&end=2025-02-10").get_json()
+    assert body == {
+        "start": "2025-02-01",
+        "end": "2025-02-10",
+        "days": 10,
+        "minutes": 80,
+        "sessions": 2,
+        "days_practiced": 2,
+        "daily_average": 8.0,
+        "session_average": 40.0,
+    }
+
+    # User, pending-job check and the two prefix rows
+    with app.app_context(), assert_max_queries(4):
+        client.get("/api/stats/range?start=2020-01-01&end=2030-12-31")
+
+
+def test_range_endpoint_rejects_bad_dates(app, client):
+    """Test 400 for missing, malformed and reversed dates."""
+    create_test_user()
+    login_test_user(client)
+
+    assert client.get("/api/stats/range?start=2025-01-01").status_code == 400
+    assert client.get("/api/stats/range?start=2025-13-01&end=2025-12-01").status_code == 400
+    resp = client.get("/api/stats/range?start=2025-02-01&end=2025-01-01")
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "validation_failed", "message": "end must not be before start"}
@@ -0,0 +1,232 @@
+"""
+Computed-Stats Cache Tests for Practice Tracker Application
+
+This module tests the interchangeable cache backends (memory, SQLite file
+and Redis protocol, the latter against a local stand-in server), value
+serialization, failure handling and the hit/miss metrics, plus the
+dashboard and analytics caches sharing one backend across workers.
+"""
+
+import socket
+import socketserver
+import threading
+import time
+from datetime import date, datetime, timezone
+
+import pytest
+
+from .conftest import create_test_user, login_test_user
+from app.utils.cache import (
+    MemoryBackend,
+    RedisBackend,
+    SharedCache,
+    SQLiteBackend,
+    dump_value,
+    load_value,
+    make_backend,
+)
+from app.utils.metrics import MetricsRegistry
+
+
+class StandInHandler(socketserver.StreamRequestHandler):
+    """Speaks the subset of RESP used by RedisBackend: GET, SET ... PX, DEL."""
+
+    def read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while (args := self.read_command()) is not None:
+            command = args[0].upper()
+            if command == b"GET":
+                value, expires_at = store.get(args[1], (None, 0))
+                if value is None or expires_at <= time.monotonic():
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif command == b"SET":
+                store[args[1]] = (args[2], time.monotonic() + int(args[4]) / 1000)
+                self.wfile.write(b"+OK\r\n")
+            elif command == b"DEL":
+                self.wfile.write(b":%d\r\n" % (store.pop(args[1], None) is not None))
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def redis_url():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.store = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryBackend()
+    elif request.param == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    else:
+        backend = RedisBackend(request.getfixturevalue("redis_url"))
+    yield backend
+    backend.close()
+
+
+def test_backends_store_expire_and_delete(backend):
+    """Test the behaviour every backend shares."""
+    assert backend.get("k") is None
+    backend.set("k", b"value", ttl=60)
+    assert backend.get("k") == b"value"
+    backend.set("k", b"newer", ttl=60)
+    assert backend.get("k") == b"newer"
+
+    backend.delete("k")
+    assert backend.get("k") is None
+
+    backend.set("short", b"x", ttl=0.05)
+    time.sleep(0.1)
+    assert backend.get("short") is None
+
+
+def test_values_round_trip_with_dates():
+    """Test that dates and datetimes survive serialization."""
+    value = {
+        "day": date(2025, 3, 1),
+        "at": datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc),
+        "rows": [{"minutes": 30, "notes": None}],
+    }
+    assert load_value(dump_value(value)) == value
+
+    with pytest.raises(TypeError):
+        dump_value({"piece": object()})
+
+
+def test_shared_cache_counts_hits_misses_and_skips_unserializable():
+    """Test lookups are counted per cache and bad values are not stored."""
+    metrics = MetricsRegistry()
+    cache = SharedCache(MemoryBackend(), "dashboard", ttl=60, metrics=metrics)
+
+    assert cache.get((1, 0, "weekly")) is None
+    cache.set((1, 0, "weekly"), {"labels": ["Mon"], "data": [30]})
+    assert cache.get((1, 0, "weekly")) == {"labels": ["Mon"], "data": [30]}
+    # A new data version is a different key
+    assert cache.get((1, 1, "weekly"), "missing") == "missing"
+
+    cache.set((1, 1, "weekly"), {"piece": object()})
+    assert cache.get((1, 1, "weekly")) is None
+
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert metrics.snapshot()["cache"] == {("dashboard", "hit"): 1, ("dashboard", "miss"): 3}
+
+
+def test_shared_cache_keeps_none_and_json_shapes():
+    """Test that a cached None is a hit and values come back JSON-shaped."""
+    backend = MemoryBackend()
+    cache = SharedCache(backend, "dashboard", ttl=60)
+
+    cache.set((1, 0, "common_piece"), None)
+    assert cache.get((1, 0, "common_piece"), "missing") is None
+    cache.set((1, 0, "weekly"), {1: ("Mon", 30)})
+    assert cache.get((1, 0, "weekly")) == {"1": ["Mon", 30]}
+
+    # Entries in another format are misses, replaced on the next set
+    backend.set("subwoofer:dashboard:1:0:streak", b'{"current": 3}', ttl=60)
+    assert cache.get((1, 0, "streak"), "missing") == "missing"
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_shared_cache_returns_copies():
+    """Test that modifying a returned value does not change the cached one."""
+    cache = SharedCache(MemoryBackend(), "analytics", ttl=60)
+    cache.set((1, 0, "instruments"), [{"instrument": "piano"}])
+    cache.get((1, 0, "instruments"))[0]["instrument"] = "changed"
+    assert cache.get((1, 0, "instruments")) == [{"instrument": "piano"}]
+
+
+def test_unreachable_backend_is_a_miss():
+    """Test that a failing backend degrades to recomputing, counted as errors."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]  # closed again before use
+    metrics = MetricsRegistry()
+    cache = SharedCache(RedisBackend(f"redis://127.0.0.1:{port}/0"), "dashboard", ttl=60, metrics=metrics)
+
+    cache.set((1, 0, "weekly"), [1])
+    assert cache.get((1, 0, "weekly"), "default") == "default"
+    assert metrics.snapshot()["cache"] == {("dashboard", "error"): 2}
+
+
+def test_sqlite_backend_is_shared_between_processes(tmp_path):
+    """Test that separate backends on one file (one per worker) see each other's entries."""
+    path = str(tmp_path / "cache.db")
+    SQLiteBackend(path).set("k", b"from worker 1", ttl=60)
+    assert SQLiteBackend(path).get("k") == b"from worker 1"
+
+
+def test_sqlite_backend_prunes_to_maxsize(tmp_path):
+    """Test that pruning drops expired entries and the soonest-expiring extras."""
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), maxsize=2)
+    backend.set("expired", b"x", ttl=-1)
+    for i, ttl in enumerate([10, 30, 20]):
+        backend.set(f"k{i}", b"x", ttl=ttl)
+    backend.prune()
+
+    assert [backend.get(f"k{i}") for i in range(3)] == [None, b"x", b"x"]
+
+
+def test_make_backend_schemes(tmp_path):
+    """Test that cache URLs select the matching backend."""
+    assert isinstance(make_backend("memory://"), MemoryBackend)
+    assert isinstance(make_backend(f"sqlite:///{tmp_path}/cache.db"), SQLiteBackend)
+    redis = make_backend("redis://:secret@cache.internal:6380/2")
+    assert (redis.host, redis.port, redis.password, redis.db) == ("cache.internal", 6380, "secret", 2)
+    with pytest.raises(ValueError):
+        make_backend("memcached://localhost")
+
+
+def test_dashboard_sections_shared_across_workers(client, app, tmp_path):
+    """Test that a worker reads the sections another worker cached in the shared file."""
+    create_test_user()
+    login_test_user(client)
+    path = str(tmp_path / "cache.db")
+    url = "/api/dashboard/stats?fields=total_minutes,weekly"
+
+    app.extensions["cache"] = SQLiteBackend(path)
+    app.extensions.pop("dashboard_cache", None)
+    first = client.get(url).get_json()
+
+    # A second worker: its own connection to the file and an empty memory
+    app.extensions["cache"] = SQLiteBackend(path)
+    app.extensions.pop("dashboard_cache", None)
+    assert client.get(url).get_json() == first
+
+    lookups = app.extensions["metrics"].snapshot()["cache"]
+    assert lookups[("dashboard", "miss")] == 2
+    assert lookups[("dashboard", "hit")] == 2
+    text = app.extensions["metrics"].render_prometheus()
+    assert 'subwoofer_cache_requests_total{cache="dashboard",result="hit"} 2' in text
+
+
+def test_analytics_reports_use_the_app_backend(client, app):
+    """Test that stats reports are cached in the app's backend under the analytics name."""
+    create_test_user()
+    login_test_user(client)
+
+    client.get("/api/stats/instruments")
+    client.get("/api/stats/instruments")
+
+    lookups = app.extensions["metrics"].snapshot()["cache"]
+    assert lookups == {("analytics", "miss"): 1, ("analytics", "hit"): 1}
+    assert app.extensions["analytics"].cache.backend is app.extensions["cache"]
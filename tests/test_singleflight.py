@@ -0,0 +1,201 @@
+"""
+Request Coalescing Tests for Practice Tracker Application
+
+This module tests the SingleFlight primitive (one computation shared by
+concurrent callers, with follower timeouts) and the coalesce_requests view
+decorator on /api/logs and /api/dashboard/stats.
+"""
+
+import threading
+import time
+
+from .conftest import create_test_user, login_test_user, seed_logs
+from app import db
+from app.utils.singleflight import SingleFlight
+
+
+def run_followers(group, key, fn, count, timeout=5):
+    """Start `count` threads calling group.do; results are filled in as they finish."""
+    results = [None] * count
+
+    def follower(i):
+        results[i] = group.do(key, fn, timeout)
+
+    threads = [threading.Thread(target=follower, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def let_followers_join():
+    """Give follower threads a moment to find the leader's call and wait on it."""
+    time.sleep(0.1)
+
+
+def test_concurrent_callers_share_one_computation():
+    """Test that duplicates arriving while the leader runs get its result."""
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, leader_result = [], []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "report"
+
+    leader = threading.Thread(target=lambda: leader_result.append(group.do("k", compute, 5)))
+    leader.start()
+    started.wait(5)
+    threads, results = run_followers(group, "k", compute, 4)
+    let_followers_join()
+    release.set()
+    for thread in threads + [leader]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert leader_result == [("report", "leader")]
+    assert results == [("report", "shared")] * 4
+    assert group.in_flight() == 0
+
+
+def test_different_keys_do_not_coalesce():
+    """Test that calls with different keys run independently."""
+    group = SingleFlight()
+    assert group.do("a", lambda: 1, 5) == (1, "leader")
+    assert group.do("b", lambda: 2, 5) == (2, "leader")
+    # A finished call is not reused: the next caller computes again
+    assert group.do("a", lambda: 3, 5) == (3, "leader")
+
+
+def test_follower_computes_itself_when_the_leader_is_stuck():
+    """Test that a follower stops waiting after the timeout."""
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def stuck():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    leader = threading.Thread(target=group.do, args=("k", stuck, 5))
+    leader.start()
+    started.wait(5)
+    try:
+        assert group.do("k", lambda: "own", 0.05) == ("own", "timeout")
+    finally:
+        release.set()
+        leader.join(5)
+
+
+def test_leader_failure_does_not_poison_followers():
+    """Test that followers recompute when the leader raises."""
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    def lead():
+        try:
+            group.do("k", failing, 5)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    threads, results = run_followers(group, "k", lambda: "recovered", 2)
+    let_followers_join()
+    release.set()
+    for thread in threads + [leader]:
+        thread.join(5)
+
+    assert len(errors) == 1
+    assert results == [("recovered", "leader_failed")] * 2
+    assert group.in_flight() == 0
+
+
+class RecordingGroup(SingleFlight):
+    """SingleFlight that records keys and can pretend a call was shared."""
+
+    def __init__(self, shared=None):
+        super().__init__()
+        self.keys = []
+        self.shared = shared
+
+    def do(self, key, fn, timeout):
+        self.keys.append(key)
+        if self.shared is not None:
+            return self.shared, "shared"
+        return super().do(key, fn, timeout)
+
+
+def test_logs_route_rebuilds_the_leader_response(client, app):
+    """Test that status, body and headers (X-Next-Cursor) survive coalescing."""
+    user = create_test_user()
+    seed_logs(user, 5)
+    db.session.commit()
+    login_test_user(client)
+    group = app.extensions["singleflight"] = RecordingGroup()
+
+    response = client.get("/api/logs?limit=2&sort=duration")
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
+    assert response.headers["X-Next-Cursor"]
+
+    (key,) = group.keys
+    assert key[:2] == (user.id, "logs.get_logs")
+    assert ("limit", "2") in key[3] and ("sort", "duration") in key[3]
+
+    metrics = app.extensions["metrics"].snapshot()["coalesced"]
+    assert metrics == {("logs.get_logs", "leader"): 1}
+
+
+def test_follower_gets_the_shared_response_without_running_the_view(client, app):
+    """Test that a shared result is returned as-is, with its own response object."""
+    create_test_user()
+    login_test_user(client)
+    body = b'{"weekly": "from the leader"}'
+    app.extensions["singleflight"] = RecordingGroup(
+        shared=(200, [("Content-Type", "application/json"), ("Content-Length", "1")], body)
+    )
+
+    response = client.get("/api/dashboard/stats")
+
+    assert response.status_code == 200
+    assert response.get_json() == {"weekly": "from the leader"}
+    assert response.headers["Content-Length"] == str(len(body))
+    text = app.extensions["metrics"].render_prometheus()
+    assert 'subwoofer_coalesced_requests_total{endpoint="dash.get_dashboard_stats",outcome="shared"} 1' in text
+
+
+def test_writes_change_the_coalescing_key(client, app):
+    """Test that a request after a log write never joins a computation from before it."""
+    create_test_user()
+    login_test_user(client)
+    group = app.extensions["singleflight"] = RecordingGroup()
+
+    client.get("/api/dashboard/stats?fields=total_minutes")
+    client.post("/api/logs", json={
+        "utc_timestamp": "2025-01-01T00:00:00", "instrument": "piano", "duration": 30,
+        "notes": "", "piece": "Etude", "composer": "Chopin",
+    })
+    client.get("/api/dashboard/stats?fields=total_minutes")
+
+    assert len(group.keys) == 2
+    assert group.keys[0][-1] != group.keys[1][-1]
+
+
+def test_coalescing_can_be_disabled(client, app):
+    """Test that SINGLEFLIGHT_TIMEOUT=0 calls the view directly."""
+    create_test_user()
+    login_test_user(client)
+    app.config["SINGLEFLIGHT_TIMEOUT"] = 0
+    group = app.extensions["singleflight"] = RecordingGroup()
+
+    assert client.get("/api/logs").status_code == 200
+    assert group.keys == []
@@ -0,0 +1,316 @@
+"""
+Startup Tests for Practice Tracker Application
+
+This module tests the fast-start path of the application factory: the
+stored schema version check that replaces create_all on warm boots, and the
+lazy loading of utility modules.
+"""
+
+import subprocess
+import sys
+import threading
+import time
+
+from sqlalchemy import inspect
+
+from app import create_app, db
+from app.models import SCHEMA_VERSION, User
+from app.utils import schema
+from app.utils.schema import ensure_schema, get_stored_version
+
+
+def make_file_app(tmp_path):
+    """Create an app backed by a fresh SQLite file in tmp_path."""
+    return create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'startup.db'}",
+        "SECRET_KEY": "testsecret",
+        "JOB_WORKERS": 0,
+    })
+
+
+def test_first_boot_creates_schema_and_stores_version(tmp_path):
+    """Test that a new database gets its tables and the current version."""
+    app = make_file_app(tmp_path)
+    with app.app_context():
+        assert get_stored_version(db.engine) == SCHEMA_VERSION
+        tables = inspect(db.engine).get_table_names()
+    assert {"user", "practice_log", "piece"} <= set(tables)
+
+
+def test_warm_boot_skips_create_all(tmp_path, monkeypatch):
+    """Test that an up-to-date database does not run create_all again."""
+    app = make_file_app(tmp_path)
+
+    calls = []
+    monkeypatch.setattr(db, "create_all", lambda *a, **kw: calls.append(1))
+    assert ensure_schema(app) is False
+    assert calls == []
+
+
+def test_version_bump_upgrades_schema(tmp_path, monkeypatch):
+    """Test that bumping SCHEMA_VERSION re-runs table and index creation."""
+    app = make_file_app(tmp_path)
+
+    monkeypatch.setattr(schema, "SCHEMA_VERSION", SCHEMA_VERSION + 1)
+    assert ensure_schema(app) is True
+    with app.app_context():
+        assert get_stored_version(db.engine) == SCHEMA_VERSION + 1
+    assert ensure_schema(app) is False
+
+
+def test_utils_package_imports_lazily():
+    """Test that importing app.utils does not load the heavy submodules."""
+    code = (
+        "import sys, app.utils; "
+        "print('app.utils.stats' in sys.modules, 'app.routes' in sys.modules); "
+        "from app.utils import get_total_log_mins; "
+        "print('app.utils.stats' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "False", "True"]
+
+
+def test_version_bump_adds_new_columns(tmp_path):
+    """Test that columns added to an existing table are created on upgrade."""
+    app = make_file_app(tmp_path)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('ALTER TABLE "user" DROP COLUMN data_version')
+        schema.set_stored_version(db.engine, SCHEMA_VERSION - 1)
+
+    assert ensure_schema(app) is True
+    with app.app_context():
+        columns = {col["name"] for col in inspect(db.engine).get_columns("user")}
+    assert "data_version" in columns
+
+
+def test_concurrent_workers_upgrade_once(tmp_path, monkeypatch):
+    """Test that workers booting together against an old database upgrade it once."""
+    apps = [make_file_app(tmp_path) for _ in range(2)]
+    with apps[0].app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('ALTER TABLE "user" DROP COLUMN data_version')
+        schema.set_stored_version(db.engine, SCHEMA_VERSION - 1)
+
+    add_missing_columns = schema.add_missing_columns
+
+    def slow_add_missing_columns(conn):
+        added = add_missing_columns(conn)
+        time.sleep(0.3)  # Keep upgrading while the other worker checks the version
+        return added
+
+    monkeypatch.setattr(schema, "add_missing_columns", slow_add_missing_columns)
+    results, errors = [], []
+
+    def boot(app):
+        try:
+            results.append(ensure_schema(app))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=boot, args=(app,)) for app in apps]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert errors == []
+    assert sorted(results) == [False, True]
+    with apps[1].app_context():
+        assert get_stored_version(db.engine) == SCHEMA_VERSION
+
+
+def test_upgrade_backfills_rollup_prefix_sums(tmp_path):
+    """Test that prefix sums added to existing rollups are filled in."""
+    app = make_file_app(tmp_path)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO user (id, username, password_hash, timezone, creation_date) "
+                "VALUES (1, 'u', 'x', 'UTC', '2025-01-01 00:00:00')"
+            )
+            for column in ("cum_minutes", "cum_sessions", "cum_days"):
+                conn.exec_driver_sql(f"ALTER TABLE daily_total DROP COLUMN {column}")
+            conn.exec_driver_sql(
+                "INSERT INTO daily_total (user_id, local_date, minutes, sessions) VALUES "
+                "(1, '2025-01-01', 30, 1), (1, '2025-01-03', 20, 2), (1, '2025-01-02', 10, 1)"
+            )
+        schema.set_stored_version(db.engine, SCHEMA_VERSION - 1)
+
+    assert ensure_schema(app) is True
+    with app.app_context():
+        with db.engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT cum_minutes, cum_sessions, cum_days FROM daily_total ORDER BY local_date"
+            ).all()
+    assert [tuple(row) for row in rows] == [(30, 1, 1), (40, 2, 2), (60, 4, 3)]
+
+
+def test_upgrade_backfills_log_change_versions(tmp_path):
+    """Test that existing logs get their owner's data version as change version."""
+    app = make_file_app(tmp_path)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO user (id, username, password_hash, timezone, creation_date, data_version) "
+                "VALUES (1, 'u', 'x', 'UTC', '2025-01-01 00:00:00', 7)"
+            )
+            conn.exec_driver_sql("DROP INDEX ix_practice_log_user_change")
+            conn.exec_driver_sql("ALTER TABLE practice_log DROP COLUMN change_version")
+            conn.exec_driver_sql(
+                "INSERT INTO practice_log (user_id, user_log_number, utc_timestamp, instrument, duration) "
+                "VALUES (1, 1, '2025-01-01 12:00:00', 'piano', 30)"
+            )
+        schema.set_stored_version(db.engine, SCHEMA_VERSION - 1)
+
+    assert ensure_schema(app) is True
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT change_version FROM practice_log").scalar() == 7
+
+
+def test_upgrade_backfills_piece_suggestions(tmp_path):
+    """Test that existing pieces get their last log time and search terms."""
+    app = make_file_app(tmp_path)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO user (id, username, password_hash, timezone, creation_date) "
+                "VALUES (1, 'u', 'x', 'UTC', '2025-01-01 00:00:00')"
+            )
+            conn.exec_driver_sql("DROP TABLE piece_term")
+            conn.exec_driver_sql("DROP INDEX ix_piece_user_last_practiced")
+            conn.exec_driver_sql("ALTER TABLE piece DROP COLUMN last_practiced")
+            conn.exec_driver_sql(
+                "INSERT INTO piece (id, user_id, title, composer, log_time) VALUES (1, 1, 'Für Elise', 'Beethoven', 50)"
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO practice_log (user_id, user_log_number, utc_timestamp, instrument, duration, piece_id) "
+                "VALUES (1, 1, '2025-01-01 12:00:00', 'piano', 30, 1), (1, 2, '2025-02-01 12:00:00', 'piano', 20, 1)"
+            )
+        schema.set_stored_version(db.engine, SCHEMA_VERSION - 1)
+
+    assert ensure_schema(app) is True
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT last_practiced FROM piece").scalar().startswith("2025-02-01 12:00:00")
+            terms = conn.exec_driver_sql("SELECT term FROM piece_term ORDER BY term").scalars().all()
+    assert terms == ["beethoven", "elise", "fur"]
+
+
+def test_upgrade_indexes_existing_notes(tmp_path):
+    """Test that the search table is created and filled for an existing database."""
+    app = make_file_app(tmp_path)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE log_search")
+            for trigger in ("insert", "update", "delete", "piece_title"):
+                conn.exec_driver_sql(f"DROP TRIGGER log_search_{trigger}")
+            conn.exec_driver_sql(
+                "INSERT INTO user (id, username, password_hash, timezone, creation_date) "
+                "VALUES (1, 'u', 'x', 'UTC', '2025-01-01 00:00:00')"
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO practice_log (user_id, user_log_number, utc_timestamp, instrument, duration, notes) "
+                "VALUES (1, 1, '2025-01-01 12:00:00', 'piano', 30, 'long tones'), "
+                "(1, 2, '2025-01-02 12:00:00', 'piano', 30, NULL)"
+            )
+        schema.set_stored_version(db.engine, SCHEMA_VERSION - 1)
+
+    assert ensure_schema(app) is True
+    with app.app_context():
+        with db.engine.connect() as conn:
+            rows = conn.exec_driver_sql("SELECT rowid FROM log_search WHERE log_search MATCH 'tones'").all()
+            assert rows == [(1,)]
+            assert conn.exec_driver_sql("SELECT count(*) FROM log_search").scalar() == 1
+
+
+def test_upgrade_builds_rollups_from_existing_logs(tmp_path):
+    """Test that the rollup table created for an existing database is filled from its logs."""
+    app = make_file_app(tmp_path)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE daily_total")
+            conn.exec_driver_sql(
+                "INSERT INTO user (id, username, password_hash, timezone, creation_date) VALUES "
+                "(1, 'u', 'x', 'America/New_York', '2025-01-01 00:00:00'), "
+                "(2, 'v', 'x', 'UTC', '2025-01-01 00:00:00')"
+            )
+            # 02:00 UTC on Jan 2 is still Jan 1 in New York
+            conn.exec_driver_sql(
+                "INSERT INTO practice_log (user_id, user_log_number, utc_timestamp, instrument, duration) VALUES "
+                "(1, 1, '2025-01-01 15:00:00', 'piano', 30), (1, 2, '2025-01-02 02:00:00', 'piano', 10), "
+                "(1, 3, '2025-01-03 15:00:00', 'piano', 20), (2, 1, '2025-01-02 02:00:00', 'violin', 45)"
+            )
+        schema.set_stored_version(db.engine, SCHEMA_VERSION - 1)
+
+    assert ensure_schema(app) is True
+    with app.app_context():
+        with db.engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT user_id, local_date, minutes, sessions, cum_minutes, cum_sessions, cum_days "
+                "FROM daily_total ORDER BY user_id, local_date"
+            ).all()
+    assert [tuple(row) for row in rows] == [
+        (1, "2025-01-01", 40, 2, 40, 2, 1),
+        (1, "2025-01-03", 20, 1, 60, 3, 2),
+        (2, "2025-01-02", 45, 1, 45, 1, 1),
+    ]
+
+
+def test_upgraded_rollups_keep_range_totals_after_a_write(tmp_path):
+    """Test that a write after an upgrade continues prefix sums that include the older logs."""
+    app = make_file_app(tmp_path)
+    with app.app_context():
+        user = User(username="u", timezone="UTC")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.commit()
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE daily_total")
+            conn.exec_driver_sql(
+                "INSERT INTO practice_log (user_id, user_log_number, utc_timestamp, instrument, duration) VALUES "
+                "(1, 1, '2025-01-01 12:00:00', 'piano', 100), (1, 2, '2025-01-05 12:00:00', 'piano', 200)"
+            )
+        schema.set_stored_version(db.engine, SCHEMA_VERSION - 1)
+
+    assert ensure_schema(app) is True
+    client = app.test_client()
+    client.post("/login", json={"username": "u", "password": "pw"})
+    client.post("/api/logs", json={
+        "utc_timestamp": "2025-01-10T12:00:00", "instrument": "piano", "duration": 40,
+        "notes": "", "piece": "", "composer": "",
+    })
+
+    totals = client.get("/api/stats/range?start=2025-01-01&end=2025-01-31").get_json()
+    assert (totals["minutes"], totals["sessions"], totals["days_practiced"]) == (340, 3, 3)
+    assert client.get("/api/stats/range?start=2025-01-06&end=2025-01-31").get_json()["minutes"] == 40
+
+
+def test_upgrade_scores_existing_logs_on_leaderboards(tmp_path):
+    """Test that the leaderboard table created for an existing database counts its logs."""
+    app = make_file_app(tmp_path)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE leaderboard_score")
+            conn.exec_driver_sql(
+                "INSERT INTO user (id, username, password_hash, timezone, creation_date) "
+                "VALUES (1, 'u', 'x', 'UTC', '2025-01-01 00:00:00')"
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO practice_log (user_id, user_log_number, utc_timestamp, instrument, duration) VALUES "
+                "(1, 1, '2025-01-01 12:00:00', 'piano', 30), (1, 2, '2025-02-03 12:00:00', 'violin', 20)"
+            )
+        schema.set_stored_version(db.engine, SCHEMA_VERSION - 1)
+
+    assert ensure_schema(app) is True
+    with app.app_context():
+        with db.engine.connect() as conn:
+            scores = dict(conn.exec_driver_sql(
+                "SELECT board || '/' || instrument, minutes FROM leaderboard_score WHERE user_id = 1"
+            ).all())
+    assert scores["all/"] == 50
+    assert scores["all/violin"] == 20
+    assert scores["month:2025-01/"] == 30
+    assert scores["week:2025-02-03/violin"] == 20
@@ -0,0 +1,117 @@
+"""
+Streak Tests for Practice Tracker Application
+
+This module tests the incremental streak arithmetic against full
+recomputation, and the streaks maintained by log writes and exposed by
+/api/dashboard/stats.
+"""
+
+import random
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from .conftest import create_test_user, login_test_user
+from app.models import Job, PracticeLog
+from app.utils.streaks import (
+    EMPTY,
+    RECOMPUTE_JOB,
+    apply_day_change,
+    get_streaks,
+    streak_state_from_days,
+    summarize,
+)
+
+D0 = date(2025, 1, 1)
+
+
+def day(n):
+    return D0 + timedelta(days=n)
+
+
+def test_state_from_days():
+    """Test latest run and past longest from a set of days."""
+    days = [day(0), day(1), day(2), day(5), day(7), day(8)]
+    assert streak_state_from_days(days) == (day(7), day(8), 3)
+    assert streak_state_from_days([]) == EMPTY
+
+
+def test_summarize_keeps_streak_alive_until_a_day_is_missed():
+    """Test that yesterday's practice still counts as a current streak."""
+    state = (day(0), day(4), 2)
+    assert summarize(state, day(5)) == {"current": 5, "longest": 5}
+    assert summarize(state, day(6)) == {"current": 0, "longest": 5}
+
+
+def test_incremental_updates_match_recompute():
+    """Test random add/remove sequences against full recomputation."""
+    rng = random.Random(1234)
+    for _ in range(200):
+        present = set()
+        state = EMPTY
+        for _ in range(40):
+            d = day(rng.randrange(30))
+            if d in present and rng.random() < 0.5:
+                present.discard(d)
+            else:
+                present.add(d)
+            updated = apply_day_change(state, d, d in present, present)
+            state = updated if updated is not None else streak_state_from_days(present)
+            assert state == streak_state_from_days(present)
+
+
+def test_common_changes_need_no_recompute():
+    """Test that extending, trimming and splitting the latest run are O(1)."""
+    state = (day(10), day(14), 3)
+    present = {day(n) for n in range(10, 15)}
+
+    assert apply_day_change(state, day(15), True, present | {day(15)}) == (day(10), day(15), 3)
+    assert apply_day_change(state, day(14), False, present - {day(14)}) == (day(10), day(13), 3)
+    assert apply_day_change(state, day(12), False, present - {day(12)}) == (day(13), day(14), 3)
+    assert apply_day_change(state, day(20), True, present | {day(20)}) == (day(20), day(20), 5)
+    # Backfilling days before the latest run needs the older history
+    assert apply_day_change(state, day(5), True, present | {day(5)}) is None
+
+
+def log_at(client, tz, local_day, duration=20):
+    local = datetime.combine(local_day, time(18, 0), tzinfo=tz)
+    client.post("/api/logs", json={
+        "utc_timestamp": local.astimezone(timezone.utc).replace(tzinfo=None).isoformat(),
+        "instrument": "piano",
+        "duration": duration,
+    })
+
+
+def test_dashboard_reports_streaks(app, client):
+    """Test streaks maintained by add and delete through the API."""
+    user = create_test_user()
+    login_test_user(client)
+    tz = ZoneInfo(user.timezone)
+    today = datetime.now(tz).date()
+
+    for offset in (10, 9, 8, 4, 3, 2, 1, 0):
+        log_at(client, tz, today - timedelta(days=offset))
+
+    streak = client.get("/api/dashboard/stats").get_json()["streak"]
+    assert streak == {"current": 5, "longest": 5}
+
+    # Deleting a log from the middle of the current run splits it in O(1)
+    log = PracticeLog.query.filter_by(user_id=user.id, user_log_number=6).first()
+    client.delete(f"/api/delete-log/{log.user_log_number}", json={"logNumber": log.user_log_number})
+    assert Job.query.filter_by(kind=RECOMPUTE_JOB).count() == 0
+    assert get_streaks(user.id, user.timezone) == {"current": 2, "longest": 3}
+
+
+def test_backfilled_history_is_recomputed_on_read(app, client):
+    """Test that changes before the latest run are recomputed before reads."""
+    user = create_test_user()
+    login_test_user(client)
+    tz = ZoneInfo(user.timezone)
+    today = datetime.now(tz).date()
+
+    log_at(client, tz, today)
+    for offset in range(20, 14, -1):
+        log_at(client, tz, today - timedelta(days=offset))
+
+    assert Job.query.filter_by(kind=RECOMPUTE_JOB).count() == 1
+    assert get_streaks(user.id, user.timezone) == {"current": 1, "longest": 6}
+    assert Job.query.filter_by(kind=RECOMPUTE_JOB).count() == 0
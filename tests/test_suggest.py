@@ -0,0 +1,144 @@
+"""
+Piece Suggestion Tests for Practice Tracker Application
+
+This module tests GET /api/pieces/suggest: word-prefix matching on
+normalized titles and composers, ranking by recency and practice time,
+the maintenance of Piece.last_practiced as logs change, and that the
+number of queries does not grow with the number of pieces.
+"""
+
+from datetime import datetime, timedelta
+
+from .conftest import assert_max_queries, create_test_user, login_test_user
+from app import db
+from app.models import Piece, PieceTerm
+from app.utils.suggest import normalize_terms
+
+
+def log_piece(client, title, composer, when, duration=30):
+    resp = client.post("/api/logs", json={
+        "utc_timestamp": when.isoformat(),
+        "instrument": "piano",
+        "duration": duration,
+        "piece": title,
+        "composer": composer,
+    })
+    assert resp.status_code == 201
+    return resp.get_json()["log"]["id"]
+
+
+def titles(client, q, **params):
+    resp = client.get("/api/pieces/suggest", query_string={"q": q, **params})
+    assert resp.status_code == 200
+    return [piece["title"] for piece in resp.get_json()]
+
+
+def test_normalize_terms():
+    """Test that accents, case and punctuation are ignored."""
+    assert normalize_terms("Für Elise, WoO 59") == ["fur", "elise", "woo", "59"]
+    assert normalize_terms("  DVOŘÁK ") == ["dvorak"]
+    assert normalize_terms(None) == []
+
+
+def test_new_pieces_are_indexed(client):
+    """Test that a piece's words are stored when it is created."""
+    user = create_test_user()
+    login_test_user(client)
+    log_piece(client, "Clair de Lune", "Debussy", datetime(2025, 1, 1, 12))
+
+    terms = db.session.execute(db.select(PieceTerm.term).where(PieceTerm.user_id == user.id)).scalars()
+    assert sorted(terms) == ["clair", "de", "debussy", "lune"]
+
+
+def test_word_prefix_matching(client):
+    """Test that every typed word must start a word of the title or composer."""
+    create_test_user()
+    login_test_user(client)
+    when = datetime(2025, 1, 1, 12)
+    log_piece(client, "Moonlight Sonata", "Beethoven", when)
+    log_piece(client, "Für Elise", "Beethoven", when)
+    log_piece(client, "Sonata in C", "Mozart", when)
+
+    assert titles(client, "moon son") == ["Moonlight Sonata"]
+    assert titles(client, "fur") == ["Für Elise"]
+    assert titles(client, "ELISE beeth") == ["Für Elise"]
+    assert set(titles(client, "sonata")) == {"Moonlight Sonata", "Sonata in C"}
+    assert titles(client, "light") == []  # not a word prefix
+    assert titles(client, "moz", limit=1) == ["Sonata in C"]
+
+
+def test_ranking_by_title_prefix_recency_and_minutes(client):
+    """Test that title-prefix matches lead, then recent and long-practiced pieces."""
+    create_test_user()
+    login_test_user(client)
+    now = datetime.utcnow()
+    log_piece(client, "Etude Op. 10", "Chopin", now - timedelta(days=200), duration=120)
+    log_piece(client, "Etude Op. 25", "Chopin", now - timedelta(days=1), duration=30)
+    log_piece(client, "Ballade", "Chopin", now - timedelta(days=1), duration=30)
+    log_piece(client, "Trois Etudes", "Debussy", now, duration=60)
+
+    assert titles(client, "etude") == ["Etude Op. 25", "Etude Op. 10", "Trois Etudes"]
+    assert titles(client, "chopin")[-1] == "Etude Op. 10"  # practiced longest, but long ago
+
+
+def test_empty_query_returns_recent_pieces(client):
+    """Test that an empty query lists the most recently practiced pieces."""
+    create_test_user()
+    login_test_user(client)
+    first = datetime(2025, 1, 1, 12)
+    for n, title in enumerate(["Old", "Middle", "New"]):
+        log_piece(client, title, "Someone", first + timedelta(days=n))
+
+    assert titles(client, "") == ["New", "Middle", "Old"]
+    assert titles(client, "", limit=2) == ["New", "Middle"]
+
+
+def test_suggestion_fields(client):
+    """Test the fields of a suggestion."""
+    create_test_user()
+    login_test_user(client)
+    log_piece(client, "Arabesque", "Debussy", datetime(2025, 3, 1, 12), duration=25)
+
+    [piece] = client.get("/api/pieces/suggest?q=arab").get_json()
+    assert set(piece) == {"id", "title", "composer", "minutes", "last_practiced"}
+    assert (piece["composer"], piece["minutes"], piece["last_practiced"]) == ("Debussy", 25, "2025-03-01")
+
+
+def test_rejects_bad_limit(client):
+    """Test 400 for limits outside 1-50."""
+    create_test_user()
+    login_test_user(client)
+    assert client.get("/api/pieces/suggest?limit=0").status_code == 400
+    resp = client.get("/api/pieces/suggest?limit=51")
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "validation_failed", "message": "limit must be between 1 and 50"}
+
+
+def test_last_practiced_follows_log_changes(client):
+    """Test that last_practiced moves back when the latest log is deleted."""
+    user = create_test_user()
+    login_test_user(client)
+    log_piece(client, "Gymnopedie", "Satie", datetime(2025, 1, 1, 12))
+    latest = log_piece(client, "Gymnopedie", "Satie", datetime(2025, 2, 1, 12))
+    log_piece(client, "Gymnopedie", "Satie", datetime(2025, 1, 15, 12))  # older than the latest
+
+    piece = Piece.query.filter_by(user_id=user.id).one()
+    assert piece.last_practiced == datetime(2025, 2, 1, 12)
+
+    client.delete(f"/api/delete-log/{latest}", json={"logNumber": latest})
+    db.session.refresh(piece)
+    assert piece.last_practiced == datetime(2025, 1, 15, 12)
+
+
+def test_query_count_is_constant(client):
+    """Test that suggestions cost the same queries with many pieces."""
+    user = create_test_user()
+    login_test_user(client)
+    db.session.add_all(
+        Piece(title=f"Prelude {n}", composer="Bach", user_id=user.id, log_time=n) for n in range(300)
+    )
+    db.session.commit()
+
+    with assert_max_queries(2):
+        resp = client.get("/api/pieces/suggest?q=prel&limit=5")
+    assert [piece["title"] for piece in resp.get_json()] == [f"Prelude {n}" for n in (299, 298, 297, 296, 295)]
@@ -0,0 +1,124 @@
+"""
+User Cache Tests for Practice Tracker Application
+
+This module tests the TTL/LRU cache primitive and the user snapshot cache
+used by the Flask-Login user_loader on read-only requests.
+"""
+
+import threading
+
+from .conftest import create_test_user, login_test_user
+from app import db
+from app.utils.cache import TTLCache
+from app.utils.metrics import capture_queries
+from app.utils.user_cache import UserSnapshot
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def user_queries(queries):
+    """Count statements that load a full row from the user table."""
+    return sum(1 for statement, _ in queries if "user.password_hash" in statement)
+
+
+def test_ttl_cache_expires_entries():
+    """Test that entries are dropped once their TTL has elapsed."""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that a full cache evicts the entry used longest ago."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")       # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_is_thread_safe():
+    """Test that concurrent writers never grow the cache past maxsize."""
+    cache = TTLCache(maxsize=50, ttl=60)
+
+    def writer(offset):
+        for i in range(2000):
+            cache.set(offset + i, i)
+            cache.get(offset + i // 2)
+
+    threads = [threading.Thread(target=writer, args=(n * 10_000,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
+
+
+def test_dashboard_load_looks_up_user_once(app, client):
+    """Test that the three dashboard requests share one cached user lookup."""
+    create_test_user()
+    login_test_user(client)
+    app.extensions["user_cache"].clear()
+
+    with capture_queries() as queries:
+        for url in ("/dashboard", "/api/recent-logs", "/api/dashboard/stats"):
+            with app.app_context():
+                assert client.get(url).status_code == 200
+
+    assert user_queries(queries) == 1
+
+
+def test_read_only_requests_get_snapshot(app, client):
+    """Test that GET requests see an immutable snapshot of the user."""
+    user = create_test_user()
+    login_test_user(client)
+
+    snapshot = app.extensions["user_cache"].get(user.id)
+    assert isinstance(snapshot, UserSnapshot)
+    assert (snapshot.id, snapshot.username, snapshot.timezone) == (user.id, "testuser", "America/New_York")
+    assert snapshot.is_authenticated and snapshot.get_id() == str(user.id)
+    assert client.get("/_whoami").get_json() == {"user": "testuser"}
+
+
+def test_timezone_update_invalidates_snapshot(app, client):
+    """Test that committing a User change evicts its cached snapshot."""
+    user = create_test_user()
+    cache = app.extensions["user_cache"]
+    assert cache.get(user.id).timezone == "America/New_York"
+
+    user.timezone = "Europe/Berlin"
+    db.session.commit()
+
+    assert cache.get(user.id).timezone == "Europe/Berlin"
+
+
+def test_cache_can_be_disabled(app):
+    """Test that USER_CACHE_TTL=0 falls back to a query per request."""
+    from app import create_app
+
+    uncached = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "testsecret",
+        "JOB_WORKERS": 0,
+        "USER_CACHE_TTL": 0,
+    })
+    assert "user_cache" not in uncached.extensions